@@ -19,11 +19,18 @@
 #	constants are shared broadly by geoprocessing scripts, whereas these
 #	are specific to the hydro database.
 #
+#	Constants that require arcpy (e.g. spatial references) are built on
+#	first access by the module __getattr__ function, and then cached, so
+#	that importing this module does not import arcpy; see LAZY IMPORTS in
+#	mg.py.
+#
 # History:
 #	2023-02-22 MCM Created
 #	2023-03-13 MCM Replace OS_USERNAMES_* constants
 #	2024-10-22 MCM Added EXTENT_DISTRICT (#191)
 #	2025-02-01 MCM Add source table names (#188)
+#	2026-10-18 MCM Build SR_UTM16N_NAD83 lazily, without importing arcpy at
+#	                 module load
 #
 # To do:
 #	none
@@ -36,7 +43,7 @@
 # Modules
 ################################################################################
 
-import arcpy
+import mg
 
 
 
@@ -66,11 +73,50 @@ TABLE_NAME_MEASURING_POINT = 'reference_points'
 #
 # Spatial references
 #
+# SR_UTM16N_NAD83 is built on first access; see _LAZY_CONSTANTS
+#
 
-SR_UTM16N_NAD83 = arcpy.SpatialReference(26916) # NAD_1983_UTM_Zone_16N
 EXTENT_DISTRICT = '439316 3274624 809752 3431406'
 
 
+
+#
+# Lazy constants
+#
+# Functions that build constant values requiring arcpy, by constant name
+#
+
+_LAZY_CONSTANTS = {
+	'SR_UTM16N_NAD83': lambda: mg.arcpy.SpatialReference(26916) # NAD_1983_UTM_Zone_16N
+}
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+def __getattr__(name):
+	'''
+	Build lazy constant on first access, and cache it as a module
+	attribute so later accesses bypass this function
+	'''
+
+	if name not in _LAZY_CONSTANTS:
+
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+	value = _LAZY_CONSTANTS[name]()
+
+	globals()[name] = value
+
+
+	return value
+
+
+
+
 ################################################################################
 # END
 ################################################################################
@@ -13,6 +13,24 @@
 #
 # Notes:
 #
+#	SCHEMA BUILD
+#
+#	create_model() builds a task graph (see mg.TaskGraph) with one task
+#	per model object and its dependencies:
+#
+#		Domains
+#		  > Feature classes and attribute tables (each with its global ID,
+#		    editor tracking, archiving, attachments, and privileges)
+#		    > Relationship classes (each after its origin and destination)
+#
+#	With --workers greater than 1, independent objects are created
+#	concurrently in worker processes, each with its own geodatabase
+#	connection. Per-object timings and the critical path are logged at the
+#	end. The default (one worker) creates objects in this process, in
+#	dependency order.
+#
+#
+#
 #	MESSAGES
 #
 #	All messaging is processed through the `logging` module, including user
@@ -116,6 +134,24 @@
 #	               Remove view LocationLastVisit (#261)
 #	               Add -d <database> argument to support development
 #	                 infrastructure
+#	2026-10-18 MCM Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Add create_model() for use by hydro.py
+#	               Accept argument list from hydro.py
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               List existing domains once in create_domains()
+#	               Create model objects from a task graph, with optional
+#	                 worker processes (--workers)
+#	               Removed relationship class DataLogger_Sensor; table
+#	                 Sensor was deleted in update 4
+#	               Read existing domains from mg.SchemaSnapshot
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Accept DATA and DATADEBUG log levels (mg.LOG_LEVEL_NAMES)
 #
 # To do:
 #	none
@@ -131,12 +167,10 @@
 
 # Standard
 
-import arcpy
 import argparse
 import logging
 import os
 import sys
-import tempfile
 
 
 # Custom
@@ -145,6 +179,44 @@ import constants as C
 import mg
 import sql_text
 
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
+
+
+#
+# Constants
+#
+
+TABLE_NAMES = ( # Attribute tables; created by create_table_<name lowercase>()
+	'ConductivityMeasurement'
+	,'DataLogger'
+	,'DischargeMeasurement'
+	,'GroundwaterMeasurement'
+	,'LocationIssue'
+	,'LocationVisit'
+	,'MeasuringPoint'
+	,'RainfallTips'
+	,'StageMeasurement'
+	,'TemperatureMeasurement'
+)
+
+RELATIONSHIP_CLASSES = (
+	#origin table		destination table		name						type		forward label			backward label		message direction	cardinality		attributed	origin PK	origin FK			destination PK	destination FK		attributes
+	('Location'		,'DataLogger'			,'Location__DataLogger'				,'SIMPLE'	,'Data Logger'			,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
+	,('Location'		,'LocationVisit'		,'Location__LocationVisit'			,'SIMPLE'	,'Location Visit'		,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
+	,('Location'		,'MeasuringPoint'		,'Location__MeasuringPoint'			,'SIMPLE'	,'Measuring Point'		,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
+	,('LocationVisit'	,'DischargeMeasurement'		,'LocationVisit_DischargeMeasurement'		,'SIMPLE'	,'Discharge Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'LocationIssue'		,'LocationVisit__LocationIssue'			,'SIMPLE'	,'Location Issue'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'RainfallTips'			,'LocationVisit__RainfallTips'			,'SIMPLE'	,'Rainfall Tips'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'StageMeasurement'		,'LocationVisit__StageMeasurement'		,'SIMPLE'	,'Stage Measurement'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'GroundwaterMeasurement'	,'LocationVisit__GroundwaterMeasurement'	,'SIMPLE'	,'Groundwater Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'ConductivityMeasurement'	,'LocationVisit__ConductivityMeasurement'	,'SIMPLE'	,'Conductivity Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('LocationVisit'	,'TemperatureMeasurement'	,'LocationVisit__TemperatureMeasurement'	,'SIMPLE'	,'Temperature Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
+	,('MeasuringPoint'	,'GroundwaterMeasurement'	,'MeasuringPoint__GroundwaterMeasurement'	,'SIMPLE'	,'Groundwater Measurement'	,'Measuring Point'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'MeasuringPointGlobalID'	,None		,None			,None)
+	,('MeasuringPoint'	,'StageMeasurement'		,'MeasuringPoint__StageMeasurement'		,'SIMPLE'	,'Stage Measurement'		,'Measuring Point'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'MeasuringPointGlobalID'	,None		,None			,None)
+)
+
+
 
 
 ################################################################################
@@ -391,6 +463,11 @@ def create_domains(
 
 
 	# Coded value
+	#
+	# Share one schema snapshot, so existing domains are listed once (and
+	# not at all while recording; see mg.record_schema())
+
+	snapshot = mg.SchemaSnapshot(gdb)
 
 	for d in domains_cv:
 
@@ -406,6 +483,7 @@ def create_domains(
 			,coded_values = coded_values
 			,name = domain_name
 			,data_type = data_type
+			,snapshot = snapshot
 			,indent_level = indent_level
 		)
 
@@ -511,16 +589,9 @@ def create_tables(
 	,indent_level = 0
 ):
 
-	create_table_conductivitymeasurement(gdb, indent_level)
-	create_table_datalogger(gdb, indent_level)
-	create_table_dischargemeasurement(gdb, indent_level)
-	create_table_groundwatermeasurement(gdb, indent_level)
-	create_table_locationissue(gdb, indent_level)
-	create_table_locationvisit(gdb, indent_level)
-	create_table_measuringpoint(gdb, indent_level)
-	create_table_rainfalltips(gdb, indent_level)
-	create_table_stagemeasurement(gdb, indent_level)
-	create_table_temperaturemeasurement(gdb, indent_level)
+	for table_name in TABLE_NAMES:
+
+		_get_create_table(table_name)(gdb, indent_level)
 
 
 
@@ -1206,79 +1277,179 @@ def create_table_temperaturemeasurement(
 # Relationship Classes
 ####################
 
-def create_rcs(
+def create_rc(
 	gdb
+	,rc_name # Name in RELATIONSHIP_CLASSES
 	,indent_level = 0
 ):
 
-	properties = (
-		#origin table		destination table		name						type		forward label			backward label		message direction	cardinality		attributed	origin PK	origin FK			destination PK	destination FK		attributes
-		('DataLogger'		,'Sensor'			,'DataLogger_Sensor'				,'SIMPLE'	,'Sensor'			,'Data Logger'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'DataLoggerGlobalID'		,None		,None			,None)
-		,('Location'		,'DataLogger'			,'Location__DataLogger'				,'SIMPLE'	,'Data Logger'			,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
-		,('Location'		,'LocationVisit'		,'Location__LocationVisit'			,'SIMPLE'	,'Location Visit'		,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
-		,('Location'		,'MeasuringPoint'		,'Location__MeasuringPoint'			,'SIMPLE'	,'Measuring Point'		,'Location'		,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationGlobalID'		,None		,None			,None)
-		,('LocationVisit'	,'DischargeMeasurement'		,'LocationVisit_DischargeMeasurement'		,'SIMPLE'	,'Discharge Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'LocationIssue'		,'LocationVisit__LocationIssue'			,'SIMPLE'	,'Location Issue'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'RainfallTips'			,'LocationVisit__RainfallTips'			,'SIMPLE'	,'Rainfall Tips'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'StageMeasurement'		,'LocationVisit__StageMeasurement'		,'SIMPLE'	,'Stage Measurement'		,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'GroundwaterMeasurement'	,'LocationVisit__GroundwaterMeasurement'	,'SIMPLE'	,'Groundwater Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'ConductivityMeasurement'	,'LocationVisit__ConductivityMeasurement'	,'SIMPLE'	,'Conductivity Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('LocationVisit'	,'TemperatureMeasurement'	,'LocationVisit__TemperatureMeasurement'	,'SIMPLE'	,'Temperature Measurement'	,'Location Visit'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'LocationVisitGlobalID'	,None		,None			,None)
-		,('MeasuringPoint'	,'GroundwaterMeasurement'	,'MeasuringPoint__GroundwaterMeasurement'	,'SIMPLE'	,'Groundwater Measurement'	,'Measuring Point'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'MeasuringPointGlobalID'	,None		,None			,None)
-		,('MeasuringPoint'	,'StageMeasurement'		,'MeasuringPoint__StageMeasurement'		,'SIMPLE'	,'Stage Measurement'		,'Measuring Point'	,'NONE'			,'ONE_TO_MANY'		,'NONE'		,'GlobalID'	,'MeasuringPointGlobalID'	,None		,None			,None)
+	for rc in RELATIONSHIP_CLASSES:
+
+		if rc[2] == rc_name:
+
+			break
+
+
+	else:
+
+		raise ValueError(f'Unknown relationship class: {rc_name}')
+
+
+
+	mg.create_rc(
+		gdb = gdb
+		,origin_table_name = rc[0]
+		,destination_table_name = rc[1]
+		,rc_name = rc[2]
+		,rc_type = rc[3]
+		,forward_label = rc[4]
+		,backward_label = rc[5]
+		,message_direction = rc[6]
+		,cardinality = rc[7]
+		,attributed = rc[8]
+		,origin_pk = rc[9]
+		,origin_fk = rc[10]
+		,destination_pk = rc[11]
+		,destination_fk = rc[12]
+		,attributes = rc[13]
+		,indent_level = indent_level
 	)
 
 
 
-	for rc in properties:
-	
-		mg.create_rc(
+def create_rcs(
+	gdb
+	,indent_level = 0
+):
+
+	for rc in RELATIONSHIP_CLASSES:
+
+		create_rc(
 			gdb = gdb
-			,origin_table_name = rc[0]
-			,destination_table_name = rc[1]
 			,rc_name = rc[2]
-			,rc_type = rc[3]
-			,forward_label = rc[4]
-			,backward_label = rc[5]
-			,message_direction = rc[6]
-			,cardinality = rc[7]
-			,attributed = rc[8]
-			,origin_pk = rc[9]
-			,origin_fk = rc[10]
-			,destination_pk = rc[11]
-			,destination_fk = rc[12]
-			,attributes = rc[13]
 			,indent_level = indent_level
 		)
 
 
 
-################################################################################
-# Utility functions
-################################################################################
-
+####################
+# Model
+####################
 
-def _check_credentials():
+def create_model(
+	gdb
+	,disable_domains = False
+	,workers = 1 # Worker processes; see SCHEMA BUILD note in module header
+	,indent_level = 0
+):
 	'''
-	The target SQL Server instance uses Windows authentication, so we need
-	to ensure that this Python process is running as the correct user
+	Create all model objects, in dependency order: domains, feature
+	classes and attribute tables, and relationship classes
 	'''
 
-	domain = os.environ.get('USERDOMAIN')
-	user = os.environ.get('USERNAME')
-	
-	username = f'{domain}\\{user}' # Leave default string case, for display
-	
-	
-	
-	logging.debug('Checking OS username')
-	if user.upper() != 'HYDRO': # Only check user, not domain, so developers can run in arbitrary environment
-	
-		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
-			'Invalid Windows credentials'
-			f'\nThis script must run in a Python session as the HQ\hydro user, but is running as {username}'
+	graph = mg.TaskGraph()
+
+
+
+	#
+	# Domains
+	#
+
+	if disable_domains:
+
+		logging.warning(
+			'Domain creation is disabled; use the output model for\n'
+			'*** TESTING PURPOSES ONLY ***'
+			,extra = {'indent_level': indent_level}
 		)
 
+		dependencies = ()
+
+
+	else:
+
+		graph.add(
+			name = 'Domains'
+			,function = create_domains
+			,args = (
+				gdb
+				,indent_level + 1
+			)
+		)
+
+		dependencies = ('Domains',)
+
+
+
+	#
+	# Feature classes and attribute tables
+	#
+
+	graph.add(
+		name = 'Location'
+		,function = create_fc_location
+		,args = (
+			gdb
+			,indent_level + 1
+		)
+		,dependencies = dependencies
+	)
+
+	for table_name in TABLE_NAMES:
+
+		graph.add(
+			name = table_name
+			,function = _get_create_table(table_name)
+			,args = (
+				gdb
+				,indent_level + 1
+			)
+			,dependencies = dependencies
+		)
+
+
+
+	#
+	# Relationship classes
+	#
+
+	for rc in RELATIONSHIP_CLASSES:
+
+		graph.add(
+			name = rc[2]
+			,function = create_rc
+			,args = (
+				gdb
+				,rc[2]
+				,indent_level + 1
+			)
+			,dependencies = (
+				rc[0]
+				,rc[1]
+			)
+		)
+
+
+
+	#
+	# Create
+	#
+
+	logging.info(
+		f'Creating {len(graph.tasks)} model objects with {workers} worker(s)'
+		,extra = {'indent_level': indent_level}
+	)
+
+	graph.run(
+		workers = workers
+		,indent_level = indent_level
+	)
+
+
+
+################################################################################
+# Utility functions
+################################################################################
 
 
 def _configure_arguments():
@@ -1322,13 +1493,7 @@ def _configure_arguments():
 	g.add_argument(
 		'-L'
 		,'--log-level'
-		,choices = (
-			'CRITICAL'
-			,'ERROR'
-			,'WARNING'
-			,'INFO'
-			,'DEBUG'
-		)
+		,choices = mg.LOG_LEVEL_NAMES
 		,default = 'INFO'
 		,dest = 'log_level'
 		,help = 'Logging level (default: INFO)'
@@ -1340,7 +1505,7 @@ def _configure_arguments():
 		'-l'
 		,'--log-file'
 		,dest = 'log_file_name'
-		,help = 'Diagnostic log file name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
 		,metavar = '<log_file>'
 		,required = False
 	)
@@ -1354,155 +1519,64 @@ def _configure_arguments():
 	)
 
 	g.add_argument(
-		'-h'
-		,'--help'
-		,action = 'help'
+		'-w'
+		,'--workers'
+		,default = 1
+		,dest = 'workers'
+		,help = 'Number of worker processes for creating independent objects concurrently (default: 1)'
+		,metavar = '<workers>'
+		,required = False
+		,type = int
 	)
 
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
 
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
 
-	return ap
-
-
-
-def _configure_log_file(
-	file_name
-	,formatter = None
-):
-	'''
-	Add log file handler to existing root logger
-	Fail if file already exists
-	'''
-
-	try:
-
-		logging.debug('Adding log FileHandler')
-		handler = logging.FileHandler(
-			file_name
-			,mode = 'x'
-			,encoding = 'utf-8'
-		)
-
-
-	except FileExistsError:
-
-		logging.error(f'Log file \'{file_name}\' already exists')
-
-		raise
-
-
-
-	if formatter is not None:
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
 
-		logging.debug('Setting log FileHandler Formatter')
-		handler.setFormatter(formatter)
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
 
 
 
-	logging.debug('Adding FileHandler to Logger')
-	logging.getLogger().addHandler(handler)
+	return ap
 
 
 
-def _connect_gdb(
-	server
-	,database
-):
+def _get_create_table(table_name):
 	'''
-	Create temporary geodatabase connection using OS authentication
-	
-	Returns tempfile.TemporaryDirectory object, along with geodatabase
-	connection file. You must retain a reference to the returned
-	TemporaryDirectory, else it will go out-of-scope and automatically
-	delete itself - including the connection file it contains. Retaining
-	a reference to the file, itself, is not sufficient to prevent automatic
-	cleanup.
+	Return create_table_<name>() function for attribute table in
+	TABLE_NAMES
 	'''
-	
-	
-	# Check Windows credentials
-	
-	try:
-	
-		_check_credentials()
-		
-	
-	except RuntimeError as e:
-	
-		raise
-		
-
-	
-	# Create connection
-	
-	temp_dir = tempfile.TemporaryDirectory()
-	logging.debug(f'Created temporary directory {temp_dir.name}')
-	
-	
-	
-	arcpy.management.CreateDatabaseConnection(
-		out_folder_path = temp_dir.name
-		,out_name = C.CONNECTION_FILE_NAME
-		,database_platform = 'SQL_SERVER'
-		,instance = server
-		,account_authentication = 'OPERATING_SYSTEM_AUTH'
-		,database = database
-	)
-	
-	
-	gdb = os.path.join(
-		temp_dir.name
-		,C.CONNECTION_FILE_NAME
-	)
-	logging.debug(f'Created database connection file: {gdb}')
-	
-	
-	
-	# Validate geodatabase connection
-	#
-	# Creating connection file does not appear to test connection, just
-	# write properties to file
-
-	logging.debug('Validating geodatabase connection')
-	try:
-
-		# Describe raises:
-		#	IOError if target is not a recognized object type
-		#	OSError if target does not exist
-
-		d = arcpy.Describe(gdb)
-		logging.debug(f'Describe type: {d.dataType}')
-
-
-
-		# Referencing workspaceType raises AttributeError if target is not a workspace
-
-		if not d.workspaceType == 'RemoteDatabase':
 
-			# Explicitly raise exception if target is not an enterprise geodatabase
+	return globals()[f'create_table_{table_name.lower()}']
 
-			raise TypeError(f'Expected RemoteDatabase type; got {d.workspaceType} type')
-
-
-	except (
-		IOError
-		,OSError
-		,AttributeError
-		,TypeError
-	) as e:
-
-		raise RuntimeError('Invalid enterprise geodatabase') from e
-
-
-	
-	# Return connection file AND TemporaryDirectory; see function header
-	# comments for details
-	
-	return(
-		gdb
-		,temp_dir
-	)
-	
 
 
 def _get_domain():
@@ -1526,63 +1600,6 @@ def _get_domain():
 		
 	
 	
-def _initialize_logging(
-	level = logging.NOTSET
-):
-	'''
-	Configure basic console logging
-
-	When running in script mode, this function is called early to establish
-	a basic communication channel with the user. The intent is to perform
-	minimial configuration here - both to reduce the possiblity of errors
-	before the channel is ready, and to avoid expensive processing if the
-	script exits early (e.g. invalid argument) - while also building some
-	of the foundation for more robust logging that may be specified in
-	the script's runtime arguments.
-
-	Use the `logging` module's root logger, and send all messages to stdout.
-	Log at the most verbose level (NOTSET) to avoid suppressing useful
-	messages in case of early problems, with the expectation that the
-	script will choose a more reasonable level after processing arguments.
-	Define custom formatting now, to avoid early messages looking
-	differently than later ones.
-
-	Returns formatter, for use with other handlers.
-	'''
-
-
-	# Formatter
-
-	f = mg.FormatterIndent(
-		fmt = mg.LOG_FORMAT
-		,datefmt = mg.LOG_FORMAT_DATE
-	)
-
-
-
-	# Handler
-
-	h = logging.StreamHandler(sys.stdout)
-
-	h.setFormatter(f)
-
-
-
-	# Logger
-
-	l = logging.getLogger()
-
-	l.setLevel(level)
-	l.addHandler(h)
-
-
-
-	# Return
-
-	return f
-
-
-
 def _print_banner(
 	args
 ):
@@ -1599,6 +1616,10 @@ def _print_banner(
 		f'Log level:               {args.log_level}\n'
 		f'Log file:                {args.log_file_name}\n'
 		f'Disable domain creation: {args.disable_domains}\n'
+		f'Workers:                 {args.workers}\n'
+		f'Profile file:            {args.profile_file}\n'
+		f'Profile mode:            {args.profile_mode}\n'
+		f'Trace arcpy:             {args.trace_arcpy}\n'
 		f'{mg.BANNER_DELIMITER_1}'
 	)
 
@@ -1612,6 +1633,7 @@ def _print_banner(
 
 def _process_arguments(
 	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
 ):
 	'''
 	Process arguments for main block
@@ -1633,7 +1655,7 @@ def _process_arguments(
 
 	# Fetch argument values
 
-	args = parser.parse_args()
+	args = parser.parse_args(argv)
 
 
 
@@ -1657,13 +1679,23 @@ def _process_arguments(
 	if args.log_file_name is not None:
 
 		logging.debug(f'Configuring log file {args.log_file_name}')
-		_configure_log_file(
+		mg.configure_log_file(
 			args.log_file_name
 			,log_formatter
 		)
 
 
 
+	#
+	# Verify workers
+	#
+
+	if not args.workers > 0:
+
+		raise ValueError('Number of workers must be greater than zero')
+
+
+
 	#
 	# Return
 	#
@@ -1690,7 +1722,7 @@ if __name__ == '__main__':
 	# Keep a reference to the formatter so we can use it with other handlers
 	# (e.g. FileHandler)
 
-	log_formatter = _initialize_logging()
+	log_formatter = mg.initialize_logging()
 
 
 
@@ -1720,10 +1752,7 @@ if __name__ == '__main__':
 
 	try:
 	
-		(
-			gdb
-			,temp_dir
-		) = _connect_gdb(
+		gdb = mg.connect_gdb(
 			server = args.server
 			,database = args.database
 		)
@@ -1738,67 +1767,32 @@ if __name__ == '__main__':
 	
 	
 	#
-	# Create domains
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
 	#
 
-	if args.disable_domains:
-
-		logging.warning(
-			'Domain creation is disabled; use the output model for\n'
-			'*** TESTING PURPOSES ONLY ***'
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
 		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
 
+		#
+		# Create model
+		#
 
-	else:
-
-		logging.info('Creating domains')
-
-		create_domains(
+		create_model(
 			gdb = gdb
-			,indent_level = 1
+			,disable_domains = args.disable_domains
+			,workers = args.workers
 		)
 
 
 
-	#
-	# Create feature classes
-	#
-
-	logging.info('Creating feature classes')
-
-	create_fcs(
-		gdb = gdb
-		,indent_level = 1
-	)
-
-
-
-	#
-	# Create attribute tables
-	#
-
-	logging.info('Creating attribute tables')
-
-	create_tables(
-		gdb = gdb
-		,indent_level = 1
-	)
-
-
-
-	#
-	# Create relationship classes
-	#
-
-	logging.info('Creating relationship classes')
-
-	create_rcs(
-		gdb = gdb
-		,indent_level = 1
-	)
-
-
-
 	#
 	# Cleanup
 	#
@@ -23,6 +23,14 @@
 #	2023-03-13 MCM Replaced OS_USERNAMES_SDE with dynamic domain name
 #	2025-07-13 MCM Add -d <database> argument to support development
 #	                 infrastructure
+#	2026-10-18 MCM Import arcpy lazily (mg.lazy_import)
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Accept DATA and DATADEBUG log levels (mg.LOG_LEVEL_NAMES)
 #
 # To do:
 #	none
@@ -38,7 +46,6 @@
 
 # Standard
 
-import arcpy
 import argparse
 import logging
 import os
@@ -52,6 +59,8 @@ import sys
 import constants as C
 import mg
 
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
 
 
 ################################################################################
@@ -69,29 +78,6 @@ import mg
 # Private
 #
 
-def _check_credentials():
-	'''
-	The target SQL Server instance uses Windows authentication, so we need
-	to ensure that this Python process is running as the correct user
-	'''
-
-	domain = os.environ.get('USERDOMAIN')
-	user = os.environ.get('USERNAME')
-	
-	username = f'{domain}\\{user}' # Leave default string case, for display
-	
-	
-	
-	logging.debug('Checking OS username')
-	if user.upper() != 'SDE': # Only check user, not domain, so developers can run in arbitrary environment
-	
-		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
-			'Invalid Windows credentials'
-			f'\nThis script must run in a Python session as the HQ\sde user, but is running as {username}'
-		)
-		
-
-
 def _configure_arguments():
 	'''
 	Configure arguments when running in script mode
@@ -142,13 +128,7 @@ def _configure_arguments():
 	g.add_argument(
 		'-L'
 		,'--log-level'
-		,choices = (
-			'CRITICAL'
-			,'ERROR'
-			,'WARNING'
-			,'INFO'
-			,'DEBUG'
-		)
+		,choices = mg.LOG_LEVEL_NAMES
 		,default = 'INFO'
 		,dest = 'log_level'
 		,help = 'Logging level (default: INFO)'
@@ -157,72 +137,43 @@ def _configure_arguments():
 	)
 
 	g.add_argument(
-		'-h'
-		,'--help'
-		,action = 'help'
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
 	)
-	
-	
-	
-	return ap
-	
-
 
-def _initialize_logging(
-	level = logging.NOTSET
-):
-	'''
-	Configure basic console logging
-	
-	When running in script mode, this function is called early to establish
-	a basic communication channel with the user. The intent is to perform
-	minimial configuration here - both to reduce the possiblity of errors
-	before the channel is ready, and to avoid expensive processing if the
-	script exits early (e.g. invalid argument) - while also building some
-	of the foundation for more robust logging that may be specified in
-	the script's runtime arguments.
-	
-	Use the `logging` module's root logger, and send all messages to stdout.
-	Log at the most verbose level (NOTSET) to avoid suppressing useful
-	messages in case of early problems, with the expectation that the
-	script will choose a more reasonable level after processing arguments.
-	Define custom formatting now, to avoid early messages looking
-	differently than later ones.
-	
-	Returns formatter, for use with other handlers.
-	'''
-	
-	
-	# Formatter
-
-	f = mg.FormatterIndent(
-		fmt = mg.LOG_FORMAT
-		,datefmt = mg.LOG_FORMAT_DATE
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
 	)
 
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
 
-
-	# Handler
-
-	h = logging.StreamHandler(sys.stdout)
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
 	
-	h.setFormatter(f)
 	
 	
-
-	# Logger
-
-	l = logging.getLogger()
+	return ap
 	
-	l.setLevel(level)
-	l.addHandler(h)
-
-
-
-	# Return
-
-	return f
-
 
 
 def _print_banner(
@@ -240,6 +191,9 @@ def _print_banner(
 		f'SQL Server database:     {args.database}\n'
 		f'Authorization file:      {args.auth_file}\n'
 		f'Log level:               {args.log_level}\n'
+		f'Profile file:            {args.profile_file}\n'
+		f'Profile mode:            {args.profile_mode}\n'
+		f'Trace arcpy:             {args.trace_arcpy}\n'
 		f'{mg.BANNER_DELIMITER_1}'
 	)
 
@@ -315,7 +269,7 @@ if __name__ == '__main__':
 	# Keep a reference to the formatter so we can use it with other handlers
 	# (e.g. FileHandler)
 
-	log_formatter = _initialize_logging()
+	log_formatter = mg.initialize_logging()
 
 
 
@@ -345,7 +299,7 @@ if __name__ == '__main__':
 	
 	try:
 	
-		_check_credentials()
+		mg.check_credentials(user = 'SDE')
 		
 	
 	except RuntimeError as e:
@@ -357,37 +311,52 @@ if __name__ == '__main__':
 
 
 	#
-	# Enable geodatabase
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
 	#
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
+
+		#
+		# Enable geodatabase
+		#
 	
-	with tempfile.TemporaryDirectory() as temp_dir:
+		with tempfile.TemporaryDirectory() as temp_dir:
 	
-		logging.debug(f'Temporary directory: {temp_dir}')
+			logging.debug(f'Temporary directory: {temp_dir}')
 	
-		logging.info('Creating database connection')
-		arcpy.management.CreateDatabaseConnection(
-			out_folder_path = temp_dir
-			,out_name = C.CONNECTION_FILE_NAME
-			,database_platform = 'SQL_SERVER'
-			,instance = args.server
-			,account_authentication = 'OPERATING_SYSTEM_AUTH'
-			,database = args.database
-		)
+			logging.info('Creating database connection')
+			arcpy.management.CreateDatabaseConnection(
+				out_folder_path = temp_dir
+				,out_name = C.CONNECTION_FILE_NAME
+				,database_platform = 'SQL_SERVER'
+				,instance = args.server
+				,account_authentication = 'OPERATING_SYSTEM_AUTH'
+				,database = args.database
+			)
 		
 		
-		gdb = os.path.join(
-			temp_dir
-			,C.CONNECTION_FILE_NAME
-		)
-		logging.debug(f'Connection file: {gdb}')
+			gdb = os.path.join(
+				temp_dir
+				,C.CONNECTION_FILE_NAME
+			)
+			logging.debug(f'Connection file: {gdb}')
 
 
 
-		logging.info('Enabling enterprise geodatabase')
-		arcpy.management.EnableEnterpriseGeodatabase(
-			input_database = gdb
-			,authorization_file = args.auth_file
-		)
+			logging.info('Enabling enterprise geodatabase')
+			arcpy.management.EnableEnterpriseGeodatabase(
+				input_database = gdb
+				,authorization_file = args.auth_file
+			)
 	
 
 	
@@ -0,0 +1,1520 @@
+################################################################################
+# Name:
+#	export_hydro_attachments.py
+#
+# Purpose:
+#	Export hydro geodatabase attachments to a directory or archive file,
+#	with a manifest, for backup, migration, or audit
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#
+# Notes:
+#	This script is the counterpart of load_hydro_photos.py: it reads
+#	attachments from the hydro geodatabase attachment tables and writes
+#	each one to a file, along with a manifest CSV file describing them.
+#
+#
+#
+#	OUTPUT
+#
+#	The output is either a directory, or a zip or tar archive file,
+#	selected by the output name extension (.zip, .tar). Within the output,
+#	each attachment is stored as:
+#
+#		<attachment table>/<related global ID>/<attachment ID>_<name>
+#
+#	The manifest begins with the columns of the Aquarius photo index
+#	file used by load_hydro_photos.py - Identifier (Location NWFID),
+#	FileName, UniqueId, tags, and Comment (Measuring Point ID) - followed
+#	by geodatabase attachment properties and the path of the file within
+#	the output. For directory output, the manifest is written inside the
+#	directory; for archive output, it is written next to the archive file
+#	(<archive>.manifest.csv).
+#
+#	UniqueId is the Aquarius photo UUID that load_hydro_photos.py keys
+#	photos on. The attachment table has nowhere to store it, so it is read
+#	from the photo loader state database (--state-db); without one, or for
+#	attachments not loaded by the photo loader, UniqueId is blank. The
+#	attachment's own global ID is in the GlobalId column.
+#
+#
+#
+#	PERFORMANCE
+#
+#	Attachment metadata is read first, without attachment content. Content
+#	is then fetched in batches of attachments, and each attachment is
+#	written in chunks as it is fetched, so memory use is bounded by the
+#	batch read-ahead, not by the size of the tables.
+#
+#	For directory output, files are written in a pool of threads, a
+#	bounded number of attachments ahead of the geodatabase reads. Archive
+#	files are a single stream, so archive members are written in order by
+#	the main thread.
+#
+#
+#
+#	RESUMING
+#
+#	The manifest is appended, and flushed, as each attachment is written,
+#	so it records exactly the attachments that are complete. When the
+#	output already exists, attachments listed in its manifest are skipped,
+#	and new attachments are added. Directory files are written under a
+#	temporary name and renamed when complete, so interrupted writes never
+#	leave partial files under a final name. Archive files can be resumed
+#	if the previous run closed them (e.g. after an error or Ctrl+C), but
+#	not after the process was killed.
+#
+#
+#
+#	MESSAGES
+#
+#	All messaging is processed through the `logging` module, including user
+#	feedback, diagnostic messages, and errors. Output to all destinations
+#	is UTF-8 encoded.
+#
+#	In script mode, this module uses the root logger.
+#
+# History:
+#	2026-10-18 MCM Created
+#	               Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Accept argument list from hydro.py
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Make Output an abstract base class (abc.ABC)
+#	               Write Aquarius photo UUID from photo loader state
+#	                 (--state-db) to UniqueId, not attachment global ID
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Use mg.LOG_LEVEL_NAMES for log level choices
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+
+# Standard
+
+import abc
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import sys
+import tarfile
+import uuid
+import zipfile
+
+
+# Custom
+
+import load_hydro_photos
+import mg
+
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
+
+
+#
+# Constants
+#
+
+BATCH_SIZE = 100 # Attachments per content query
+
+CHUNK_SIZE = 1048576 # Bytes per write
+
+MANIFEST_FILE_NAME = 'manifest.csv'
+
+MANIFEST_FIELDS = (
+	# Aquarius photo index columns
+	'Identifier'
+	,'AttachmentType'
+	,'FileName'
+	,'UniqueId'
+	,'Tags_0_Key'
+	,'Comment'
+	# Geodatabase attachment properties
+	,'Table'
+	,'RelGlobalId'
+	,'AttachmentId'
+	,'GlobalId'
+	,'ContentType'
+	,'DataSize'
+	,'Keywords'
+	# Export
+	,'Path'
+	,'Sha256'
+)
+
+READ_AHEAD_FACTOR = 2 # Attachments to fetch ahead of writing, per worker
+
+
+# Tables with attachments, and path from each to its Location
+#
+#	table name: (foreign key to parent, parent table name)
+
+TABLES = {
+	'Location': None
+	,'MeasuringPoint': (
+		'LocationGlobalID'
+		,'Location'
+	)
+	,'LocationVisit': (
+		'LocationGlobalID'
+		,'Location'
+	)
+	,'LocationIssue': (
+		'LocationVisitGlobalID'
+		,'LocationVisit'
+	)
+	,'DischargeMeasurement': (
+		'LocationVisitGlobalID'
+		,'LocationVisit'
+	)
+}
+
+
+# Attachment keywords that correspond to Aquarius photo tags
+
+TAGS = {
+	'Location_image': 'Site Photo'
+	,'MeasuringPoint_image': 'MP'
+}
+
+
+
+################################################################################
+# Classes
+################################################################################
+
+class Output(abc.ABC):
+	'''
+	Abstract superclass for common features of export output subclasses
+	
+	Subclasses write attachment content to a specific kind of output.
+	'''
+
+
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+	PARALLEL = False # True if write() is safe to call from multiple threads
+
+
+
+	########################################################################
+	# Properties
+	########################################################################
+	
+	@property
+	def manifest_file(self):
+	
+		return f'{self.name}.manifest.csv'
+
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+	def __init__(
+		self
+		,name # Output directory or file name
+	):
+
+		logging.debug(f'Initializing {self.__class__.__name__}')
+
+		self.name = name
+
+
+
+	def close(self):
+
+		pass
+
+
+
+	@abc.abstractmethod
+	def write(
+		self
+		,path # Path within output, with '/' separators
+		,data # bytes
+	):
+		'''
+		Write attachment content to output in chunks
+		
+		Returns SHA-256 hash of content
+		'''
+
+
+
+	#
+	# Private
+	#
+
+	@staticmethod
+	def _chunks(data):
+
+		view = memoryview(data)
+
+		for offset in range(
+			0
+			,len(view)
+			,CHUNK_SIZE
+		):
+
+			yield view[offset:offset + CHUNK_SIZE]
+
+
+
+class OutputDirectory(Output):
+	'''
+	Export attachments to files in a directory tree
+	'''
+
+
+	########################################################################
+	# Class attributes
+	########################################################################
+
+	PARALLEL = True
+
+
+
+	########################################################################
+	# Properties
+	########################################################################
+	
+	@property
+	def manifest_file(self):
+	
+		return os.path.join(
+			self.name
+			,MANIFEST_FILE_NAME
+		)
+
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+	def __init__(
+		self
+		,name
+	):
+
+		super().__init__(name)
+
+		os.makedirs(
+			name
+			,exist_ok = True
+		)
+
+
+
+	def write(
+		self
+		,path
+		,data
+	):
+
+		file_name = os.path.join(
+			self.name
+			,*path.split('/')
+		)
+
+		os.makedirs(
+			os.path.dirname(file_name)
+			,exist_ok = True
+		)
+
+
+		sha256 = hashlib.sha256()
+
+
+		# Write to temporary name, and rename when complete
+
+		with open(
+			f'{file_name}.part'
+			,'wb'
+		) as f:
+
+			for chunk in self._chunks(data):
+
+				sha256.update(chunk)
+				f.write(chunk)
+
+
+		os.replace(
+			f'{file_name}.part'
+			,file_name
+		)
+
+
+		return sha256.hexdigest()
+
+
+
+class OutputTar(Output):
+	'''
+	Export attachments to uncompressed tar archive, which can be appended
+	'''
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+	def __init__(
+		self
+		,name
+	):
+
+		super().__init__(name)
+
+		self.archive = tarfile.open(
+			name
+			,mode = 'a'
+		)
+
+
+
+	def close(self):
+
+		self.archive.close()
+
+
+
+	def write(
+		self
+		,path
+		,data
+	):
+
+		member = tarfile.TarInfo(path)
+		member.size = len(data)
+
+		self.archive.addfile(
+			member
+			,io.BytesIO(data) # Copied to archive in chunks by tarfile
+		)
+
+
+		return hashlib.sha256(data).hexdigest()
+
+
+
+class OutputZip(Output):
+	'''
+	Export attachments to zip archive
+	
+	Members are stored without compression, because photos are already
+	compressed.
+	'''
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+	def __init__(
+		self
+		,name
+	):
+
+		super().__init__(name)
+
+		self.archive = zipfile.ZipFile(
+			name
+			,mode = 'a'
+			,compression = zipfile.ZIP_STORED
+			,allowZip64 = True
+		)
+
+
+
+	def close(self):
+
+		self.archive.close()
+
+
+
+	def write(
+		self
+		,path
+		,data
+	):
+
+		sha256 = hashlib.sha256()
+
+
+		with self.archive.open(
+			path
+			,mode = 'w'
+			,force_zip64 = True
+		) as f:
+
+			for chunk in self._chunks(data):
+
+				sha256.update(chunk)
+				f.write(chunk)
+
+
+		return sha256.hexdigest()
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+
+#
+# Public
+#
+
+def export_attachments(
+	gdb
+	,output_name
+	,table_names = tuple(TABLES)
+	,workers = None
+	,feedback = 0
+	,state_file = None # Photo loader state database, for UniqueId; see OUTPUT note in module header
+):
+	'''
+	Export attachments from hydro geodatabase tables to output directory
+	or archive file, with manifest
+	
+	Attachments already listed in an existing output manifest are skipped.
+	'''
+
+
+	#
+	# Open output
+	#
+	
+	output = _open_output(output_name)
+	
+	logging.info(f'Exporting to {output.__class__.__name__}: {output_name}')
+	
+	
+	done = _read_manifest(output.manifest_file)
+	
+	if len(done) > 0:
+	
+		logging.info(f'Resuming export; {len(done):n} attachments already exported')
+		
+		
+		
+	#
+	# Look up Location identifiers and Measuring Point IDs for manifest
+	#
+	
+	logging.info('Reading related records')
+	
+	parents = _read_parents(
+		gdb = gdb
+		,table_names = table_names
+	)
+	
+	
+	if state_file is None:
+	
+		photo_uuids = {}
+		
+	else:
+	
+		logging.info('Reading photo UUIDs from photo loader state')
+		
+		photo_uuids = _read_photo_uuids(state_file)
+	
+	
+	
+	#
+	# Export
+	#
+	
+	if workers is None:
+	
+		workers = os.cpu_count() or 1
+		
+		
+	if not output.PARALLEL:
+	
+		workers = 1 # Write archive members from one thread, in order
+		
+		
+	counts = collections.Counter()
+	
+	
+	manifest_exists = os.path.exists(output.manifest_file)
+	
+	with (
+		open(
+			output.manifest_file
+			,'a'
+			,newline = ''
+			,encoding = 'utf-8'
+		) as manifest_file
+		,concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor
+	):
+	
+		manifest = csv.DictWriter(
+			manifest_file
+			,fieldnames = MANIFEST_FIELDS
+		)
+		
+		if not manifest_exists:
+		
+			manifest.writeheader()
+			
+			
+		try:
+		
+			for table_name in table_names:
+			
+				logging.info(f'Exporting attachments from {table_name}')
+				
+				pending = collections.deque()
+				
+				
+				for (
+					record
+					,data
+				) in _fetch_attachments(
+					gdb = gdb
+					,table_name = table_name
+					,parents = parents
+					,photo_uuids = photo_uuids
+					,done = done
+					,counts = counts
+				):
+				
+					pending.append(
+						(
+							record
+							,executor.submit(
+								output.write
+								,path = record['Path']
+								,data = data
+							)
+						)
+					)
+					
+					
+					if len(pending) >= workers * READ_AHEAD_FACTOR:
+					
+						_write_manifest(
+							manifest = manifest
+							,manifest_file = manifest_file
+							,pending = pending.popleft()
+							,counts = counts
+						)
+						
+						
+					if (
+						feedback > 0
+						and counts['fetched'] % feedback == 0
+					):
+					
+						logging.info(_format_counts(counts))
+						
+						
+						
+				while len(pending) > 0:
+				
+					_write_manifest(
+						manifest = manifest
+						,manifest_file = manifest_file
+						,pending = pending.popleft()
+						,counts = counts
+					)
+					
+					
+		finally:
+		
+			output.close()
+			
+			
+			
+	#
+	# Final feedback message
+	#
+	
+	logging.info('Finished exporting attachments')
+	
+	logging.info(_format_counts(counts))
+
+
+
+#
+# Private
+#
+
+def _configure_arguments():
+	'''
+	Configure arguments when running in script mode
+
+	Returns configured argparse.ArgumentParser
+	'''
+
+	ap = argparse.ArgumentParser(
+		conflict_handler = 'resolve' # Allow overwriting built-in -h/--help to add to custom argument group
+		,description = 'Export attachments from hydro geodatabase'
+	)
+
+
+
+	g = ap.add_argument_group( # Avoid all named arguments being listed as 'optional' in help
+		'Arguments'
+	)
+
+
+
+	g.add_argument(
+		'-o'
+		,'--output'
+		,dest = 'output_name'
+		,help = 'Output directory, or archive file (.zip, .tar); existing output is resumed'
+		,metavar = '<output>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-d'
+		,'--database'
+		,dest = 'database'
+		,help = 'Geodatabase database name'
+		,metavar = '<database>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-g'
+		,'--gdb-server'
+		,dest = 'gdb_server'
+		,help = 'Geodatabase server'
+		,metavar = '<geodatabase_server>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-t'
+		,'--table'
+		,action = 'append'
+		,choices = tuple(TABLES)
+		,dest = 'table_names'
+		,help = 'Table whose attachments to export; repeat for multiple tables (default: all tables with attachments)'
+		,metavar = '<table>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-L'
+		,'--log-level'
+		,choices = mg.LOG_LEVEL_NAMES
+		,default = 'INFO'
+		,dest = 'log_level'
+		,help = 'Logging level (default: INFO)'
+		,required = False
+		,type = str.upper
+	)
+
+	g.add_argument(
+		'-l'
+		,'--log-file'
+		,dest = 'log_file_name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
+		,metavar = '<log_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-f'
+		,'--feedback'
+		,default = 0
+		,dest = 'feedback'
+		,help = 'Feedback interval for progress metrics (number of attachments fetched); 0 to disable'
+		,metavar = '<feedback>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-w'
+		,'--workers'
+		,default = os.cpu_count() or 1
+		,dest = 'workers'
+		,help = 'Number of workers for writing files to output directory (default: number of CPUs)'
+		,metavar = '<workers>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-s'
+		,'--state-db'
+		,dest = 'state_file'
+		,help = 'Photo loader state database (SQLite), for Aquarius photo UUIDs in manifest'
+		,metavar = '<state_db>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
+
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
+
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
+
+
+
+	return ap
+
+
+
+def _fetch_attachments(
+	gdb
+	,table_name
+	,parents # From _read_parents()
+	,photo_uuids # From _read_photo_uuids()
+	,done # Set of exported (table, attachmentid) tuples
+	,counts # collections.Counter
+):
+	'''
+	Yield (manifest record, content) tuples for attachments not already
+	exported
+	
+	Reads attachment metadata for the whole table first, then content in
+	batches of BATCH_SIZE attachments, so at most one batch of content is
+	held by the cursor at a time.
+	'''
+	
+	table_attachment = f'hydro.{table_name.lower()}__attach'
+	
+	
+	
+	#
+	# Metadata
+	#
+	
+	records = {}
+	
+	with arcpy.da.SearchCursor(
+		in_table = os.path.join(
+			gdb
+			,table_attachment
+		)
+		,field_names = (
+			'attachmentid'
+			,'rel_globalid'
+			,'globalid'
+			,'att_name'
+			,'content_type'
+			,'data_size'
+			,'keywords'
+		)
+	) as cursor:
+	
+		for row in cursor:
+		
+			if (
+				table_attachment
+				,str(row[0])
+			) in done:
+			
+				counts['skipped'] += 1
+				continue
+				
+				
+			records[row[0]] = _get_manifest_record(
+				table_name = table_name
+				,table_attachment = table_attachment
+				,row = row
+				,parents = parents
+				,photo_uuid = photo_uuids.get(
+					(
+						table_attachment
+						,row[0]
+					)
+				)
+			)
+			
+			
+	logging.debug(f'{len(records):n} attachments to export from {table_attachment}')
+	
+	
+	
+	#
+	# Content
+	#
+	
+	attachmentids = sorted(records)
+	
+	for i in range(
+		0
+		,len(attachmentids)
+		,BATCH_SIZE
+	):
+	
+		batch = attachmentids[i:i + BATCH_SIZE]
+		
+		with arcpy.da.SearchCursor(
+			in_table = os.path.join(
+				gdb
+				,table_attachment
+			)
+			,field_names = (
+				'attachmentid'
+				,'data'
+			)
+			,where_clause = f'attachmentid IN ({", ".join(str(a) for a in batch)})'
+		) as cursor:
+		
+			for row in cursor:
+			
+				counts['fetched'] += 1
+				
+				yield (
+					records[row[0]]
+					,bytes(row[1]) # Cursor may reuse its buffer for the next row
+				)
+
+
+
+def _format_counts(counts):
+
+	return (
+		'Export metrics'
+		f'\n\tAttachments fetched:               {counts["fetched"]:n}'
+		f'\n\tAttachments exported:              {counts["exported"]:n}'
+		f'\n\tAttachments failed:                {counts["failed"]:n}'
+		f'\n\tAttachments skipped (resumed):     {counts["skipped"]:n}'
+		f'\n\tBytes exported:                    {counts["bytes"]:n}'
+	)
+
+
+
+def _get_manifest_record(
+	table_name
+	,table_attachment
+	,row # attachmentid, rel_globalid, globalid, att_name, content_type, data_size, keywords
+	,parents
+	,photo_uuid = None # Aquarius photo UUID, if loaded by photo loader
+):
+	'''
+	Return manifest record (dict) for attachment metadata row
+	'''
+	
+	(
+		attachmentid
+		,rel_globalid
+		,globalid
+		,att_name
+		,content_type
+		,data_size
+		,keywords
+	) = row
+	
+	rel_globalid = _standardize_globalid(rel_globalid)
+	
+	
+	
+	# Identifier: follow related records to Location
+	
+	globalid_parent = rel_globalid
+	table_parent = table_name
+	
+	while TABLES[table_parent] is not None:
+	
+		globalid_parent = parents[table_parent].get(globalid_parent)
+		table_parent = TABLES[table_parent][1]
+		
+		
+	identifier = parents['Location'].get(globalid_parent)
+	
+	
+	
+	# Comment: related Measuring Point ID, as in Aquarius photo index
+	
+	if (
+		table_name == 'MeasuringPoint'
+		and rel_globalid in parents['AquariusID']
+	):
+	
+		comment = f'MP#{parents["AquariusID"][rel_globalid]}'
+		
+	else:
+	
+		comment = None
+		
+		
+		
+	# Path within output
+	
+	file_name = re.sub(
+		r'''[\\/:*?"<>|]'''
+		,'_'
+		,mg.none2blank(att_name)
+	)
+	
+	path = f'{table_attachment}/{rel_globalid}/{attachmentid}_{file_name}'
+	
+	
+	
+	return {
+		'Identifier': identifier
+		,'AttachmentType': 'Image' if mg.none2blank(content_type).startswith('image/') else 'File'
+		,'FileName': att_name
+		,'UniqueId': uuid.UUID(photo_uuid).hex if photo_uuid is not None else None # Aquarius format
+		,'Tags_0_Key': TAGS.get(keywords)
+		,'Comment': comment
+		,'Table': table_attachment
+		,'RelGlobalId': rel_globalid
+		,'AttachmentId': attachmentid
+		,'GlobalId': _standardize_globalid(globalid)
+		,'ContentType': content_type
+		,'DataSize': data_size
+		,'Keywords': keywords
+		,'Path': path
+		,'Sha256': None # Set when written
+	}
+
+
+
+def _open_output(output_name):
+	'''
+	Return Output instance for output name, by extension
+	'''
+	
+	extension = os.path.splitext(output_name)[1].lower()
+	
+	
+	if extension == '.zip':
+	
+		return OutputZip(output_name)
+		
+	elif extension == '.tar':
+	
+		return OutputTar(output_name)
+		
+	else:
+	
+		return OutputDirectory(output_name)
+
+
+
+def _print_banner(
+	args
+):
+	'''
+	Print banner containing argument information to log
+	'''
+
+	banner = (
+		f'{mg.BANNER_DELIMITER_1}\n'
+		f'Hydrologic Geodatabase Attachment Export\n'
+		f'{mg.BANNER_DELIMITER_2}\n'
+		f'Output:                            {args.output_name}\n'
+		f'Tables:                            {", ".join(args.table_names)}\n'
+		f'Geodatabase server:                {args.gdb_server}\n'
+		f'Geodatabase database name:         {args.database}\n'
+		f'Log level:                         {args.log_level}\n'
+		f'Log file:                          {args.log_file_name}\n'
+		f'Feedback:                          {args.feedback}\n'
+		f'Workers:                           {args.workers}\n'
+		f'Photo state database:              {args.state_file}\n'
+		f'Profile file:                      {args.profile_file}\n'
+		f'Profile mode:                      {args.profile_mode}\n'
+		f'Trace arcpy:                       {args.trace_arcpy}\n'
+		f'{mg.BANNER_DELIMITER_1}'
+	)
+
+
+
+	# Print banner
+
+	logging.info(banner)
+
+
+
+def _process_arguments(
+	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
+):
+	'''
+	Process arguments for main block
+
+	Act on arguments that can be handled immediately. Return arguments, as
+	well as any objects created here that are needed elsewhere.
+
+	Note: Refrain from sending log messges until the log level argument is
+	processed, as not to report extraneous information to a user who
+	requested a coarser level of detail.
+	'''
+
+
+	# Define arguments
+
+	parser = _configure_arguments()
+
+
+
+	# Fetch argument values
+
+	args = parser.parse_args(argv)
+
+
+
+	#
+	# Evaluate arguments
+	#
+
+
+	# Set log level
+
+	logging.getLogger().setLevel(args.log_level)
+
+
+
+	# Configure log file
+	#
+	# Do this as early as possible, so we can capture the most messages to
+	# the log file; logging messages sent before log file coniguration will
+	# go to console only
+
+	if args.log_file_name is not None:
+
+		logging.debug(f'Configuring log file {args.log_file_name}')
+		mg.configure_log_file(
+			args.log_file_name
+			,log_formatter
+		)
+
+
+
+	#
+	# Verify feedback and workers
+	#
+
+	if not args.feedback >= 0:
+
+		raise ValueError('Feedback interval must be greater or equal to zero')
+
+
+	if not args.workers > 0:
+
+		raise ValueError('Number of workers must be greater than zero')
+
+
+
+	# Default tables
+
+	if args.table_names is None:
+
+		args.table_names = list(TABLES)
+
+
+
+	# Standardize paths
+	#
+	# Relative paths break some arcpy functionality, so force all paths to
+	# absolute
+
+	output_name = os.path.abspath(args.output_name)
+
+	if args.state_file is not None:
+
+		args.state_file = os.path.abspath(args.state_file)
+
+		if not os.path.isfile(args.state_file): # PhotoState would create it
+
+			raise ValueError(f'Photo state database does not exist: {args.state_file}')
+
+
+
+	#
+	# Return
+	#
+
+	return (
+		args
+		,output_name
+	)
+
+
+
+def _read_manifest(manifest_file):
+	'''
+	Return set of (table, attachmentid) tuples listed in existing manifest
+	'''
+	
+	done = set()
+	
+	
+	if os.path.exists(manifest_file):
+	
+		with open(
+			manifest_file
+			,newline = ''
+			,encoding = 'utf-8'
+		) as f:
+		
+			for record in csv.DictReader(f):
+			
+				done.add(
+					(
+						record['Table']
+						,record['AttachmentId']
+					)
+				)
+				
+				
+	return done
+
+
+
+def _read_parents(
+	gdb
+	,table_names
+):
+	'''
+	Read keys needed to relate attachments to their Location
+	
+	Returns dict of:
+	
+		'Location': {Location global ID: NWFID}
+		<table name>: {global ID: parent global ID}, for each table on
+		              the path from `table_names` to Location
+		'AquariusID': {Measuring Point global ID: Aquarius ID (hex)}
+	'''
+	
+	parents = {
+		'Location': {}
+		,'AquariusID': {}
+	}
+	
+	
+	
+	# Location
+	
+	with arcpy.da.SearchCursor(
+		in_table = os.path.join(
+			gdb
+			,'hydro.location'
+		)
+		,field_names = (
+			'globalid'
+			,'nwfid'
+		)
+	) as cursor:
+	
+		for row in cursor:
+		
+			parents['Location'][_standardize_globalid(row[0])] = row[1]
+			
+			
+			
+	# Tables related to Location
+	
+	for table_name in table_names:
+	
+		while (
+			TABLES[table_name] is not None
+			and table_name not in parents
+		):
+		
+			parents[table_name] = {}
+			
+			
+			field_names = [
+				'globalid'
+				,TABLES[table_name][0]
+			]
+			
+			if table_name == 'MeasuringPoint':
+			
+				field_names.append('aquariusid')
+				
+				
+			with arcpy.da.SearchCursor(
+				in_table = os.path.join(
+					gdb
+					,f'hydro.{table_name.lower()}'
+				)
+				,field_names = field_names
+			) as cursor:
+			
+				for row in cursor:
+				
+					globalid = _standardize_globalid(row[0])
+					
+					parents[table_name][globalid] = _standardize_globalid(row[1])
+					
+					if (
+						table_name == 'MeasuringPoint'
+						and row[2] is not None
+					):
+					
+						parents['AquariusID'][globalid] = uuid.UUID(row[2]).hex
+						
+						
+			table_name = TABLES[table_name][1]
+			
+			
+			
+	return parents
+
+
+
+def _read_photo_uuids(state_file):
+	'''
+	Return Aquarius photo UUIDs of attachments loaded by the photo loader,
+	by (attachment table, attachmentid), from its state database
+
+	Identical photos with different UUIDs share one attachment (see
+	load_hydro_photos.Attachment.load); the most recently loaded is used.
+	'''
+
+	photo_uuids = {}
+
+	with contextlib.closing(load_hydro_photos.PhotoState(state_file)) as state:
+
+		for record in sorted(
+			state.find_all()
+			,key = lambda r: r['loaded']
+		):
+
+			photo_uuids[
+				(
+					record['table_name']
+					,record['attachmentid']
+				)
+			] = record['photo_uuid']
+
+
+	logging.debug(f'Read {len(photo_uuids):n} photo UUIDs')
+
+	return photo_uuids
+
+
+
+def _standardize_globalid(globalid):
+	'''
+	Return global ID as upper-case string without braces, or None
+	'''
+	
+	if globalid is None:
+	
+		return None
+		
+	else:
+	
+		return str(uuid.UUID(globalid)).upper()
+
+
+
+def _write_manifest(
+	manifest # csv.DictWriter
+	,manifest_file # File object underlying `manifest`
+	,pending # (record, future) tuple
+	,counts # collections.Counter
+):
+	'''
+	Wait for attachment write to complete, and append its record to the
+	manifest
+	
+	The manifest is flushed after each record, so it always lists exactly
+	the attachments that were written completely.
+	'''
+	
+	(
+		record
+		,future
+	) = pending
+	
+	
+	try:
+	
+		record['Sha256'] = future.result()
+		
+	except OSError as e:
+	
+		logging.warning(f'Failed to write attachment: Table {record["Table"]} attachmentid {record["AttachmentId"]}: {e}')
+		counts['failed'] += 1
+		return
+		
+		
+	manifest.writerow(record)
+	manifest_file.flush()
+	
+	counts['exported'] += 1
+	counts['bytes'] += record['DataSize'] or 0
+
+
+
+################################################################################
+# Main
+################################################################################
+
+if __name__ == '__main__':
+
+
+	#
+	# Setup
+	#
+
+
+	# Initialize logging infrastructure; do this early so we can communicate
+	# with user
+	#
+	# Keep a reference to the formatter so we can use it with other handlers
+	# (e.g. FileHandler)
+
+	log_formatter = mg.initialize_logging()
+
+
+
+	# Process arguments
+
+	try:
+
+		(
+			args
+			,output_name
+		) = _process_arguments(log_formatter)
+
+
+	except Exception as e:
+
+		logging.error(e)
+		raise
+
+
+
+	# Print banner
+
+	_print_banner(args)
+
+
+
+	# Connect to geodatabase
+
+	logging.info('Connecting to geodatabase')
+
+	try:
+
+		gdb = mg.connect_gdb(
+			server = args.gdb_server
+			,database = args.database
+		)
+
+
+	except RuntimeError as e:
+
+		logging.error(e)
+
+		sys.exit(mg.EXIT_FAILURE)
+
+
+
+	#
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
+	#
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
+
+		#
+		# Export data
+		#
+
+		export_attachments(
+			gdb = gdb
+			,output_name = output_name
+			,table_names = args.table_names
+			,workers = args.workers
+			,feedback = args.feedback
+			,state_file = args.state_file
+		)
+
+
+
+	#
+	# Cleanup
+	#
+
+	logging.info('Done.')
+
+
+
+
+################################################################################
+# END
+################################################################################
@@ -0,0 +1,696 @@
+################################################################################
+# Name:
+#	hydro.py
+#
+# Purpose:
+#	Run hydro geodatabase deployment and maintenance steps, in sequence,
+#	from a single entry point
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#
+# Notes:
+#	Each step corresponds to a standalone script in this directory. Running
+#	the scripts one at a time repeats the same setup for every script:
+#	importing arcpy, validating the geodatabase connection, and configuring
+#	logging. This script runs any number of steps in one Python process,
+#	so the steps share one arcpy import, one validated geodatabase
+#	connection, and one log.
+#
+#
+#
+#	USAGE
+#
+#	Geodatabase and logging arguments come first, followed by the steps.
+#	Separate steps with a standalone + argument:
+#
+#		python hydro.py -s <server> -d <database> [-L <level>] [-l <log>]
+#		  <step> [<step arguments>] [+ <step> [<step arguments>] ...]
+#
+#	For example, to deploy the model and load it:
+#
+#		python hydro.py -s gis-sql -d hydro
+#		  create-model
+#		  + load-data AquariusExport.gdb
+#		  + load-photos -i LocationPhotos.csv -D photos
+#
+#
+#
+#	STEPS
+#
+#		create-model		create_hydro_data_model.py
+#		delete-model		delete_hydro_data_model.py
+#		migrate-model		migrate_hydro_data_model.py
+#		load-data		load_hydro_data.py
+#		load-photos		load_hydro_photos.py
+#		reconcile-photos	reconcile_hydro_photos.py
+#		export-attachments	export_hydro_attachments.py
+#
+#	Step arguments are the arguments of the corresponding script, except
+#	the geodatabase server, database, and log level, which this script
+#	supplies. Use <step> -h for help on step arguments.
+#
+#	enable_geodatabase_hydro.py is not a step: it must run as the Windows
+#	sde user, not hydro, and before the geodatabase exists, while this
+#	script validates its connection as an enterprise geodatabase before
+#	running any step. The numbered update_database_hydro scripts are
+#	one-off migrations; use migrate-model instead.
+#
+#	Step --profile and --trace-arcpy options apply to that step only, since
+#	profilers do not nest; see mg.profile() and mg.trace_arcpy().
+#
+#	Arguments for all steps are validated before connecting to the
+#	geodatabase, so a typo in the last step does not fail the chain after
+#	the first steps are done. Steps then run in order; an error stops the
+#	chain.
+#
+#
+#
+#	MESSAGES
+#
+#	All messaging is processed through the `logging` module, including user
+#	feedback, diagnostic messages, and errors. Output to all destinations
+#	is UTF-8 encoded.
+#
+#	In script mode, this module uses the root logger.
+#
+# History:
+#	2026-10-18 MCM Created
+#	               Added step migrate-model
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Summarize repeated warnings of loader steps by reason
+#	               Pass load-data and load-photos --only-keys option
+#	               Pass reconcile-photos photo reduction and thumbnail options
+#	               Pass export-attachments --state-db option
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Use mg.LOG_LEVEL_NAMES for log level choices
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+
+# Standard
+
+import argparse
+import logging
+import sys
+import time
+
+
+# Custom
+
+import create_hydro_data_model
+import delete_hydro_data_model
+import export_hydro_attachments
+import load_hydro_data
+import load_hydro_photos
+import mg
+import migrate_hydro_data_model
+import reconcile_hydro_photos
+
+
+
+#
+# Constants
+#
+
+STEP_SEPARATOR = '+' # Standalone argument between steps
+
+STEPS = { # Step name: (script module, geodatabase server argument)
+	'create-model': (create_hydro_data_model, '-s')
+	,'delete-model': (delete_hydro_data_model, '-s')
+	,'migrate-model': (migrate_hydro_data_model, '-s')
+	,'load-data': (load_hydro_data, '-s')
+	,'load-photos': (load_hydro_photos, '-g')
+	,'reconcile-photos': (reconcile_hydro_photos, '-g')
+	,'export-attachments': (export_hydro_attachments, '-g')
+}
+
+STEPS_AGGREGATE_WARNINGS = ( # Steps that warn per row; see mg.aggregate_warnings()
+	'load-data'
+	,'load-photos'
+)
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+
+#
+# Public
+#
+
+def run_step(
+	gdb
+	,step_name
+	,step_arguments # Tuple returned by script module _process_arguments()
+):
+	'''
+	Run one step against geodatabase, with arguments already processed by
+	the corresponding script module
+	'''
+
+	module = STEPS[step_name][0]
+
+	args = step_arguments[0]
+
+	module._print_banner(args)
+
+
+
+	# Run, with optional profiling (step --profile) and arcpy call tracing
+	# (step --trace-arcpy); repeated warnings of loader steps are summarized
+	# by reason
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+		,mg.aggregate_warnings(
+			enabled = step_name in STEPS_AGGREGATE_WARNINGS
+			,rejects_file = getattr(args, 'rejects_file', None) # Loader steps only
+		)
+	):
+
+		if step_name == 'create-model':
+
+			module.create_model(
+				gdb = gdb
+				,disable_domains = args.disable_domains
+				,workers = args.workers
+			)
+
+
+		elif step_name == 'delete-model':
+
+			module.delete_model(
+				gdb = gdb
+				,keep_domains = args.keep_domains
+			)
+
+
+		elif step_name == 'migrate-model':
+
+			module.migrate_model(
+				gdb = gdb
+				,dry_run = args.dry_run
+				,drop_fields = args.drop_fields
+				,force = args.force
+			)
+
+
+		elif step_name == 'load-data':
+
+			(
+				args
+				,source_table_location
+				,source_table_monitoring
+				,source_table_measuring_point
+			) = step_arguments
+
+			module.load_data(
+				target_gdb = gdb
+				,source_table_location = source_table_location
+				,source_table_monitoring = source_table_monitoring
+				,source_table_measuring_point = source_table_measuring_point
+				,feedback = args.feedback
+				,only_keys_file = args.only_keys_file
+			)
+
+
+		elif step_name == 'load-photos':
+
+			(
+				args
+				,index_file
+				,photo_dir
+			) = step_arguments
+
+			if args.validate_only:
+
+				module.validate_index(
+					index_file = index_file
+					,photo_dir = photo_dir
+				)
+
+
+			else:
+
+				module.load_photos(
+					index_file = index_file
+					,photo_dir = photo_dir
+					,gdb = gdb
+					,feedback = args.feedback
+					,max_dimension = args.max_dimension
+					,jpeg_quality = args.jpeg_quality
+					,workers = args.workers
+					,state_file = args.state_file
+					,sync = args.sync
+					,remove_missing = args.remove_missing
+					,resume = args.resume
+					,thumbnail_dimension = args.thumbnail_dimension
+					,report_file = args.report_file
+					,only_keys_file = args.only_keys_file
+				)
+
+
+		elif step_name == 'reconcile-photos':
+
+			(
+				args
+				,index_file
+				,photo_dir
+			) = step_arguments
+
+			module.reconcile_photos(
+				index_file = index_file
+				,photo_dir = photo_dir
+				,gdb = gdb
+				,dry_run = args.dry_run
+				,state_file = args.state_file
+				,all_attachments = args.all_attachments
+				,batch_size = args.batch_size
+				,max_dimension = args.max_dimension
+				,jpeg_quality = args.jpeg_quality
+				,thumbnail_dimension = args.thumbnail_dimension
+			)
+
+
+		elif step_name == 'export-attachments':
+
+			(
+				args
+				,output_name
+			) = step_arguments
+
+			module.export_attachments(
+				gdb = gdb
+				,output_name = output_name
+				,table_names = args.table_names
+				,workers = args.workers
+				,feedback = args.feedback
+				,state_file = args.state_file
+			)
+
+
+		else:
+
+			raise ValueError(f'Unknown step: {step_name}')
+
+
+
+#
+# Private
+#
+
+def _configure_arguments():
+	'''
+	Configure arguments when running in script mode
+
+	Returns configured argparse.ArgumentParser
+	'''
+
+	ap = argparse.ArgumentParser(
+		conflict_handler = 'resolve' # Allow overwriting built-in -h/--help to add to custom argument group
+		,description = 'Run hydro geodatabase steps in one process'
+		,epilog = (
+			f'Steps: {", ".join(STEPS)}. Separate steps with a standalone'
+			f' {STEP_SEPARATOR} argument; use <step> -h for step arguments.'
+		)
+	)
+
+
+
+	g = ap.add_argument_group( # Avoid all named arguments being listed as 'optional' in help
+		'Arguments'
+	)
+
+
+
+	g.add_argument(
+		'-s'
+		,'--server'
+		,dest = 'server'
+		,help = 'Geodatabase server'
+		,metavar = '<server>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-d'
+		,'--database'
+		,dest = 'database'
+		,help = 'Geodatabase database name'
+		,metavar = '<database>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-L'
+		,'--log-level'
+		,choices = mg.LOG_LEVEL_NAMES
+		,default = 'INFO'
+		,dest = 'log_level'
+		,help = 'Logging level (default: INFO)'
+		,required = False
+		,type = str.upper
+	)
+
+	g.add_argument(
+		'-l'
+		,'--log-file'
+		,dest = 'log_file_name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
+		,metavar = '<log_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
+
+	g.add_argument(
+		'steps'
+		,help = 'Steps to run, with their arguments'
+		,metavar = '<step> [<step arguments>] ...'
+		,nargs = argparse.REMAINDER
+	)
+
+
+
+	return ap
+
+
+
+def _print_banner(
+	args
+	,steps # List of (step name, step arguments)
+):
+	'''
+	Print banner containing argument information to log
+	'''
+
+	banner = (
+		f'{mg.BANNER_DELIMITER_1}\n'
+		f'Hydrologic Geodatabase Steps\n'
+		f'{mg.BANNER_DELIMITER_2}\n'
+		f'Geodatabase server:                {args.server}\n'
+		f'Geodatabase database name:         {args.database}\n'
+		f'Log level:                         {args.log_level}\n'
+		f'Log file:                          {args.log_file_name}\n'
+		f'Steps:                             {" > ".join(name for name, arguments in steps)}\n'
+		f'{mg.BANNER_DELIMITER_1}'
+	)
+
+
+
+	# Print banner
+
+	logging.info(banner)
+
+
+
+def _process_arguments(
+	log_formatter = None # Formatter to use with log file
+):
+	'''
+	Process arguments for main block
+
+	Act on arguments that can be handled immediately. Return arguments, as
+	well as any objects created here that are needed elsewhere.
+
+	Note: Refrain from sending log messges until the log level argument is
+	processed, as not to report extraneous information to a user who
+	requested a coarser level of detail.
+	'''
+
+	# Define arguments
+
+	parser = _configure_arguments()
+
+
+
+	# Fetch argument values
+
+	args = parser.parse_args()
+
+
+
+	#
+	# Evaluate arguments
+	#
+
+
+	# Set log level
+
+	logging.getLogger().setLevel(args.log_level)
+
+
+
+	# Configure log file
+	#
+	# Do this as early as possible, so we can capture the most messages to
+	# the log file; logging messages sent before log file coniguration will
+	# go to console only
+
+	if args.log_file_name is not None:
+
+		logging.debug(f'Configuring log file {args.log_file_name}')
+		mg.configure_log_file(
+			args.log_file_name
+			,log_formatter
+		)
+
+
+
+	#
+	# Process step arguments
+	#
+	# Each script module validates its own arguments; supply the shared
+	# geodatabase and log level arguments in the form that script expects
+
+	steps = []
+
+	for step_argv in _split_steps(args.steps):
+
+		step_name = step_argv[0]
+
+		if step_name not in STEPS:
+
+			parser.error(f'unknown step {step_name!r} (choose from {", ".join(STEPS)})')
+
+
+
+		(
+			module
+			,server_argument
+		) = STEPS[step_name]
+
+		logging.debug(f'Processing arguments for step {step_name}')
+		step_arguments = module._process_arguments(
+			log_formatter = log_formatter
+			,argv = [
+				server_argument
+				,args.server
+				,'-d'
+				,args.database
+				,'-L'
+				,args.log_level
+				,*step_argv[1:]
+			]
+		)
+
+		if not isinstance(step_arguments, tuple): # Some scripts return args alone; standardize on tuple starting with args
+
+			step_arguments = (step_arguments,)
+
+
+
+		steps.append(
+			(
+				step_name
+				,step_arguments
+			)
+		)
+
+
+
+	if not steps:
+
+		parser.error('at least one step is required')
+
+
+
+	#
+	# Return
+	#
+
+	return (
+		args
+		,steps
+	)
+
+
+
+def _split_steps(
+	argv # List of step arguments
+):
+	'''
+	Split step arguments at each standalone STEP_SEPARATOR
+
+	Returns list of argument lists, one per step, each starting with the
+	step name. Empty steps (e.g. trailing separator) are dropped.
+	'''
+
+	steps = [[]]
+
+	for arg in argv:
+
+		if arg == STEP_SEPARATOR:
+
+			steps.append([])
+
+
+		else:
+
+			steps[-1].append(arg)
+
+
+
+	return [
+		step
+		for step in steps
+		if step
+	]
+
+
+
+################################################################################
+# Main
+################################################################################
+
+if __name__ == '__main__':
+
+
+	#
+	# Setup
+	#
+
+
+	# Initialize logging infrastructure; do this early so we can communicate
+	# with user
+	#
+	# Keep a reference to the formatter so we can use it with other handlers
+	# (e.g. FileHandler)
+
+	log_formatter = mg.initialize_logging()
+
+
+
+	# Process arguments
+
+	try:
+
+		(
+			args
+			,steps
+		) = _process_arguments(log_formatter)
+
+
+	except Exception as e:
+
+		logging.error(e)
+		raise
+
+
+
+	# Print banner
+
+	_print_banner(
+		args = args
+		,steps = steps
+	)
+
+
+
+	# Connect to geodatabase; all steps share this connection
+
+	logging.info('Connecting to geodatabase')
+
+	try:
+
+		gdb = mg.connect_gdb(
+			server = args.server
+			,database = args.database
+		)
+
+
+	except RuntimeError as e:
+
+		logging.error(e)
+
+		sys.exit(mg.EXIT_FAILURE)
+
+
+
+	#
+	# Run steps
+	#
+
+	for (
+		step_number
+		,(
+			step_name
+			,step_arguments
+		)
+	) in enumerate(
+		steps
+		,start = 1
+	):
+
+		logging.info(f'Running step {step_number} of {len(steps)}: {step_name}')
+
+		time_start = time.perf_counter()
+
+		run_step(
+			gdb = gdb
+			,step_name = step_name
+			,step_arguments = step_arguments
+		)
+
+		logging.info(f'Finished step {step_name} in {time.perf_counter() - time_start:.1f} seconds')
+
+
+
+	#
+	# Cleanup
+	#
+
+	logging.info('Done.')
+
+
+
+################################################################################
+# END
+################################################################################
@@ -34,6 +34,25 @@
 #
 #	In script mode, this module uses the root logger.
 #
+#
+#
+#	REJECTS
+#
+#	Rejected Locations and Measuring Points are logged as warnings with
+#	structured fields: event (location_rejected or
+#	measuring_point_rejected), the stage at which the row was rejected
+#	(transform, write_location, write_data_logger, write_sensors, or
+#	write_measuring_points), and the source keys, location_id and
+#	measuring_point_id. With --rejects-file, they are written in full to a
+#	JSON lines file, with a reason code; see mg.aggregate_warnings().
+#
+#	After fixing the source data, load just the rejected Locations with
+#	--only-keys <rejects_file>. A rejected Location is rolled back as a
+#	whole, so reloading it does not duplicate rows. Rejected Measuring
+#	Points do not reject their Location, which is loaded without them;
+#	since the loader only inserts, delete such a Location before listing
+#	its ID in a keys file to reload it.
+#
 # History:
 #	2022-12-12 MCM Created
 #	2023-03-14 MCM Added `MeasuringPoint.IsActive` property (#72)
@@ -55,9 +74,29 @@
 #	               Remove 'Slab' from Measuring Point exclusion list (#212)
 #	2025-07-13 MCM Add -d <database> argument to support development
 #	                 infrastructure
+#	2026-10-18 MCM Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Accept argument list from hydro.py
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Switch from local asdict to mg.asdict
+#	               Summarize repeated warnings by reason, and add
+#	                 --rejects-file option (mg.aggregate_warnings)
+#	               Warn of rejected Measuring Points, and add source keys
+#	                 and stage to rejects
+#	               Add --only-keys option to reload rejected Locations
+#	               Write to geodatabase passed to load_data(), not main
+#	                 block global, for hydro.py
+#	               Require rejects file to differ from only keys file
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Use mg.LOG_LEVEL_NAMES for log level choices
 #
 # To do:
-#	Switch from local asdict to mg.asdict
+#	none
 #
 # Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
 ################################################################################
@@ -70,13 +109,11 @@
 
 # Standard
 
-import arcpy
 import argparse
 import json
 import logging
 import os
 import sys
-import tempfile
 import uuid
 
 
@@ -85,6 +122,8 @@ import uuid
 import constants as C
 import mg
 
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
 
 
 #
@@ -175,7 +214,7 @@ class DataLogger:
 	def __str__(self):
 
 		return json.dumps(
-			asdict(
+			mg.asdict(
 				object = self
 				,attributes = self.__class__.ATTRIBUTES
 			)
@@ -441,7 +480,7 @@ class Location:
 		# Location
 
 		message = json.dumps(
-			asdict(
+			mg.asdict(
 				object = self
 				,attributes = self.__class__.ATTRIBUTES
 			)
@@ -883,18 +922,30 @@ class Location:
 			else:
 			
 				header = f'Rejecting Measuring Point {source_data.UniqueId}:'
+				
+				extra = { # Rejects file fields; see mg.aggregate_warnings()
+					'event': 'measuring_point_rejected'
+					,'stage': 'transform'
+					,'location_id': self.data_location.LocationIdentifier
+					,'measuring_point_id': source_data.UniqueId
+					,'reason': mg.WarningAggregator.reason('; '.join(reject_messages))
+				}
 			
 			
 				if len(reject_messages) == 1: # Single line message
 				
-					logging.debug(f'{header} {reject_messages[0]}')
+					logging.warning(
+						f'{header} {reject_messages[0]}'
+						,extra = extra
+					)
 					
 					
 				else: # Multiline message
 				
-					logging.debug(
+					logging.warning(
 						f'{header}'
 						f'\n\t{(NEWLINE + TAB).join(reject_messages)}'
+						,extra = extra
 					)
 			
 			
@@ -1524,7 +1575,7 @@ class MeasuringPoint:
 	def __str__(self):
 
 		return json.dumps(
-			asdict(
+			mg.asdict(
 				object = self
 				,attributes = self.__class__.ATTRIBUTES
 			)
@@ -1692,7 +1743,7 @@ class Sensor:
 	def __str__(self):
 
 		return json.dumps(
-			asdict(
+			mg.asdict(
 				object = self
 				,attributes = self.__class__.ATTRIBUTES
 			)
@@ -1813,7 +1864,7 @@ class SourceData:
 	def __str__(self):
 
 		return json.dumps(
-			asdict(
+			mg.asdict(
 				object = self
 				,attributes = self._attributes
 			)
@@ -1832,86 +1883,6 @@ class SourceData:
 #
 
 
-def asdict(
-	object
-	,attributes
-):
-	'''
-	Convert complex objects to dictionaries with simple types that can be
-	encoded as JSON by json module
-
-	This helper function factors out common code from several classes
-	defined in this module. It accepts an object and a sequence of attribute
-	names, and returns a dict of the attribute names and their values.
-
-	The conversion logic is simple:
-
-		If an attribute value has its own attribute named 'asdict', we
-		assume that the value is a complex object that needs additional
-		simplification and call value.asdict() to get a dict with simple
-		types that are compatible with the json module.
-
-		Otherwise, if the value does not have an attribute named
-		'asdict', we assume that it can be encoded directly by the
-		json module and add it to the dict without furhter processing.
-	'''
-
-	d = {}
-
-
-	for a in attributes:
-
-		value = getattr(
-			object
-			,a
-		)
-
-
-
-		if hasattr( # Complex type
-			value
-			,'asdict'
-		):
-
-			d[a] = value.asdict()
-
-
-		else: # Simple type
-
-			if isinstance( # Convert datetime to string, for subsequent JSON conversions
-				value
-				,datetime.datetime
-			):
-
-				value = value.strftime(mg.JSON_FORMAT_DATE)
-
-
-			if isinstance( # Display human-friendly representation of geometry
-				value
-				,arcpy.Geometry
-			):
-
-				value = json.loads(value.JSON)
-				
-				
-			if isinstance( # Convert UUID to string, for subsequent JSON conversions
-				value
-				,uuid.UUID
-			):
-			
-				value = str(value)
-
-
-			d[a] = value
-
-
-
-	# Return
-
-	return d
-
-
-
 def fetch_monitoring(
 	source_table_monitoring
 	,location_id
@@ -2108,9 +2079,15 @@ def load_data(
 	,source_table_monitoring
 	,source_table_measuring_point
 	,feedback
+	,only_keys_file = None # Load only these Locations; see mg.read_keys()
 ):
 	'''
 	Read data from source files and load to target geodatabase
+	
+	If `only_keys_file` is provided, only the Locations it lists are read
+	from the source: the rejected Locations of a rejects file from an
+	earlier run, or a list of Location IDs, one per line. See REJECTS note
+	in module header.
 	'''
 
 
@@ -2134,6 +2111,30 @@ def load_data(
 
 
 
+	#
+	# Select Locations
+	#
+	
+	if only_keys_file is None:
+	
+		where_clause = None
+		
+	else:
+	
+		only_keys = mg.read_keys(
+			file_name = only_keys_file
+			,key = 'location_id'
+			,events = ('location_rejected',)
+		)
+		logging.info(f'Loading only {len(only_keys)} Locations from {only_keys_file}')
+		
+		where_clause = mg.where_in(
+			'LocationIdentifier'
+			,only_keys
+		)
+
+
+
 	#
 	# Process data
 	#
@@ -2154,7 +2155,7 @@ def load_data(
 	with arcpy.da.SearchCursor(
 		in_table = source_table_location
 		,field_names = '*'
-		# ,where_clause = 'LocationIdentifier in (8495,  8505,  8544)' # DEBUG
+		,where_clause = where_clause
 		,spatial_reference = C.SR_UTM16N_NAD83
 	) as cursor_location:
 
@@ -2208,7 +2209,10 @@ def load_data(
 
 			except ValueError as e:
 
-				logging.warning(f'Skipping Location ID {location_id}: {e}')
+				logging.warning(
+					f'Skipping Location ID {location_id}: {e}'
+					,extra = {'event': 'location_rejected', 'stage': 'transform', 'location_id': location_id} # See mg.aggregate_warnings()
+				)
 
 				metrics_input.location_failed += 1
 				
@@ -2247,15 +2251,21 @@ def load_data(
 			try:
 			
 				location_globalid = write_location(
-					gdb = gdb
+					gdb = target_gdb
 					,location = location
 				)
-				logging.debug(f'Loaded Location ID {location_id} to GlobalID {location_globalid}')
+				logging.debug(
+					f'Loaded Location ID {location_id} to GlobalID {location_globalid}'
+					,extra = {'event': 'location_loaded', 'location_id': location_id, 'globalid': location_globalid} # See mg.FormatterJSON
+				)
 				
 				
 			except Exception as e:
 			
-				logging.warning(f'Failed to load Location ID {location_id}: {e}')
+				logging.warning(
+					f'Failed to load Location ID {location_id}: {e}'
+					,extra = {'event': 'location_rejected', 'stage': 'write_location', 'location_id': location_id} # See mg.aggregate_warnings()
+				)
 				
 				logging.debug('Rolling back transaction')
 				editor.stopEditing(False)
@@ -2277,7 +2287,7 @@ def load_data(
 				try:
 				
 					data_logger_globalid = write_data_logger(
-						gdb = gdb
+						gdb = target_gdb
 						,location = location
 						,location_globalid = location_globalid
 					)
@@ -2286,7 +2296,10 @@ def load_data(
 
 				except Exception as e:
 				
-					logging.warning(f'Failed to load Location ID {location_id}: Data Logger: {e}')
+					logging.warning(
+						f'Failed to load Location ID {location_id}: Data Logger: {e}'
+						,extra = {'event': 'location_rejected', 'stage': 'write_data_logger', 'location_id': location_id} # See mg.aggregate_warnings()
+					)
 					
 					logging.debug('Rolling back transaction')
 					editor.stopEditing(False)
@@ -2311,7 +2324,7 @@ def load_data(
 				try:
 				
 					sensor_objectids = write_sensors(
-						gdb = gdb
+						gdb = target_gdb
 						,location = location
 						,data_logger_globalid = data_logger_globalid
 					)
@@ -2323,7 +2336,10 @@ def load_data(
 
 				except Exception as e:
 				
-					logging.warning(f'Failed to load Location ID {location_id}: Sensors: {e}')
+					logging.warning(
+						f'Failed to load Location ID {location_id}: Sensors: {e}'
+						,extra = {'event': 'location_rejected', 'stage': 'write_sensors', 'location_id': location_id} # See mg.aggregate_warnings()
+					)
 					
 					logging.debug('Rolling back transaction')
 					editor.stopEditing(False)
@@ -2348,7 +2364,7 @@ def load_data(
 				try:
 				
 					measuring_point_objectids = write_measuring_point(
-						gdb = gdb
+						gdb = target_gdb
 						,location = location
 						,location_globalid = location_globalid
 					)
@@ -2360,7 +2376,10 @@ def load_data(
 
 				except Exception as e:
 				
-					logging.warning(f'Failed to load Location ID {location_id}: Measuring Points: {e}')
+					logging.warning(
+						f'Failed to load Location ID {location_id}: Measuring Points: {e}'
+						,extra = {'event': 'location_rejected', 'stage': 'write_measuring_points', 'location_id': location_id} # See mg.aggregate_warnings()
+					)
 					
 					logging.debug('Rolling back transaction')
 					editor.stopEditing(False)
@@ -2742,29 +2761,6 @@ def write_sensors(
 # Private
 #
 
-def _check_credentials():
-	'''
-	The target SQL Server instance uses Windows authentication, so we need
-	to ensure that this Python process is running as the correct user
-	'''
-
-	domain = os.environ.get('USERDOMAIN')
-	user = os.environ.get('USERNAME')
-
-	username = f'{domain}\\{user}' # Leave default string case, for display
-
-
-
-	logging.debug('Checking OS username')
-	if user.upper() != 'HYDRO': # Only check user, not domain, so developers can run in arbitrary environment
-
-		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
-			'Invalid Windows credentials'
-			f'\nThis script must run in a Python session as the HQ\hydro user, but is running as {username}'
-		)
-
-
-
 def _configure_arguments():
 	'''
 	Configure arguments when running in script mode
@@ -2806,15 +2802,7 @@ def _configure_arguments():
 	g.add_argument(
 		'-L'
 		,'--log-level'
-		,choices = (
-			'CRITICAL'
-			,'ERROR'
-			,'WARNING'
-			,'INFO'
-			,'DEBUG'
-			,'DATA'
-			,'DATADEBUG'
-		)
+		,choices = mg.LOG_LEVEL_NAMES
 		,default = 'INFO'
 		,dest = 'log_level'
 		,help = 'Logging level (default: INFO)'
@@ -2826,7 +2814,7 @@ def _configure_arguments():
 		'-l'
 		,'--log-file'
 		,dest = 'log_file_name'
-		,help = 'Diagnostic log file name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
 		,metavar = '<log_file>'
 		,required = False
 	)
@@ -2842,6 +2830,52 @@ def _configure_arguments():
 		,type = int
 	)
 
+	g.add_argument(
+		'-E'
+		,'--rejects-file'
+		,dest = 'rejects_file'
+		,help = 'Write every warning, in full, to JSON lines file, with source keys and reason codes of rejected rows; must not exist; use suffix .gz to compress'
+		,metavar = '<rejects_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-K'
+		,'--only-keys'
+		,dest = 'only_keys_file'
+		,help = 'Load only the Locations rejected in this rejects file, or listed in this file, one Location ID per line'
+		,metavar = '<only_keys_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
+
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
+
 	g.add_argument(
 		'-h'
 		,'--help'
@@ -2867,294 +2901,6 @@ def _configure_arguments():
 
 
 
-def _configure_log_file(
-	file_name
-	,formatter = None
-):
-	'''
-	Add log file handler to existing root logger
-	Fail if file already exists
-	'''
-
-	try:
-
-		logging.debug('Adding log FileHandler')
-		handler = logging.FileHandler(
-			file_name
-			,mode = 'x'
-			,encoding = 'utf-8'
-		)
-
-
-	except FileExistsError:
-
-		logging.error(f'Log file \'{file_name}\' already exists')
-
-		raise
-
-
-
-	if formatter is not None:
-
-		logging.debug('Setting log FileHandler Formatter')
-		handler.setFormatter(formatter)
-
-
-
-	logging.debug('Adding FileHandler to Logger')
-	logging.getLogger().addHandler(handler)
-
-
-
-def _connect_gdb(
-	server
-	,database
-):
-	'''
-	Create temporary geodatabase connection using OS authentication
-
-	Returns tempfile.TemporaryDirectory object, along with geodatabase
-	connection file. You must retain a reference to the returned
-	TemporaryDirectory, else it will go out-of-scope and automatically
-	delete itself - including the connection file it contains. Retaining
-	a reference to the file, itself, is not sufficient to prevent automatic
-	cleanup.
-	'''
-
-
-	# Check Windows credentials
-
-	try:
-
-		_check_credentials()
-
-
-	except RuntimeError as e:
-
-		raise
-
-
-
-	# Create connection
-
-	temp_dir = tempfile.TemporaryDirectory()
-	logging.debug(f'Created temporary directory {temp_dir.name}')
-
-
-
-	arcpy.management.CreateDatabaseConnection(
-		out_folder_path = temp_dir.name
-		,out_name = C.CONNECTION_FILE_NAME
-		,database_platform = 'SQL_SERVER'
-		,instance = server
-		,account_authentication = 'OPERATING_SYSTEM_AUTH'
-		,database = database
-	)
-
-
-	gdb = os.path.join(
-		temp_dir.name
-		,C.CONNECTION_FILE_NAME
-	)
-	logging.debug(f'Created database connection file: {gdb}')
-
-
-
-	# Validate geodatabase connection
-	#
-	# Creating connection file does not appear to test connection, just
-	# write properties to file
-
-	logging.debug('Validating geodatabase connection')
-	try:
-
-		# Describe raises:
-		#	IOError if target is not a recognized object type
-		#	OSError if target does not exist
-
-		d = arcpy.Describe(gdb)
-		logging.debug(f'Describe type: {d.dataType}')
-
-
-
-		# Referencing workspaceType raises AttributeError if target is not a workspace
-
-		if not d.workspaceType == 'RemoteDatabase':
-
-			# Explicitly raise exception if target is not an enterprise geodatabase
-
-			raise TypeError(f'Expected RemoteDatabase type; got {d.workspaceType} type')
-
-
-	except (
-		IOError
-		,OSError
-		,AttributeError
-		,TypeError
-	) as e:
-
-		raise RuntimeError('Invalid enterprise geodatabase') from e
-
-
-
-	# Return connection file AND TemporaryDirectory; see function header
-	# comments for details
-
-	return(
-		gdb
-		,temp_dir
-	)
-
-
-
-def _initialize_logging(
-	level = logging.NOTSET
-):
-	'''
-	Configure basic console logging
-
-	When running in script mode, this function is called early to establish
-	a basic communication channel with the user. The intent is to perform
-	minimial configuration here - both to reduce the possiblity of errors
-	before the channel is ready, and to avoid expensive processing if the
-	script exits early (e.g. invalid argument) - while also building some
-	of the foundation for more robust logging that may be specified in
-	the script's runtime arguments.
-
-	Use the `logging` module's root logger, and send all messages to stdout.
-	Log at the most verbose level (NOTSET) to avoid suppressing useful
-	messages in case of early problems, with the expectation that the
-	script will choose a more reasonable level after processing arguments.
-	Define custom formatting now, to avoid early messages looking
-	differently than later ones.
-
-	The custom implementations includes attributes and methods that mimic
-	those of the built-in levels, including:
-
-		Logging level macros
-
-			logging.DATA
-			logging.DATADEBUG
-
-		Wrapper functions, at module level
-
-			logging.data('message')
-			logging.datadebug('message')
-
-		Wrapper functions, at root logger level
-
-			l = logging.getLogger()
-			l.data('message')
-			l.datadebug('message')
-
-	Returns formatter, for use with other handlers.
-	'''
-
-
-	# Configure custom DATA level
-
-	logging.DATA = mg.LOG_LEVEL_DATA
-
-	logging.addLevelName(
-		logging.DATA
-		,'DATA'
-	)
-
-	logging.data = _logging_data
-	logging.getLogger().data = _logging_data
-
-
-
-	# Configure custom DATADEBUG level
-
-	logging.DATADEBUG = mg.LOG_LEVEL_DATADEBUG
-
-	logging.addLevelName(
-		logging.DATADEBUG
-		,'DATADEBUG'
-	)
-
-	logging.datadebug = _logging_datadebug
-	logging.getLogger().datadebug = _logging_datadebug
-
-
-
-	# Formatter
-
-	f = mg.FormatterIndent(
-		fmt = mg.LOG_FORMAT
-		,datefmt = mg.LOG_FORMAT_DATE
-	)
-
-
-
-	# Handler
-
-	h = logging.StreamHandler(sys.stdout)
-
-	h.setFormatter(f)
-
-
-
-	# Logger
-
-	l = logging.getLogger()
-
-	l.setLevel(level)
-	l.addHandler(h)
-
-
-
-	# Return
-
-	return f
-
-
-
-def _logging_data(
-	msg
-	,*args
-	,**kwargs
-):
-	'''
-	Create function for custom logging.DATA level
-
-	This function will be bound to the logging module and the root logger
-	the root logger to match the convenience functions for the built-in
-	log levels. For example: logging.data('message')
-	'''
-
-	logging.log(
-		logging.DATA
-		,msg
-		,*args
-		,**kwargs
-	)
-
-
-
-def _logging_datadebug(
-	msg
-	,*args
-	,**kwargs
-):
-	'''
-	Create function for custom logging.DATADEBUG level
-
-	This function will be bound to the logging module and the root logger
-	the root logger to match the convenience functions for the built-in
-	log levels. For example: logging.datadebug('message')
-	'''
-
-	logging.log(
-		logging.DATADEBUG
-		,msg
-		,*args
-		,**kwargs
-	)
-
-
-
 def _print_banner(
 	args
 ):
@@ -3172,6 +2918,11 @@ def _print_banner(
 		f'Log level:                    {args.log_level}\n'
 		f'Log file:                     {args.log_file_name}\n'
 		f'Feedback:                     {args.feedback}\n'
+		f'Rejects file:                 {args.rejects_file}\n'
+		f'Only keys file:               {args.only_keys_file}\n'
+		f'Profile file:                 {args.profile_file}\n'
+		f'Profile mode:                 {args.profile_mode}\n'
+		f'Trace arcpy:                  {args.trace_arcpy}\n'
 		f'{mg.BANNER_DELIMITER_1}'
 	)
 
@@ -3185,6 +2936,7 @@ def _print_banner(
 
 def _process_arguments(
 	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
 ):
 	'''
 	Process arguments for main block
@@ -3206,7 +2958,7 @@ def _process_arguments(
 
 	# Fetch argument values
 
-	args = parser.parse_args()
+	args = parser.parse_args(argv)
 
 
 
@@ -3230,7 +2982,7 @@ def _process_arguments(
 	if args.log_file_name is not None:
 
 		logging.debug(f'Configuring log file {args.log_file_name}')
-		_configure_log_file(
+		mg.configure_log_file(
 			args.log_file_name
 			,log_formatter
 		)
@@ -3247,6 +2999,23 @@ def _process_arguments(
 	
 
 
+	#
+	# Verify rejects file
+	#
+	# The rejects file is created when loading starts, before the keys file
+	# is read
+	#
+
+	if (
+		args.rejects_file is not None
+		and args.only_keys_file is not None
+		and os.path.normcase(os.path.abspath(args.rejects_file)) == os.path.normcase(os.path.abspath(args.only_keys_file))
+	):
+
+		raise ValueError('Rejects file (--rejects-file) must differ from only keys file (--only-keys)')
+
+
+
 	# Build paths
 	#
 	# Relative paths break some arcpy functionality so force all paths to
@@ -3302,7 +3071,7 @@ if __name__ == '__main__':
 	# Keep a reference to the formatter so we can use it with other handlers
 	# (e.g. FileHandler)
 
-	log_formatter = _initialize_logging()
+	log_formatter = mg.initialize_logging()
 
 
 
@@ -3337,10 +3106,7 @@ if __name__ == '__main__':
 
 	try:
 
-		(
-			gdb
-			,temp_dir
-		) = _connect_gdb(
+		gdb = mg.connect_gdb(
 			server = args.server
 			,database = args.database
 		)
@@ -3355,16 +3121,35 @@ if __name__ == '__main__':
 
 
 	#
-	# Load data
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy); repeated warnings are summarized by reason
 	#
 
-	load_data(
-		target_gdb = gdb
-		,source_table_location = source_table_location
-		,source_table_monitoring = source_table_monitoring
-		,source_table_measuring_point = source_table_measuring_point
-		,feedback = args.feedback
-	)
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+		,mg.aggregate_warnings(
+			rejects_file = args.rejects_file
+		)
+	):
+
+		#
+		# Load data
+		#
+
+		load_data(
+			target_gdb = gdb
+			,source_table_location = source_table_location
+			,source_table_monitoring = source_table_monitoring
+			,source_table_measuring_point = source_table_measuring_point
+			,feedback = args.feedback
+			,only_keys_file = args.only_keys_file
+		)
 
 
 
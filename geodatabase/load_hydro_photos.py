@@ -90,6 +90,150 @@
 #
 #
 #
+#	PHOTO REDUCTION
+#
+#	Survey123 field tablets download the attachment photos over cellular
+#	links, so full-resolution photos from Aquarius can make field sync slow.
+#	Optionally, this script reduces each photo before loading it: images
+#	larger than a maximum width/height are downsampled and re-encoded,
+#	with EXIF orientation applied so the result displays upright. Both the
+#	original and loaded sizes are reported in the output metrics.
+#
+#	Photo files are read (and reduced) in a pool of workers, a bounded
+#	number of photos ahead of the geodatabase loading, so file I/O and
+#	image processing overlap with geodatabase I/O.
+#
+#
+#
+#	INDEX VALIDATION
+#
+#	Before loading, the script validates the whole photo index in one pass
+#	over its columns: photo UUIDs, Location / Measuring Point tags, related
+#	Measuring Point IDs, content type (from file extension), and photo
+#	file existence (from a single photo directory scan). All defects are
+#	reported together, and only valid records are loaded. To check an index
+#	without loading, use --validate-only.
+#
+#
+#
+#	EXIF METADATA
+#
+#	The workers also extract the EXIF metadata segment from each JPEG
+#	photo, which is loaded to the attachment EXIFINFO column along with
+#	the photo, so consumers can read capture time and GPS position without
+#	parsing the attachment content.
+#
+#
+#
+#	THUMBNAILS
+#
+#	Full-size photos render slowly on field tablets. Optionally
+#	(--thumbnail-dimension), the workers also generate a small thumbnail of
+#	each photo, which is loaded as a separate attachment to the same row,
+#	named with a "thumbnail_" prefix and with keywords suffixed by
+#	"_thumbnail" (e.g. Location_image_thumbnail), so the Survey123 form can
+#	display it in its own question. A thumbnail is replaced whenever its
+#	photo is inserted or replaced.
+#
+#	After loading, existing photo attachments without a thumbnail (e.g.
+#	loaded before thumbnails were enabled, or skipped as unchanged) are
+#	backfilled from the attachment content, and thumbnails whose photo
+#	attachment no longer exists are deleted. Each thumbnail is committed as
+#	it is generated, so an interrupted backfill continues on the next run.
+#
+#
+#
+#	PHOTO IDENTITY
+#
+#	The attachment tables have nowhere to store the Aquarius photo UUID, so
+#	an attachment can only be matched to its source photo by file name.
+#	That misses a renamed re-export of the same photo, and cannot tell
+#	whether a photo with the same name has been edited.
+#
+#	To address this, the script computes a SHA-256 hash of each photo file
+#	as it is read, and can keep a local state database (SQLite) mapping
+#	each photo UUID and content hash to the attachment loaded from it. With
+#	the state database, photos whose content is already attached to the
+#	target row are skipped regardless of file name, and attachments whose
+#	source photo content changed are replaced.
+#
+#	Without the state database, or for attachments loaded before it was
+#	created, an existing attachment with the same file name is compared
+#	with the photo content, and skipped if identical. Sizes are compared
+#	first, and existing content is only read from the geodatabase when the
+#	sizes match. An existing attachment with different content is only
+#	replaced if the state database records it for the same photo UUID; if
+#	it records another photo UUID, the photos merely share a file name, and
+#	the photo is attached alongside it. Otherwise the attachment cannot be
+#	matched to the photo, so it is left in place and the photo is
+#	rejected.
+#
+#	Replacement inserts the new attachment before deleting the old one, so
+#	a failure does not lose the existing photo.
+#
+#	The state database describes one target geodatabase; use a separate
+#	file for each database, and delete it if the target attachments are
+#	rebuilt by other means.
+#
+#
+#
+#	SYNC MODE
+#
+#	For routine refreshes, the script can process only photos that changed
+#	since they were last loaded (--sync). The photo directory is scanned
+#	once (name, size, modification time) at startup, and each index record
+#	is compared with the file status and index metadata recorded in the
+#	state database when that photo was last loaded successfully. Unchanged
+#	photos are skipped without reading the file or querying the
+#	geodatabase; photos that failed to load are retried on the next run.
+#
+#	Optionally (--remove-missing), attachments loaded from photos that are
+#	no longer in the index are deleted. Only attachments recorded in the
+#	state database are considered, so attachments loaded by other means
+#	are never removed.
+#
+#
+#
+#	RESUMING AN INTERRUPTED LOAD
+#
+#	With a state database, each run also keeps a journal of the photos and
+#	target rows committed so far. The journal is cleared when the run
+#	finishes. If a run is interrupted (e.g. network failure), rerunning with
+#	--resume skips journaled photos without reading their files or querying
+#	the geodatabase, and continues where the run stopped. Without --resume,
+#	a new run discards any journal left by an interrupted run.
+#
+#
+#
+#	METRICS
+#
+#	Progress metrics (--feedback, and at the end of the run) report counts
+#	of photos and attachments processed, files read and attachment content
+#	written per second, and the latency of each stage per photo: file read
+#	and processing (in the workers), target lookup and attachment write (in
+#	the geodatabase), and end-to-end. Each stage has a histogram of
+#	latencies, so a slow photo share can be told apart from a slow
+#	database link. With --report, the final metrics are also written to a
+#	JSON file.
+#
+#
+#
+#	REJECTS
+#
+#	Rejected photos are logged as warnings with structured fields: event
+#	photo_rejected, the stage at which the photo was rejected
+#	(validate_index, metadata, read, attachment_metadata, or load), and
+#	the source key, file_name.
+#	With --rejects-file, they are written in full to a JSON lines file,
+#	with a reason code; see mg.aggregate_warnings().
+#
+#	After fixing the photos or their index, load just the rejected photos
+#	with --only-keys <rejects_file>. Only the matching photo index records
+#	are read, with a FileName IN (...) where clause. Attachments already
+#	loaded for a photo are replaced or left unchanged, as in any run.
+#
+#
+#
 #	MESSAGES
 #
 #	All messaging is processed through the `logging` module, including user
@@ -104,6 +248,50 @@
 #	2025-07-13 MCM Add -d <database> argument to support development
 #	                 infrastructure
 #	               Change photo directory flag from -d to -D
+#	2026-10-18 MCM Add optional photo reduction stage, with read-ahead of
+#	                 photo files in a worker pool
+#	               Track photo identity by content hash in local state
+#	                 database; skip unchanged photos and replace changed
+#	                 ones
+#	               Add sync mode using photo directory snapshots, with
+#	                 optional removal of photos missing from index
+#	               Populate attachment EXIFINFO from photo EXIF metadata
+#	               Validate photo index upfront and report all defects
+#	               Journal committed photos in state database, and add
+#	                 option to resume interrupted load
+#	               Add optional thumbnail attachments, with backfill of
+#	                 existing attachments
+#	               Add throughput and stage latency metrics, with optional
+#	                 JSON report
+#	               Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Accept argument list from hydro.py
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Summarize repeated warnings by reason, and add
+#	                 --rejects-file option (mg.aggregate_warnings)
+#	               Add source keys and stage to rejects, and warn of each
+#	                 defective photo index record
+#	               Add --only-keys option to reload rejected photos
+#	               Use attachment geodatabase for target tables, not main
+#	                 block global, for hydro.py
+#	               Read existing attachment content only if its size
+#	                 matches the photo
+#	               Match photo index file names to photo files as the file
+#	                 system does, e.g. without case on Windows
+#	               Require rejects file to differ from only keys file
+#	               Add PhotoState.delete_attachment(), and option to record
+#	                 without journaling, for reconcile_hydro_photos.py
+#	               Check for Pillow with importlib.util.find_spec()
+#	               Replace existing attachment with same file name only if
+#	                 photo state records it for the same photo UUID
+#	               Time existing thumbnail lookup as target lookup
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Use mg.LOG_LEVEL_NAMES for log level choices
 #
 # To do:
 #	none
@@ -119,22 +307,31 @@
 
 # Standard
 
-import arcpy
 import argparse
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import datetime
+import hashlib
+import importlib.util
 import json
 import logging
 import mimetypes
 import os
 import re
+import sqlite3
 import sys
-import tempfile
+import time
 import uuid
 
 
 # Custom
 
-import constants as C
 import mg
+import photo_processing
+
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
 
 
 
@@ -144,6 +341,21 @@ import mg
 
 NEWLINE = '\n' # For f-string expressions, which disallow backslashes
 
+READ_AHEAD_FACTOR = 2 # Photo files to read ahead of loading, per worker
+
+PATTERN_MP_UUID = re.compile(r'''MP#([0-9a-f]{32})''') # Related MP in photo index comment
+PATTERN_TAG_COLUMN = re.compile(r'''Tags_[0-9]+_Key''') # Tag columns in photo index
+
+TAG_LOCATION = 'Site Photo'
+TAG_MP = 'MP'
+
+THUMBNAIL_CONTENT_TYPES = ( # Content types that photo_processing.make_thumbnail() supports
+	'image/jpeg'
+	,'image/png'
+)
+THUMBNAIL_PREFIX = 'thumbnail_' # Thumbnail attachment name, before photo file name
+THUMBNAIL_SUFFIX = '_thumbnail' # Thumbnail attachment keywords, after photo keywords
+
 
 
 ################################################################################
@@ -174,14 +386,28 @@ class Attachment:
 
 	ATTRIBUTES = (
 		'content_type'
+		,'count_inserted'
+		,'count_replaced'
+		,'count_thumbnail_inserted'
+		,'count_thumbnail_replaced'
+		,'count_unchanged'
 		,'data_size'
 		,'gdb'
 		,'globalid'
 		,'photo'
 		,'rel_globalids'
+		,'seconds_lookup'
+		,'seconds_write'
 	)
 
 
+	# SQL expression for the target row key that where_clauses compares
+	# with photo index values; shared with reconcile_hydro_photos.py, so
+	# both select the same target rows. Set in subclasses.
+
+	TARGET_KEY = None
+
+
 
 	########################################################################
 	# Properties
@@ -233,11 +459,25 @@ class Attachment:
 	# Derived read-only properties
 	#
 	
+	@property
+	def att_name_thumbnail(self):
+	
+		return f'{THUMBNAIL_PREFIX}{self.photo.file_name}'
+		
+	
+	
+	@property
+	def keywords_thumbnail(self):
+	
+		return f'{self.keywords}{THUMBNAIL_SUFFIX}'
+		
+	
+	
 	@property
 	def table(self):
 	
 		return os.path.join(
-			gdb
+			self.gdb
 			,self.table_name
 		)
 		
@@ -247,7 +487,7 @@ class Attachment:
 	def table_attachment(self):
 	
 		return os.path.join(
-			gdb
+			self.gdb
 			,self.table_name_attachment
 		)
 		
@@ -266,7 +506,7 @@ class Attachment:
 		self
 		,gdb
 		,photo # Photo
-		
+		,rel_globalids = None # Target rows, if already known; see transform_rel_globalids()
 	):
 
 		logging.debug(f'Initializing {__class__.__name__}')
@@ -284,6 +524,15 @@ class Attachment:
 		
 		self._initialize_attributes()
 		
+		self.rel_globalids = rel_globalids
+		
+		
+		
+		# Initialize stage timers; see _timer()
+		
+		self.seconds_lookup = 0.0
+		self.seconds_write = 0.0
+		
 		
 		
 		# Process source data into instance attributes
@@ -304,7 +553,9 @@ class Attachment:
 	def asdict(self):
 	
 		properties = (
-			'keywords'
+			'att_name_thumbnail'
+			,'keywords'
+			,'keywords_thumbnail'
 			,'table'
 			,'table_attachment'
 			,'table_name'
@@ -333,105 +584,301 @@ class Attachment:
 		'''
 		Check if attachment already exists in geodatabase
 		
-		We need to test by file name, because there is nowhere to store
-		Aquarius photo UUID in the attachment table.
+		We test by file name, because there is nowhere to store Aquarius
+		photo UUID in the attachment table; see PhotoState for tracking
+		photos across file names.
+		
+		Reads only the key and size columns, so no attachment content is
+		transferred; see _hash_target() for comparing content
+		
+		Returns (attachmentid, data_size) tuple for existing attachment, or
+		None if attachment does not exist
 		'''
 	
 		logging.debug('Checking for existing attachment')
 	
 	
-		table = os.path.join(
-			self.gdb
-			,self.table_name_attachment
-		)
-
-
-		with arcpy.da.SearchCursor(
-			in_table = table
-			,field_names = 'rel_globalid' # Arbitrary column
-			,where_clause = (
-				f"rel_globalid = '{rel_globalid}'"
-				f" AND att_name = '{self.photo.file_name}'"
-			)
-		) as cursor:
+		with self._timer('seconds_lookup'):
 		
-			try:
-			
-				row = cursor.next()
-				
-				raise ValueError(
-					'Attachment already exists for:'
-					f'\n\tTable: {self.table_name}'
-					f'\n\tGlobal ID: {rel_globalid}'
-					f'\n\tFile name: {self.photo.file_name}'
+			with arcpy.da.SearchCursor(
+				in_table = self.table_attachment
+				,field_names = (
+					'attachmentid'
+					,'data_size'
 				)
-				
-				
-			except StopIteration:
+				,where_clause = (
+					f"rel_globalid = '{rel_globalid}'"
+					f" AND att_name = '{self.photo.file_name}'"
+				)
+			) as cursor:
 			
-				logging.debug('Attachment does not already exist')
+				for row in cursor:
+				
+					logging.debug(f'Attachment already exists: attachmentid {row[0]}')
+					
+					return (
+						row[0]
+						,row[1]
+					)
+					
+					
+		logging.debug('Attachment does not already exist')
+		
+		return None
 				
 					
 
-	def load(self):
+	def load(
+		self
+		,state = None # PhotoState
+		,resume = False # Skip target rows journaled in `state` by interrupted run
+		,journal = True # Journal target rows in `state`; False outside loader runs
+	):
 		'''
 		Load source file to geodatabase attachment(s)
 		
+		For each target row, skip the photo if its content is already
+		attached, replace the existing attachment if the photo content
+		changed, or else insert a new attachment. Record outcomes in the
+		count_* attributes, and in `state`, if provided.
+		
+		If the photo has a thumbnail, it is loaded with each inserted or
+		replaced attachment, replacing any existing thumbnail.
+		
 		Return list of errors for failed loads
 		'''
 		
 		errors = []
 		
+		self.count_inserted = 0
+		self.count_replaced = 0
+		self.count_thumbnail_inserted = 0
+		self.count_thumbnail_replaced = 0
+		self.count_unchanged = 0
+		
 		
 		for rel_globalid in self.rel_globalids:
 		
 			logging.debug(f'Loading attachment to {self.table_name_attachment} for rel_globalid {rel_globalid}')
-		
-		
-			# Verify that attachment does not already exist
 			
-			try:
+			attachmentid_replace = None
+			
+			
+			
+			#
+			# Check journal of interrupted run
+			#
+			
+			if (
+				resume
+				and state.is_journaled_target(
+					table_name = self.table_name_attachment
+					,rel_globalid = rel_globalid
+					,photo_uuid = self.photo.photo_uuid
+				)
+			):
+			
+				logging.debug('Attachment committed by interrupted run; skipping')
+				self.count_unchanged += 1
+				continue
+				
+				
+				
+			#
+			# Check local state for this photo content and UUID
+			#
 			
-				self.check_target(rel_globalid)
+			if state is not None:
+			
+			
+				# Identical content, under any photo UUID or file name
+			
+				record = state.find_content(
+					table_name = self.table_name_attachment
+					,rel_globalid = rel_globalid
+					,sha256 = self.photo.sha256
+				)
+				
+				if (
+					record is not None
+					and self._exists_target(record['attachmentid'])
+				):
+				
+					logging.debug(f'Photo content already loaded as attachmentid {record["attachmentid"]}; skipping')
+					
+					self._record_state(
+						state = state
+						,rel_globalid = rel_globalid
+						,attachmentid = record['attachmentid']
+						,journal = journal
+					)
+					self.count_unchanged += 1
+					continue
+					
+					
+					
+				# Same photo UUID, different content
+				
+				record = state.find_photo(
+					table_name = self.table_name_attachment
+					,rel_globalid = rel_globalid
+					,photo_uuid = self.photo.photo_uuid
+				)
+				
+				if (
+					record is not None
+					and self._exists_target(record['attachmentid'])
+				):
+				
+					logging.debug(f'Photo content changed since loaded as attachmentid {record["attachmentid"]}; replacing')
+					attachmentid_replace = record['attachmentid']
+					
+					
+					
+			#
+			# Check for existing attachment by file name
+			#
+			
+			if attachmentid_replace is None:
+			
+				target = self.check_target(rel_globalid)
+				
+				if target is not None:
 				
+					(
+						attachmentid
+						,data_size
+					) = target
+					
+					
+					# Compare content only if size matches, so existing
+					# content is transferred only if it is likely identical
+					
+					if (
+						data_size == self.data_size
+						and self._hash_target(attachmentid) == hashlib.sha256(self.photo.data).hexdigest()
+					):
+					
+						logging.debug('Existing attachment content is identical; skipping')
+						
+						if state is not None:
+						
+							self._record_state(
+								state = state
+								,rel_globalid = rel_globalid
+								,attachmentid = attachmentid
+								,journal = journal
+							)
+						
+						self.count_unchanged += 1
+						continue
+						
+						
+					# Replace only the same photo; see PHOTO IDENTITY note
+					# in module header
+					
+					if state is None:
+					
+						photo_uuids = set()
+						
+					else:
+					
+						photo_uuids = {
+							record['photo_uuid']
+							for record in state.find_attachment(
+								table_name = self.table_name_attachment
+								,attachmentid = attachmentid
+							)
+						}
+						
+						
+					if self.photo.photo_uuid in photo_uuids:
+					
+						logging.debug('Existing attachment content differs; replacing')
+						attachmentid_replace = attachmentid
+						
+						
+					elif len(photo_uuids) > 0:
+					
+						logging.debug(f'Existing attachment with same file name is another photo ({", ".join(sorted(photo_uuids))}); inserting')
+						
+						
+					else:
+					
+						logging.debug('Existing attachment content differs, and is not recorded for this photo; not replacing')
+						errors.append(
+							ValueError(
+								f'Attachment with same file name and different content already exists: attachmentid {attachmentid}'
+								f'\n\tNot replaced, because it is not recorded in photo state for photo UUID {self.photo.photo_uuid}'
+							)
+						)
+						continue
+					
+					
+					
+			#
+			# Load attachment
+			#
+			
+			try:
 			
-			except ValueError as e:
+				attachmentid = self._insert_target(rel_globalid)
+				
+				
+				if attachmentid_replace is not None:
+				
+					self._delete_target(attachmentid_replace)
+					
+					
+			except (
+				RuntimeError
+				,ValueError
+			) as e:
 			
 				logging.debug('Failed to load attachment; collecting error for reporting after attempting all targets for this photo')
 				errors.append(e)
 				continue
+				
+				
+				
+			if attachmentid_replace is None:
 			
-
-
-			# Load attachment
+				self.count_inserted += 1
+				
+			else:
 			
-			with arcpy.da.InsertCursor(
-				in_table = self.table_attachment
-				,field_names = (
-					'rel_globalid'
-					,'content_type'
-					,'att_name'
-					,'data_size'
-					,'data'
-					#,'globalid'
-					#,'attachmentid'
-					,'keywords'
-				)
-			) as cursor:
+				self.count_replaced += 1
+				
+				
+			if state is not None:
 			
-				cursor.insertRow(
-					(
-						rel_globalid
-						,self.content_type
-						,self.photo.file_name
-						,self.data_size
-						,self.photo.data
-						# ArcGIS generates globalid automatically
-						# ArcGIS generates attachmentid automatically
-						,self.keywords
-					)
+				self._record_state(
+					state = state
+					,rel_globalid = rel_globalid
+					,attachmentid = attachmentid
+					,journal = journal
 				)
 				
+				
+				
+			#
+			# Load thumbnail
+			#
+			
+			if self.photo.thumbnail is not None:
+			
+				try:
+				
+					self._load_thumbnail(rel_globalid)
+					
+				except (
+					RuntimeError
+					,ValueError
+				) as e:
+				
+					logging.debug('Failed to load thumbnail; collecting error for reporting after attempting all targets for this photo')
+					errors.append(e)
+				
 		
 		
 		return errors
@@ -471,7 +918,16 @@ class Attachment:
 
 
 	def transform_rel_globalids(self):
+		'''
+		Look up target rows with where_clauses, unless passed to
+		constructor (e.g. by reconcile_hydro_photos.py)
+		'''
 	
+		if self.rel_globalids is not None:
+		
+			return
+			
+			
 		self.rel_globalids = []
 		
 	
@@ -483,30 +939,32 @@ class Attachment:
 		
 		for where_clause in self.where_clauses:
 		
-			count_fetch = 0
+			with self._timer('seconds_lookup'):
 			
-			with arcpy.da.SearchCursor(
-				in_table = table
-				,field_names = 'globalid'
-				,where_clause = where_clause
-			) as cursor:
-			
-				for row in cursor:
+				count_fetch = 0
 				
-					count_fetch += 1
-					
-					if count_fetch > 1:
+				with arcpy.da.SearchCursor(
+					in_table = table
+					,field_names = 'globalid'
+					,where_clause = where_clause
+				) as cursor:
+				
+					for row in cursor:
 					
-						raise ValueError(
-							f'rel_globalid: Found multiple rows for:'
-							f'\n\tTable: {self.table_name}'
-							f'\n\tFilter: {where_clause}'
-						)
+						count_fetch += 1
+						
+						if count_fetch > 1:
+						
+							raise ValueError(
+								f'rel_globalid: Found multiple rows for:'
+								f'\n\tTable: {self.table_name}'
+								f'\n\tFilter: {where_clause}'
+							)
+							
+						
+						self.rel_globalids.append(row[0][1:-1]) # Trim curly braces
+						
 						
-					
-					self.rel_globalids.append(row[0][1:-1]) # Trim curly braces
-					
-					
 			if count_fetch == 0:
 			
 				raise ValueError(
@@ -521,15 +979,95 @@ class Attachment:
 	# Private
 	#
 
-	def _initialize_attributes(self):
-
-		for a in self.ATTRIBUTES:
-
-			if not hasattr(
-				self
-				,a
-			):
-			
+	def _delete_target(
+		self
+		,attachmentid
+	):
+		'''
+		Delete attachment replaced by a changed photo or thumbnail
+		'''
+	
+		logging.debug(f'Deleting attachmentid {attachmentid}')
+		
+		
+		with self._timer('seconds_write'):
+		
+			with arcpy.da.UpdateCursor(
+				in_table = self.table_attachment
+				,field_names = 'attachmentid'
+				,where_clause = f'attachmentid = {attachmentid}'
+			) as cursor:
+			
+				for row in cursor:
+				
+					cursor.deleteRow()
+					
+					
+					
+	def _exists_target(
+		self
+		,attachmentid
+	):
+		'''
+		Check that attachment recorded in local state still exists
+		
+		Reads only the key column, so no attachment content is transferred
+		'''
+	
+		with self._timer('seconds_lookup'):
+		
+			with arcpy.da.SearchCursor(
+				in_table = self.table_attachment
+				,field_names = 'attachmentid'
+				,where_clause = f'attachmentid = {attachmentid}'
+			) as cursor:
+			
+				for row in cursor:
+				
+					return True
+					
+					
+		logging.debug(f'Attachment recorded in local state no longer exists: attachmentid {attachmentid}')
+		
+		return False
+		
+		
+		
+	def _hash_target(
+		self
+		,attachmentid
+	):
+		'''
+		Return SHA-256 hash of existing attachment content, or None if
+		attachment does not exist
+		'''
+	
+		with self._timer('seconds_lookup'):
+		
+			with arcpy.da.SearchCursor(
+				in_table = self.table_attachment
+				,field_names = 'data'
+				,where_clause = f'attachmentid = {attachmentid}'
+			) as cursor:
+			
+				for row in cursor:
+				
+					return hashlib.sha256(row[0]).hexdigest()
+					
+					
+		return None
+		
+		
+		
+	def _initialize_attributes(self):
+
+		for a in self.ATTRIBUTES:
+
+			if not hasattr(
+				self
+				,a
+			):
+			
 				setattr(
 					self
 					,a
@@ -538,12 +1076,177 @@ class Attachment:
 
 
 
+	def _insert_target(
+		self
+		,rel_globalid
+		,thumbnail = False # Insert photo thumbnail instead of photo
+	):
+		'''
+		Insert attachment
+		
+		Returns attachmentid of new attachment
+		'''
+	
+		if thumbnail:
+		
+			values = (
+				self.att_name_thumbnail
+				,len(self.photo.thumbnail)
+				,self.photo.thumbnail
+				,self.keywords_thumbnail
+				,None
+			)
+			
+		else:
+		
+			values = (
+				self.photo.file_name
+				,self.data_size
+				,self.photo.data
+				,self.keywords
+				,self.photo.exif_info # None if photo has no EXIF
+			)
+			
+			
+		with self._timer('seconds_write'):
+		
+			with arcpy.da.InsertCursor(
+				in_table = self.table_attachment
+				,field_names = (
+					'rel_globalid'
+					,'content_type'
+					,'att_name'
+					,'data_size'
+					,'data'
+					#,'globalid'
+					#,'attachmentid'
+					,'keywords'
+					,'exifinfo'
+				)
+			) as cursor:
+			
+				return cursor.insertRow(
+					(
+						rel_globalid
+						,self.content_type
+					)
+					+ values
+					# ArcGIS generates globalid automatically
+					# ArcGIS generates attachmentid automatically
+				)
+				
+				
+				
+	def _load_thumbnail(
+		self
+		,rel_globalid
+	):
+		'''
+		Insert photo thumbnail, then delete any existing thumbnail for the
+		same photo file name
+		'''
+	
+		with self._timer('seconds_lookup'):
+		
+			with arcpy.da.SearchCursor(
+				in_table = self.table_attachment
+				,field_names = 'attachmentid'
+				,where_clause = (
+					f"rel_globalid = '{rel_globalid}'"
+					f" AND att_name = '{self.att_name_thumbnail}'"
+				)
+			) as cursor:
+			
+				attachmentids_replace = [row[0] for row in cursor]
+				
+				
+		self._insert_target(
+			rel_globalid = rel_globalid
+			,thumbnail = True
+		)
+		
+		
+		for attachmentid in attachmentids_replace:
+		
+			self._delete_target(attachmentid)
+			
+			
+		if len(attachmentids_replace) == 0:
+		
+			self.count_thumbnail_inserted += 1
+			
+		else:
+		
+			self.count_thumbnail_replaced += 1
+			
+			
+			
+	def _record_state(
+		self
+		,state # PhotoState
+		,rel_globalid
+		,attachmentid
+		,journal = True
+	):
+	
+		state.record(
+			table_name = self.table_name_attachment
+			,rel_globalid = rel_globalid
+			,photo_uuid = self.photo.photo_uuid
+			,sha256 = self.photo.sha256
+			,att_name = self.photo.file_name
+			,attachmentid = attachmentid
+			,journal = journal
+		)
+		
+		
+		
+	@contextlib.contextmanager
+	def _timer(
+		self
+		,attribute # Stage timer attribute to add elapsed time to
+	):
+		'''
+		Add time spent in block to stage timer attribute; see
+		MetricsTiming
+		'''
+	
+		time_start = time.perf_counter()
+		
+		
+		try:
+		
+			yield
+			
+		finally:
+		
+			setattr(
+				self
+				,attribute
+				,getattr(
+					self
+					,attribute
+				)
+				+ time.perf_counter()
+				- time_start
+			)
+
+
+
 class LocationAttachment(Attachment):
 	'''
 	Source data and metadata for Location geodatabase attachment
 	'''
 
 
+	########################################################################
+	# Class attributes
+	########################################################################
+
+	TARGET_KEY = 'nwfid'
+
+
+
 	########################################################################
 	# Properties
 	########################################################################
@@ -579,7 +1282,7 @@ class LocationAttachment(Attachment):
 		will be attached
 		'''
 		
-		return [f"nwfid = '{self.photo.location}'"]
+		return [f"{self.TARGET_KEY} = '{self.photo.location}'"]
 		
 	
 	
@@ -589,6 +1292,14 @@ class MPAttachment(Attachment):
 	'''
 	
 
+	########################################################################
+	# Class attributes
+	########################################################################
+
+	TARGET_KEY = 'UPPER(aquariusid)' # Photo.mp_uuids are upper case
+
+
+
 	########################################################################
 	# Properties
 	########################################################################
@@ -624,7 +1335,7 @@ class MPAttachment(Attachment):
 		will be attached
 		'''
 		
-		return [f"UPPER(aquariusid) = '{id}'" for id in self.photo.mp_uuids]
+		return [f"{self.TARGET_KEY} = '{id}'" for id in self.photo.mp_uuids]
 		
 	
 	
@@ -712,9 +1423,26 @@ class Metrics:
 	#
 
 	_TEMPLATE = '\n\t{type:<30s}{total:>12s}{succeeded:>12s}{failed:>12s}'
+	_TEMPLATE_ACTION = '\n\t{type:<30s}{inserted:>12s}{replaced:>12s}{unchanged:>12s}{deleted:>12s}'
+	_TEMPLATE_RATE = '\n\t{type:<30s}{total:>12s}{rate:>12s}'
+	_TEMPLATE_SIZE = '\n\t{type:<30s}{original:>12s}{loaded:>12s}{reduction:>12s}'
+	
 	
 	
+	########################################################################
+	# Properties
+	########################################################################
+	
+	@property
+	def elapsed(self):
+		'''
+		Seconds since metrics were initialized
+		'''
 	
+		return time.perf_counter() - self.time_start
+		
+		
+		
 	########################################################################
 	# Static methods
 	########################################################################
@@ -765,6 +1493,55 @@ class Metrics:
 	
 		
 		
+	@staticmethod
+	def _format_rate(
+		value
+		,elapsed
+		,unit = '/s'
+	):
+	
+		if (
+			value is None
+			or not elapsed
+		):
+		
+			return '-'
+			
+		else:
+		
+			return f'{value / elapsed:,.1f}{unit}'
+	
+		
+		
+	@staticmethod
+	def _format_reduction(
+		original
+		,loaded
+	):
+	
+		if not original:
+		
+			return '-'
+			
+		else:
+		
+			return f'{1 - loaded / original:.1%}'
+	
+		
+		
+	@staticmethod
+	def _format_size(value):
+	
+		if value is None:
+		
+			return '-'
+			
+		else:
+		
+			return f'{value / 1048576:,.1f} MB'
+	
+		
+		
 	@staticmethod
 	def _get_total(
 		succeeded
@@ -808,6 +1585,21 @@ class Metrics:
 		
 		
 		
+		# Start clock for rates
+		
+		self.time_start = time.perf_counter()
+		
+		
+		
+	def asdict(self):
+	
+		return mg.asdict(
+			object = self
+			,attributes = self.ATTRIBUTES
+		)
+		
+		
+		
 class MetricsInput(Metrics):
 	'''
 	Store and report statistics for input data processing progress
@@ -821,6 +1613,36 @@ class MetricsInput(Metrics):
 	'''
 
 
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+
+	# List of public metrics attributes, for use by asdict
+
+	ATTRIBUTES = (
+		'bytes_read'
+		,'elapsed'
+		,'file_failed'
+		,'file_succeeded'
+		,'file_total'
+		,'index_failed'
+		,'index_succeeded'
+		,'index_total'
+		,'metadata_failed'
+		,'metadata_succeeded'
+		,'metadata_total'
+		,'resume_skipped'
+		,'sync_unchanged'
+	)
+
+
+
 	########################################################################
 	# Properties
 	########################################################################
@@ -985,18 +1807,85 @@ class MetricsInput(Metrics):
 		
 		
 
-	########################################################################
-	# Instance methods
-	########################################################################
-
-
 	#
-	# Public
+	# Photos skipped in sync mode
 	#
-
-	def __init__(
+	# Photos whose file and index metadata are unchanged since they were
+	# last loaded; reported as a total only
+	#
+	
+	@property
+	def sync_unchanged(self):
+	
+		return self._sync_unchanged
+		
+		
+	@sync_unchanged.setter
+	def sync_unchanged(
 		self
-		,header = 'Input Processing Metrics' # Header message
+		,count
+	):
+	
+		self._sync_unchanged = self._check_count(count)
+		
+		
+
+	#
+	# Photos skipped when resuming
+	#
+	# Photos committed by an interrupted run; reported as a total only
+	#
+	
+	@property
+	def resume_skipped(self):
+	
+		return self._resume_skipped
+		
+		
+	@resume_skipped.setter
+	def resume_skipped(
+		self
+		,count
+	):
+	
+		self._resume_skipped = self._check_count(count)
+		
+		
+
+	#
+	# Photo file bytes read
+	#
+	# Size of source photo files read successfully, for throughput
+	#
+	
+	@property
+	def bytes_read(self):
+	
+		return self._bytes_read
+		
+		
+	@bytes_read.setter
+	def bytes_read(
+		self
+		,count
+	):
+	
+		self._bytes_read = self._check_count(count)
+		
+		
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+	def __init__(
+		self
+		,header = 'Input Processing Metrics' # Header message
 	):
 
 		super().__init__(header)
@@ -1005,12 +1894,15 @@ class MetricsInput(Metrics):
 		
 		# Initialize counters
 
+		self.bytes_read = 0
 		self.file_failed = 0
 		self.file_succeeded = 0
 		self.index_failed = 0
 		self.index_succeeded = 0
 		self.metadata_failed = 0
 		self.metadata_succeeded = 0
+		self.resume_skipped = 0
+		self.sync_unchanged = 0
 
 
 
@@ -1055,6 +1947,50 @@ class MetricsInput(Metrics):
 		)
 
 
+		message += self._TEMPLATE.format(
+			type = 'Photo unchanged since sync'
+			,total = self._format_count(self.sync_unchanged)
+			,succeeded = self._format_count(None)
+			,failed = self._format_count(None)
+		)
+
+		message += self._TEMPLATE.format(
+			type = 'Photo loaded before resume'
+			,total = self._format_count(self.resume_skipped)
+			,succeeded = self._format_count(None)
+			,failed = self._format_count(None)
+		)
+
+
+
+		elapsed = self.elapsed
+
+		message += self._TEMPLATE_RATE.format(
+			type = ''
+			,total = 'Total'
+			,rate = 'Rate'
+		)
+
+		message += self._TEMPLATE_RATE.format(
+			type = 'Photo file read'
+			,total = self._format_count(self.file_succeeded)
+			,rate = self._format_rate(
+				value = self.file_succeeded
+				,elapsed = elapsed
+			)
+		)
+
+		message += self._TEMPLATE_RATE.format(
+			type = 'Photo file bytes read'
+			,total = self._format_size(self.bytes_read)
+			,rate = self._format_rate(
+				value = self.bytes_read / 1048576
+				,elapsed = elapsed
+				,unit = ' MB/s'
+			)
+		)
+
+
 
 		return message
 
@@ -1073,6 +2009,41 @@ class MetricsOutput(Metrics):
 	'''
 
 
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+
+	# List of public metrics attributes, for use by asdict
+
+	ATTRIBUTES = (
+		'attachment_deleted'
+		,'attachment_inserted'
+		,'attachment_replaced'
+		,'attachment_unchanged'
+		,'attachment_written'
+		,'bytes_written'
+		,'elapsed'
+		,'location_failed'
+		,'location_succeeded'
+		,'location_total'
+		,'mp_failed'
+		,'mp_succeeded'
+		,'mp_total'
+		,'size_loaded'
+		,'size_original'
+		,'thumbnail_deleted'
+		,'thumbnail_inserted'
+		,'thumbnail_replaced'
+	)
+
+
+
 	########################################################################
 	# Properties
 	########################################################################
@@ -1184,6 +2155,236 @@ class MetricsOutput(Metrics):
 		
 		
 
+	#
+	# Attachment actions
+	#
+	# Attachment rows inserted, replaced because the photo content
+	# changed, left unchanged because the photo content is already
+	# attached, or deleted because the photo is no longer in the index
+	#
+	
+	
+	# Inserted
+	
+	@property
+	def attachment_inserted(self):
+	
+		return self._attachment_inserted
+		
+		
+	@attachment_inserted.setter
+	def attachment_inserted(
+		self
+		,count
+	):
+	
+		self._attachment_inserted = self._check_count(count)
+		
+		
+	
+	# Replaced
+	
+	@property
+	def attachment_replaced(self):
+	
+		return self._attachment_replaced
+		
+		
+	@attachment_replaced.setter
+	def attachment_replaced(
+		self
+		,count
+	):
+	
+		self._attachment_replaced = self._check_count(count)
+		
+		
+	
+	# Unchanged
+	
+	@property
+	def attachment_unchanged(self):
+	
+		return self._attachment_unchanged
+		
+		
+	@attachment_unchanged.setter
+	def attachment_unchanged(
+		self
+		,count
+	):
+	
+		self._attachment_unchanged = self._check_count(count)
+		
+		
+	
+	# Deleted
+	
+	@property
+	def attachment_deleted(self):
+	
+		return self._attachment_deleted
+		
+		
+	@attachment_deleted.setter
+	def attachment_deleted(
+		self
+		,count
+	):
+	
+		self._attachment_deleted = self._check_count(count)
+		
+		
+	
+	# Written
+	#
+	# Attachment rows written, including thumbnails; derived
+	
+	@property
+	def attachment_written(self):
+	
+		return sum(
+			count or 0
+			for count in (
+				self.attachment_inserted
+				,self.attachment_replaced
+				,self.thumbnail_inserted
+				,self.thumbnail_replaced
+			)
+		)
+		
+		
+
+	#
+	# Thumbnail actions
+	#
+	# Thumbnail attachment rows inserted (including backfill), replaced
+	# along with their photo, or deleted because their photo attachment no
+	# longer exists
+	#
+	
+	
+	# Inserted
+	
+	@property
+	def thumbnail_inserted(self):
+	
+		return self._thumbnail_inserted
+		
+		
+	@thumbnail_inserted.setter
+	def thumbnail_inserted(
+		self
+		,count
+	):
+	
+		self._thumbnail_inserted = self._check_count(count)
+		
+		
+	
+	# Replaced
+	
+	@property
+	def thumbnail_replaced(self):
+	
+		return self._thumbnail_replaced
+		
+		
+	@thumbnail_replaced.setter
+	def thumbnail_replaced(
+		self
+		,count
+	):
+	
+		self._thumbnail_replaced = self._check_count(count)
+		
+		
+	
+	# Deleted
+	
+	@property
+	def thumbnail_deleted(self):
+	
+		return self._thumbnail_deleted
+		
+		
+	@thumbnail_deleted.setter
+	def thumbnail_deleted(
+		self
+		,count
+	):
+	
+		self._thumbnail_deleted = self._check_count(count)
+		
+		
+
+	#
+	# Loaded attachment size
+	#
+	# Bytes of source photo files, and of attachment content actually
+	# written, which differ when photo reduction is enabled
+	#
+	
+	
+	# Original
+	
+	@property
+	def size_original(self):
+	
+		return self._size_original
+		
+		
+	@size_original.setter
+	def size_original(
+		self
+		,count
+	):
+	
+		self._size_original = self._check_count(count)
+		
+		
+	
+	# Loaded
+	
+	@property
+	def size_loaded(self):
+	
+		return self._size_loaded
+		
+		
+	@size_loaded.setter
+	def size_loaded(
+		self
+		,count
+	):
+	
+		self._size_loaded = self._check_count(count)
+		
+		
+
+	#
+	# Attachment bytes written
+	#
+	# Size of attachment content written, including thumbnails, for
+	# throughput
+	#
+	
+	@property
+	def bytes_written(self):
+	
+		return self._bytes_written
+		
+		
+	@bytes_written.setter
+	def bytes_written(
+		self
+		,count
+	):
+	
+		self._bytes_written = self._check_count(count)
+		
+		
+
 	########################################################################
 	# Instance methods
 	########################################################################
@@ -1204,10 +2405,20 @@ class MetricsOutput(Metrics):
 		
 		# Initialize counters
 
+		self.attachment_deleted = 0
+		self.attachment_inserted = 0
+		self.attachment_replaced = 0
+		self.attachment_unchanged = 0
+		self.bytes_written = 0
 		self.location_failed = 0
 		self.location_succeeded = 0
 		self.mp_failed = 0
 		self.mp_succeeded = 0
+		self.size_loaded = 0
+		self.size_original = 0
+		self.thumbnail_deleted = 0
+		self.thumbnail_inserted = 0
+		self.thumbnail_replaced = 0
 
 
 
@@ -1244,40 +2455,334 @@ class MetricsOutput(Metrics):
 
 
 
-		return message
-		
-		
-	
-class Photo:
-	'''
-	Source photo
-	'''
+		message += self._TEMPLATE_ACTION.format(
+			type = ''
+			,inserted = 'Inserted'
+			,replaced = 'Replaced'
+			,unchanged = 'Unchanged'
+			,deleted = 'Deleted'
+		)
 
+		message += self._TEMPLATE_ACTION.format(
+			type = 'Attachment'
+			,inserted = self._format_count(self.attachment_inserted)
+			,replaced = self._format_count(self.attachment_replaced)
+			,unchanged = self._format_count(self.attachment_unchanged)
+			,deleted = self._format_count(self.attachment_deleted)
+		)
 
-	########################################################################
-	# Class attributes
-	########################################################################
+		message += self._TEMPLATE_ACTION.format(
+			type = 'Thumbnail'
+			,inserted = self._format_count(self.thumbnail_inserted)
+			,replaced = self._format_count(self.thumbnail_replaced)
+			,unchanged = self._format_count(None) # Not tracked
+			,deleted = self._format_count(self.thumbnail_deleted)
+		)
 
 
-	#
-	# Public
-	#
 
+		message += self._TEMPLATE_SIZE.format(
+			type = ''
+			,original = 'Original'
+			,loaded = 'Loaded'
+			,reduction = 'Reduction'
+		)
 
-	# List of public, custom (i.e. non-system) instance attributes, for use
-	# by __str__, etc.
+		message += self._TEMPLATE_SIZE.format(
+			type = 'Attachment size'
+			,original = self._format_size(self.size_original)
+			,loaded = self._format_size(self.size_loaded)
+			,reduction = self._format_reduction(
+				original = self.size_original
+				,loaded = self.size_loaded
+			)
+		)
 
-	ATTRIBUTES = (
-		'data'
-		,'file_name'
+
+
+		elapsed = self.elapsed
+
+		message += self._TEMPLATE_RATE.format(
+			type = ''
+			,total = 'Total'
+			,rate = 'Rate'
+		)
+
+		message += self._TEMPLATE_RATE.format(
+			type = 'Attachment written'
+			,total = self._format_count(self.attachment_written)
+			,rate = self._format_rate(
+				value = self.attachment_written
+				,elapsed = elapsed
+			)
+		)
+
+		message += self._TEMPLATE_RATE.format(
+			type = 'Attachment bytes written'
+			,total = self._format_size(self.bytes_written)
+			,rate = self._format_rate(
+				value = self.bytes_written / 1048576
+				,elapsed = elapsed
+				,unit = ' MB/s'
+			)
+		)
+
+
+
+		return message
+
+
+
+class MetricsTiming(Metrics):
+	'''
+	Store and report per-photo latency of each processing stage
+	
+	Each stage accumulates a count, total and maximum time, and a
+	histogram of latencies in decade buckets, so that a slow photo share
+	(file read) can be told apart from a slow database link (target lookup,
+	attachment write).
+	'''
+
+
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+
+	# List of public metrics attributes, for use by asdict
+
+	ATTRIBUTES = (
+		'elapsed'
+		,'stages'
+	)
+	
+	
+	# Upper bounds of histogram buckets (seconds); the last bucket has no
+	# upper bound
+	
+	BUCKETS = (
+		0.001
+		,0.01
+		,0.1
+		,1
+		,10
+	)
+	
+	
+	# Stages, with report labels
+	
+	STAGES = {
+		'read': 'Photo file read' # Worker time; overlaps other stages
+		,'process': 'Photo processing' # Worker time; reduction, EXIF, thumbnail
+		,'lookup': 'Target lookup'
+		,'write': 'Attachment write'
+		,'photo': 'Photo end-to-end'
+	}
+
+
+
+	#
+	# Private
+	#
+
+	_TEMPLATE_HISTOGRAM = '\n\t{type:<30s}' + '{:>8s}' * (len(BUCKETS) + 1)
+	_TEMPLATE_TIMING = '\n\t{type:<30s}{count:>12s}{mean:>12s}{max:>12s}{total:>12s}'
+
+
+
+	########################################################################
+	# Static methods
+	########################################################################
+
+
+	#
+	# Private
+	#
+	
+	@staticmethod
+	def _format_seconds(seconds):
+	
+		if seconds < 1:
+		
+			return f'{seconds * 1000:g}ms'
+			
+		else:
+		
+			return f'{seconds:g}s'
+
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+	def __init__(
+		self
+		,header = 'Stage Timing Metrics' # Header message
+	):
+
+		super().__init__(header)
+		
+		
+		
+		# Initialize timers
+		
+		self.stages = {
+			stage: {
+				'count': 0
+				,'total': 0.0
+				,'max': 0.0
+				,'histogram': [0] * (len(self.BUCKETS) + 1)
+			}
+			for stage in self.STAGES
+		}
+
+
+
+	def __str__(self):
+	
+		message = self.header
+		
+		
+		
+		# Latency summary
+		
+		message += self._TEMPLATE_TIMING.format(
+			type = ''
+			,count = 'Count'
+			,mean = 'Mean ms'
+			,max = 'Max ms'
+			,total = 'Total s'
+		)
+		
+		for (
+			stage
+			,label
+		) in self.STAGES.items():
+		
+			timer = self.stages[stage]
+			
+			if timer['count'] == 0:
+			
+				mean = None
+				
+			else:
+			
+				mean = timer['total'] / timer['count']
+				
+				
+			message += self._TEMPLATE_TIMING.format(
+				type = label
+				,count = self._format_count(timer['count'])
+				,mean = '-' if mean is None else f'{mean * 1000:,.1f}'
+				,max = f'{timer["max"] * 1000:,.1f}'
+				,total = f'{timer["total"]:,.1f}'
+			)
+			
+			
+			
+		# Latency histogram
+		
+		message += self._TEMPLATE_HISTOGRAM.format(
+			*(
+				[f'<{self._format_seconds(b)}' for b in self.BUCKETS]
+				+ [f'>={self._format_seconds(self.BUCKETS[-1])}']
+			)
+			,type = ''
+		)
+		
+		for (
+			stage
+			,label
+		) in self.STAGES.items():
+		
+			message += self._TEMPLATE_HISTOGRAM.format(
+				*(self._format_count(c) for c in self.stages[stage]['histogram'])
+				,type = label
+			)
+			
+			
+			
+		return message
+		
+		
+		
+	def add(
+		self
+		,stage
+		,seconds
+	):
+		'''
+		Add one latency observation to stage
+		'''
+	
+		timer = self.stages[stage]
+		
+		timer['count'] += 1
+		timer['total'] += seconds
+		timer['max'] = max(
+			timer['max']
+			,seconds
+		)
+		timer['histogram'][
+			bisect.bisect_right(
+				self.BUCKETS
+				,seconds
+			)
+		] += 1
+		
+		
+	
+class Photo:
+	'''
+	Source photo
+	'''
+
+
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+
+	# List of public, custom (i.e. non-system) instance attributes, for use
+	# by __str__, etc.
+
+	ATTRIBUTES = (
+		'capture_time'
+		,'data'
+		,'data_size_original'
+		,'exif_info'
+		,'file_name'
 		,'index_record'
 		,'is_location'
 		,'is_mp'
+		,'is_reduced'
+		,'latitude'
 		,'location'
+		,'longitude'
+		,'metadata_hash'
 		,'mp_uuids'
 		,'photo_dir'
 		,'photo_uuid'
+		,'sha256'
+		,'tag_columns'
 		,'tags'
+		,'thumbnail'
 	)
 
 
@@ -1314,6 +2819,7 @@ class Photo:
 		self
 		,index_record # IndexRecord
 		,photo_dir
+		,tag_columns = None # Tag column names; derived from index_record if omitted
 	):
 
 		logging.debug(f'Initializing {__class__.__name__}')
@@ -1324,6 +2830,7 @@ class Photo:
 
 		self.index_record = index_record
 		self.photo_dir = photo_dir
+		self.tag_columns = tag_columns
 
 
 
@@ -1369,14 +2876,47 @@ class Photo:
 
 
 
-	def get_data(self):
+	def get_data(
+		self
+		,max_dimension = None
+		,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+		,thumbnail_dimension = None
+	):
+		'''
+		Read photo file in this process
+		
+		The photo loader normally reads files ahead in a worker pool and
+		passes results to set_data(); this method is for reading a
+		single photo directly.
+		'''
 	
-		photo_file = open(
-			self.photo_file
-			,'rb'
+		self.set_data(
+			photo_processing.read_photo(
+				photo_file = self.photo_file
+				,max_dimension = max_dimension
+				,jpeg_quality = jpeg_quality
+				,thumbnail_dimension = thumbnail_dimension
+			)
 		)
 		
-		self.data = photo_file.read()
+		
+		
+	def set_data(
+		self
+		,result # dict from photo_processing.read_photo
+	):
+	
+		self.data = result['data']
+		self.data_size_original = result['size_original']
+		self.is_reduced = result['reduced']
+		self.sha256 = result['sha256']
+		
+		self.capture_time = result['capture_time']
+		self.exif_info = result['exif']
+		self.latitude = result['latitude']
+		self.longitude = result['longitude']
+		
+		self.thumbnail = result['thumbnail']
 	
 
 	
@@ -1389,6 +2929,7 @@ class Photo:
 			# Photo index record properties
 			self.transform_file_name
 			,self.transform_location
+			,self.transform_metadata_hash
 			,self.transform_photo_uuid
 			,self.transform_tags
 			# First tier derived attributes
@@ -1411,7 +2952,7 @@ class Photo:
 		
 	def transform_is_location(self):
 	
-		if 'Site Photo' in self.tags:
+		if TAG_LOCATION in self.tags:
 		
 			self.is_location = True
 			
@@ -1424,7 +2965,7 @@ class Photo:
 			
 	def transform_is_mp(self):
 	
-		if 'MP' in self.tags:
+		if TAG_MP in self.tags:
 		
 			self.is_mp = True
 			
@@ -1443,10 +2984,7 @@ class Photo:
 
 		if self.is_mp == True:
 		
-			match = re.findall(
-				r'''MP#([0-9a-f]{32})'''
-				,mg.none2blank(self.index_record.Comment)
-			)
+			match = PATTERN_MP_UUID.findall(mg.none2blank(self.index_record.Comment))
 
 
 			if len(match) == 0:
@@ -1494,6 +3032,22 @@ class Photo:
 		
 		
 		
+	def transform_metadata_hash(self):
+		'''
+		Hash of all photo index record values, for detecting metadata
+		changes in sync mode
+		'''
+	
+		self.metadata_hash = hashlib.sha256(
+			json.dumps(
+				self.index_record.asdict()
+				,sort_keys = True
+				,default = str
+			).encode()
+		).hexdigest()
+		
+		
+		
 	def transform_photo_uuid(self):
 	
 	
@@ -1505,15 +3059,14 @@ class Photo:
 	
 	def transform_tags(self):
 	
-		tag_columns = re.findall(
-			pattern = 'Tags_[0-9]+_Key'
-			,string = str(self.index_record.fields)
-		)
+		if self.tag_columns is None:
 		
+			self.tag_columns = _get_tag_columns(self.index_record.fields)
+			
 				
 		self.tags = []
 		
-		for tag_column in tag_columns:
+		for tag_column in self.tag_columns:
 		
 			self.tags.append(
 				getattr(
@@ -1545,306 +3098,1656 @@ class Photo:
 
 
 
-################################################################################
-# Functions
-################################################################################
-
-
-#
-# Public
-#
-
-def load_photos(
-	index_file
-	,photo_dir
-	,gdb
-	,feedback
-):
+class PhotoState:
 	'''
-	Read data from source files and load to target geodatabase
+	Local photo load state, stored in a SQLite database
+	
+	Records, for each attachment table and target row, the photo UUID and
+	content hash of each photo loaded, and the attachmentid of the
+	resulting attachment. Allows the loader to recognize photos already
+	loaded under a different file name, and photos whose content changed
+	since they were loaded.
+	
+	Also records, for each photo loaded successfully, the photo file
+	status and index metadata at that time, for sync mode.
+	
+	Finally, keeps a journal of the photos and target rows committed by
+	the current run, for resuming an interrupted run. Target rows are
+	journaled as they are recorded, and photos when all of their target
+	rows are done.
+	
+	Each record is committed as soon as it is written, so the state
+	remains consistent with the geodatabase if the loader is interrupted.
 	'''
 
 
+	########################################################################
+	# Class attributes
+	########################################################################
+
+
 	#
-	# Initialize metrics
+	# Private
 	#
 
+	_SQL_CREATE = (
+		'''
+		CREATE TABLE IF NOT EXISTS attachment (
+			table_name TEXT NOT NULL
+			,rel_globalid TEXT NOT NULL
+			,photo_uuid TEXT NOT NULL
+			,sha256 TEXT NOT NULL
+			,att_name TEXT NOT NULL
+			,attachmentid INTEGER NOT NULL
+			,loaded TEXT NOT NULL
+			,PRIMARY KEY (
+				table_name
+				,rel_globalid
+				,photo_uuid
+			)
+		)
+		'''
+		,'''
+		CREATE INDEX IF NOT EXISTS attachment_sha256 ON attachment (
+			table_name
+			,rel_globalid
+			,sha256
+		)
+		'''
+		,'''
+		CREATE TABLE IF NOT EXISTS sync (
+			photo_uuid TEXT NOT NULL PRIMARY KEY
+			,file_name TEXT NOT NULL
+			,file_size INTEGER NOT NULL
+			,file_mtime_ns INTEGER NOT NULL
+			,metadata_hash TEXT NOT NULL
+			,synced TEXT NOT NULL
+		)
+		'''
+		,'''
+		CREATE TABLE IF NOT EXISTS journal_photo (
+			photo_uuid TEXT NOT NULL PRIMARY KEY
+			,committed TEXT NOT NULL
+		)
+		'''
+		,'''
+		CREATE TABLE IF NOT EXISTS journal_target (
+			table_name TEXT NOT NULL
+			,rel_globalid TEXT NOT NULL
+			,photo_uuid TEXT NOT NULL
+			,PRIMARY KEY (
+				table_name
+				,rel_globalid
+				,photo_uuid
+			)
+		)
+		'''
+	)
+
 
-	# Input
-	
-	metrics_input = MetricsInput()
-	
-	metrics_input.index_failed = None # Disable counter
-	
-	
-	
-	# Output
-	
-	metrics_output = MetricsOutput()
-	
-	
+
+	########################################################################
+	# Instance methods
+	########################################################################
 
 
 	#
-	# Process data
+	# Public
 	#
-	
-	logging.info('Starting photo index processing')
-	
-	
-	
-	with arcpy.da.SearchCursor(
-		in_table = index_file
-		,field_names = '*'
-	) as cursor_index:
-	
-		for row_index in cursor_index:
-		
+
+	def __init__(
+		self
+		,file_name # SQLite database file; created if it does not exist
+	):
+
+		logging.debug(f'Initializing {__class__.__name__}')
+
+
+
+		self.file_name = file_name
+
+
+
+		# Open database and create schema, if needed
+
+		logging.debug(f'Opening photo state database {file_name}')
+
+		self.connection = sqlite3.connect(file_name)
+		self.connection.row_factory = sqlite3.Row
+
+
+		with self.connection:
+
+			for sql in self._SQL_CREATE:
+
+				self.connection.execute(sql)
+
+
+
+	def clear_journal(self):
+
+		logging.debug('Clearing photo state journal')
+
+
+		with self.connection:
+
+			for table in (
+				'journal_photo'
+				,'journal_target'
+			):
+
+				self.connection.execute(f'DELETE FROM {table}')
+
+
+
+	def close(self):
+
+		logging.debug(f'Closing photo state database {self.file_name}')
+
+		self.connection.close()
+
+
+
+	def count_journal(self):
+		'''
+		Return number of photos in journal
+		'''
+
+		return self.connection.execute(
+			'SELECT COUNT(*) FROM journal_photo'
+		).fetchone()[0]
+
+
+
+	def delete(
+		self
+		,table_name
+		,rel_globalid
+		,photo_uuid
+	):
+
+		with self.connection:
+
+			self.connection.execute(
+				'''
+				DELETE FROM attachment
+				WHERE
+					table_name = ?
+					AND rel_globalid = ?
+					AND photo_uuid = ?
+				'''
+				,(
+					table_name
+					,rel_globalid
+					,photo_uuid
+				)
+			)
+
+
+
+	def delete_attachment(
+		self
+		,table_name
+		,attachmentid
+	):
+		'''
+		Delete state records of attachment, for all photo UUIDs that share it
+		'''
+
+		with self.connection:
+
+			self.connection.execute(
+				'''
+				DELETE FROM attachment
+				WHERE
+					table_name = ?
+					AND attachmentid = ?
+				'''
+				,(
+					table_name
+					,attachmentid
+				)
+			)
+
+
+
+	def delete_sync(
+		self
+		,photo_uuid
+	):
+
+		with self.connection:
+
+			self.connection.execute(
+				'''
+				DELETE FROM sync
+				WHERE photo_uuid = ?
+				'''
+				,(photo_uuid,)
+			)
+
+
+
+	def find_all(self):
+		'''
+		Return list of all state records
+		'''
+
+		return self.connection.execute(
+			'''
+			SELECT *
+			FROM attachment
+			ORDER BY
+				table_name
+				,attachmentid
+			'''
+		).fetchall()
+
+
+
+	def find_attachment(
+		self
+		,table_name
+		,attachmentid
+	):
+		'''
+		Return list of state records for attachment, one per photo UUID
+		that shares it
+		'''
+
+		return self.connection.execute(
+			'''
+			SELECT *
+			FROM attachment
+			WHERE
+				table_name = ?
+				AND attachmentid = ?
+			'''
+			,(
+				table_name
+				,attachmentid
+			)
+		).fetchall()
+
+
+
+	def find_content(
+		self
+		,table_name
+		,rel_globalid
+		,sha256
+	):
+		'''
+		Return state record for photo content loaded to target row, under
+		any photo UUID, or None if not found
+		'''
+
+		return self.connection.execute(
+			'''
+			SELECT *
+			FROM attachment
+			WHERE
+				table_name = ?
+				AND rel_globalid = ?
+				AND sha256 = ?
+			ORDER BY loaded DESC
+			'''
+			,(
+				table_name
+				,rel_globalid
+				,sha256
+			)
+		).fetchone()
+
+
+
+	def find_missing(
+		self
+		,photo_uuids # Set of photo UUIDs currently in photo index
+	):
+		'''
+		Return list of state records for photos not in `photo_uuids`
+		'''
+
+		return [
+			row
+			for row in self.connection.execute(
+				'''
+				SELECT *
+				FROM attachment
+				ORDER BY
+					table_name
+					,attachmentid
+				'''
+			)
+			if row['photo_uuid'] not in photo_uuids
+		]
+
+
+
+	def find_photo(
+		self
+		,table_name
+		,rel_globalid
+		,photo_uuid
+	):
+		'''
+		Return state record for photo UUID loaded to target row, or None if
+		not found
+		'''
+
+		return self.connection.execute(
+			'''
+			SELECT *
+			FROM attachment
+			WHERE
+				table_name = ?
+				AND rel_globalid = ?
+				AND photo_uuid = ?
+			'''
+			,(
+				table_name
+				,rel_globalid
+				,photo_uuid
+			)
+		).fetchone()
+
+
+
+	def find_sync(
+		self
+		,photo_uuid
+	):
+		'''
+		Return sync record for photo UUID, or None if not found
+		'''
+
+		return self.connection.execute(
+			'''
+			SELECT *
+			FROM sync
+			WHERE photo_uuid = ?
+			'''
+			,(photo_uuid,)
+		).fetchone()
+
+
+
+	def is_attached(
+		self
+		,table_name
+		,attachmentid
+		,photo_uuids # Set of photo UUIDs currently in photo index
+	):
+		'''
+		Check if attachment is recorded for any photo in `photo_uuids`
+		
+		Identical photos with different UUIDs share one attachment; see
+		Attachment.load()
+		'''
+
+		for row in self.connection.execute(
+			'''
+			SELECT photo_uuid
+			FROM attachment
+			WHERE
+				table_name = ?
+				AND attachmentid = ?
+			'''
+			,(
+				table_name
+				,attachmentid
+			)
+		):
+
+			if row['photo_uuid'] in photo_uuids:
+
+				return True
+
+
+		return False
+
+
+
+	def is_journaled_photo(
+		self
+		,photo_uuid
+	):
+
+		return self.connection.execute(
+			'''
+			SELECT 1
+			FROM journal_photo
+			WHERE photo_uuid = ?
+			'''
+			,(photo_uuid,)
+		).fetchone() is not None
+
+
+
+	def is_journaled_target(
+		self
+		,table_name
+		,rel_globalid
+		,photo_uuid
+	):
+
+		return self.connection.execute(
+			'''
+			SELECT 1
+			FROM journal_target
+			WHERE
+				table_name = ?
+				AND rel_globalid = ?
+				AND photo_uuid = ?
+			'''
+			,(
+				table_name
+				,rel_globalid
+				,photo_uuid
+			)
+		).fetchone() is not None
+
+
+
+	def journal_photo(
+		self
+		,photo_uuid
+	):
+		'''
+		Journal photo after all of its target rows are done
+		'''
+
+		with self.connection:
+
+			self.connection.execute(
+				'''
+				INSERT OR REPLACE INTO journal_photo (
+					photo_uuid
+					,committed
+				)
+				VALUES (?, ?)
+				'''
+				,(
+					photo_uuid
+					,datetime.datetime.now().isoformat(timespec = 'seconds')
+				)
+			)
+
+
+
+	def record(
+		self
+		,table_name
+		,rel_globalid
+		,photo_uuid
+		,sha256
+		,att_name
+		,attachmentid
+		,journal = True # False outside loader runs, e.g. reconciliation
+	):
+		'''
+		Record photo loaded to target row, replacing any previous record for
+		the same photo UUID, and journal target row
+		'''
+
+		with self.connection:
+
+			if journal:
+
+				self.connection.execute(
+					'''
+					INSERT OR REPLACE INTO journal_target (
+						table_name
+						,rel_globalid
+						,photo_uuid
+					)
+					VALUES (?, ?, ?)
+					'''
+					,(
+						table_name
+						,rel_globalid
+						,photo_uuid
+					)
+				)
+
+
+			self.connection.execute(
+				'''
+				INSERT OR REPLACE INTO attachment (
+					table_name
+					,rel_globalid
+					,photo_uuid
+					,sha256
+					,att_name
+					,attachmentid
+					,loaded
+				)
+				VALUES (?, ?, ?, ?, ?, ?, ?)
+				'''
+				,(
+					table_name
+					,rel_globalid
+					,photo_uuid
+					,sha256
+					,att_name
+					,attachmentid
+					,datetime.datetime.now().isoformat(timespec = 'seconds')
+				)
+			)
+
+
+
+	def record_sync(
+		self
+		,photo # Photo
+		,file_stat # (size, mtime_ns) tuple from photo directory snapshot
+	):
+		'''
+		Record photo file status and index metadata after photo is loaded
+		successfully
+		'''
+
+		with self.connection:
+
+			self.connection.execute(
+				'''
+				INSERT OR REPLACE INTO sync (
+					photo_uuid
+					,file_name
+					,file_size
+					,file_mtime_ns
+					,metadata_hash
+					,synced
+				)
+				VALUES (?, ?, ?, ?, ?, ?)
+				'''
+				,(
+					photo.photo_uuid
+					,photo.file_name
+					,file_stat[0]
+					,file_stat[1]
+					,photo.metadata_hash
+					,datetime.datetime.now().isoformat(timespec = 'seconds')
+				)
+			)
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+
+#
+# Public
+#
+
+def load_photos(
+	index_file
+	,photo_dir
+	,gdb
+	,feedback
+	,max_dimension = None
+	,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+	,workers = None
+	,state_file = None
+	,sync = False
+	,remove_missing = False
+	,resume = False
+	,thumbnail_dimension = None
+	,report_file = None
+	,only_keys_file = None # Load only these photos; see mg.read_keys()
+):
+	'''
+	Read data from source files and load to target geodatabase
+	
+	The photo index is validated as a whole first (validate_index). Valid
+	photos then pass through these stages, chained as generators so that
+	the loader never holds more than a bounded number of photos in memory:
+	
+		1. Gather photo metadata (_generate_photos)
+		
+		2. In sync mode, skip photos unchanged since they were last
+		   loaded (_filter_sync)
+		
+		3. When resuming, skip photos committed by the interrupted run
+		   (_filter_journal)
+		
+		4. Read photo files ahead of loading in a worker pool, and
+		   optionally reduce them and generate thumbnails (_read_ahead)
+		
+		5. Load photos to geodatabase attachments (below)
+		
+	Stage 4 uses a process pool when photo reduction or thumbnails are
+	enabled, because re-encoding images is CPU-bound; otherwise it uses a
+	thread pool, which is sufficient to overlap file I/O with geodatabase
+	I/O.
+	
+	If `thumbnail_dimension` is set, existing attachments without a
+	thumbnail are backfilled after loading, in the same pool; see
+	_backfill_thumbnails.
+	
+	If `state_file` is provided, photo identity and content hashes are
+	tracked across runs in that SQLite database; see PhotoState. Sync mode,
+	removal of photos missing from the index (`remove_missing`), and
+	resuming an interrupted run (`resume`) require it.
+	
+	Progress metrics include throughput and per-photo latency of each
+	stage; see MetricsTiming. If `report_file` is provided, the final
+	metrics are also written to it as JSON.
+	
+	If `only_keys_file` is provided, only the photos it lists are read from
+	the photo index: the rejected photos of a rejects file from an earlier
+	run, or a list of photo file names, one per line. See REJECTS note in
+	module header.
+	'''
+
+
+	#
+	# Initialize metrics
+	#
+
+
+	# Input
+	
+	metrics_input = MetricsInput()
+	
+	metrics_input.index_failed = None # Disable counter
+	
+	if not sync:
+	
+		metrics_input.sync_unchanged = None # Disable counter
+		
+	if not resume:
+	
+		metrics_input.resume_skipped = None # Disable counter
+	
+	
+	
+	# Output
+	
+	metrics_output = MetricsOutput()
+	
+	if thumbnail_dimension is None:
+	
+		metrics_output.thumbnail_deleted = None # Disable counter
+		metrics_output.thumbnail_inserted = None # Disable counter
+		metrics_output.thumbnail_replaced = None # Disable counter
+	
+	
+	
+	# Timing
+	
+	metrics_timing = MetricsTiming()
+	
+	
+
+
+	#
+	# Configure photo file read-ahead
+	#
+	
+	if workers is None:
+	
+		workers = os.cpu_count() or 1
+		
+		
+	if (
+		max_dimension is None
+		and thumbnail_dimension is None
+	):
+	
+		executor_class = concurrent.futures.ThreadPoolExecutor
+		
+	else:
+	
+		executor_class = concurrent.futures.ProcessPoolExecutor
+		
+		
+	logging.debug(f'Reading photo files with {executor_class.__name__}, {workers} workers')
+
+
+
+	#
+	# Open local state
+	#
+	# Removal of missing photos compares the state database with the whole
+	# photo index
+	#
+	
+	if (
+		remove_missing
+		and only_keys_file is not None
+	):
+	
+		raise ValueError('Removal of missing photos cannot be combined with only keys')
+		
+		
+	if state_file is None:
+	
+		if (
+			sync
+			or remove_missing
+			or resume
+		):
+		
+			raise ValueError('Sync mode, removal of missing photos, and resume require a photo state database')
+	
+	
+		state = None
 		
+	else:
+	
+		state = PhotoState(state_file)
+		
+		
+		if resume:
+		
+			logging.info(f'Resuming interrupted run; {state.count_journal():n} photos already loaded')
+			
+		else:
+		
+			state.clear_journal()
+
+
+
+	#
+	# Select photos
+	#
+	
+	if only_keys_file is None:
+	
+		only_keys = None
+		
+	else:
+	
+		only_keys = mg.read_keys(
+			file_name = only_keys_file
+			,key = 'file_name'
+			,events = ('photo_rejected',)
+		)
+		logging.info(f'Loading only {len(only_keys):n} photos from {only_keys_file}')
+
+
+
+	#
+	# Snapshot photo directory
+	#
+	
+	if sync:
+	
+		logging.info('Scanning photo directory')
+		
+		snapshot = _scan_photo_dir(photo_dir)
+		
+		logging.debug(f'Found {len(snapshot):n} photo files')
+
+
+
+	#
+	# Process data
+	#
+	
+	logging.info('Starting photo index processing')
+	
+	count_photo = 0
+	time_photo = None
+	
+	
+	
+	with (
+		executor_class(max_workers = workers) as executor
+		,contextlib.closing(state) if state is not None else contextlib.nullcontext()
+	):
+	
+		(
+			index_records
+			,tag_columns
+			,photo_uuids
+		) = validate_index(
+			index_file = index_file
+			,photo_dir = photo_dir
+			,metrics_input = metrics_input
+			,only_keys = only_keys
+		)
+		
+		
+		photos = _generate_photos(
+			index_records = index_records
+			,photo_dir = photo_dir
+			,tag_columns = tag_columns
+			,metrics_input = metrics_input
+		)
+		
+		
+		if sync:
+		
+			photos = _filter_sync(
+				photos = photos
+				,state = state
+				,snapshot = snapshot
+				,metrics_input = metrics_input
+			)
+		
+		
+		if resume:
+		
+			photos = _filter_journal(
+				photos = photos
+				,state = state
+				,metrics_input = metrics_input
+			)
+		
+		
+		for (
+			photo
+			,future
+		) in _read_ahead(
+			photos = photos
+			,executor = executor
+			,window = workers * READ_AHEAD_FACTOR
+			,max_dimension = max_dimension
+			,jpeg_quality = jpeg_quality
+			,thumbnail_dimension = thumbnail_dimension
+		):
+		
+		
+			#
+			# Time previous photo
+			#
+			# Measured between successive photos, so it includes waiting
+			# for the photo file to be read, and every exit from the loop
+			# body
+			#
+			
+			time_now = time.perf_counter()
+			
+			if time_photo is not None:
+			
+				metrics_timing.add(
+					stage = 'photo'
+					,seconds = time_now - time_photo
+				)
+				
+			time_photo = time_now
+			
+			
+			
+			#
+			# Report feedback
+			#
+			
+			if (
+				feedback > 0 # Check first to avoid ZeroDivisionError in modulo
+				and count_photo != 0 # Skip first pass
+				and count_photo % feedback == 0
+			):
+			
+				logging.info(f'{metrics_input}\n{metrics_output}\n{metrics_timing}')
+				
+				
+			count_photo += 1
+			
+			
+			
+			# Fetch source data from photo file
+			
+			try:
+			
+				result = future.result()
+				
+				photo.set_data(result)
+				
+				metrics_input.file_succeeded += 1
+				
+			except Exception as e:
+			
+				logging.warning(
+					f'Skipping photo: Failed to fetch data from source file: File {photo.file_name}: {e}'
+					,extra = {'event': 'photo_rejected', 'stage': 'read', 'file_name': photo.file_name} # See mg.aggregate_warnings()
+				)
+				metrics_input.file_failed += 1
+				continue
+				
+				
+			metrics_input.bytes_read += result['size_original']
+			
+			for stage in (
+				'read'
+				,'process'
+			):
+			
+				metrics_timing.add(
+					stage = stage
+					,seconds = result[f'seconds_{stage}']
+				)
+				
+				
+			if photo.is_reduced:
+			
+				logging.debug(f'Reduced photo from {photo.data_size_original:n} to {len(photo.data):n} bytes')
+				
+				
+			if photo.exif_info is not None:
+			
+				logging.debug(f'Photo EXIF: Capture time {photo.capture_time} Latitude {photo.latitude} Longitude {photo.longitude}')
+			
+			
+			
+			####################
+			# Load photo to geodatabase
+			#
+			# Photo may be for either or both of Location or
+			# Measuring Point
+			####################
+			
+			logging.debug('Loading photo file as geodatabase attachment(s)')
+			
+			
+			
+			#
+			# Location attachment
+			#
+			
+			if photo.is_location == True:
+			
+			
+				# Get attachment metadata
+				
+				logging.debug('Gathering Location attachment metadata')
+				try:
+				
+					attachment = LocationAttachment(
+						gdb = gdb
+						,photo = photo
+					)
+					logging.datadebug(f'Location attachment:\n{attachment}')
+				
+				
+				except ValueError as e:
+				
+					logging.warning(
+						f'Failed to generate attachment metadata: Location: {photo.location} File: {photo.file_name}'
+						f'\n{e}'
+						,extra = {'event': 'photo_rejected', 'stage': 'attachment_metadata', 'file_name': photo.file_name, 'target': 'Location', 'reason': mg.WarningAggregator.reason(f'Failed to generate attachment metadata: {e}')} # See mg.aggregate_warnings()
+					)
+					metrics_output.location_failed += 1
+					continue
+				
+				
+					
+				# Load attachment
+				
+				logging.debug('Loading Location attachment')
+				
+				errors = attachment.load(
+					state = state
+					,resume = resume
+				)
+				
+				_update_attachment_metrics(
+					metrics_output = metrics_output
+					,metrics_timing = metrics_timing
+					,attachment = attachment
+				)
+					
+				if len(errors) > 0:
+				
+					for error in errors:
+					
+						logging.warning(
+							f'Failed to load attachment: Location: {photo.location} File: {photo.file_name}'
+							f'\n{error}'
+							,extra = {'event': 'photo_rejected', 'stage': 'load', 'file_name': photo.file_name, 'target': 'Location', 'reason': mg.WarningAggregator.reason(f'Failed to load attachment: {error}')} # See mg.aggregate_warnings()
+						)
+						metrics_output.location_failed += 1
+					
+					
+					continue
+				
+				
+				else:
+				
+					logging.debug(
+						'Loaded Location attachment'
+						,extra = {'event': 'photo_loaded', 'file_name': photo.file_name, 'target': 'Location'} # See mg.FormatterJSON
+					)
+					metrics_output.location_succeeded += 1
+				
+				
+				
+			#
+			# Measuring Point attachment
+			#
+			
+			if photo.is_mp == True:
+			
+			
+				# Get attachment metadata
+				
+				logging.debug('Gathering Measuring Point attachment metadata')
+				try:
+				
+					attachment = MPAttachment(
+						gdb = gdb
+						,photo = photo
+					)
+					logging.datadebug(f'Measuring Point attachment:\n{attachment}')
+				
+				
+				except ValueError as e:
+				
+					logging.warning(
+						f'Failed to generate attachment metadata: Location: {photo.location} File: {photo.file_name}'
+						f'\n{e}'
+						,extra = {'event': 'photo_rejected', 'stage': 'attachment_metadata', 'file_name': photo.file_name, 'target': 'MeasuringPoint', 'reason': mg.WarningAggregator.reason(f'Failed to generate attachment metadata: {e}')} # See mg.aggregate_warnings()
+					)
+					metrics_output.mp_failed += 1
+					continue
+				
+				
+					
+				# Load attachment
+				
+				logging.debug('Loading Measuring Point attachments')
+				
+				errors = attachment.load(
+					state = state
+					,resume = resume
+				)
+				
+				_update_attachment_metrics(
+					metrics_output = metrics_output
+					,metrics_timing = metrics_timing
+					,attachment = attachment
+				)
+					
+				if len(errors) > 0:
+				
+					for error in errors:
+				
+						logging.warning(
+							f'Failed to load attachment: Location: {photo.location} File: {photo.file_name}'
+							f'\n{error}'
+							,extra = {'event': 'photo_rejected', 'stage': 'load', 'file_name': photo.file_name, 'target': 'MeasuringPoint', 'reason': mg.WarningAggregator.reason(f'Failed to load attachment: {error}')} # See mg.aggregate_warnings()
+						)
+						metrics_output.mp_failed += 1
+						
+					
+					continue
+					
+					
+				else:
+				
+					logging.debug(
+						'Loaded Measuring Point attachments'
+						,extra = {'event': 'photo_loaded', 'file_name': photo.file_name, 'target': 'MeasuringPoint'} # See mg.FormatterJSON
+					)
+					metrics_output.mp_succeeded += 1
+					
+					
+					
 			#
-			# Report feedback
+			# Record photo in sync state and journal
+			#
+			# Reached only if all attachments for photo loaded
+			# successfully; failed photos are retried on next sync or
+			# resume
 			#
 			
 			if (
-				feedback > 0 # Check first to avoid ZeroDivisionError in modulo
-				and metrics_input.index_total != 0 # Skip first pass
-				and metrics_input.index_total % feedback == 0
+				sync
+				and os.path.normcase(photo.file_name) in snapshot
 			):
 			
-				logging.info(f'{metrics_input}\n{metrics_output}')
+				state.record_sync(
+					photo = photo
+					,file_stat = snapshot[os.path.normcase(photo.file_name)]
+				)
 				
 				
+			if state is not None:
+			
+				state.journal_photo(photo.photo_uuid)
 				
-			####################
-			# Process input photo
-			####################
+				
+				
+		if time_photo is not None: # Last photo
+		
+			metrics_timing.add(
+				stage = 'photo'
+				,seconds = time.perf_counter() - time_photo
+			)
 			
 			
-			# Read photo index record
 			
-			index_record = IndexRecord(
-				fields = cursor_index.fields
-				,values = row_index
+		#
+		# Remove attachments for photos missing from index
+		#
+		
+		if remove_missing:
+		
+			_remove_missing(
+				gdb = gdb
+				,state = state
+				,photo_uuids = photo_uuids
+				,metrics_output = metrics_output
 			)
-			logging.datadebug(f'Photo index record:\n{index_record}')
-			
-			metrics_input.index_succeeded += 1
 			
 			
 			
-			# Gather photo metadata
+		#
+		# Backfill thumbnails
+		#
+		
+		if thumbnail_dimension is not None:
+		
+			_backfill_thumbnails(
+				gdb = gdb
+				,executor = executor
+				,window = workers * READ_AHEAD_FACTOR
+				,thumbnail_dimension = thumbnail_dimension
+				,jpeg_quality = jpeg_quality
+				,metrics_output = metrics_output
+			)
 			
-			try:
 			
-				photo = Photo(
-					index_record = index_record
-					,photo_dir = photo_dir
-				)
-				logging.datadebug(f'Photo:\n{photo}')
-				
-
-			except ValueError as e:
 			
-				logging.warning(f'Skipping photo: {e}')
-				metrics_input.metadata_failed += 1
-				continue
+		#
+		# Run finished; discard journal
+		#
+		
+		if state is not None:
+		
+			state.clear_journal()
 				
 				
 				
-			# Assess metadata properties
-			
-			if not (
-				photo.is_location == True
-				or photo.is_mp == True
-			):
-			
-				logging.warning(f'Skipping photo: Photo not tagged for Location or Measuring Point: File {photo.file_name}')
-				metrics_input.metadata_failed += 1
-				continue
+	#
+	# Final feedback message
+	#
+	
+	logging.info('Finished processing photos')
+	
+	logging.info(f'{metrics_input}\n{metrics_output}\n{metrics_timing}')
+	
+	
+	
+	#
+	# Write metrics report
+	#
+	
+	if report_file is not None:
+	
+		logging.info(f'Writing metrics report to {report_file}')
+		
+		with open(
+			report_file
+			,'w'
+			,encoding = 'utf-8'
+		) as f:
+		
+			json.dump(
+				{
+					'input': metrics_input.asdict()
+					,'output': metrics_output.asdict()
+					,'timing': metrics_timing.asdict()
+				}
+				,f
+				,indent = mg.JSON_INDENT
+			)
+
+
+
+def validate_index(
+	index_file
+	,photo_dir
+	,metrics_input = None # MetricsInput
+	,only_keys = None # Photo file names; validate only these index records
+):
+	'''
+	Validate all photo index records before loading
+	
+	Reads the photo index once and checks each column for the whole index
+	at a time, rather than record by record: photo UUID, Location /
+	Measuring Point tags, related Measuring Point IDs, content type, and
+	photo file existence. The photo directory is scanned once for the
+	latter. All defects are logged in one report.
+	
+	Counts index records and metadata failures in `metrics_input`, if
+	provided.
+	
+	If `only_keys` is provided, only index records with those file names
+	are read.
+	
+	Returns tuple:
+	
+		List of valid IndexRecord instances
+		List of tag column names, for Photo
+		Set of photo UUIDs of all index records read, valid or not
+	'''
+	
+	logging.info('Validating photo index')
+	
+	
+	
+	#
+	# Read photo index into columns
+	#
+	
+	with arcpy.da.SearchCursor(
+		in_table = index_file
+		,field_names = '*'
+		,where_clause = (
+			None
+			if only_keys is None
+			else mg.where_in('FileName', only_keys)
+		)
+	) as cursor_index:
+	
+		fields = cursor_index.fields
+		rows = list(cursor_index)
+		
+		
+	count_row = len(rows)
+	
+	columns = dict(
+		zip(
+			fields
+			,zip(*rows) if count_row > 0 else [()] * len(fields)
+		)
+	)
+	
+	logging.debug(f'Read {count_row:n} photo index records')
+	
+	
+	tag_columns = _get_tag_columns(fields)
+	
+	logging.debug(f'Photo index tag columns: {tag_columns}')
+	
+	
+	defects = [[] for i in range(count_row)]
+	
+	
+	
+	#
+	# Photo UUID
+	#
+	
+	photo_uuids = set()
+	
+	for (
+		i
+		,value
+	) in enumerate(columns['UniqueId']):
+	
+		try:
+		
+			photo_uuids.add(str(uuid.UUID(value)).upper())
 			
+		except (
+			TypeError
+			,ValueError
+		):
+		
+			defects[i].append(f'Invalid photo UUID: {value}')
 			
 			
-			# Log valid metadata
 			
-			logging.debug('Photo metadata is valid')
-			metrics_input.metadata_succeeded += 1
-				
-				
+	#
+	# Tags
+	#
+	
+	tags = list(
+		zip(
+			*(columns[c] for c in tag_columns)
+		)
+	) or [()] * count_row
+	
+	is_location = [TAG_LOCATION in t for t in tags]
+	is_mp = [TAG_MP in t for t in tags]
+	
+	
+	for i in range(count_row):
+	
+		if not (
+			is_location[i]
+			or is_mp[i]
+		):
+		
+			defects[i].append('Photo not tagged for Location or Measuring Point')
 			
-			# Fetch source data from photo file
 			
-			try:
-				photo.get_data()
-				
-				metrics_input.file_succeeded += 1
-				
-			except Exception as e:
 			
-				logging.warning(f'Skipping photo: Failed to fetch data from source file: File {photo.file_name}: {e}')
-				metrics_input.file_failed += 1
-				continue
+	#
+	# Related Measuring Point IDs
+	#
+	
+	for (
+		i
+		,comment
+	) in enumerate(columns['Comment']):
+	
+		if (
+			is_mp[i]
+			and len(PATTERN_MP_UUID.findall(mg.none2blank(comment))) == 0
+		):
+		
+			defects[i].append('Measuring Point photo missing Aquarius ID of related MP')
 			
 			
 			
-			####################
-			# Load photo to geodatabase
-			#
-			# Photo may be for either or both of Location or
-			# Measuring Point
-			####################
+	#
+	# Content type and photo file
+	#
+	
+	# File names are compared as the file system does, e.g. without case on
+	# Windows
+	
+	with os.scandir(photo_dir) as entries:
+	
+		file_names = {
+			os.path.normcase(entry.name)
+			for entry in entries
+			if entry.is_file()
+		}
+		
+		
+	for (
+		i
+		,file_name
+	) in enumerate(columns['FileName']):
+	
+		if mimetypes.guess_type(mg.none2blank(file_name))[0] is None:
+		
+			defects[i].append('Unknown content type')
 			
-			logging.debug('Loading photo file as geodatabase attachment(s)')
 			
+		if os.path.normcase(mg.none2blank(file_name)) not in file_names:
+		
+			defects[i].append('Photo file not found')
 			
 			
-			#
-			# Location attachment
-			#
 			
-			if photo.is_location == True:
+	#
+	# Report
+	#
+	
+	index_records = []
+	
+	for i in range(count_row):
+	
+		if len(defects[i]) == 0:
+		
+			index_records.append(
+				IndexRecord(
+					fields = fields
+					,values = rows[i]
+				)
+			)
 			
 			
-				# Get attachment metadata
-				
-				logging.debug('Gathering Location attachment metadata')
-				try:
-				
-					attachment = LocationAttachment(
-						gdb = gdb
-						,photo = photo
-					)
-					logging.datadebug(f'Location attachment:\n{attachment}')
-				
-				
-				except ValueError as e:
-				
-					logging.warning(
-						f'Failed to generate attachment metadata: Location: {photo.location} File: {photo.file_name}'
-						f'\n{e}'
-					)
-					metrics_output.location_failed += 1
-					continue
-				
-				
-					
-				# Load attachment
-				
-				logging.debug('Loading Location attachment')
-				
-				errors = attachment.load()
-					
-				if len(errors) > 0:
-				
-					for error in errors:
-					
-						logging.warning(
-							f'Failed to load attachment: Location: {photo.location} File: {photo.file_name}'
-							f'\n{error}'
+	_report_defects(
+		file_names = columns['FileName']
+		,defects = defects
+	)
+	
+	
+	if metrics_input is not None:
+	
+		metrics_input.index_succeeded += count_row
+		metrics_input.metadata_failed += count_row - len(index_records)
+		
+		
+		
+	return (
+		index_records
+		,tag_columns
+		,photo_uuids
+	)
+
+
+
+#
+# Private
+#
+
+def _backfill_thumbnails(
+	gdb
+	,executor # concurrent.futures.Executor
+	,window # Maximum number of attachments fetched at once
+	,thumbnail_dimension
+	,jpeg_quality
+	,metrics_output # MetricsOutput
+):
+	'''
+	Generate thumbnails of existing photo attachments that lack one, and
+	delete thumbnails whose photo attachment no longer exists
+	
+	Attachment metadata is scanned first, without content. Then content is
+	fetched for at most `window` attachments at a time, thumbnails are
+	generated in `executor`, and each is inserted as soon as it is
+	available, so an interrupted backfill continues on the next run.
+	'''
+	
+	logging.info('Backfilling photo thumbnails')
+	
+	
+	for (
+		table_name
+		,keywords
+	) in (
+		(
+			'hydro.location__attach'
+			,'Location_image'
+		)
+		,(
+			'hydro.measuringpoint__attach'
+			,'MeasuringPoint_image'
+		)
+	):
+	
+		table = os.path.join(
+			gdb
+			,table_name
+		)
+		
+		
+		
+		#
+		# Scan attachment metadata
+		#
+		
+		photos = {} # (rel_globalid, att_name): attachmentid
+		thumbnails = {} # (rel_globalid, photo att_name): attachmentid
+		
+		
+		with arcpy.da.SearchCursor(
+			in_table = table
+			,field_names = (
+				'attachmentid'
+				,'rel_globalid'
+				,'att_name'
+				,'content_type'
+				,'keywords'
+			)
+		) as cursor:
+		
+			for (
+				attachmentid
+				,rel_globalid
+				,att_name
+				,content_type
+				,keywords_row
+			) in cursor:
+			
+				if (
+					keywords_row == keywords
+					and content_type in THUMBNAIL_CONTENT_TYPES
+				):
+				
+					photos[
+						(
+							rel_globalid
+							,att_name
 						)
-						metrics_output.location_failed += 1
+					] = attachmentid
 					
 					
-					continue
-				
-				
-				else:
-				
-					logging.debug('Loaded Location attachment')
-					metrics_output.location_succeeded += 1
-				
+				elif (
+					keywords_row == f'{keywords}{THUMBNAIL_SUFFIX}'
+					and att_name.startswith(THUMBNAIL_PREFIX)
+				):
 				
+					thumbnails[
+						(
+							rel_globalid
+							,att_name[len(THUMBNAIL_PREFIX):]
+						)
+					] = attachmentid
+					
+					
+		attachmentids_missing = [
+			attachmentid
+			for (
+				key
+				,attachmentid
+			) in photos.items()
+			if key not in thumbnails
+		]
+		
+		attachmentids_orphan = [
+			attachmentid
+			for (
+				key
+				,attachmentid
+			) in thumbnails.items()
+			if key not in photos
+		]
+		
+		logging.debug(f'{table_name}: {len(attachmentids_missing):n} photos without thumbnail, {len(attachmentids_orphan):n} orphan thumbnails')
+		
+		
+		
+		#
+		# Delete orphan thumbnails
+		#
+		
+		for i in range(
+			0
+			,len(attachmentids_orphan)
+			,window
+		):
+		
+			with arcpy.da.UpdateCursor(
+				in_table = table
+				,field_names = 'attachmentid'
+				,where_clause = f'attachmentid IN ({", ".join(str(a) for a in attachmentids_orphan[i:i + window])})'
+			) as cursor:
+			
+				for row in cursor:
 				
-			#
-			# Measuring Point attachment
-			#
+					logging.debug(f'Deleting orphan thumbnail: attachmentid {row[0]}')
+					cursor.deleteRow()
+					metrics_output.thumbnail_deleted += 1
+					
+					
+					
+		#
+		# Generate missing thumbnails
+		#
+		
+		for i in range(
+			0
+			,len(attachmentids_missing)
+			,window
+		):
+		
+			pending = []
 			
-			if photo.is_mp == True:
 			
+			with arcpy.da.SearchCursor(
+				in_table = table
+				,field_names = (
+					'rel_globalid'
+					,'att_name'
+					,'content_type'
+					,'data'
+				)
+				,where_clause = f'attachmentid IN ({", ".join(str(a) for a in attachmentids_missing[i:i + window])})'
+			) as cursor:
 			
-				# Get attachment metadata
-				
-				logging.debug('Gathering Measuring Point attachment metadata')
-				try:
-				
-					attachment = MPAttachment(
-						gdb = gdb
-						,photo = photo
-					)
-					logging.datadebug(f'Measuring Point attachment:\n{attachment}')
-				
-				
-				except ValueError as e:
+				for (
+					rel_globalid
+					,att_name
+					,content_type
+					,data
+				) in cursor:
 				
-					logging.warning(
-						f'Failed to generate attachment metadata: Location: {photo.location} File: {photo.file_name}'
-						f'\n{e}'
+					pending.append(
+						(
+							rel_globalid
+							,att_name
+							,content_type
+							,executor.submit(
+								photo_processing.make_thumbnail
+								,data = bytes(data)
+								,max_dimension = thumbnail_dimension
+								,jpeg_quality = jpeg_quality
+							)
+						)
 					)
-					metrics_output.mp_failed += 1
-					continue
-				
-				
 					
-				# Load attachment
-				
-				logging.debug('Loading Measuring Point attachments')
-				
-				errors = attachment.load()
 					
-				if len(errors) > 0:
-				
-					for error in errors:
+			with arcpy.da.InsertCursor(
+				in_table = table
+				,field_names = (
+					'rel_globalid'
+					,'content_type'
+					,'att_name'
+					,'data_size'
+					,'data'
+					,'keywords'
+				)
+			) as cursor:
+			
+				for (
+					rel_globalid
+					,att_name
+					,content_type
+					,future
+				) in pending:
 				
-						logging.warning(
-							f'Failed to load attachment: Location: {photo.location} File: {photo.file_name}'
-							f'\n{error}'
-						)
-						metrics_output.mp_failed += 1
+					try:
+					
+						thumbnail = future.result()
 						
+					except Exception as e:
 					
-					continue
+						logging.warning(f'Skipping thumbnail: Failed to generate thumbnail: Table {table_name} File {att_name}: {e}')
+						continue
+						
+						
+					if thumbnail is None:
 					
+						logging.debug(f'Photo format does not support thumbnails: File {att_name}')
+						continue
+						
+						
+					cursor.insertRow(
+						(
+							rel_globalid
+							,content_type
+							,f'{THUMBNAIL_PREFIX}{att_name}'
+							,len(thumbnail)
+							,thumbnail
+							,f'{keywords}{THUMBNAIL_SUFFIX}'
+						)
+					)
 					
-				else:
-				
-					logging.debug('Loaded Measuring Point attachments')
-					metrics_output.mp_succeeded += 1
-				
-				
-				
-	#
-	# Final feedback message
-	#
-	
-	logging.info('Finished processing photos')
-	
-	logging.info(f'{metrics_input}\n{metrics_output}')
-
-
-
-#
-# Private
-#
-
-def _check_credentials():
-	'''
-	The target SQL Server instance uses Windows authentication, so we need
-	to ensure that this Python process is running as the correct user
-	'''
-
-	domain = os.environ.get('USERDOMAIN')
-	user = os.environ.get('USERNAME')
-
-	username = f'{domain}\\{user}' # Leave default string case, for display
-
-
-
-	logging.debug('Checking OS username')
-	if user.upper() != 'HYDRO': # Only check user, not domain, so developers can run in arbitrary environment
-
-		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
-			'Invalid Windows credentials'
-			f'\nThis script must run in a Python session as the HQ\hydro user, but is running as {username}'
-		)
+					metrics_output.thumbnail_inserted += 1
+					metrics_output.bytes_written += len(thumbnail)
 
 
 
@@ -1907,15 +4810,7 @@ def _configure_arguments():
 	g.add_argument(
 		'-L'
 		,'--log-level'
-		,choices = (
-			'CRITICAL'
-			,'ERROR'
-			,'WARNING'
-			,'INFO'
-			,'DEBUG'
-			,'DATA'
-			,'DATADEBUG'
-		)
+		,choices = mg.LOG_LEVEL_NAMES
 		,default = 'INFO'
 		,dest = 'log_level'
 		,help = 'Logging level (default: INFO)'
@@ -1927,7 +4822,7 @@ def _configure_arguments():
 		'-l'
 		,'--log-file'
 		,dest = 'log_file_name'
-		,help = 'Diagnostic log file name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
 		,metavar = '<log_file>'
 		,required = False
 	)
@@ -1937,309 +4832,292 @@ def _configure_arguments():
 		,'--feedback'
 		,default = 0
 		,dest = 'feedback'
-		,help = 'Feedback interval for progress metrics (number of Locations processed); 0 to disable'
+		,help = 'Feedback interval for progress metrics (number of photos processed); 0 to disable'
 		,metavar = '<feedback>'
 		,required = False
 		,type = int
 	)
 
 	g.add_argument(
-		'-h'
-		,'--help'
-		,action = 'help'
+		'-x'
+		,'--max-dimension'
+		,dest = 'max_dimension'
+		,help = 'Reduce photos larger than this width or height (pixels) before loading; omit to load photos unchanged'
+		,metavar = '<max_dimension>'
+		,required = False
+		,type = int
 	)
 
-
-
-	return ap
-
-
-
-def _configure_log_file(
-	file_name
-	,formatter = None
-):
-	'''
-	Add log file handler to existing root logger
-	Fail if file already exists
-	'''
-
-	try:
-
-		logging.debug('Adding log FileHandler')
-		handler = logging.FileHandler(
-			file_name
-			,mode = 'x'
-			,encoding = 'utf-8'
-		)
-
-
-	except FileExistsError:
-
-		logging.error(f'Log file \'{file_name}\' already exists')
-
-		raise
-
-
-
-	if formatter is not None:
-
-		logging.debug('Setting log FileHandler Formatter')
-		handler.setFormatter(formatter)
-
-
-
-	logging.debug('Adding FileHandler to Logger')
-	logging.getLogger().addHandler(handler)
-
-
-
-def _connect_gdb(
-	server
-	,database
-):
-	'''
-	Create temporary geodatabase connection using OS authentication
-
-	Returns tempfile.TemporaryDirectory object, along with geodatabase
-	connection file. You must retain a reference to the returned
-	TemporaryDirectory, else it will go out-of-scope and automatically
-	delete itself - including the connection file it contains. Retaining
-	a reference to the file, itself, is not sufficient to prevent automatic
-	cleanup.
-	'''
-
-
-	# Check Windows credentials
-
-	try:
-
-		_check_credentials()
-
-
-	except RuntimeError as e:
-
-		raise
-
-
-
-	# Create connection
-
-	temp_dir = tempfile.TemporaryDirectory()
-	logging.debug(f'Created temporary directory {temp_dir.name}')
-
-
-
-	arcpy.management.CreateDatabaseConnection(
-		out_folder_path = temp_dir.name
-		,out_name = C.CONNECTION_FILE_NAME
-		,database_platform = 'SQL_SERVER'
-		,instance = server
-		,account_authentication = 'OPERATING_SYSTEM_AUTH'
-		,database = database
+	g.add_argument(
+		'-q'
+		,'--jpeg-quality'
+		,default = photo_processing.JPEG_QUALITY_DEFAULT
+		,dest = 'jpeg_quality'
+		,help = f'JPEG quality (1-95) for reduced photos (default: {photo_processing.JPEG_QUALITY_DEFAULT})'
+		,metavar = '<jpeg_quality>'
+		,required = False
+		,type = int
 	)
 
-
-	gdb = os.path.join(
-		temp_dir.name
-		,C.CONNECTION_FILE_NAME
+	g.add_argument(
+		'-t'
+		,'--thumbnail-dimension'
+		,dest = 'thumbnail_dimension'
+		,help = 'Load a thumbnail attachment of each photo, no larger than this width or height (pixels), and backfill thumbnails of existing attachments; omit to skip thumbnails'
+		,metavar = '<thumbnail_dimension>'
+		,required = False
+		,type = int
 	)
-	logging.debug(f'Created database connection file: {gdb}')
-
 
-
-	# Validate geodatabase connection
-	#
-	# Creating connection file does not appear to test connection, just
-	# write properties to file
-
-	logging.debug('Validating geodatabase connection')
-	try:
-
-		# Describe raises:
-		#	IOError if target is not a recognized object type
-		#	OSError if target does not exist
-
-		d = arcpy.Describe(gdb)
-		logging.debug(f'Describe type: {d.dataType}')
-
-
-
-		# Referencing workspaceType raises AttributeError if target is not a workspace
-
-		if not d.workspaceType == 'RemoteDatabase':
-
-			# Explicitly raise exception if target is not an enterprise geodatabase
-
-			raise TypeError(f'Expected RemoteDatabase type; got {d.workspaceType} type')
-
-
-	except (
-		IOError
-		,OSError
-		,AttributeError
-		,TypeError
-	) as e:
-
-		raise RuntimeError('Invalid enterprise geodatabase') from e
-
-
-
-	# Return connection file AND TemporaryDirectory; see function header
-	# comments for details
-
-	return(
-		gdb
-		,temp_dir
+	g.add_argument(
+		'-w'
+		,'--workers'
+		,default = os.cpu_count() or 1
+		,dest = 'workers'
+		,help = 'Number of workers for reading / reducing photo files (default: number of CPUs)'
+		,metavar = '<workers>'
+		,required = False
+		,type = int
 	)
 
-
-
-def _initialize_logging(
-	level = logging.NOTSET
-):
-	'''
-	Configure basic console logging
-
-	When running in script mode, this function is called early to establish
-	a basic communication channel with the user. The intent is to perform
-	minimial configuration here - both to reduce the possiblity of errors
-	before the channel is ready, and to avoid expensive processing if the
-	script exits early (e.g. invalid argument) - while also building some
-	of the foundation for more robust logging that may be specified in
-	the script's runtime arguments.
-
-	Use the `logging` module's root logger, and send all messages to stdout.
-	Log at the most verbose level (NOTSET) to avoid suppressing useful
-	messages in case of early problems, with the expectation that the
-	script will choose a more reasonable level after processing arguments.
-	Define custom formatting now, to avoid early messages looking
-	differently than later ones.
-
-	The custom implementations includes attributes and methods that mimic
-	those of the built-in levels, including:
-
-		Logging level macros
-
-			logging.DATA
-			logging.DATADEBUG
-
-		Wrapper functions, at module level
-
-			logging.data('message')
-			logging.datadebug('message')
-
-		Wrapper functions, at root logger level
-
-			l = logging.getLogger()
-			l.data('message')
-			l.datadebug('message')
-
-	Returns formatter, for use with other handlers.
-	'''
-
-
-	# Configure custom DATA level
-
-	logging.DATA = mg.LOG_LEVEL_DATA
-
-	logging.addLevelName(
-		logging.DATA
-		,'DATA'
+	g.add_argument(
+		'-s'
+		,'--state-db'
+		,dest = 'state_file'
+		,help = 'Local photo state database (SQLite) for tracking loaded photos by content across runs; created if it does not exist'
+		,metavar = '<state_db>'
+		,required = False
 	)
 
-	logging.data = _logging_data
-	logging.getLogger().data = _logging_data
-
-
-
-	# Configure custom DATADEBUG level
-
-	logging.DATADEBUG = mg.LOG_LEVEL_DATADEBUG
-
-	logging.addLevelName(
-		logging.DATADEBUG
-		,'DATADEBUG'
+	g.add_argument(
+		'-S'
+		,'--sync'
+		,action = 'store_true'
+		,dest = 'sync'
+		,help = 'Process only photos whose file or index record changed since they were last loaded; requires --state-db'
+		,required = False
 	)
 
-	logging.datadebug = _logging_datadebug
-	logging.getLogger().datadebug = _logging_datadebug
+	g.add_argument(
+		'-r'
+		,'--remove-missing'
+		,action = 'store_true'
+		,dest = 'remove_missing'
+		,help = 'Delete attachments loaded from photos that are no longer in the photo index; requires --state-db'
+		,required = False
+	)
 
+	g.add_argument(
+		'-R'
+		,'--resume'
+		,action = 'store_true'
+		,dest = 'resume'
+		,help = 'Resume interrupted run, skipping photos it already loaded; requires --state-db'
+		,required = False
+	)
 
+	g.add_argument(
+		'-j'
+		,'--report'
+		,dest = 'report_file'
+		,help = 'JSON file to write final metrics report to, including throughput and stage latency'
+		,metavar = '<report_file>'
+		,required = False
+	)
 
-	# Formatter
+	g.add_argument(
+		'-V'
+		,'--validate-only'
+		,action = 'store_true'
+		,dest = 'validate_only'
+		,help = 'Validate photo index and report defects, without loading photos'
+		,required = False
+	)
 
-	f = mg.FormatterIndent(
-		fmt = mg.LOG_FORMAT
-		,datefmt = mg.LOG_FORMAT_DATE
+	g.add_argument(
+		'-E'
+		,'--rejects-file'
+		,dest = 'rejects_file'
+		,help = 'Write every warning, in full, to JSON lines file, with source keys and reason codes of rejected photos; must not exist; use suffix .gz to compress'
+		,metavar = '<rejects_file>'
+		,required = False
 	)
 
+	g.add_argument(
+		'-K'
+		,'--only-keys'
+		,dest = 'only_keys_file'
+		,help = 'Load only the photos rejected in this rejects file, or listed in this file, one photo file name per line; incompatible with --remove-missing'
+		,metavar = '<only_keys_file>'
+		,required = False
+	)
 
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
 
-	# Handler
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
 
-	h = logging.StreamHandler(sys.stdout)
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
 
-	h.setFormatter(f)
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
 
 
 
-	# Logger
+	return ap
 
-	l = logging.getLogger()
 
-	l.setLevel(level)
-	l.addHandler(h)
 
+def _filter_journal(
+	photos # Iterable of Photo
+	,state # PhotoState
+	,metrics_input # MetricsInput
+):
+	'''
+	Yield photos not committed by the interrupted run being resumed
+	
+	Journaled photos are skipped before their files are read or their
+	target rows are queried.
+	'''
+	
+	for photo in photos:
+	
+		if state.is_journaled_photo(photo.photo_uuid):
+		
+			logging.debug(f'Photo loaded by interrupted run; skipping: File {photo.file_name}')
+			metrics_input.resume_skipped += 1
+			continue
+			
+			
+		yield photo
 
 
-	# Return
 
-	return f
+def _filter_sync(
+	photos # Iterable of Photo
+	,state # PhotoState
+	,snapshot # Photo directory snapshot from _scan_photo_dir()
+	,metrics_input # MetricsInput
+):
+	'''
+	Yield photos whose file or index metadata changed since they were last
+	loaded, or that have not been loaded
+	
+	Compares file status from the photo directory snapshot, so unchanged
+	photos are skipped without reading the file. Photos missing from the
+	snapshot are yielded, so that the read failure is reported.
+	'''
+	
+	for photo in photos:
+	
+		record = state.find_sync(photo.photo_uuid)
+		
+		
+		if (
+			record is not None
+			and record['file_name'] == photo.file_name
+			and record['metadata_hash'] == photo.metadata_hash
+			and (
+				record['file_size']
+				,record['file_mtime_ns']
+			) == snapshot.get(os.path.normcase(photo.file_name))
+		):
+		
+			logging.debug(f'Photo unchanged since {record["synced"]}; skipping: File {photo.file_name}')
+			metrics_input.sync_unchanged += 1
+			continue
+			
+			
+		yield photo
 
 
 
-def _logging_data(
-	msg
-	,*args
-	,**kwargs
+def _generate_photos(
+	index_records # Valid IndexRecord instances, from validate_index()
+	,photo_dir
+	,tag_columns
+	,metrics_input # MetricsInput
 ):
 	'''
-	Create function for custom logging.DATA level
-
-	This function will be bound to the logging module and the root logger
-	the root logger to match the convenience functions for the built-in
-	log levels. For example: logging.data('message')
+	Yield Photo instances for validated photo index records
+	
+	Records that fail metadata analysis are logged and counted in
+	`metrics_input`, and are not yielded.
 	'''
 
-	logging.log(
-		logging.DATA
-		,msg
-		,*args
-		,**kwargs
-	)
+	for index_record in index_records:
+	
+		logging.datadebug(f'Photo index record:\n{index_record}')
+		
+		
+		
+		# Gather photo metadata
+		
+		try:
+		
+			photo = Photo(
+				index_record = index_record
+				,photo_dir = photo_dir
+				,tag_columns = tag_columns
+			)
+			logging.datadebug(f'Photo:\n{photo}')
+			
 
+		except ValueError as e:
+		
+			logging.warning(
+				f'Skipping photo: {e}'
+				,extra = {'event': 'photo_rejected', 'stage': 'metadata', 'file_name': index_record.FileName} # See mg.aggregate_warnings()
+			)
+			metrics_input.metadata_failed += 1
+			continue
+			
+			
+			
+		# Log valid metadata
+		
+		logging.debug('Photo metadata is valid')
+		metrics_input.metadata_succeeded += 1
+		
+		
+		yield photo
 
 
-def _logging_datadebug(
-	msg
-	,*args
-	,**kwargs
-):
-	'''
-	Create function for custom logging.DATADEBUG level
 
-	This function will be bound to the logging module and the root logger
-	the root logger to match the convenience functions for the built-in
-	log levels. For example: logging.datadebug('message')
+def _get_tag_columns(fields):
 	'''
-
-	logging.log(
-		logging.DATADEBUG
-		,msg
-		,*args
-		,**kwargs
-	)
+	Return list of photo index tag column names, in index order
+	'''
+	
+	return [
+		field
+		for field in fields
+		if PATTERN_TAG_COLUMN.fullmatch(field)
+	]
 
 
 
@@ -2261,6 +5139,21 @@ def _print_banner(
 		f'Log level:                         {args.log_level}\n'
 		f'Log file:                          {args.log_file_name}\n'
 		f'Feedback:                          {args.feedback}\n'
+		f'Photo maximum dimension:           {args.max_dimension}\n'
+		f'Photo JPEG quality:                {args.jpeg_quality}\n'
+		f'Thumbnail maximum dimension:       {args.thumbnail_dimension}\n'
+		f'Workers:                           {args.workers}\n'
+		f'Photo state database:              {args.state_file}\n'
+		f'Sync mode:                         {args.sync}\n'
+		f'Remove missing photos:             {args.remove_missing}\n'
+		f'Resume:                            {args.resume}\n'
+		f'Metrics report file:               {args.report_file}\n'
+		f'Validate only:                     {args.validate_only}\n'
+		f'Rejects file:                      {args.rejects_file}\n'
+		f'Only keys file:                    {args.only_keys_file}\n'
+		f'Profile file:                      {args.profile_file}\n'
+		f'Profile mode:                      {args.profile_mode}\n'
+		f'Trace arcpy:                       {args.trace_arcpy}\n'
 		f'{mg.BANNER_DELIMITER_1}'
 	)
 
@@ -2274,6 +5167,7 @@ def _print_banner(
 
 def _process_arguments(
 	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
 ):
 	'''
 	Process arguments for main block
@@ -2295,7 +5189,7 @@ def _process_arguments(
 
 	# Fetch argument values
 
-	args = parser.parse_args()
+	args = parser.parse_args(argv)
 
 
 
@@ -2319,7 +5213,7 @@ def _process_arguments(
 	if args.log_file_name is not None:
 
 		logging.debug(f'Configuring log file {args.log_file_name}')
-		_configure_log_file(
+		mg.configure_log_file(
 			args.log_file_name
 			,log_formatter
 		)
@@ -2336,6 +5230,88 @@ def _process_arguments(
 
 
 
+	#
+	# Verify photo reduction, thumbnails, and workers
+	#
+
+	if (
+		args.max_dimension is not None
+		and not args.max_dimension > 0
+	):
+
+		raise ValueError('Maximum photo dimension must be greater than zero')
+
+
+	if (
+		args.thumbnail_dimension is not None
+		and not args.thumbnail_dimension > 0
+	):
+
+		raise ValueError('Maximum thumbnail dimension must be greater than zero')
+
+
+	if (
+		args.max_dimension is not None
+		or args.thumbnail_dimension is not None
+	):
+
+		if importlib.util.find_spec('PIL') is None: # Imported where used
+
+			raise RuntimeError('Photo reduction and thumbnails require the Pillow package')
+
+
+	if not 1 <= args.jpeg_quality <= 95:
+
+		raise ValueError('JPEG quality must be between 1 and 95')
+
+
+	if not args.workers > 0:
+
+		raise ValueError('Number of workers must be greater than zero')
+
+
+
+	#
+	# Verify sync options
+	#
+
+	if (
+		(
+			args.sync
+			or args.remove_missing
+			or args.resume
+		)
+		and args.state_file is None
+	):
+
+		raise ValueError('Sync mode, removal of missing photos, and resume require a photo state database (--state-db)')
+
+	if (
+		args.remove_missing
+		and args.only_keys_file is not None
+	):
+
+		raise ValueError('Removal of missing photos cannot be combined with only keys (--only-keys)')
+
+
+
+	#
+	# Verify rejects file
+	#
+	# The rejects file is created when loading starts, before the keys file
+	# is read
+	#
+
+	if (
+		args.rejects_file is not None
+		and args.only_keys_file is not None
+		and os.path.normcase(os.path.abspath(args.rejects_file)) == os.path.normcase(os.path.abspath(args.only_keys_file))
+	):
+
+		raise ValueError('Rejects file (--rejects-file) must differ from only keys file (--only-keys)')
+
+
+
 	# Standardize paths
 	#
 	# Relative paths break some arcpy functionality (e.g. accessing Excel
@@ -2344,6 +5320,14 @@ def _process_arguments(
 	index_file = os.path.abspath(args.index_file)
 	photo_dir = os.path.abspath(args.photo_dir)
 
+	if args.state_file is not None:
+
+		args.state_file = os.path.abspath(args.state_file)
+
+	if args.report_file is not None:
+
+		args.report_file = os.path.abspath(args.report_file)
+
 
 
 	#
@@ -2358,6 +5342,260 @@ def _process_arguments(
 
 
 
+def _read_ahead(
+	photos # Iterable of Photo
+	,executor # concurrent.futures.Executor
+	,window # Maximum number of photo files read ahead
+	,max_dimension = None
+	,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+	,thumbnail_dimension = None
+):
+	'''
+	Submit photo files to executor for reading, and yield (photo, future)
+	tuples in photo order
+	
+	At most `window` files are in flight or awaiting the consumer at once,
+	which bounds memory use regardless of the number of photos. Exceptions
+	raised while reading a file are raised by the future's result() method,
+	so the consumer can handle them per photo.
+	'''
+	
+	pending = collections.deque()
+	
+	
+	for photo in photos:
+	
+		pending.append(
+			(
+				photo
+				,executor.submit(
+					photo_processing.read_photo
+					,photo_file = photo.photo_file
+					,max_dimension = max_dimension
+					,jpeg_quality = jpeg_quality
+					,thumbnail_dimension = thumbnail_dimension
+				)
+			)
+		)
+		
+		
+		if len(pending) >= window:
+		
+			yield pending.popleft()
+			
+			
+			
+	while len(pending) > 0:
+	
+		yield pending.popleft()
+
+
+
+def _remove_missing(
+	gdb
+	,state # PhotoState
+	,photo_uuids # Set of photo UUIDs currently in photo index
+	,metrics_output # MetricsOutput
+):
+	'''
+	Delete attachments loaded from photos that are no longer in the photo
+	index, and their state records
+	
+	Only attachments recorded in the state database are considered. An
+	attachment shared by identical photos is kept while any of them
+	remains in the index.
+	'''
+	
+	logging.info('Removing attachments for photos missing from index')
+	
+	
+	if len(photo_uuids) == 0:
+	
+		logging.warning('Photo index contains no photos; skipping removal of missing photos')
+		return
+		
+		
+		
+	for record in state.find_missing(photo_uuids):
+	
+		if state.is_attached(
+			table_name = record['table_name']
+			,attachmentid = record['attachmentid']
+			,photo_uuids = photo_uuids
+		):
+		
+			logging.debug(f'Attachment is shared with a photo still in index; keeping: attachmentid {record["attachmentid"]}')
+			
+		else:
+		
+			logging.debug(f'Deleting attachment: Table {record["table_name"]} attachmentid {record["attachmentid"]} File {record["att_name"]}')
+			
+			with arcpy.da.UpdateCursor(
+				in_table = os.path.join(
+					gdb
+					,record['table_name']
+				)
+				,field_names = 'attachmentid'
+				,where_clause = f'attachmentid = {record["attachmentid"]}'
+			) as cursor:
+			
+				for row in cursor:
+				
+					cursor.deleteRow()
+					metrics_output.attachment_deleted += 1
+					
+					
+					
+		state.delete(
+			table_name = record['table_name']
+			,rel_globalid = record['rel_globalid']
+			,photo_uuid = record['photo_uuid']
+		)
+		
+		state.delete_sync(record['photo_uuid'])
+
+
+
+def _report_defects(
+	file_names # Photo index FileName column
+	,defects # List of defect message lists, per photo index record
+):
+	'''
+	Log all photo index defects in one report, summarized by defect type,
+	and then one warning per defective record, as a photo reject
+	'''
+	
+	count_defective = sum(1 for d in defects if len(d) > 0)
+	
+	
+	if count_defective == 0:
+	
+		logging.info(f'Photo index validation found no defects in {len(defects):n} records')
+		return
+		
+		
+		
+	# Summary
+	
+	summary = collections.Counter(
+		d.split(':')[0]
+		for record_defects in defects
+		for d in record_defects
+	)
+	
+	message = f'Photo index validation found defects in {count_defective:n} of {len(defects):n} records'
+	
+	for (
+		defect
+		,count
+	) in summary.most_common():
+	
+		message += f'\n\t{defect:<60s}{count:>8n}'
+		
+		
+		
+	logging.warning(message)
+	
+	
+	
+	# Details
+	#
+	# Record numbers are one-based data rows, excluding header
+	
+	for (
+		i
+		,record_defects
+	) in enumerate(defects):
+	
+		if len(record_defects) > 0:
+		
+			logging.warning(
+				f'Defective photo index record {i + 1}: File {file_names[i]}: {"; ".join(record_defects)}'
+				,extra = {'event': 'photo_rejected', 'stage': 'validate_index', 'file_name': file_names[i], 'reason': mg.WarningAggregator.reason("; ".join(record_defects))} # See mg.aggregate_warnings()
+			)
+
+
+
+def _scan_photo_dir(photo_dir):
+	'''
+	Snapshot photo directory in a single scan
+	
+	Returns dict of file name: (size, mtime_ns) tuples, keyed by
+	os.path.normcase(file name), so look up file names the same way
+	'''
+	
+	snapshot = {}
+	
+	
+	with os.scandir(photo_dir) as entries:
+	
+		for entry in entries:
+		
+			if entry.is_file():
+			
+				stat = entry.stat()
+				
+				snapshot[os.path.normcase(entry.name)] = (
+					stat.st_size
+					,stat.st_mtime_ns
+				)
+				
+				
+	return snapshot
+
+
+
+def _update_attachment_metrics(
+	metrics_output # MetricsOutput
+	,metrics_timing # MetricsTiming
+	,attachment # Attachment, after load()
+):
+	'''
+	Add attachment actions to output metrics, add attachment content
+	sizes once for each attachment row written, and add attachment stage
+	times to timing metrics
+	'''
+	
+	metrics_output.attachment_inserted += attachment.count_inserted
+	metrics_output.attachment_replaced += attachment.count_replaced
+	metrics_output.attachment_unchanged += attachment.count_unchanged
+	
+	if metrics_output.thumbnail_inserted is not None: # Thumbnails enabled
+	
+		metrics_output.thumbnail_inserted += attachment.count_thumbnail_inserted
+		metrics_output.thumbnail_replaced += attachment.count_thumbnail_replaced
+	
+	
+	count_loaded = (
+		attachment.count_inserted
+		+ attachment.count_replaced
+	)
+	
+	metrics_output.size_original += attachment.photo.data_size_original * count_loaded
+	metrics_output.size_loaded += attachment.data_size * count_loaded
+	
+	metrics_output.bytes_written += attachment.data_size * count_loaded
+	
+	if attachment.photo.thumbnail is not None:
+	
+		metrics_output.bytes_written += len(attachment.photo.thumbnail) * (
+			attachment.count_thumbnail_inserted
+			+ attachment.count_thumbnail_replaced
+		)
+		
+		
+	metrics_timing.add(
+		stage = 'lookup'
+		,seconds = attachment.seconds_lookup
+	)
+	
+	metrics_timing.add(
+		stage = 'write'
+		,seconds = attachment.seconds_write
+	)
+
+
+
 ################################################################################
 # Main
 ################################################################################
@@ -2376,7 +5614,7 @@ if __name__ == '__main__':
 	# Keep a reference to the formatter so we can use it with other handlers
 	# (e.g. FileHandler)
 
-	log_formatter = _initialize_logging()
+	log_formatter = mg.initialize_logging()
 
 
 
@@ -2404,16 +5642,28 @@ if __name__ == '__main__':
 
 
 
+	# Validate photo index only; no geodatabase connection needed
+
+	if args.validate_only:
+
+		validate_index(
+			index_file = index_file
+			,photo_dir = photo_dir
+		)
+
+		logging.info('Done.')
+
+		sys.exit()
+
+
+
 	# Connect to geodatabase
 
 	logging.info('Connecting to geodatabase')
 
 	try:
 
-		(
-			gdb
-			,temp_dir
-		) = _connect_gdb(
+		gdb = mg.connect_gdb(
 			server = args.gdb_server
 			,database = args.database
 		)
@@ -2428,15 +5678,43 @@ if __name__ == '__main__':
 
 
 	#
-	# Load data
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy); repeated warnings are summarized by reason
 	#
 
-	load_photos(
-		index_file = index_file
-		,photo_dir = photo_dir
-		,gdb = gdb
-		,feedback = args.feedback
-	)
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+		,mg.aggregate_warnings(
+			rejects_file = args.rejects_file
+		)
+	):
+
+		#
+		# Load data
+		#
+
+		load_photos(
+			index_file = index_file
+			,photo_dir = photo_dir
+			,gdb = gdb
+			,feedback = args.feedback
+			,max_dimension = args.max_dimension
+			,jpeg_quality = args.jpeg_quality
+			,workers = args.workers
+			,state_file = args.state_file
+			,sync = args.sync
+			,remove_missing = args.remove_missing
+			,resume = args.resume
+			,thumbnail_dimension = args.thumbnail_dimension
+			,report_file = args.report_file
+			,only_keys_file = args.only_keys_file
+		)
 
 
 
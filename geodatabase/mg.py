@@ -39,6 +39,208 @@
 #	For details about the custom `FormatterIndent` class, including the
 #	`indent_level` payload, see the comments within the class code below.
 #
+#	For log aggregation, `FormatterJSON` writes each record as one JSON
+#	object per line, including any `extra` keys as structured fields. The
+#	hydro scripts use it for log files named with LOG_FILE_SUFFIX_JSON.
+#
+#
+#
+#	LOGGING QUEUE
+#
+#	Console output is slow, particularly on Windows, and the loaders log
+#	several records per row. `initialize_logging()` therefore attaches a
+#	`LogQueueHandler` to the root logger, which only puts records on a
+#	queue; a `logging.handlers.QueueListener` thread formats them and
+#	writes them to the console and any handlers added with
+#	`add_log_handler()` (e.g. a log file).
+#
+#	Records are not formatted until the listener thread handles them, so
+#	do not mutate objects passed as logging arguments after logging them;
+#	the hydro scripts log f-strings.
+#
+#	`stop_logging()` writes any queued records and stops the thread; it
+#	runs at exit, and before an unhandled exception's traceback is
+#	printed, so no records are lost and the traceback comes last. Records
+#	logged afterwards are written directly by the same handlers.
+#
+#
+#
+#	CONNECTION FILE CACHE
+#
+#	Creating an enterprise geodatabase connection file and validating it
+#	with a Describe round-trip takes several seconds, so `connect_gdb()`
+#	caches validated connection files per (server, database) in a private
+#	per-user directory. A cached file younger than its time-to-live (TTL)
+#	is handed out without any round-trip; an older file is revalidated
+#	with Describe only, and recreated if that fails. Within one process,
+#	each connection is validated at most once.
+#
+#	Connection files use operating system authentication, so they contain
+#	no credentials. Delete the cache directory to force new connections.
+#
+#
+#
+#	SCRIPT BOOTSTRAP
+#
+#	The hydro scripts share their script mode setup through this module:
+#	`initialize_logging()` (console logging, with the custom DATA and
+#	DATADEBUG levels), `configure_log_file()` (--log-file), and
+#	`connect_gdb()`, which checks the Windows user (`check_credentials()`)
+#	before connecting. Their --log-level choices are LOG_LEVEL_NAMES.
+#
+#
+#
+#	LAZY IMPORTS
+#
+#	Importing arcpy takes several seconds, which scripts would otherwise pay
+#	before parsing arguments - even for --help, argument errors, or modes
+#	that do not touch a geodatabase. This module and the hydro scripts
+#	therefore bind `arcpy` with `lazy_import()`, which defers the actual
+#	import until the first attribute access (e.g. arcpy.da.SearchCursor).
+#	To measure startup, run a script with `python -X importtime`; arcpy
+#	should not appear in the output for commands that do not use it.
+#
+#	Avoid touching `arcpy` at module level (e.g. in constants or default
+#	argument values), which would trigger the import early; see
+#	constants.py for lazily built constants.
+#
+#
+#
+#	PROFILING
+#
+#	`profile()` wraps a block of work (e.g. the main block of a script,
+#	behind its --profile option) and reports where the time goes, without
+#	editing code. It supports two modes:
+#
+#		deterministic	cProfile; records every Python function call.
+#				Writes a .pstats file for pstats, snakeviz, etc.
+#				Adds overhead to call-heavy code such as cursor
+#				loops, so total times run long.
+#
+#		sample		Background thread records the stack of the
+#				profiled thread at a fixed interval. Overhead is
+#				low and independent of call volume, so it suits
+#				long production runs. Writes folded stacks (one
+#				line per distinct stack, with its sample count)
+#				for flame graph tools.
+#
+#	Both modes log the top functions by cumulative time, through the
+#	usual log handlers. Only the calling thread is profiled; work in
+#	worker processes (e.g. photo reduction) appears as time waiting for
+#	results.
+#
+#
+#
+#	ARCPY CALL TRACING
+#
+#	Most wall time in the hydro scripts is spent inside arcpy, where
+#	neither profiling mode can see individual round-trips. `trace_arcpy()`
+#	temporarily replaces arcpy entry points with timing wrappers:
+#
+#		o Geoprocessing tools in arcpy.management
+#		o arcpy.da cursors (construction, each row fetched, inserted,
+#		  updated, or deleted), Editor methods, and ListDomains
+#		o arcpy.Describe and arcpy.AlterAliasName
+#
+#	Calls are aggregated by operation and call site (file, line, and
+#	calling function); cursor rows are attributed to the call site that
+#	opened the cursor. At the end of the block, a table with call counts,
+#	total, mean, and 95th percentile latency, and rows moved is logged,
+#	slowest call site first.
+#
+#	Tracing adds about a microsecond per call, and replaces arcpy.da cursor
+#	and Editor classes with factory functions, so it is opt-in (e.g.
+#	--trace-arcpy); do not rely on isinstance() checks against them while
+#	tracing.
+#
+#
+#
+#	TASK GRAPHS
+#
+#	`TaskGraph` runs named tasks that declare the tasks they depend on
+#	(e.g. a relationship class depends on its origin and destination
+#	tables). Independent tasks run concurrently in worker processes, each
+#	with its own arcpy import and geodatabase connection. Log messages from
+#	a worker are captured and logged together by the calling process when
+#	the task finishes, so messages from concurrent tasks do not interleave.
+#	A report of per-task timings and the critical path (the longest chain
+#	of dependent tasks, which bounds the elapsed time) is logged at the
+#	end.
+#
+#	Task functions and arguments must be picklable; use module-level
+#	functions.
+#
+#
+#
+#	SCHEMA RECORDING
+#
+#	Within `record_schema()`, the object creation functions
+#	`create_domain_cv()`, `create_fc()`, `create_rc()`, and
+#	`create_table()` make no geodatabase changes; each appends
+#	(object type, arguments) to the recorded list instead. Running a
+#	model's creation code this way yields its complete desired state,
+#	which a migration can compare with a live geodatabase (see
+#	migrate_hydro_data_model.py), and replay for objects that are missing.
+#
+#
+#
+#	SCHEMA SNAPSHOTS
+#
+#	Each catalog question (does a table exist, what are a domain's codes)
+#	is a round-trip to the database. `SchemaSnapshot` reads the catalog
+#	once - one arcpy.da.ListDomains() call for domains, and one workspace
+#	arcpy.Describe() for tables, feature classes, relationship classes,
+#	and their fields - and answers later questions from memory. Domains
+#	and datasets are read separately, on first use.
+#
+#	The DDL functions in this module (e.g. `create_table()`,
+#	`add_fields()`) invalidate the objects they change in every snapshot
+#	of the same geodatabase in this process; a changed dataset is reread
+#	with one Describe on next use, and changed domains with one
+#	ListDomains. Changes made by other processes (e.g. TaskGraph workers)
+#	or directly through arcpy are not seen; call `invalidate()` after
+#	them.
+#
+#	Snapshot contents are plain JSON-serializable values. With a file
+#	name, a snapshot is saved by `save()` and reused by later runs within
+#	its time-to-live (TTL), e.g. for repeated migration dry runs. By
+#	convention, the file sits next to the connection file, with suffix
+#	SCHEMA_SNAPSHOT_SUFFIX; see `schema_snapshot_file()`.
+#
+#	Invalidation also deletes the saved file, both the snapshot's own and
+#	the conventional one for its geodatabase, so DDL in any process using
+#	this module (e.g. create_hydro_data_model.py, then a migration dry run)
+#	is never hidden by the TTL. DDL made directly through arcpy, outside
+#	this module and without `invalidate()`, can still be hidden until the
+#	TTL expires.
+#
+#
+#
+#	WARNING AGGREGATION
+#
+#	The loaders warn once per rejected row, so a systematic problem (e.g.
+#	a new data logger type) buries the log in thousands of identical
+#	warnings. Within `aggregate_warnings()`, a `WarningAggregator` filter
+#	on the root logger groups warnings by reason - the first line of the
+#	message, with identifiers, numbers, and quoted values replaced by
+#	placeholders, or the `reason` key of the `extra` argument, if any. The
+#	first WARNING_EXAMPLES warnings for each reason are logged; the rest
+#	are only counted, and a table of reasons by descending count is logged
+#	when the block ends.
+#
+#	Optionally, every warning, suppressed or not, is also written in full
+#	to a rejects file, in FormatterJSON format, with the reason and a
+#	reason code (a short hash of the reason, stable across runs) added;
+#	names ending with .gz are gzip-compressed. Like log files, an existing
+#	rejects file is never overwritten.
+#
+#	Warnings about rejected source rows carry structured fields in
+#	`extra`: an `event` such as 'location_rejected', the `stage` at which
+#	the row was rejected, and the row's source keys (e.g. `location_id`).
+#	`read_keys()` reads the keys of rejected rows back from a rejects
+#	file, and `where_in()` builds a where clause selecting only those
+#	rows, so a loader can reprocess just the rejects of an earlier run.
+#
 # History:
 #	2022-07-18 MCM Created
 #	2022-11-21 MCM Added attachment upgrade support (Hydro 55)
@@ -46,6 +248,41 @@
 #	2023-03-13 MCM Changed `attachments_upgrade` default to True
 #	2023-11-27 MCM Added asdict()
 #	2024-10-22 MCM Added create_view()
+#	2026-10-18 MCM Added connect_gdb() connection file cache and
+#	                 validate_gdb()
+#	               Added lazy_import(), and import arcpy lazily
+#	               Added profile() and StackSampler
+#	               Added trace_arcpy() and ArcpyTracer
+#	               Batch fields in add_fields() with AddFields
+#	               Load create_domain_cv() codes with TableToDomain, and
+#	                 update existing domains idempotently
+#	               Added TaskGraph
+#	               Added record_schema()
+#	               Added SchemaSnapshot, and invalidate it from DDL functions
+#	               Indent messages in FormatterIndent without copying
+#	                 records, with cached indents
+#	               Added FormatterJSON
+#	               Added initialize_logging(), add_log_handler(),
+#	                 stop_logging(), and LogQueueHandler to write log
+#	                 records on a background thread
+#	               Compile asdict() serializers per class and attributes,
+#	                 with converters by value type
+#	               Read existing domains in create_domain_cv() from
+#	                 SchemaSnapshot
+#	               Added aggregate_warnings() and WarningAggregator
+#	               Added reason codes to rejects files, and read_keys() and
+#	                 where_in() to reprocess rejected rows
+#	               Do not overwrite rejects files; drop null keys in
+#	                 read_keys() and where_in(), and chunk IN lists
+#	               Added check_credentials(), configure_log_file(), and
+#	                 LOG_LEVEL_NAMES; check credentials in connect_gdb(),
+#	                 and add DATA and DATADEBUG levels in
+#	                 initialize_logging(), for all scripts
+#	               Added connect_gdb() prompt argument, to check an invalid
+#	                 connection file before it is deleted
+#	               Delete saved SchemaSnapshot file on invalidation, so DDL
+#	                 from other processes is not hidden by the TTL; added
+#	                 schema_snapshot_file()
 #
 # To do:
 #	none
@@ -58,14 +295,35 @@
 # Modules
 #
 
-import arcpy
-import copy
+import array
+import atexit
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
 import datetime
+import functools
+import getpass
+import gzip
+import hashlib
+import importlib.util
 import inspect
+import io
 import json
 import logging
+import logging.handlers
+import math
+import operator
 import os
+import pstats
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
 import uuid
+import weakref
 
 
 
@@ -100,10 +358,88 @@ JSON_INDENT = 4
 #
 
 LOG_FORMAT = '%(asctime)s.%(msecs)-3d %(levelname)-9s %(message)s' # msecs occasionally returns two digits instead of three; right-pad with space character to preserve alignment, if necessary
+LOG_FILE_SUFFIX_JSON = '.jsonl' # Log files with this suffix are written with FormatterJSON
 LOG_FORMAT_DATE = '%Y-%m-%d %H:%M:%S'
 LOG_INDENT_HEADER = 34 # For indenting multi-line messages; currently set to line header length
 LOG_LEVEL_DATA = logging.DEBUG - 1
 LOG_LEVEL_DATADEBUG = logging.DEBUG - 2
+LOG_LEVEL_NAMES = ( # Script --log-level choices; see initialize_logging()
+	'CRITICAL'
+	,'ERROR'
+	,'WARNING'
+	,'INFO'
+	,'DEBUG'
+	,'DATA'
+	,'DATADEBUG'
+)
+
+
+
+#
+# Database connections
+#
+
+CONNECTION_CACHE_DIR = os.path.join( # Private, per-user cache of validated connection files
+	tempfile.gettempdir()
+	,f'mg_connections_{getpass.getuser()}'
+)
+CONNECTION_CACHE_TTL = 3600 # Seconds a cached connection file is trusted before revalidation
+CREDENTIALS_USER = 'HYDRO' # Windows user for OS authentication; see check_credentials()
+
+
+
+#
+# Profiling
+#
+
+PROFILE_INTERVAL = 0.01 # Seconds between stack samples, in sample mode
+PROFILE_MODE_DETERMINISTIC = 'deterministic'
+PROFILE_MODE_SAMPLE = 'sample'
+PROFILE_MODES = (
+	PROFILE_MODE_DETERMINISTIC
+	,PROFILE_MODE_SAMPLE
+)
+PROFILE_TOP = 25 # Functions listed in profile summary
+
+
+
+#
+# arcpy call tracing
+#
+
+TRACE_ARCPY_DA = ( # arcpy.da names to trace
+	'Editor'
+	,'InsertCursor'
+	,'ListDomains'
+	,'SearchCursor'
+	,'UpdateCursor'
+)
+TRACE_ARCPY_EDITOR = ( # arcpy.da.Editor methods to trace
+	'abortOperation'
+	,'startEditing'
+	,'startOperation'
+	,'stopEditing'
+	,'stopOperation'
+)
+TRACE_ARCPY_ROOT = ( # arcpy names to trace; all arcpy.management tools are traced
+	'AlterAliasName'
+	,'Describe'
+)
+TRACE_PERCENTILE = 0.95
+
+
+
+#
+# Schema snapshots
+#
+
+SCHEMA_SNAPSHOT_SUFFIX = '.schema.json' # Appended to connection file name, without extension
+SCHEMA_SNAPSHOT_TTL = 600 # Seconds a persisted snapshot is trusted before rereading
+SCHEMA_SNAPSHOT_TYPES = ( # arcpy.Describe dataType values in snapshots
+	'FeatureClass'
+	,'RelationshipClass'
+	,'Table'
+)
 
 
 
@@ -116,10 +452,268 @@ LAST_EDITOR_TIMESTAMP = 'EditTimestamp'
 
 
 
+#
+# Warning aggregation
+#
+
+WARNING_EXAMPLES = 5 # Warnings logged per reason; the rest are counted
+WARNING_REASON_PATTERNS = ( # (pattern, placeholder) applied in order to normalize reasons
+	(re.compile(r'\{?[0-9A-Fa-f]{8}(?:-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12}\}?'), '<id>') # GUIDs
+	,(re.compile(r"'[^']*'"), "'<value>'")
+	,(re.compile(r'"[^"]*"'), '"<value>"')
+	,(re.compile(r'[\w.\\/-]*\d[\w.\\/-]*'), '<n>') # Numbers, dates, and IDs / file names containing digits
+)
+WHERE_IN_CHUNK = 1000 # Values per IN list in where_in(); Oracle allows at most 1000
+
+
+
+################################################################################
+# Module state
+################################################################################
+
+_connections = {} # Connection files validated in this process, by (server, database)
+
+_asdict_converters = {} # Value converters, by type; see asdict_compile()
+_asdict_serializers = {} # Compiled serializers, by (class, attributes); see asdict()
+
+_log_listener = None # QueueListener; see initialize_logging()
+
+_schema_recorder = None # List of (object type, arguments) within record_schema()
+
+
+
 ################################################################################
 # Classes
 ################################################################################
 
+class ArcpyTracer:
+	'''
+	Record count, latency, and rows moved for arcpy calls, by operation and
+	call site
+
+	See ARCPY CALL TRACING note in module header. Use through
+	trace_arcpy().
+	'''
+
+	def __init__(self):
+
+		self.records = {} # (operation, call site): [latencies, rows]
+
+		self._lock = threading.Lock()
+		self._originals = [] # (object, name, original value), to restore
+
+
+
+	def install(self):
+		'''
+		Replace arcpy entry points with tracing wrappers
+		'''
+
+		for name in dir(arcpy.management):
+
+			if name[:1].isupper():
+
+				self._wrap(
+					arcpy.management
+					,'management'
+					,name
+				)
+
+
+
+		for name in TRACE_ARCPY_DA:
+
+			self._wrap(
+				arcpy.da
+				,'da'
+				,name
+			)
+
+
+
+		for name in TRACE_ARCPY_ROOT:
+
+			self._wrap(
+				arcpy
+				,None
+				,name
+			)
+
+
+
+	def record(
+		self
+		,operation
+		,site
+		,seconds
+		,rows = 0
+	):
+
+		with self._lock:
+
+			record = self.records.get((operation, site))
+
+			if record is None:
+
+				record = self.records[(operation, site)] = [
+					array.array('d')
+					,0
+				]
+
+
+
+			record[0].append(seconds)
+			record[1] += rows
+
+
+
+	def report(self):
+		'''
+		Return table of traced calls, by descending total time
+		'''
+
+		lines = [
+			f'{"Total s":>10}{"Calls":>10}{"Mean ms":>10}{"P95 ms":>10}{"Rows":>10}  Operation, call site'
+		]
+
+		for (operation, site), (latencies, rows) in sorted(
+			self.records.items()
+			,key = lambda item: sum(item[1][0])
+			,reverse = True
+		):
+
+			ordered = sorted(latencies)
+			total = sum(ordered)
+			percentile = ordered[math.ceil(len(ordered) * TRACE_PERCENTILE) - 1] # Nearest rank
+
+			lines.append(
+				f'{total:>10.3f}'
+				f'{len(ordered):>10}'
+				f'{total / len(ordered) * 1000:>10.2f}'
+				f'{percentile * 1000:>10.2f}'
+				f'{rows or "":>10}'
+				f'  {operation}, {site}'
+			)
+
+
+
+		return '\n'.join(lines)
+
+
+
+	def uninstall(self):
+		'''
+		Restore original arcpy entry points
+		'''
+
+		while self._originals:
+
+			(
+				obj
+				,name
+				,value
+			) = self._originals.pop()
+
+			setattr(
+				obj
+				,name
+				,value
+			)
+
+
+
+	@staticmethod
+	def call_site(depth = 2):
+		'''
+		Return call site of traced call, as file:line(function)
+
+		Depth 2 is the caller of the function calling this method.
+		'''
+
+		frame = sys._getframe(depth)
+
+		return f'{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}({frame.f_code.co_name})'
+
+
+
+	def _wrap(
+		self
+		,obj # Module containing callable
+		,module_name # For operation name; None for arcpy itself
+		,name
+	):
+
+		original = getattr(obj, name)
+
+		if not callable(original):
+
+			return
+
+
+
+		operation = name if module_name is None else f'{module_name}.{name}'
+
+		if name in ('InsertCursor', 'SearchCursor', 'UpdateCursor'):
+
+			proxy = TracedCursor
+
+
+		elif name == 'Editor':
+
+			proxy = TracedEditor
+
+
+		else:
+
+			proxy = None
+
+
+
+		@functools.wraps(original)
+		def wrapper(*args, **kwargs):
+
+			site = ArcpyTracer.call_site()
+
+			time_start = time.perf_counter()
+			result = original(*args, **kwargs)
+			self.record(
+				operation
+				,site
+				,time.perf_counter() - time_start
+			)
+
+			if proxy is not None:
+
+				result = proxy(
+					result
+					,operation
+					,site
+					,self
+				)
+
+
+
+			return result
+
+
+
+		self._originals.append(
+			(
+				obj
+				,name
+				,original
+			)
+		)
+
+		setattr(
+			obj
+			,name
+			,wrapper
+		)
+
+
+
+
 class FormatterIndent(logging.Formatter):
 	'''
 	Format multiline log messges to left-align message content
@@ -180,829 +774,2973 @@ class FormatterIndent(logging.Formatter):
 	For more indentation, choose a larger integer value for `indent_level`.
 	'''
 
-	def format(
+	@staticmethod
+	@functools.cache
+	def _indents(
+		indent_level
+	):
+		'''
+		Return (first line prefix, newline replacement) for indent level;
+		cached, since few levels are used
+		'''
+
+		log_indent_line = '\t' * indent_level
+
+		return (
+			log_indent_line
+			,f'\n{" " * LOG_INDENT_HEADER}{log_indent_line}'
+		)
+
+
+
+	def formatMessage(
 		self
 		,record
 	):
 
-		# Copy LogRecord to avoid propagating changes to Handlers that
-		# use other Formatters
-		#
-		# Shallow copy is acceptable because we're only modifying an
-		# str attribute
+		# logging.Formatter.format() sets record.message from the record's
+		# msg and args before calling this method, and every Formatter sets
+		# it again, so indenting record.message here does not propagate to
+		# Handlers that use other Formatters. This avoids copying the
+		# LogRecord, and leaves records without indent or newlines
+		# untouched.
 
-		r = copy.copy(record)
-		
-		if hasattr(
-			r
+		indent_level = getattr(
+			record
 			,'indent_level'
-		):
-		
-			log_indent_line = '\t' * r.indent_level
-			
-		
-		else:
-		
-			log_indent_line = ''
-			
-		
-		
-		r.msg = f'{log_indent_line}{r.msg}'
-		
-		
-		
-		r.msg = str(r.msg).replace(
-			'\n'
-			,f'\n{" " * LOG_INDENT_HEADER}{log_indent_line}'
+			,0
 		)
 
+		if indent_level or '\n' in record.message:
+
+			(
+				log_indent_line
+				,newline
+			) = FormatterIndent._indents(indent_level)
+
+			record.message = log_indent_line + record.message.replace(
+				'\n'
+				,newline
+			)
 
-		return super().format(r)
 
 
+		return super().formatMessage(record)
 
-################################################################################
-# Functions
-################################################################################
 
-def add_fields(
-	table
-	,fields_spec
-	,indent_level = 0
-):
+
+class FormatterJSON(logging.Formatter):
+	'''
+	Format log records as JSON lines, for aggregating logs without parsing
+	text
+
+	Each record is one JSON object on one line, such as:
+
+		{"time": "2026-10-18T18:20:47.885", "level": "INFO", "message": "Loaded Location", "event": "location_loaded", "location_id": 1234}
+
+	Besides time, level, and message (without indentation), the object
+	contains any keys passed in the `extra` argument of the logging call,
+	except `indent_level`. Per-row events use this for structured fields;
+	by convention, they include an `event` key that names the event.
+	Values that JSON cannot represent are written as strings. Exception
+	tracebacks are written to key `exception`.
 	'''
-	`fields_spec` is a tuple-of-tuples in the following format:
 
+	RECORD_ATTRIBUTES = frozenset( # Standard LogRecord attributes; other attributes come from `extra`
 		(
-			#name		,type	,precision	,scale	,length	,alias			,nullable	,required	,domain		,default
-			('Attribute1'	,'Text'	,''		,''	,16	,'Attribute One'	,True		,False		,'Domain 1'	,'Value 1')
-			,...
+			*vars(
+				logging.LogRecord(
+					name = ''
+					,level = logging.NOTSET
+					,pathname = ''
+					,lineno = 0
+					,msg = ''
+					,args = ()
+					,exc_info = None
+				)
+			)
+			,'asctime'
+			,'indent_level'
+			,'message'
 		)
-	'''
+	)
 
-	subtype_domains = []
 
 
+	def format(
+		self
+		,record
+	):
 
-	for field_spec in fields_spec:
-
-		(
-			name
-			,data_type
-			,precision
-			,scale
-			,length
-			,alias
-			,is_nullable
-			,is_required
-			,domain
-			,default
-		) = field_spec
-
+		event = {
+			'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec = 'milliseconds')
+			,'level': record.levelname
+			,'message': record.getMessage()
+		}
 
+		for key, value in record.__dict__.items():
 
-		logging.info(
-			f'{name}'
-			,extra = {'indent_level': indent_level}
-		)
+			if key not in FormatterJSON.RECORD_ATTRIBUTES:
 
+				event[key] = value
 
 
-		if type(domain) is tuple:
 
-			subtype_domains.append(
-				(
-					name
-					,domain
-				)
-			)
+		if record.exc_info:
 
-			domain = ''
+			event['exception'] = self.formatException(record.exc_info)
 
 
 
-		arcpy.management.AddField(
-			in_table = table
-			,field_name = name
-			,field_type = data_type
-			,field_precision = precision
-			,field_scale = scale
-			,field_length = length
-			,field_alias = alias
-			,field_is_nullable = is_nullable
-			,field_is_required = is_required
-			,field_domain = domain
+		return json.dumps(
+			event
+			,default = str
+			,ensure_ascii = False
 		)
 
 
 
-		if default:
+class LogQueueHandler(logging.handlers.QueueHandler):
+	'''
+	Put log records on a queue without formatting them
 
-			arcpy.management.AssignDefaultToField(
-				in_table = table
-				,field_name = name
-				,default_value = default
-			)
+	logging.handlers.QueueHandler formats each record (and copies it)
+	before queueing, on the logging thread. This subclass defers all
+	formatting to the handlers of the QueueListener; see LOGGING QUEUE note
+	in module header.
+	'''
 
+	def prepare(
+		self
+		,record
+	):
 
+		return record
 
-	return subtype_domains
 
 
+class SchemaSnapshot:
+	'''
+	In-memory copy of a geodatabase catalog: domains, and tables, feature
+	classes, and relationship classes with their fields
 
-def add_subtypes(
-	table
-	,subtype_spec
-	,indent_level = 0
-):
+	See SCHEMA SNAPSHOTS note in module header.
+	'''
 
-	(
-		field_name
-		,subtypes
-	) = subtype_spec
+	_instances = weakref.WeakSet() # For invalidate_all()
 
 
 
-	logging.info(
-		f'Setting subtype field to {field_name}'
-		,extra = {'indent_level': indent_level}
-	)
+	def __init__(
+		self
+		,gdb
+		,file_name = None # Persisted snapshot; see save()
+		,ttl = SCHEMA_SNAPSHOT_TTL # Seconds a persisted snapshot is trusted; 0 to reread
+	):
 
+		self.gdb = gdb
+		self.file_name = file_name
+		self.ttl = ttl
 
+		self._datasets = None # Name lowercase: properties; None until read
+		self._datasets_stale = set() # Names lowercase
+		self._domains = None # Name: properties; None until read
+		self._domains_stale = set() # Names
 
-	arcpy.management.SetSubtypeField(
-		in_table = table
-		,field = field_name
-	)
 
 
+		if file_name is not None:
 
-	for subtype in subtypes:
+			self._load()
 
-		(
-			code
-			,description
-		) = subtype
 
 
-		logging.info(
-			f'{code}: {description}'
-			,extra = {'indent_level': indent_level}
-		)
+		SchemaSnapshot._instances.add(self)
 
 
-		arcpy.management.AddSubtype(
-			in_table = table
-			,subtype_code = code
-			,subtype_description = description
-		)
 
+	def dataset(
+		self
+		,name # Unqualified
+	):
+		'''
+		Return properties of table, feature class, or relationship class, or
+		None if it does not exist:
 
+			{
+				'name': ...
+				,'type': 'FeatureClass', 'RelationshipClass', or 'Table'
+				,'fields': {name lowercase: {'name': ..., 'type': ..., ...}}
+			}
+		'''
 
-def asdict(
-	object
-	,attributes
-):
-	'''
-	Convert complex objects to dictionaries with simple types that can be
-	encoded as JSON by json module
+		self._refresh_datasets(name)
 
-	This function accepts an object and a sequence of attribute names, and
-	returns a dict of the attribute names and their values.
+		return self._datasets.get(name.lower())
 
-	The conversion logic is simple:
 
-		If an attribute value has its own attribute named 'asdict', we
-		assume that the value is a complex object that needs additional
-		simplification and call value.asdict() to get a dict with simple
-		types that are compatible with the json module.
 
-		Otherwise, if the value does not have an attribute named
-		'asdict', we assume that it can be encoded directly by the
-		json module and add it to the dict without furhter processing.
-	'''
+	def datasets(self):
+		'''
+		Return properties of all tables, feature classes, and relationship
+		classes, by name lowercase
+		'''
 
-	d = {}
+		self._refresh_datasets()
 
+		return self._datasets
 
-	for a in attributes:
 
-		value = getattr(
-			object
-			,a
-		)
 
+	def domain(
+		self
+		,name
+	):
+		'''
+		Return properties of domain, or None if it does not exist:
 
+			{
+				'name': ...
+				,'type': 'CodedValue' or 'Range'
+				,'field_type': ...
+				,'codes': [[code, description], ...] # Coded value domains
+				,'range': [minimum, maximum] # Range domains
+			}
+		'''
 
-		if hasattr( # Complex type
-			value
-			,'asdict'
-		):
+		self._refresh_domains(name)
 
-			d[a] = value.asdict()
+		return self._domains.get(name)
 
 
-		else: # Simple type
 
-			if ( # Display human-friendly representation of binary
-				isinstance(
-					value
-					,bytearray
-				)
-				or isinstance(
-					value
-					,bytes
-				)
-			):
-			
-				value = f'<binary: {len(value):,} bytes>'
-				
-			
-			elif isinstance( # Convert datetime to string, for subsequent JSON conversions
-				value
-				,datetime.datetime
-			):
+	def domains(self):
+		'''
+		Return properties of all domains, by name
+		'''
 
-				value = value.strftime(JSON_FORMAT_DATE)
+		self._refresh_domains()
 
+		return self._domains
 
-			elif isinstance( # Display human-friendly representation of geometry
-				value
-				,arcpy.Geometry
-			):
 
-				value = json.loads(value.JSON)
-				
-				
-			elif isinstance( # Convert UUID to string, for subsequent JSON conversions
-				value
-				,uuid.UUID
-			):
-			
-				value = str(value)
 
+	def exists(
+		self
+		,name # Unqualified
+	):
 
+		return self.dataset(name) is not None
 
-			d[a] = value
 
 
+	def field(
+		self
+		,table_name # Unqualified
+		,field_name
+	):
+		'''
+		Return properties of field, or None if table or field does not exist
+		'''
 
-	# Return
+		table = self.dataset(table_name)
 
-	return d
+		if table is None:
 
+			return None
 
+		return table['fields'].get(field_name.lower())
 
-def assign_privileges(
-	table
-	,privileges_spec
-	,indent_level = 0
-):
 
-	for privilege in privileges_spec:
 
-		(
-			username
-			,read_privilege
-			,write_privilege
-		) = privilege
+	def invalidate(
+		self
+		,name = None # Dataset, unqualified
+		,domain = None
+	):
+		'''
+		Mark dataset or domain as changed, so it is reread on next use; with
+		no arguments, discard the whole snapshot
 
+		Deletes saved snapshot files for this geodatabase; see SCHEMA
+		SNAPSHOTS note in module header
+		'''
 
-		logging.info(
-			f'{username:15}{read_privilege:10}{write_privilege:10}'
-			,extra = {'indent_level': indent_level}
+		SchemaSnapshot._remove_files(
+			self.file_name
+			,schema_snapshot_file(self.gdb)
 		)
 
 
-		arcpy.management.ChangePrivileges(
-			table
-			,username
-			,read_privilege
-			,write_privilege
-		)
 
+		if name is None and domain is None:
 
+			self._datasets = None
+			self._datasets_stale.clear()
+			self._domains = None
+			self._domains_stale.clear()
 
-def create_domain_cv(
-	gdb
-	,coded_values
-	,name
-	,data_type
-	,description = ''
-	,split_policy = 'DEFAULT'
-	,merge_policy = 'DEFAULT'
-	,indent_level = 0
-):
+			return
 
-	logging.info(
-		f'Creating domain {name}'
-		,extra = {'indent_level': indent_level}
-	)
 
 
-	arcpy.management.CreateDomain(
-		in_workspace = gdb
-		,domain_name = name
-		,domain_description = description
-		,field_type = data_type
-		,domain_type = 'CODED'
-		,split_policy = split_policy
-		,merge_policy = merge_policy
-	)
+		if name is not None:
 
+			self._datasets_stale.add(name.lower())
 
 
-	logging.info(
-		'Adding coded values'
-		,extra = {'indent_level': indent_level + 1}
-	)
+		if domain is not None:
 
-	for cv in coded_values:
+			self._domains_stale.add(domain)
 
-		(
-			code
-			,description
-		) = cv
 
 
-		logging.info(
-			f'{code}: {description}'
-			,extra = {'indent_level': indent_level + 2}
-		)
+	@classmethod
+	def invalidate_all(
+		cls
+		,gdb
+		,name = None
+		,domain = None
+	):
+		'''
+		Invalidate dataset or domain in all snapshots of `gdb` in this
+		process, and delete the saved snapshot file of `gdb`, for other
+		processes; called by the DDL functions in this module
+		'''
 
+		for snapshot in list(cls._instances):
 
-		arcpy.management.AddCodedValueToDomain(
-			in_workspace = gdb
-			,domain_name = name
-			,code = code
-			,code_description = description
-		)
+			if os.path.normcase(snapshot.gdb) == os.path.normcase(gdb):
 
+				snapshot.invalidate(
+					name = name
+					,domain = domain
+				)
 
 
-def create_fc(
-	gdb
-	,fc_name
-	,alias
-	,geometry
-	,sr
-	,attributes = None
-	,subtypes = None
-	,global_id = True
-	,editor_tracking = True
-	,archiving = True
-	,attachments = True
-	,attachments_upgrade = True
-	,privileges = None
-	,indent_level = 0
-):
 
+		cls._remove_files(schema_snapshot_file(gdb))
 
-	# Log start message
 
-	logging.info(
-		f'Creating feature class {fc_name}'
-		,extra = {'indent_level': indent_level}
-	)
 
+	def save(self):
+		'''
+		Write snapshot to `file_name`, if set, for use by later runs
 
+		Parts that were not read are not saved. Changed datasets and domains
+		are saved as stale, so the next run rereads them.
+		'''
 
-	# Create feature class
+		if self.file_name is None:
 
-	arcpy.management.CreateFeatureclass(
-		out_path = gdb
-		,out_name = fc_name
-		,geometry_type = geometry
-		,spatial_reference = sr
-	)
+			return
 
 
 
-	fc = os.path.join(
-		gdb
-		,fc_name
-	)
+		logging.debug(f'Saving schema snapshot: {self.file_name}')
 
+		file_name_temp = f'{self.file_name}.{uuid.uuid4().hex}'
 
+		with open(
+			file_name_temp
+			,'w'
+			,encoding = 'utf-8'
+		) as f:
 
-	# Set alias
+			json.dump(
+				{
+					'gdb': self.gdb
+					,'datasets': self._datasets
+					,'datasets_stale': sorted(self._datasets_stale)
+					,'domains': self._domains
+					,'domains_stale': sorted(self._domains_stale)
+				}
+				,f
+				,default = str # Dates (e.g. field defaults)
+			)
 
-	logging.info(
-		f'Setting alias to {alias}'
-		,extra = {'indent_level': indent_level + 1}
-	)
+		os.replace( # Atomic, so concurrent runs never read a partial file
+			file_name_temp
+			,self.file_name
+		)
 
-	arcpy.AlterAliasName(
-		table = fc
-		,alias = alias
-	)
 
 
+	def _load(self):
 
-	# Add attributes
+		try:
 
-	if attributes is not None:
+			age = time.time() - os.path.getmtime(self.file_name)
 
-		logging.info(
-			'Adding attributes'
-			,extra = {'indent_level': indent_level + 1}
-		)
+			with open(
+				self.file_name
+				,encoding = 'utf-8'
+			) as f:
 
-		subtype_domains = add_fields(
-			table = fc
-			,fields_spec = attributes
-			,indent_level = indent_level + 2
-		)
+				snapshot = json.load(f)
 
-	else:
 
-		subtype_domains = []
+		except (
+			OSError
+			,ValueError
+		) as e:
 
+			logging.debug(f'No usable schema snapshot: {e}')
 
+			return
 
-	# Add subtypes
 
-	if subtypes is not None:
 
-		logging.info(
-			'Adding subtypes'
-			,extra = {'indent_level': indent_level + 1}
-		)
+		if age >= self.ttl or snapshot.get('gdb') != self.gdb:
 
-		add_subtypes(
-			table = fc
-			,subtype_spec = subtypes
-			,indent_level = indent_level + 2
-		)
+			logging.debug(f'Ignoring expired schema snapshot: {self.file_name}')
 
+			return
 
 
-	# Add subtype-specific domains
 
-	if len(subtype_domains) > 0:
+		logging.debug(f'Using schema snapshot: {self.file_name}')
 
-		logging.info(
-			'Adding subtype-specific domains'
-			,extra = {'indent_level': indent_level + 1}
-		)
+		self._datasets = snapshot['datasets']
+		self._datasets_stale = set(snapshot['datasets_stale'])
+		self._domains = snapshot['domains']
+		self._domains_stale = set(snapshot['domains_stale'])
 
-		set_subtype_domains(
-			table = fc
-			,domains_spec = subtype_domains
-			,indent_level = indent_level + 2
-		)
 
 
+	@staticmethod
+	def _remove_files(*file_names): # None entries ignored
 
-	# Add global IDs
+		for file_name in set(file_names) - {None}:
 
-	if global_id:
+			try:
 
-		logging.info(
-			'Adding global ID'
-			,extra = {'indent_level': indent_level + 1}
-		)
+				os.remove(file_name)
 
-		arcpy.management.AddGlobalIDs(
-			in_datasets = fc
-		)
+			except FileNotFoundError:
 
+				continue
 
+			logging.debug(f'Deleted schema snapshot: {file_name}')
 
-	# Enable editor tracking
 
-	if editor_tracking:
 
-		logging.info(
-			'Enabling editor tracking'
-			,extra = {'indent_level': indent_level + 1}
-		)
+	@staticmethod
+	def _read_dataset(d): # arcpy.Describe object
 
-		arcpy.management.EnableEditorTracking(
-			in_dataset = fc
-			,last_editor_field = LAST_EDITOR_NAME
-			,last_edit_date_field = LAST_EDITOR_TIMESTAMP
-			,add_fields = True
-			,record_dates_in = 'UTC'
-		)
+		return {
+			'name': d.name.split('.')[-1] # Unqualified
+			,'type': d.dataType
+			,'fields': {
+				f.name.lower(): {
+					'name': f.name
+					,'type': f.type
+					,'length': f.length
+					,'precision': f.precision
+					,'scale': f.scale
+					,'alias': f.aliasName
+					,'nullable': f.isNullable
+					,'required': f.required
+					,'domain': f.domain
+					,'default': f.defaultValue
+				}
+				for f in getattr(d, 'fields', ()) # Relationship classes may have none
+			}
+		}
 
 
 
-	# Enable archiving
+	def _refresh_datasets(
+		self
+		,name = None # Reread only this dataset, if stale; default all stale
+	):
 
-	if archiving:
+		if self._datasets is None:
 
-		logging.info(
-			'Enabling archiving'
-			,extra = {'indent_level': indent_level + 1}
-		)
+			logging.debug('Reading schema snapshot datasets')
 
-		arcpy.management.EnableArchiving(
-			in_dataset = fc
-		)
+			self._datasets = {}
+			self._datasets_stale.clear()
 
 
 
-	# Enable attachments
-	#
-	# Ensure that GlobalIDs are enabled first, so attachments will use
-	# them in %_ATTACHREL relationship class
+			def read(children):
 
-	if attachments:
+				for child in children:
 
-		logging.info(
-			'Enabling attachments'
-			,extra = {'indent_level': indent_level + 1}
-		)
+					if child.dataType == 'FeatureDataset':
 
-		arcpy.management.EnableAttachments(
-			in_dataset = fc
-		)
-		
-		
-		
-		if attachments_upgrade:
-		
-			logging.info(
-				'Upgrading attachments format'
-				,extra = {'indent_level': indent_level + 1}
-			)
-			
-			arcpy.management.UpgradeAttachments(
-				in_dataset = fc
-			)
+						read(child.children)
 
 
+					elif child.dataType in SCHEMA_SNAPSHOT_TYPES:
 
-	# Assign privileges
+						dataset = SchemaSnapshot._read_dataset(child)
 
-	if privileges:
+						self._datasets[dataset['name'].lower()] = dataset
 
-		logging.info(
-			'Assigning privileges'
-			,extra = {'indent_level': indent_level + 1}
-		)
 
 
-		assign_privileges(
-			table = fc
-			,privileges_spec = privileges
-			,indent_level = indent_level + 2
-		)
+			read(arcpy.Describe(self.gdb).children)
 
 
 
-def create_rc(
-	gdb
-	,origin_table_name
-	,destination_table_name
-	,rc_name
-	,rc_type
-	,forward_label
-	,backward_label
-	,message_direction
-	,cardinality
-	,attributed
-	,origin_pk
-	,origin_fk
-	,destination_pk = None
-	,destination_fk = None
-	,attributes = None
-	,indent_level = 0
-):
-	'''
-	`attributes` is a tuple in the format of the `add_fields()` function
-	`fields_spec` argument
-	'''
+		if name is None:
 
+			names = list(self._datasets_stale)
 
-	# Log start message
+		elif name.lower() in self._datasets_stale:
 
-	logging.info(
-		f'Creating relationship class {rc_name}'
-		,extra = {'indent_level': indent_level}
-	)
+			names = [name.lower()]
 
+		else:
 
+			names = []
 
-	# DEBUG: Print arguments and values
-	
-	self_name = inspect.currentframe().f_code.co_name
-	self = eval(self_name)
-	args = inspect.getfullargspec(self).args
-	
-	logging.debug(
-		'Arguments:'
-		,extra = {'indent_level': indent_level + 1}
-	)
-	for arg in args:
-	
-		logging.debug(
-			f'{arg:<30}{locals()[arg]}'
-			,extra = {'indent_level': indent_level + 2}
-		)
-	
 
 
-	# Derive fully qualified object names
+		for name in names:
 
-	origin_table = os.path.join(
-		gdb
-		,origin_table_name
-	)
+			self._datasets_stale.discard(name)
 
-	destination_table = os.path.join(
-		gdb
-		,destination_table_name
-	)
-	
-	rc = os.path.join(
-		gdb
-		,rc_name
-	)
+			logging.debug(f'Rereading schema snapshot dataset {name}')
 
+			self._datasets.pop(name, None)
 
+			try:
 
-	# Create relationship class
+				d = arcpy.Describe(os.path.join(self.gdb, name))
 
-	arcpy.management.CreateRelationshipClass(
-		origin_table = origin_table
-		,destination_table = destination_table
-		,out_relationship_class = rc
-		,relationship_type = rc_type
-		,forward_label = forward_label
-		,backward_label = backward_label
-		,message_direction = message_direction
-		,cardinality = cardinality
-		,attributed = attributed
-		,origin_primary_key = origin_pk
-		,origin_foreign_key = origin_fk
-		,destination_primary_key = destination_pk
-		,destination_foreign_key = destination_fk
-	)
-	
-	
-	
-	# Add attributes
-	
-	if attributes is not None:
-	
-		logging.info(
-			f'Creating relationship class {rc_name}'
-			,extra = {'indent_level': indent_level + 1}
-		)
-		
-		rc_table = os.path.join(
-			gdb
-			,rc_name
-		)
+			except OSError: # Does not exist
 
-		add_fields(
-			table = rc_table
-			,fields_spec = attributes
-			,indent_level = indent_level + 2
-		)
-			
-			
-			
-def create_table(
-	gdb
-	,table_name
-	,alias
-	,attributes = None
-	,subtypes = None
-	,global_id = True
-	,editor_tracking = True
-	,archiving = True
-	,attachments = True
-	,attachments_upgrade = True
-	,privileges = None
-	,indent_level = 0
-):
+				continue
 
 
-	# Log start message
 
-	logging.info(
-		f'Creating table {table_name}'
-		,extra = {'indent_level': indent_level}
-	)
+			if d.dataType in SCHEMA_SNAPSHOT_TYPES:
 
+				self._datasets[name] = SchemaSnapshot._read_dataset(d)
 
 
-	# Create table
 
-	arcpy.management.CreateTable(
-		out_path = gdb
-		,out_name = table_name
-	)
+	def _refresh_domains(
+		self
+		,name = None # Reread only if this domain is stale; default any stale
+	):
 
+		if self._domains is not None and (
+			name not in self._domains_stale
+			if name is not None
+			else not self._domains_stale
+		):
 
+			return
 
-	table = os.path.join(
-		gdb
-		,table_name
-	)
 
 
+		# arcpy cannot read one domain, so any change rereads all of them
 
-	# Set alias
+		logging.debug('Reading schema snapshot domains')
 
-	logging.info(
-		f'Setting alias to {alias}'
-		,extra = {'indent_level': indent_level + 1}
-	)
+		self._domains = {
+			d.name: {
+				'name': d.name
+				,'type': d.domainType
+				,'field_type': d.type
+				,'codes': (
+					[
+						[code, description]
+						for code, description in d.codedValues.items()
+					]
+					if d.domainType == 'CodedValue'
+					else None
+				)
+				,'range': (
+					list(d.range)
+					if d.domainType == 'Range'
+					else None
+				)
+			}
+			for d in arcpy.da.ListDomains(self.gdb)
+		}
 
-	arcpy.AlterAliasName(
-		table = table
-		,alias = alias
-	)
+		self._domains_stale.clear()
 
 
 
-	# Add attributes
+class StackSampler(threading.Thread):
+	'''
+	Sample the call stack of another thread at a fixed interval
 
-	if attributes is not None:
+	Low-overhead alternative to cProfile for long runs; see PROFILING note
+	in module header. Each sample attributes one interval to the innermost
+	function (self time) and to every distinct function on the stack
+	(cumulative time).
+	'''
 
-		logging.info(
-			'Adding attributes'
-			,extra = {'indent_level': indent_level + 1}
-		)
+	def __init__(
+		self
+		,thread_id # Thread to sample, from threading.get_ident()
+		,interval = PROFILE_INTERVAL
+	):
 
-		subtype_domains = add_fields(
-			table = table
-			,fields_spec = attributes
-			,indent_level = indent_level + 2
+		super().__init__(
+			name = 'StackSampler'
+			,daemon = True
 		)
 
-	else:
+		self.thread_id = thread_id
+		self.interval = interval
 
-		subtype_domains = []
+		self.count = 0
+		self.counts_cumulative = collections.Counter() # Function: samples
+		self.counts_self = collections.Counter() # Function: samples
+		self.stacks = collections.Counter() # Folded stack: samples
 
+		self._stop_event = threading.Event()
 
 
-	# Add subtypes
 
-	if subtypes is not None:
+	def run(self):
 
-		logging.info(
-			'Adding subtypes'
-			,extra = {'indent_level': indent_level + 1}
-		)
+		while not self._stop_event.wait(self.interval):
 
-		add_subtypes(
-			table = table
-			,subtype_spec = subtypes
-			,indent_level = indent_level + 2
-		)
+			frame = sys._current_frames().get(self.thread_id)
 
+			if frame is None: # Thread finished
 
+				break
 
-	# Add subtype-specific domains
 
-	if len(subtype_domains) > 0:
 
-		logging.info(
-			'Adding subtype-specific domains'
-			,extra = {'indent_level': indent_level + 1}
-		)
+			stack = []
 
-		set_subtype_domains(
-			table = table
-			,domains_spec = subtype_domains
-			,indent_level = indent_level + 2
-		)
+			while frame is not None:
 
+				code = frame.f_code
+				stack.append(
+					f'{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})'
+				)
 
+				frame = frame.f_back
 
-	# Add global IDs
 
-	if global_id:
 
-		logging.info(
-			'Adding global ID'
-			,extra = {'indent_level': indent_level + 1}
-		)
+			self.count += 1
+			self.counts_self[stack[0]] += 1
+			self.counts_cumulative.update(set(stack)) # Count recursive functions once per sample
+			self.stacks[';'.join(reversed(stack))] += 1
 
-		arcpy.management.AddGlobalIDs(
-			in_datasets = table
-		)
 
 
+	def stop(self):
 
-	# Enable editor tracking
+		self._stop_event.set()
+		self.join()
 
-	if editor_tracking:
 
-		logging.info(
-			'Enabling editor tracking'
-			,extra = {'indent_level': indent_level + 1}
-		)
 
-		arcpy.management.EnableEditorTracking(
-			in_dataset = table
-			,last_editor_field = LAST_EDITOR_NAME
-			,last_edit_date_field = LAST_EDITOR_TIMESTAMP
+	def summary(
+		self
+		,top = PROFILE_TOP
+	):
+		'''
+		Return table of top functions by cumulative samples, in the layout
+		of pstats output
+		'''
+
+		lines = [
+			f'{self.count} samples at {self.interval} second interval'
+			,''
+			,'   Ordered by: cumulative samples'
+			,''
+			,f'{"cumtime":>10}{"cum%":>8}{"tottime":>10}{"tot%":>8}  function'
+		]
+
+		for function, count in self.counts_cumulative.most_common(top):
+
+			lines.append(
+				f'{count * self.interval:>10.2f}'
+				f'{count / self.count:>8.1%}'
+				f'{self.counts_self[function] * self.interval:>10.2f}'
+				f'{self.counts_self[function] / self.count:>8.1%}'
+				f'  {function}'
+			)
+
+
+
+		return '\n'.join(lines)
+
+
+
+	def write(
+		self
+		,file_name
+	):
+		'''
+		Write folded stacks, one per line with sample count, for flame graph
+		tools
+		'''
+
+		with open(
+			file_name
+			,'w'
+			,encoding = 'utf-8'
+		) as f:
+
+			for stack, count in self.stacks.most_common():
+
+				f.write(f'{stack} {count}\n')
+
+
+
+class TaskGraph:
+	'''
+	Run named tasks in dependency order, concurrently where dependencies
+	allow
+
+	See TASK GRAPHS note in module header.
+	'''
+
+	def __init__(self):
+
+		self.tasks = {} # Name: (function, args, dependencies)
+		self.timings = {} # Name: (start, end), in seconds since start of run
+
+
+
+	def add(
+		self
+		,name
+		,function # Module-level function, so it can be sent to a worker process
+		,args = ()
+		,dependencies = () # Names of tasks that must finish first
+	):
+
+		if name in self.tasks:
+
+			raise ValueError(f'Duplicate task: {name}')
+
+
+
+		self.tasks[name] = (
+			function
+			,tuple(args)
+			,tuple(dependencies)
+		)
+
+
+
+	def critical_path(self):
+		'''
+		Return (seconds, task names) of the longest chain of dependent
+		tasks, by measured duration
+		'''
+
+		paths = {}
+
+		for name in self._order():
+
+			(
+				seconds
+				,names
+			) = max(
+				(
+					paths[dependency]
+					for dependency in self.tasks[name][2]
+				)
+				,default = (0.0, [])
+				,key = lambda path: path[0]
+			)
+
+			(
+				start
+				,end
+			) = self.timings[name]
+
+			paths[name] = (
+				seconds + end - start
+				,names + [name]
+			)
+
+
+
+		return max(
+			paths.values()
+			,default = (0.0, [])
+			,key = lambda path: path[0]
+		)
+
+
+
+	def report(self):
+		'''
+		Return table of task timings, in start order, with critical path
+		and elapsed time
+		'''
+
+		(
+			critical_seconds
+			,critical_names
+		) = self.critical_path()
+
+		lines = [
+			f'{"Start s":>10}{"Seconds":>10}  Task (* critical path)'
+		]
+
+		for name, (start, end) in sorted(
+			self.timings.items()
+			,key = lambda item: item[1]
+		):
+
+			lines.append(
+				f'{start:>10.1f}'
+				f'{end - start:>10.1f}'
+				f'  {"*" if name in critical_names else " "} {name}'
+			)
+
+
+
+		elapsed = max(
+			(end for start, end in self.timings.values())
+			,default = 0.0
+		)
+
+		busy = sum(
+			end - start
+			for start, end in self.timings.values()
+		)
+
+		lines.extend(
+			(
+				''
+				,f'Critical path: {" > ".join(critical_names)} ({critical_seconds:.1f} s)'
+				,f'Elapsed: {elapsed:.1f} s; total task time: {busy:.1f} s'
+			)
+		)
+
+
+
+		return '\n'.join(lines)
+
+
+
+	def run(
+		self
+		,workers = 1 # Worker processes; 1 to run tasks in this process, in order
+		,indent_level = 0
+	):
+
+		order = self._order() # Validates dependencies
+
+		self.timings = {}
+
+		time_run = time.time() # Wall clock, comparable across processes
+
+
+
+		if workers <= 1:
+
+			for name in order:
+
+				(
+					function
+					,args
+					,dependencies
+				) = self.tasks[name]
+
+				start = time.time()
+				function(*args)
+				self.timings[name] = (
+					start - time_run
+					,time.time() - time_run
+				)
+
+
+		else:
+
+			self._run_concurrent(
+				workers = workers
+				,time_run = time_run
+			)
+
+
+
+		logging.info(
+			f'Task timings:\n{self.report()}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+
+	def _order(self):
+		'''
+		Return task names in a valid run order, preferring tasks with longer
+		chains of dependent tasks, so the critical path starts early
+
+		Raises ValueError for unknown dependencies or dependency cycles
+		'''
+
+		dependents = {
+			name: []
+			for name in self.tasks
+		}
+
+		for name, (function, args, dependencies) in self.tasks.items():
+
+			for dependency in dependencies:
+
+				if dependency not in self.tasks:
+
+					raise ValueError(f'Task {name} depends on unknown task {dependency}')
+
+
+				dependents[dependency].append(name)
+
+
+
+		heights = {} # Longest chain of dependents, by task count
+
+		def height(name, visiting = ()):
+
+			if name in visiting:
+
+				raise ValueError(f'Dependency cycle: {" > ".join(visiting + (name,))}')
+
+
+			if name not in heights:
+
+				heights[name] = 1 + max(
+					(
+						height(dependent, visiting + (name,))
+						for dependent in dependents[name]
+					)
+					,default = 0
+				)
+
+
+			return heights[name]
+
+
+
+		order = []
+		done = set()
+
+		while len(order) < len(self.tasks):
+
+			ready = [
+				name
+				for name, (function, args, dependencies) in self.tasks.items()
+				if name not in done
+				and all(dependency in done for dependency in dependencies)
+			]
+
+			if not ready:
+
+				for name in self.tasks: # Raises ValueError for the cycle
+
+					height(name)
+
+
+
+			ready.sort(
+				key = height
+				,reverse = True
+			)
+
+			order.extend(ready)
+			done.update(ready)
+
+
+
+		return order
+
+
+
+	def _run_concurrent(
+		self
+		,workers
+		,time_run
+	):
+
+		pending = self._order()
+		running = {} # Future: name
+
+		log_level = logging.getLogger().getEffectiveLevel()
+
+
+
+		with concurrent.futures.ProcessPoolExecutor(
+			max_workers = workers
+		) as executor:
+
+			while pending or running:
+
+				# Submit ready tasks, in _order() priority
+
+				for name in [
+					name
+					for name in pending
+					if all(
+						dependency in self.timings
+						for dependency in self.tasks[name][2]
+					)
+				]:
+
+					(
+						function
+						,args
+						,dependencies
+					) = self.tasks[name]
+
+					pending.remove(name)
+
+					running[
+						executor.submit(
+							TaskGraph._run_task
+							,function
+							,args
+							,log_level
+						)
+					] = name
+
+
+
+				(
+					done
+					,not_done
+				) = concurrent.futures.wait(
+					running
+					,return_when = concurrent.futures.FIRST_COMPLETED
+				)
+
+				for future in done:
+
+					name = running.pop(future)
+
+					(
+						records
+						,start
+						,end
+						,exception
+					) = future.result()
+
+					for record in records:
+
+						logging.getLogger().handle(record)
+
+
+
+					if exception is not None:
+
+						executor.shutdown(
+							wait = True
+							,cancel_futures = True
+						)
+
+						raise RuntimeError(f'Task {name} failed') from exception
+
+
+
+					self.timings[name] = (
+						start - time_run
+						,end - time_run
+					)
+
+
+
+	@staticmethod
+	def _run_task(
+		function
+		,args
+		,log_level
+	):
+		'''
+		Run task in worker process, capturing its log records
+
+		Returns (log records, start time, end time, exception or None)
+		'''
+
+		logger = logging.getLogger()
+		handlers = logger.handlers[:] # Inherited when processes are forked
+
+		buffer = logging.handlers.BufferingHandler(
+			capacity = sys.maxsize # Flushed by caller, not by capacity
+		)
+
+		logger.handlers = [buffer]
+		logger.setLevel(log_level)
+
+
+
+		exception = None
+
+		start = time.time()
+
+		try:
+
+			function(*args)
+
+
+		except Exception as e:
+
+			exception = e
+
+
+		finally:
+
+			end = time.time()
+
+			logger.handlers = handlers
+
+
+
+		records = buffer.buffer
+
+		for record in records: # Make records picklable
+
+			record.msg = record.getMessage()
+			record.args = None
+
+			if record.exc_info:
+
+				record.exc_text = logging.Formatter().formatException(record.exc_info)
+				record.exc_info = None
+
+
+
+		return (
+			records
+			,start
+			,end
+			,exception
+		)
+
+
+
+class TracedCursor:
+	'''
+	arcpy.da cursor wrapper that records row fetches, inserts, updates, and
+	deletes against the call site that opened the cursor
+
+	See ArcpyTracer.
+	'''
+
+	def __init__(
+		self
+		,cursor
+		,operation # e.g. da.SearchCursor
+		,site
+		,tracer # ArcpyTracer
+	):
+
+		self._cursor = cursor
+		self._iterator = None
+		self._operation = operation
+		self._site = site
+		self._tracer = tracer
+
+
+
+	def __enter__(self):
+
+		self._cursor.__enter__()
+
+		return self
+
+
+
+	def __exit__(self, *args):
+
+		return self._cursor.__exit__(*args)
+
+
+
+	def __getattr__(self, name): # Delegate everything else (e.g. fields, reset)
+
+		return getattr(
+			self._cursor
+			,name
+		)
+
+
+
+	def __iter__(self):
+
+		self._iterator = iter(self._cursor)
+
+		return self
+
+
+
+	def __next__(self):
+
+		if self._iterator is None:
+
+			self._iterator = iter(self._cursor)
+
+
+
+		time_start = time.perf_counter()
+		row = next(self._iterator) # StopIteration is not recorded
+		self._tracer.record(
+			f'{self._operation}.next'
+			,self._site
+			,time.perf_counter() - time_start
+			,rows = 1
+		)
+
+
+
+		return row
+
+
+
+	def deleteRow(self, *args):
+
+		return self._call('deleteRow', *args)
+
+
+
+	def insertRow(self, *args):
+
+		return self._call('insertRow', *args)
+
+
+
+	def next(self):
+
+		return self.__next__()
+
+
+
+	def updateRow(self, *args):
+
+		return self._call('updateRow', *args)
+
+
+
+	def _call(
+		self
+		,name
+		,*args
+	):
+
+		time_start = time.perf_counter()
+		result = getattr(self._cursor, name)(*args)
+		self._tracer.record(
+			f'{self._operation}.{name}'
+			,self._site
+			,time.perf_counter() - time_start
+			,rows = 1
+		)
+
+
+
+		return result
+
+
+
+class TracedEditor:
+	'''
+	arcpy.da.Editor wrapper that records edit session and operation calls,
+	including those made by the context manager protocol, against the call
+	site that created the Editor
+
+	See ArcpyTracer.
+	'''
+
+	def __init__(
+		self
+		,editor
+		,operation # da.Editor
+		,site
+		,tracer # ArcpyTracer
+	):
+
+		self._editor = editor
+		self._operation = operation
+		self._site = site
+		self._tracer = tracer
+
+
+
+	def __enter__(self):
+
+		self._call('__enter__')
+
+		return self
+
+
+
+	def __exit__(self, *args):
+
+		return self._call('__exit__', *args)
+
+
+
+	def __getattr__(self, name):
+
+		attribute = getattr(
+			self._editor
+			,name
+		)
+
+		if name not in TRACE_ARCPY_EDITOR:
+
+			return attribute
+
+
+
+		return functools.partial(
+			self._call
+			,name
+		)
+
+
+
+	def _call(
+		self
+		,name
+		,*args
+		,**kwargs
+	):
+
+		time_start = time.perf_counter()
+		result = getattr(self._editor, name)(*args, **kwargs)
+		self._tracer.record(
+			f'{self._operation}.{name}'
+			,self._site
+			,time.perf_counter() - time_start
+		)
+
+
+
+		return result
+
+
+
+class WarningAggregator(logging.Filter):
+	'''
+	Logging filter that groups warnings by reason, passes the first few of
+	each reason, and counts the rest
+
+	See WARNING AGGREGATION note in module header.
+	'''
+
+	def __init__(
+		self
+		,examples = WARNING_EXAMPLES # Warnings logged per reason
+		,rejects_file = None # Every warning is written here, in full; must not exist; see module header
+	):
+
+		super().__init__()
+
+		self.examples = examples
+		self.counts = collections.Counter() # By reason
+
+		self._lock = threading.Lock()
+		self._rejects = None
+		self._rejects_formatter = FormatterJSON()
+
+
+
+		if rejects_file is not None:
+
+			self._rejects = (
+				gzip.open
+				if rejects_file.lower().endswith('.gz')
+				else open
+			)(
+				rejects_file
+				,'xt' # Never overwrite rejects of an earlier run
+				,encoding = 'utf-8'
+			)
+
+
+
+	def close(self):
+
+		if self._rejects is not None:
+
+			self._rejects.close()
+			self._rejects = None
+
+
+
+	def filter(
+		self
+		,record
+	):
+
+		if record.levelno != logging.WARNING:
+
+			return True
+
+
+
+		reason = getattr(record, 'reason', None)
+
+		if reason is None:
+
+			reason = WarningAggregator.reason(record.getMessage())
+			record.reason = reason # Structured field for FormatterJSON
+
+
+		record.reason_code = WarningAggregator.reason_code(reason)
+
+
+
+		with self._lock: # Loaders may warn from several threads
+
+			self.counts[reason] += 1
+			count = self.counts[reason]
+
+			if self._rejects is not None:
+
+				self._rejects.write(f'{self._rejects_formatter.format(record)}\n')
+
+
+
+		if count > self.examples:
+
+			return False
+
+
+
+		if count == self.examples:
+
+			record.msg = f'{record.getMessage()}\n(Further warnings for this reason are counted and summarized at end)'
+			record.args = None
+
+
+
+		return True
+
+
+
+	@staticmethod
+	def reason(message):
+		'''
+		Return reason of warning message: first line, with identifiers,
+		numbers, and quoted values replaced by placeholders
+		'''
+
+		reason = message.split('\n', 1)[0]
+
+		for pattern, placeholder in WARNING_REASON_PATTERNS:
+
+			reason = pattern.sub(placeholder, reason)
+
+
+
+		return reason
+
+
+
+	@staticmethod
+	def reason_code(reason):
+		'''
+		Return short code identifying reason, stable across runs
+		'''
+
+		return hashlib.sha1(reason.encode('utf-8')).hexdigest()[:8]
+
+
+
+	def report(self):
+		'''
+		Return table of warning reasons, by descending count
+		'''
+
+		lines = [
+			f'{"Count":>10}{"Logged":>10}  Code      Reason'
+		]
+
+		for reason, count in self.counts.most_common():
+
+			lines.append(
+				f'{count:>10}'
+				f'{min(count, self.examples):>10}'
+				f'  {WarningAggregator.reason_code(reason)}  {reason}'
+			)
+
+
+
+		return '\n'.join(lines)
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+def add_fields(
+	table
+	,fields_spec
+	,indent_level = 0
+):
+	'''
+	`fields_spec` is a tuple-of-tuples in the following format:
+
+		(
+			#name		,type	,precision	,scale	,length	,alias			,nullable	,required	,domain		,default
+			('Attribute1'	,'Text'	,''		,''	,16	,'Attribute One'	,True		,False		,'Domain 1'	,'Value 1')
+			,...
+		)
+
+	Each AddField call takes a schema lock on the table, so consecutive
+	fields that AddFields can express (no precision or scale, nullable,
+	not required) are added, with their defaults, in one AddFields call.
+	Other fields are added individually with AddField, and their defaults
+	assigned afterwards. Field order is preserved.
+	'''
+
+	SchemaSnapshot.invalidate_all( # See SCHEMA SNAPSHOTS note in module header
+		gdb = os.path.dirname(table)
+		,name = os.path.basename(table)
+	)
+
+
+
+	subtype_domains = []
+
+	field_descriptions = [] # Pending AddFields batch
+	defaults = [] # (name, default) for fields added individually
+
+
+
+	def add_batch():
+
+		if field_descriptions:
+
+			logging.debug(
+				f'Adding {len(field_descriptions)} fields with AddFields'
+				,extra = {'indent_level': indent_level}
+			)
+
+			arcpy.management.AddFields(
+				in_table = table
+				,field_description = list(field_descriptions) # Copy; cleared below
+			)
+
+			field_descriptions.clear()
+
+
+
+	for field_spec in fields_spec:
+
+		(
+			name
+			,data_type
+			,precision
+			,scale
+			,length
+			,alias
+			,is_nullable
+			,is_required
+			,domain
+			,default
+		) = field_spec
+
+
+
+		logging.info(
+			f'{name}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+
+		if type(domain) is tuple:
+
+			subtype_domains.append(
+				(
+					name
+					,domain
+				)
+			)
+
+			domain = ''
+
+
+
+		if (
+			precision in (None, '')
+			and scale in (None, '')
+			and is_nullable
+			and not is_required
+		):
+
+			field_descriptions.append(
+				[
+					name
+					,data_type
+					,none2blank(alias)
+					,none2blank(length)
+					,none2blank(default)
+					,none2blank(domain)
+				]
+			)
+
+			continue
+
+
+
+		# AddFields cannot express this field; add pending batch first, to
+		# preserve field order
+
+		add_batch()
+
+		arcpy.management.AddField(
+			in_table = table
+			,field_name = name
+			,field_type = data_type
+			,field_precision = precision
+			,field_scale = scale
+			,field_length = length
+			,field_alias = alias
+			,field_is_nullable = is_nullable
+			,field_is_required = is_required
+			,field_domain = domain
+		)
+
+
+
+		if default:
+
+			defaults.append(
+				(
+					name
+					,default
+				)
+			)
+
+
+
+	add_batch()
+
+
+
+	for name, default in defaults:
+
+		arcpy.management.AssignDefaultToField(
+			in_table = table
+			,field_name = name
+			,default_value = default
+		)
+
+
+
+	return subtype_domains
+
+
+
+def add_log_handler(
+	handler
+):
+	'''
+	Add handler to root logger, through the logging thread if
+	initialize_logging() started one
+	'''
+
+	if _log_listener is None:
+
+		logging.getLogger().addHandler(handler)
+
+		return
+
+
+
+	_log_listener.handlers = (
+		*_log_listener.handlers
+		,handler
+	)
+
+
+
+def add_subtypes(
+	table
+	,subtype_spec
+	,indent_level = 0
+):
+
+	(
+		field_name
+		,subtypes
+	) = subtype_spec
+
+
+
+	logging.info(
+		f'Setting subtype field to {field_name}'
+		,extra = {'indent_level': indent_level}
+	)
+
+
+
+	arcpy.management.SetSubtypeField(
+		in_table = table
+		,field = field_name
+	)
+
+
+
+	for subtype in subtypes:
+
+		(
+			code
+			,description
+		) = subtype
+
+
+		logging.info(
+			f'{code}: {description}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+		arcpy.management.AddSubtype(
+			in_table = table
+			,subtype_code = code
+			,subtype_description = description
+		)
+
+
+
+@contextlib.contextmanager
+def aggregate_warnings(
+	enabled = True
+	,examples = WARNING_EXAMPLES
+	,rejects_file = None # Optional; see WarningAggregator
+	,indent_level = 0
+):
+	'''
+	Context manager that groups warnings logged in the enclosed block by
+	reason, logs the first `examples` of each, and logs counts by reason
+	when the block ends
+
+	See WARNING AGGREGATION note in module header.
+	'''
+
+	if not enabled:
+
+		yield
+		return
+
+
+
+	aggregator = WarningAggregator(
+		examples = examples
+		,rejects_file = rejects_file
+	)
+
+	logging.getLogger().addFilter(aggregator)
+
+
+
+	try:
+
+		yield aggregator
+
+
+	finally:
+
+		logging.getLogger().removeFilter(aggregator)
+		aggregator.close()
+
+
+
+		if aggregator.counts:
+
+			logging.warning(
+				f'{aggregator.counts.total()} warnings, by reason:\n{aggregator.report()}'
+				,extra = {'indent_level': indent_level}
+			)
+
+
+
+def asdict(
+	object
+	,attributes
+):
+	'''
+	Convert complex objects to dictionaries with simple types that can be
+	encoded as JSON by json module
+
+	This function accepts an object and a sequence of attribute names, and
+	returns a dict of the attribute names and their values.
+
+	The conversion logic is simple:
+
+		If an attribute value has its own attribute named 'asdict', we
+		assume that the value is a complex object that needs additional
+		simplification and call value.asdict() to get a dict with simple
+		types that are compatible with the json module.
+
+		Binary values, datetimes, geometries, and UUIDs are converted to
+		JSON-friendly representations; see asdict_converter().
+
+		Otherwise, we assume that the value can be encoded directly by the
+		json module and add it to the dict without furhter processing.
+
+	The work of inspecting attributes and value types is done once: a
+	serializer is compiled per (class, attributes) by asdict_compile(),
+	and converters are looked up by value type. Repeated calls for objects
+	of the same class only fetch and convert values.
+	'''
+
+	key = (
+		type(object)
+		,tuple(attributes)
+	)
+
+	serializer = _asdict_serializers.get(key)
+
+	if serializer is None:
+
+		serializer = _asdict_serializers[key] = asdict_compile(*key)
+
+
+
+	return serializer(object)
+
+
+
+def asdict_compile(
+	cls
+	,attributes # tuple
+):
+	'''
+	Return function that converts an instance of `cls` to a dict of
+	`attributes`, as asdict() does
+
+	Attribute values are fetched together with operator.attrgetter, and
+	converted with the converter for their type (see asdict_converter()).
+	'''
+
+	if not attributes:
+
+		return lambda object: {}
+
+
+
+	getter = operator.attrgetter(*attributes)
+
+	single = len(attributes) == 1 # attrgetter returns value, not tuple
+
+	converters = _asdict_converters
+
+
+
+	def serializer(object):
+
+		values = getter(object)
+
+		if single:
+
+			values = (values,)
+
+
+
+		d = {}
+
+		for a, value in zip(attributes, values):
+
+			value_type = type(value)
+
+			try:
+
+				converter = converters[value_type]
+
+			except KeyError:
+
+				converter = converters[value_type] = asdict_converter(value_type)
+
+
+
+			d[a] = value if converter is None else converter(value)
+
+
+
+		return d
+
+
+
+	serializer.__qualname__ = f'asdict_{cls.__name__}'
+
+
+
+	return serializer
+
+
+
+def asdict_converter(
+	value_type
+):
+	'''
+	Return function that converts values of `value_type` for asdict(), or
+	None if values are used as is
+
+	Compiled serializers cache the result per type.
+	'''
+
+	if hasattr( # Complex type
+		value_type
+		,'asdict'
+	):
+
+		return lambda value: value.asdict()
+
+
+	elif issubclass( # Display human-friendly representation of binary
+		value_type
+		,(bytearray, bytes)
+	):
+
+		return lambda value: f'<binary: {len(value):,} bytes>'
+
+
+	elif issubclass( # Convert datetime to string, for subsequent JSON conversions
+		value_type
+		,datetime.datetime
+	):
+
+		return lambda value: value.strftime(JSON_FORMAT_DATE)
+
+
+	elif (
+		value_type.__module__.startswith('arcpy') # Avoid importing arcpy for other types
+		and issubclass( # Display human-friendly representation of geometry
+			value_type
+			,arcpy.Geometry
+		)
+	):
+
+		return lambda value: json.loads(value.JSON)
+
+
+	elif issubclass( # Convert UUID to string, for subsequent JSON conversions
+		value_type
+		,uuid.UUID
+	):
+
+		return str
+
+
+
+	return None
+
+
+
+def assign_privileges(
+	table
+	,privileges_spec
+	,indent_level = 0
+):
+
+	for privilege in privileges_spec:
+
+		(
+			username
+			,read_privilege
+			,write_privilege
+		) = privilege
+
+
+		logging.info(
+			f'{username:15}{read_privilege:10}{write_privilege:10}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+		arcpy.management.ChangePrivileges(
+			table
+			,username
+			,read_privilege
+			,write_privilege
+		)
+
+
+
+def check_credentials(
+	user = CREDENTIALS_USER
+):
+	'''
+	The target SQL Server instance uses Windows authentication, so we need
+	to ensure that this Python process is running as the correct user
+	'''
+
+	domain = os.environ.get('USERDOMAIN')
+	username = os.environ.get('USERNAME')
+
+	username_display = f'{domain}\\{username}' # Leave default string case, for display
+
+
+
+	logging.debug('Checking OS username')
+	if none2blank(username).upper() != user.upper(): # Only check user, not domain, so developers can run in arbitrary environment
+
+		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
+			'Invalid Windows credentials'
+			f'\nThis script must run in a Python session as the HQ\\{user.lower()} user, but is running as {username_display}'
+		)
+
+
+
+def configure_log_file(
+	file_name
+	,formatter = None
+):
+	'''
+	Add log file handler to existing root logger
+	Fail if file already exists
+	'''
+
+	try:
+
+		logging.debug('Adding log FileHandler')
+		handler = logging.FileHandler(
+			file_name
+			,mode = 'x'
+			,encoding = 'utf-8'
+		)
+
+
+	except FileExistsError:
+
+		logging.error(f'Log file \'{file_name}\' already exists')
+
+		raise
+
+
+
+	if file_name.lower().endswith(LOG_FILE_SUFFIX_JSON): # Structured log for aggregation
+
+		formatter = FormatterJSON()
+
+
+
+	if formatter is not None:
+
+		logging.debug('Setting log FileHandler Formatter')
+		handler.setFormatter(formatter)
+
+
+
+	logging.debug('Adding FileHandler to Logger')
+	add_log_handler(handler) # Written on logging thread; see initialize_logging()
+
+
+
+def connect_gdb(
+	server
+	,database
+	,cache_dir = CONNECTION_CACHE_DIR
+	,ttl = CONNECTION_CACHE_TTL # Seconds; 0 to revalidate on every call
+	,user = CREDENTIALS_USER # Windows user this process must run as; None to skip check
+	,prompt = None # Interactive prompt before raising on invalid new connection file; None for no prompt
+):
+	'''
+	Return validated SQL Server geodatabase connection file using OS
+	authentication, from connection file cache if possible
+	
+	See the CONNECTION FILE CACHE note in the module header. New files are
+	created in a temporary directory within the cache and moved into place
+	only after validation, so concurrent scripts never see a partial or
+	invalid file.
+	
+	Raises RuntimeError if this process is not running as `user` (see
+	check_credentials()), or if the connection is not a valid enterprise
+	geodatabase. If `prompt` is provided, it is shown with input() before
+	an invalid new connection file is deleted, so you can check the file.
+	'''
+	
+	if user is not None:
+	
+		check_credentials(user)
+		
+		
+		
+	key = (
+		server.upper()
+		,database.upper()
+	)
+	
+	if key in _connections:
+	
+		logging.debug(f'Using connection validated in this process: {_connections[key]}')
+		return _connections[key]
+		
+		
+		
+	# Cache file name; sanitized for the file system, with a hash to keep
+	# distinct server / database names distinct
+	
+	name = re.sub(
+		r'[^\w.-]'
+		,'_'
+		,f'{server}.{database}'
+	)
+	
+	digest = hashlib.sha1(f'{key[0]}|{key[1]}'.encode('utf-8')).hexdigest()[:8]
+	
+	gdb = os.path.join(
+		cache_dir
+		,f'{name}.{digest}.sde'
+	)
+	
+	
+	os.makedirs(
+		cache_dir
+		,mode = 0o700
+		,exist_ok = True
+	)
+	
+	
+	
+	# Cached file
+	
+	if os.path.exists(gdb):
+	
+		age = time.time() - os.path.getmtime(gdb)
+		
+		
+		if age < ttl:
+		
+			logging.debug(f'Using cached connection file: {gdb}')
+			_connections[key] = gdb
+			return gdb
+			
+			
+		logging.debug(f'Revalidating cached connection file: {gdb}')
+		
+		try:
+		
+			validate_gdb(gdb)
+			
+		except RuntimeError as e:
+		
+			logging.debug(f'Cached connection file is invalid; recreating: {e}')
+			
+		else:
+		
+			os.utime(gdb) # Restart TTL
+			_connections[key] = gdb
+			return gdb
+			
+			
+			
+	# New file
+	
+	with tempfile.TemporaryDirectory(dir = cache_dir) as temp_dir:
+	
+		logging.debug(f'Creating connection file in {temp_dir}')
+		
+		arcpy.management.CreateDatabaseConnection(
+			out_folder_path = temp_dir
+			,out_name = os.path.basename(gdb)
+			,database_platform = 'SQL_SERVER'
+			,instance = server
+			,account_authentication = 'OPERATING_SYSTEM_AUTH'
+			,database = database
+		)
+		
+		gdb_temp = os.path.join(
+			temp_dir
+			,os.path.basename(gdb)
+		)
+		
+		
+		try:
+		
+			validate_gdb(gdb_temp)
+			
+		except RuntimeError:
+		
+			if prompt is not None:
+			
+				logging.error(f'Invalid connection file: {gdb_temp}')
+				input(prompt)
+				
+			raise
+			
+			
+		os.replace(
+			gdb_temp
+			,gdb
+		)
+		
+		
+	logging.debug(f'Created database connection file: {gdb}')
+	
+	_connections[key] = gdb
+	
+	
+	return gdb
+
+
+
+def create_domain_cv(
+	gdb
+	,coded_values
+	,name
+	,data_type
+	,description = ''
+	,split_policy = 'DEFAULT'
+	,merge_policy = 'DEFAULT'
+	,snapshot = None # SchemaSnapshot of gdb; see below
+	,indent_level = 0
+):
+	'''
+	Create coded value domain, or update existing domain to match
+
+	`coded_values` is a sequence of (code, description) tuples, in display
+	order.
+
+	Rather than one AddCodedValueToDomain call per code, the coded values
+	are written to a scratch table in the memory workspace and loaded with
+	one TableToDomain call. An existing domain is compared with
+	`coded_values` first, so repeated runs are idempotent:
+
+		Same codes, descriptions, and order	No change
+		Codes removed only			One DeleteCodedValueFromDomain call
+		Anything else				Codes replaced with TableToDomain
+
+	The split and merge policies apply to new domains only.
+
+	Existing domains are read from `snapshot`; pass one when creating many
+	domains, so they are listed once. If omitted, domains are listed here.
+	'''
+
+	if _schema_recorder is not None: # See SCHEMA RECORDING note in module header
+
+		_schema_recorder.append(
+			(
+				'domain'
+				,dict(locals())
+			)
+		)
+
+		return
+
+
+
+	if snapshot is None:
+
+		snapshot = SchemaSnapshot(gdb)
+
+
+
+	coded_values = dict(coded_values) # Preserves order
+
+	existing = snapshot.domain(name)
+
+	SchemaSnapshot.invalidate_all( # See SCHEMA SNAPSHOTS note in module header
+		gdb = gdb
+		,domain = name
+	)
+
+
+
+	#
+	# Compare with existing domain
+	#
+
+	if existing is None:
+
+		logging.info(
+			f'Creating domain {name}'
+			,extra = {'indent_level': indent_level}
+		)
+
+		update_option = 'APPEND'
+
+
+	else:
+
+		current = {
+			code: code_description
+			for code, code_description in existing['codes']
+		}
+
+		if list(current.items()) == list(coded_values.items()):
+
+			logging.info(
+				f'Domain {name} is up to date'
+				,extra = {'indent_level': indent_level}
+			)
+
+			return
+
+
+
+		if [
+			(code, code_description)
+			for code, code_description in current.items()
+			if code in coded_values
+		] == list(coded_values.items()):
+
+			removed = [
+				code
+				for code in current
+				if code not in coded_values
+			]
+
+			logging.info(
+				f'Updating domain {name}'
+				,extra = {'indent_level': indent_level}
+			)
+
+			logging.info(
+				'Deleting coded values'
+				,extra = {'indent_level': indent_level + 1}
+			)
+
+			for code in removed:
+
+				logging.info(
+					f'{code}: {current[code]}'
+					,extra = {'indent_level': indent_level + 2}
+				)
+
+
+
+			arcpy.management.DeleteCodedValueFromDomain(
+				in_workspace = gdb
+				,domain_name = name
+				,code = removed
+			)
+
+			return
+
+
+
+		logging.info(
+			f'Replacing coded values of domain {name}'
+			,extra = {'indent_level': indent_level}
+		)
+
+		update_option = 'REPLACE'
+
+
+
+	#
+	# Load coded values
+	#
+
+	logging.info(
+		'Adding coded values'
+		,extra = {'indent_level': indent_level + 1}
+	)
+
+	table = arcpy.management.CreateTable(
+		out_path = 'memory'
+		,out_name = f'domain_{uuid.uuid4().hex}'
+	)[0]
+
+	try:
+
+		arcpy.management.AddFields(
+			in_table = table
+			,field_description = [
+				#name		,type		,alias	,length							,default	,domain
+				['Code'		,data_type	,''	,255 if data_type.upper() == 'TEXT' else ''	,''		,'']
+				,['Description'	,'TEXT'		,''	,255							,''		,'']
+			]
+		)
+
+
+
+		with arcpy.da.InsertCursor(
+			in_table = table
+			,field_names = (
+				'Code'
+				,'Description'
+			)
+		) as cursor:
+
+			for code, code_description in coded_values.items():
+
+				logging.info(
+					f'{code}: {code_description}'
+					,extra = {'indent_level': indent_level + 2}
+				)
+
+				cursor.insertRow(
+					(
+						code
+						,code_description
+					)
+				)
+
+
+
+		arcpy.management.TableToDomain(
+			in_table = table
+			,code_field = 'Code'
+			,description_field = 'Description'
+			,in_workspace = gdb
+			,domain_name = name
+			,domain_description = description
+			,update_option = update_option
+		)
+
+
+	finally:
+
+		arcpy.management.Delete(table)
+
+
+
+	if (
+		existing is None
+		and (
+			split_policy != 'DEFAULT'
+			or merge_policy != 'DEFAULT'
+		)
+	):
+
+		arcpy.management.AlterDomain(
+			in_workspace = gdb
+			,domain_name = name
+			,split_policy = split_policy
+			,merge_policy = merge_policy
+		)
+
+
+
+def create_fc(
+	gdb
+	,fc_name
+	,alias
+	,geometry
+	,sr
+	,attributes = None
+	,subtypes = None
+	,global_id = True
+	,editor_tracking = True
+	,archiving = True
+	,attachments = True
+	,attachments_upgrade = True
+	,privileges = None
+	,indent_level = 0
+):
+
+	if _schema_recorder is not None: # See SCHEMA RECORDING note in module header
+
+		_schema_recorder.append(
+			(
+				'feature class'
+				,dict(locals())
+			)
+		)
+
+		return
+
+
+
+	for name in ( # See SCHEMA SNAPSHOTS note in module header
+		fc_name
+		,f'{fc_name}__ATTACH'
+		,f'{fc_name}__ATTACHREL'
+	):
+
+		SchemaSnapshot.invalidate_all(
+			gdb = gdb
+			,name = name
+		)
+
+
+
+	# Log start message
+
+	logging.info(
+		f'Creating feature class {fc_name}'
+		,extra = {'indent_level': indent_level}
+	)
+
+
+
+	# Create feature class
+
+	arcpy.management.CreateFeatureclass(
+		out_path = gdb
+		,out_name = fc_name
+		,geometry_type = geometry
+		,spatial_reference = sr
+	)
+
+
+
+	fc = os.path.join(
+		gdb
+		,fc_name
+	)
+
+
+
+	# Set alias
+
+	logging.info(
+		f'Setting alias to {alias}'
+		,extra = {'indent_level': indent_level + 1}
+	)
+
+	arcpy.AlterAliasName(
+		table = fc
+		,alias = alias
+	)
+
+
+
+	# Add attributes
+
+	if attributes is not None:
+
+		logging.info(
+			'Adding attributes'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		subtype_domains = add_fields(
+			table = fc
+			,fields_spec = attributes
+			,indent_level = indent_level + 2
+		)
+
+	else:
+
+		subtype_domains = []
+
+
+
+	# Add subtypes
+
+	if subtypes is not None:
+
+		logging.info(
+			'Adding subtypes'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		add_subtypes(
+			table = fc
+			,subtype_spec = subtypes
+			,indent_level = indent_level + 2
+		)
+
+
+
+	# Add subtype-specific domains
+
+	if len(subtype_domains) > 0:
+
+		logging.info(
+			'Adding subtype-specific domains'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		set_subtype_domains(
+			table = fc
+			,domains_spec = subtype_domains
+			,indent_level = indent_level + 2
+		)
+
+
+
+	# Add global IDs
+
+	if global_id:
+
+		logging.info(
+			'Adding global ID'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.AddGlobalIDs(
+			in_datasets = fc
+		)
+
+
+
+	# Enable editor tracking
+
+	if editor_tracking:
+
+		logging.info(
+			'Enabling editor tracking'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.EnableEditorTracking(
+			in_dataset = fc
+			,last_editor_field = LAST_EDITOR_NAME
+			,last_edit_date_field = LAST_EDITOR_TIMESTAMP
+			,add_fields = True
+			,record_dates_in = 'UTC'
+		)
+
+
+
+	# Enable archiving
+
+	if archiving:
+
+		logging.info(
+			'Enabling archiving'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.EnableArchiving(
+			in_dataset = fc
+		)
+
+
+
+	# Enable attachments
+	#
+	# Ensure that GlobalIDs are enabled first, so attachments will use
+	# them in %_ATTACHREL relationship class
+
+	if attachments:
+
+		logging.info(
+			'Enabling attachments'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.EnableAttachments(
+			in_dataset = fc
+		)
+		
+		
+		
+		if attachments_upgrade:
+		
+			logging.info(
+				'Upgrading attachments format'
+				,extra = {'indent_level': indent_level + 1}
+			)
+			
+			arcpy.management.UpgradeAttachments(
+				in_dataset = fc
+			)
+
+
+
+	# Assign privileges
+
+	if privileges:
+
+		logging.info(
+			'Assigning privileges'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+
+		assign_privileges(
+			table = fc
+			,privileges_spec = privileges
+			,indent_level = indent_level + 2
+		)
+
+
+
+def create_rc(
+	gdb
+	,origin_table_name
+	,destination_table_name
+	,rc_name
+	,rc_type
+	,forward_label
+	,backward_label
+	,message_direction
+	,cardinality
+	,attributed
+	,origin_pk
+	,origin_fk
+	,destination_pk = None
+	,destination_fk = None
+	,attributes = None
+	,indent_level = 0
+):
+	'''
+	`attributes` is a tuple in the format of the `add_fields()` function
+	`fields_spec` argument
+	'''
+
+	if _schema_recorder is not None: # See SCHEMA RECORDING note in module header
+
+		_schema_recorder.append(
+			(
+				'relationship class'
+				,dict(locals())
+			)
+		)
+
+		return
+
+
+
+	SchemaSnapshot.invalidate_all( # See SCHEMA SNAPSHOTS note in module header
+		gdb = gdb
+		,name = rc_name
+	)
+
+
+	# Log start message
+
+	logging.info(
+		f'Creating relationship class {rc_name}'
+		,extra = {'indent_level': indent_level}
+	)
+
+
+
+	# DEBUG: Print arguments and values
+	
+	self_name = inspect.currentframe().f_code.co_name
+	self = eval(self_name)
+	args = inspect.getfullargspec(self).args
+	
+	logging.debug(
+		'Arguments:'
+		,extra = {'indent_level': indent_level + 1}
+	)
+	for arg in args:
+	
+		logging.debug(
+			f'{arg:<30}{locals()[arg]}'
+			,extra = {'indent_level': indent_level + 2}
+		)
+	
+
+
+	# Derive fully qualified object names
+
+	origin_table = os.path.join(
+		gdb
+		,origin_table_name
+	)
+
+	destination_table = os.path.join(
+		gdb
+		,destination_table_name
+	)
+	
+	rc = os.path.join(
+		gdb
+		,rc_name
+	)
+
+
+
+	# Create relationship class
+
+	arcpy.management.CreateRelationshipClass(
+		origin_table = origin_table
+		,destination_table = destination_table
+		,out_relationship_class = rc
+		,relationship_type = rc_type
+		,forward_label = forward_label
+		,backward_label = backward_label
+		,message_direction = message_direction
+		,cardinality = cardinality
+		,attributed = attributed
+		,origin_primary_key = origin_pk
+		,origin_foreign_key = origin_fk
+		,destination_primary_key = destination_pk
+		,destination_foreign_key = destination_fk
+	)
+	
+	
+	
+	# Add attributes
+	
+	if attributes is not None:
+	
+		logging.info(
+			f'Creating relationship class {rc_name}'
+			,extra = {'indent_level': indent_level + 1}
+		)
+		
+		rc_table = os.path.join(
+			gdb
+			,rc_name
+		)
+
+		add_fields(
+			table = rc_table
+			,fields_spec = attributes
+			,indent_level = indent_level + 2
+		)
+			
+			
+			
+def create_table(
+	gdb
+	,table_name
+	,alias
+	,attributes = None
+	,subtypes = None
+	,global_id = True
+	,editor_tracking = True
+	,archiving = True
+	,attachments = True
+	,attachments_upgrade = True
+	,privileges = None
+	,indent_level = 0
+):
+
+	if _schema_recorder is not None: # See SCHEMA RECORDING note in module header
+
+		_schema_recorder.append(
+			(
+				'table'
+				,dict(locals())
+			)
+		)
+
+		return
+
+
+
+	for name in ( # See SCHEMA SNAPSHOTS note in module header
+		table_name
+		,f'{table_name}__ATTACH'
+		,f'{table_name}__ATTACHREL'
+	):
+
+		SchemaSnapshot.invalidate_all(
+			gdb = gdb
+			,name = name
+		)
+
+
+
+	# Log start message
+
+	logging.info(
+		f'Creating table {table_name}'
+		,extra = {'indent_level': indent_level}
+	)
+
+
+
+	# Create table
+
+	arcpy.management.CreateTable(
+		out_path = gdb
+		,out_name = table_name
+	)
+
+
+
+	table = os.path.join(
+		gdb
+		,table_name
+	)
+
+
+
+	# Set alias
+
+	logging.info(
+		f'Setting alias to {alias}'
+		,extra = {'indent_level': indent_level + 1}
+	)
+
+	arcpy.AlterAliasName(
+		table = table
+		,alias = alias
+	)
+
+
+
+	# Add attributes
+
+	if attributes is not None:
+
+		logging.info(
+			'Adding attributes'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		subtype_domains = add_fields(
+			table = table
+			,fields_spec = attributes
+			,indent_level = indent_level + 2
+		)
+
+	else:
+
+		subtype_domains = []
+
+
+
+	# Add subtypes
+
+	if subtypes is not None:
+
+		logging.info(
+			'Adding subtypes'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		add_subtypes(
+			table = table
+			,subtype_spec = subtypes
+			,indent_level = indent_level + 2
+		)
+
+
+
+	# Add subtype-specific domains
+
+	if len(subtype_domains) > 0:
+
+		logging.info(
+			'Adding subtype-specific domains'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		set_subtype_domains(
+			table = table
+			,domains_spec = subtype_domains
+			,indent_level = indent_level + 2
+		)
+
+
+
+	# Add global IDs
+
+	if global_id:
+
+		logging.info(
+			'Adding global ID'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.AddGlobalIDs(
+			in_datasets = table
+		)
+
+
+
+	# Enable editor tracking
+
+	if editor_tracking:
+
+		logging.info(
+			'Enabling editor tracking'
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+		arcpy.management.EnableEditorTracking(
+			in_dataset = table
+			,last_editor_field = LAST_EDITOR_NAME
+			,last_edit_date_field = LAST_EDITOR_TIMESTAMP
 			,add_fields = True
 			,record_dates_in = 'UTC'
 		)
@@ -1088,6 +3826,12 @@ def create_view(
 	,indent_level = 0
 ):
 
+	SchemaSnapshot.invalidate_all( # See SCHEMA SNAPSHOTS note in module header
+		gdb = gdb
+		,name = view_name
+	)
+
+
 
 	# Log start message
 	
@@ -1181,25 +3925,201 @@ def create_view(
 		
 		
 		
-	# Assign privileges
+	# Assign privileges
+	
+	if privileges:
+	
+		logging.info(
+			'Assigning privileges'
+			,extra = {'indent_level': indent_level + 1}
+		)
+		
+		
+		assign_privileges(
+			table = view
+			,privileges_spec = privileges
+			,indent_level = indent_level + 2
+			
+		)
+	
+		
+
+
+
+
+def initialize_logging(
+	level = logging.NOTSET
+):
+	'''
+	Configure root logger to write to stdout, with FormatterIndent, on a
+	background thread; see LOGGING QUEUE note in module header
+
+	When running in script mode, this function is called early to establish
+	a basic communication channel with the user. Log at the most verbose
+	level (NOTSET) to avoid suppressing useful messages in case of early
+	problems, with the expectation that the script will choose a more
+	reasonable level after processing arguments.
+
+	Also configures custom DATA and DATADEBUG levels, with attributes and
+	methods that mimic those of the built-in levels:
+
+		Logging level macros
+
+			logging.DATA
+			logging.DATADEBUG
+
+		Wrapper functions, at module level
+
+			logging.data('message')
+			logging.datadebug('message')
+
+		Wrapper functions, at root logger level
+
+			l = logging.getLogger()
+			l.data('message')
+			l.datadebug('message')
+
+	Returns formatter, for use with other handlers (see add_log_handler())
+	'''
+
+	global _log_listener
+
+	stop_logging() # Previous call, if any
+
+
+
+	# Custom DATA and DATADEBUG levels
+
+	logging.DATA = LOG_LEVEL_DATA
+
+	logging.addLevelName(
+		logging.DATA
+		,'DATA'
+	)
+
+	logging.data = _logging_data
+	logging.getLogger().data = _logging_data
+
+
+	logging.DATADEBUG = LOG_LEVEL_DATADEBUG
+
+	logging.addLevelName(
+		logging.DATADEBUG
+		,'DATADEBUG'
+	)
+
+	logging.datadebug = _logging_datadebug
+	logging.getLogger().datadebug = _logging_datadebug
+
+
+
+	# Formatter
+
+	f = FormatterIndent(
+		fmt = LOG_FORMAT
+		,datefmt = LOG_FORMAT_DATE
+	)
+
+
+
+	# Handler
+
+	h = logging.StreamHandler(sys.stdout)
+
+	h.setFormatter(f)
+
+
+
+	# Listener
+
+	q = queue.SimpleQueue()
+
+	_log_listener = logging.handlers.QueueListener(
+		q
+		,h
+		,respect_handler_level = True
+	)
+
+	_log_listener.start()
+
+
+
+	# Flush at exit, before unhandled exception tracebacks, and in forked
+	# child processes (which do not inherit the listener thread)
+
+	atexit.register(stop_logging)
+
+	excepthook = sys.excepthook
+
+	def excepthook_flush(*args):
+
+		stop_logging()
+		excepthook(*args)
+
+	sys.excepthook = excepthook_flush
+
+	if hasattr(os, 'register_at_fork'): # POSIX only
+
+		os.register_at_fork(
+			after_in_child = stop_logging
+		)
+
+
+
+	# Logger
+
+	l = logging.getLogger()
+
+	l.setLevel(level)
+	l.addHandler(LogQueueHandler(q))
+
+
+
+	# Return
+
+	return f
+
+
+
+def lazy_import(name):
+	'''
+	Return module that is imported on first attribute access
+	
+	If the module is already imported (lazily or not), return it as is.
+	Otherwise, register a lazy module in sys.modules, so later `import`
+	statements for the same name also receive it without importing. See
+	LAZY IMPORTS note in module header.
+	
+	Raises ModuleNotFoundError if module cannot be found; this is checked
+	immediately, without importing it
+	'''
+
+	if name in sys.modules:
+	
+		return sys.modules[name]
+		
+		
+		
+	spec = importlib.util.find_spec(name)
 	
-	if privileges:
+	if spec is None:
 	
-		logging.info(
-			'Assigning privileges'
-			,extra = {'indent_level': indent_level + 1}
+		raise ModuleNotFoundError(
+			f'No module named {name!r}'
+			,name = name
 		)
 		
 		
-		assign_privileges(
-			table = view
-			,privileges_spec = privileges
-			,indent_level = indent_level + 2
-			
-		)
+	loader = importlib.util.LazyLoader(spec.loader)
+	spec.loader = loader
 	
-		
-
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	
+	loader.exec_module(module) # Defers module execution to first attribute access
+	
+	
+	return module
 
 
 
@@ -1218,6 +4138,219 @@ def none2blank(
 		
 
 
+@contextlib.contextmanager
+def profile(
+	file_name = None # Statistics output file; None to disable profiling
+	,mode = PROFILE_MODE_DETERMINISTIC # See PROFILE_MODES
+	,top = PROFILE_TOP
+	,interval = PROFILE_INTERVAL # Sample mode only
+	,indent_level = 0
+):
+	'''
+	Context manager that profiles the enclosed block
+
+	Writes statistics to file and logs the top functions by cumulative
+	time. See PROFILING note in module header.
+	'''
+
+	if file_name is None:
+
+		yield
+		return
+
+
+
+	if mode not in PROFILE_MODES:
+
+		raise ValueError(f'Invalid profile mode: {mode}')
+
+
+
+	logging.debug(
+		f'Profiling ({mode}) to {file_name}'
+		,extra = {'indent_level': indent_level}
+	)
+
+	if mode == PROFILE_MODE_DETERMINISTIC:
+
+		profiler = cProfile.Profile()
+		profiler.enable()
+
+
+	else:
+
+		profiler = StackSampler(
+			thread_id = threading.get_ident()
+			,interval = interval
+		)
+		profiler.start()
+
+
+
+	try:
+
+		yield
+
+
+	finally:
+
+		stream = io.StringIO()
+
+		if mode == PROFILE_MODE_DETERMINISTIC:
+
+			profiler.disable()
+			profiler.dump_stats(file_name)
+
+			(
+				pstats.Stats(
+					profiler
+					,stream = stream
+				)
+				.strip_dirs()
+				.sort_stats(pstats.SortKey.CUMULATIVE)
+				.print_stats(top)
+			)
+
+
+		else:
+
+			profiler.stop()
+			profiler.write(file_name)
+
+			stream.write(profiler.summary(top))
+
+
+
+		logging.info(
+			f'Profile ({mode}) written to {file_name}; top {top} functions:\n'
+			f'{stream.getvalue().strip(chr(10))}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+
+def read_keys(
+	file_name
+	,key # Source key field in rejects file, e.g. 'location_id'
+	,events = None # Rejects file events to read keys from; None for all
+):
+	'''
+	Return source keys of rejected rows, from a rejects file written by
+	WarningAggregator, or from a plain list of keys, one per line
+
+	Lines that are JSON objects contribute their `key` value, if any and if
+	their `event` is in `events`. Other lines are keys, parsed as JSON
+	values where possible, so numbers stay numbers. Null keys (e.g. a
+	rejected row missing its key) and duplicate keys are dropped, in file
+	order. Names ending with .gz are read as gzip-compressed.
+
+	See WARNING AGGREGATION note in module header.
+	'''
+
+	keys = {} # Ordered set
+
+	with (
+		gzip.open
+		if file_name.lower().endswith('.gz')
+		else open
+	)(
+		file_name
+		,'rt'
+		,encoding = 'utf-8'
+	) as f:
+
+		for line in f:
+
+			line = line.strip()
+
+			if not line:
+
+				continue
+
+
+
+			try:
+
+				value = json.loads(line)
+
+			except ValueError: # Plain text key
+
+				value = line
+
+
+
+			if isinstance(value, dict):
+
+				if (
+					key not in value
+					or (
+						events is not None
+						and value.get('event') not in events
+					)
+				):
+
+					continue
+
+
+
+				value = value[key]
+
+
+
+			if value is None:
+
+				continue
+
+
+
+			keys[value] = None
+
+
+
+	return list(keys)
+
+
+
+@contextlib.contextmanager
+def record_schema():
+	'''
+	Context manager that records object creation calls instead of running
+	them; see SCHEMA RECORDING note in module header
+
+	Yields list of (object type, arguments), where object type is one of
+	'domain', 'feature class', 'relationship class', or 'table', and
+	arguments are the keyword arguments of the corresponding create_*()
+	function.
+	'''
+
+	global _schema_recorder
+
+	recorder_previous = _schema_recorder
+	_schema_recorder = []
+
+
+
+	try:
+
+		yield _schema_recorder
+
+
+	finally:
+
+		_schema_recorder = recorder_previous
+
+
+
+def schema_snapshot_file(gdb):
+	'''
+	Return conventional saved SchemaSnapshot file name for geodatabase
+	connection file `gdb`; see SCHEMA SNAPSHOTS note in module header
+	'''
+
+	return f'{os.path.splitext(gdb)[0]}{SCHEMA_SNAPSHOT_SUFFIX}'
+
+
+
 def set_subtype_domains(
 	table
 	,domains_spec
@@ -1261,6 +4394,235 @@ def set_subtype_domains(
 
 
 
+def stop_logging():
+	'''
+	Write queued log records, stop logging thread, and attach its handlers
+	to the root logger directly; see LOGGING QUEUE note in module header
+	'''
+
+	global _log_listener
+
+	if _log_listener is None:
+
+		return
+
+
+
+	listener = _log_listener
+	_log_listener = None
+
+	logger = logging.getLogger()
+
+	for handler in logger.handlers[:]:
+
+		if isinstance(handler, LogQueueHandler):
+
+			logger.removeHandler(handler)
+
+
+
+	listener.stop() # Handles remaining records first
+
+	for handler in listener.handlers:
+
+		logger.addHandler(handler)
+
+
+
+@contextlib.contextmanager
+def trace_arcpy(
+	enabled = True
+	,indent_level = 0
+):
+	'''
+	Context manager that traces arcpy calls in the enclosed block, and logs
+	counts and latencies by call site when the block ends
+
+	See ARCPY CALL TRACING note in module header.
+	'''
+
+	if not enabled:
+
+		yield
+		return
+
+
+
+	logging.debug(
+		'Tracing arcpy calls'
+		,extra = {'indent_level': indent_level}
+	)
+
+	tracer = ArcpyTracer()
+	tracer.install()
+
+
+
+	try:
+
+		yield tracer
+
+
+	finally:
+
+		tracer.uninstall()
+
+		logging.info(
+			f'arcpy calls by call site:\n{tracer.report()}'
+			,extra = {'indent_level': indent_level}
+		)
+
+
+
+def validate_gdb(gdb):
+	'''
+	Validate that connection file refers to an enterprise geodatabase
+	
+	Creating connection file does not appear to test connection, just
+	write properties to file, so this requires a Describe round-trip.
+	
+	Raises RuntimeError if not
+	'''
+
+	logging.debug('Validating geodatabase connection')
+	try:
+
+		# Describe raises:
+		#	IOError if target is not a recognized object type
+		#	OSError if target does not exist
+
+		d = arcpy.Describe(gdb)
+		logging.debug(f'Describe type: {d.dataType}')
+
+
+
+		# Referencing workspaceType raises AttributeError if target is not a workspace
+
+		if not d.workspaceType == 'RemoteDatabase':
+
+			# Explicitly raise exception if target is not an enterprise geodatabase
+
+			raise TypeError(f'Expected RemoteDatabase type; got {d.workspaceType} type')
+
+
+	except (
+		IOError
+		,OSError
+		,AttributeError
+		,TypeError
+	) as e:
+
+		raise RuntimeError('Invalid enterprise geodatabase') from e
+
+
+
+def where_in(
+	field
+	,values
+):
+	'''
+	Return SQL where clause selecting rows whose `field` is one of `values`
+
+	Strings are quoted, and numbers are not; other values (e.g. None) are
+	dropped, since they cannot be compared with IN. Values are listed in
+	IN lists of at most WHERE_IN_CHUNK values each, joined with OR, to stay
+	within database limits. With no values, the clause selects no rows.
+	'''
+
+	literals = []
+
+	for value in values:
+
+		if isinstance(value, str):
+
+			value = value.replace("'", "''")
+
+			literals.append(f"'{value}'")
+
+
+		elif isinstance(value, (int, float)) and not isinstance(value, bool):
+
+			literals.append(str(value))
+
+
+
+	if not literals:
+
+		return '1 = 0'
+
+
+
+	clauses = [
+		f'{field} IN ({", ".join(literals[i:i + WHERE_IN_CHUNK])})'
+		for i in range(0, len(literals), WHERE_IN_CHUNK)
+	]
+
+	if len(clauses) == 1:
+
+		return clauses[0]
+
+
+
+	return f'({" OR ".join(clauses)})'
+
+
+
+#
+# Private
+#
+
+def _logging_data(
+	msg
+	,*args
+	,**kwargs
+):
+	'''
+	Create function for custom logging.DATA level
+
+	This function will be bound to the logging module and the root logger
+	to match the convenience functions for the built-in log levels. For
+	example: logging.data('message')
+	'''
+
+	logging.log(
+		logging.DATA
+		,msg
+		,*args
+		,**kwargs
+	)
+
+
+
+def _logging_datadebug(
+	msg
+	,*args
+	,**kwargs
+):
+	'''
+	Create function for custom logging.DATADEBUG level
+
+	This function will be bound to the logging module and the root logger
+	to match the convenience functions for the built-in log levels. For
+	example: logging.datadebug('message')
+	'''
+
+	logging.log(
+		logging.DATADEBUG
+		,msg
+		,*args
+		,**kwargs
+	)
+
+
+
+
+
+################################################################################
+# Lazy imports
+################################################################################
+
+arcpy = lazy_import('arcpy') # See LAZY IMPORTS note in module header
+
 
 
 ################################################################################
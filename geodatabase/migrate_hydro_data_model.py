@@ -0,0 +1,1312 @@
+################################################################################
+# Name:
+#	migrate_hydro_data_model.py
+#
+# Purpose:
+#	Bring an existing geodatabase up to date with the hydrologic monitoring
+#	data model, applying only the differences
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#
+# Notes:
+#
+#	METHOD
+#
+#	The object definitions in create_hydro_data_model.py are the desired
+#	state of the model. This script:
+#
+#		1. Records the desired state by running the model's creation
+#		   functions within mg.record_schema(), which makes no changes
+#		2. Compares a checksum of the desired state with the latest entry
+#		   in the schema ledger table; if they match, and that entry left
+#		   no warnings, the geodatabase is up to date and the script exits
+#		3. Reads the live schema once, through mg.SchemaSnapshot: one
+#		   arcpy.da.ListDomains() call and one arcpy.Describe() of the
+#		   workspace
+#		4. Builds an ordered plan of changes from the differences
+#		5. Applies the plan (unless --dry-run), then appends an entry to
+#		   the ledger
+#
+#	Reruns against a migrated geodatabase are therefore no-ops. While the
+#	latest entry has outstanding warnings (see PLAN note), reruns plan
+#	again so the warnings are reported until they are resolved; a new entry
+#	is only appended when changes are applied or the warnings differ. Use
+#	--force to compare against the live schema regardless of the ledger
+#	(e.g. after manual schema changes).
+#
+#	The schema snapshot is saved next to the connection file. Dry runs
+#	reuse a saved snapshot within its time-to-live, so repeated plan
+#	generation makes no catalog round-trips; runs that apply changes (and
+#	--force) always read the live schema.
+#
+#
+#
+#	PLAN
+#
+#	Changes are applied in dependency order:
+#
+#		Domains			Created, or updated to match
+#					  (mg.create_domain_cv)
+#		Feature classes, tables	Created if missing, with all properties
+#		Fields			Added if missing; alias, domain, and
+#					  default updated to match
+#		Relationship classes	Created if missing
+#
+#	Other differences are reported as warnings, and left for a manual
+#	update script: field type, length, and nullability changes (which
+#	require copying data); tables and relationship classes that are not in
+#	the model; and fields that are not in the model, unless --drop-fields
+#	is specified. System fields (object ID, global ID, shape, editor
+#	tracking, archiving) are ignored.
+#
+#
+#
+#	NUMBERED UPDATE SCRIPTS
+#
+#	The update_database_hydro.<n>.py scripts are kept for reference. Their
+#	schema changes are covered here; data migrations (e.g. loading
+#	DischargeMeasurement from legacy records) are out of scope and still
+#	need a dedicated script. The ledger numbers its entries after the last
+#	numbered update.
+#
+# History:
+#	2026-10-18 MCM Created
+#	               Read live schema through mg.SchemaSnapshot, saved between
+#	                 runs
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Plan again while latest ledger entry has outstanding
+#	                 warnings, rather than reporting schema up to date
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Accept DATA and DATADEBUG log levels (mg.LOG_LEVEL_NAMES)
+#	               Name schema snapshot file with mg.schema_snapshot_file()
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+
+# Standard
+
+import argparse
+import collections
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+
+
+# Custom
+
+import create_hydro_data_model
+import mg
+
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
+
+
+#
+# Constants
+#
+
+
+# Schema ledger
+
+LEDGER_TABLE_NAME = 'SchemaLedger'
+
+LEDGER_ATTRIBUTES = (
+	#name			,type		,precision	,scale	,length		,alias			,nullable	,required	,domain		,default
+	('Version'		,'LONG'		,None		,None	,None		,'Version'		,True		,False		,None		,None)
+	,('Checksum'		,'TEXT'		,None		,None	,64		,'Checksum'		,True		,False		,None		,None)
+	,('AppliedDate'		,'DATE'		,None		,None	,None		,'Applied Date'		,True		,False		,None		,None)
+	,('Changes'		,'LONG'		,None		,None	,None		,'Changes'		,True		,False		,None		,None)
+	,('Warnings'		,'LONG'		,None		,None	,None		,'Warnings'		,True		,False		,None		,None)
+)
+
+LEDGER_VERSION_FIRST = 6 # After update_database_hydro.5.py
+
+
+
+# Field types, from add_fields() specification to arcpy.Field.type
+
+FIELD_TYPES = {
+	'BIGINTEGER': 'BigInteger'
+	,'BLOB': 'Blob'
+	,'DATE': 'Date'
+	,'DOUBLE': 'Double'
+	,'FLOAT': 'Single'
+	,'GUID': 'Guid'
+	,'LONG': 'Integer'
+	,'SHORT': 'SmallInteger'
+	,'TEXT': 'String'
+}
+
+
+
+# System fields and objects, not managed by the model
+
+SYSTEM_FIELD_NAMES = ( # Lowercase
+	mg.LAST_EDITOR_NAME.lower()
+	,mg.LAST_EDITOR_TIMESTAMP.lower()
+	,'gdb_archive_oid'
+	,'gdb_from_date'
+	,'gdb_to_date'
+	,'shape.starea()'
+	,'shape.stlength()'
+	,'shape_area'
+	,'shape_length'
+)
+
+SYSTEM_FIELD_TYPES = (
+	'Geometry'
+	,'GlobalID'
+	,'OID'
+)
+
+SYSTEM_OBJECT_SUFFIXES = ( # Lowercase; attachment tables and relationship classes
+	'__attach'
+	,'__attachrel'
+)
+
+
+
+# Recorded arguments excluded from the desired state checksum, because they
+# vary by connection or call rather than by model
+
+CHECKSUM_EXCLUDED_ARGUMENTS = (
+	'gdb'
+	,'indent_level'
+	,'snapshot'
+)
+
+
+
+#
+# Types
+#
+
+Change = collections.namedtuple( # Plan step
+	'Change'
+	,(
+		'description'
+		,'function'
+		,'arguments'
+	)
+)
+
+
+
+
+
+
+################################################################################
+# Migration functions
+################################################################################
+
+
+####################
+# Desired state
+####################
+
+def get_checksum(
+	desired
+):
+	'''
+	Return SHA-256 checksum of recorded desired state, as hexadecimal string
+
+	Spatial references are represented by their factory code.
+	'''
+
+	def default(o):
+
+		factory_code = getattr(o, 'factoryCode', None)
+
+		if factory_code is not None:
+
+			return factory_code
+
+		return str(o)
+
+
+
+	state = [
+		(
+			object_type
+			,{
+				k: v
+				for k, v in arguments.items()
+				if k not in CHECKSUM_EXCLUDED_ARGUMENTS
+			}
+		)
+		for object_type, arguments in desired
+	]
+
+
+
+	return hashlib.sha256(
+		json.dumps(
+			state
+			,default = default
+			,sort_keys = True
+		).encode('utf-8')
+	).hexdigest()
+
+
+
+def get_desired_schema(
+	gdb
+	,indent_level = 0
+):
+	'''
+	Return desired state of the model, as recorded by mg.record_schema()
+	'''
+
+	with mg.record_schema() as desired:
+
+		create_hydro_data_model.create_domains(gdb, indent_level)
+		create_hydro_data_model.create_fcs(gdb, indent_level)
+		create_hydro_data_model.create_tables(gdb, indent_level)
+		create_hydro_data_model.create_rcs(gdb, indent_level)
+
+
+
+	return desired
+
+
+
+####################
+# Plan
+####################
+
+def get_plan(
+	gdb
+	,desired
+	,snapshot # mg.SchemaSnapshot of gdb
+	,drop_fields = False
+):
+	'''
+	Compare desired and live schemas; see PLAN note in module header
+
+	Returns tuple of (changes, warnings), where changes is a list of Change
+	in the order they must be applied, and warnings is a list of messages
+	for differences that are not migrated automatically.
+	'''
+
+	changes = []
+	warnings = []
+
+
+
+	#
+	# Domains
+	#
+
+	for object_type, arguments in desired:
+
+		if object_type != 'domain':
+
+			continue
+
+
+
+		name = arguments['name']
+		domain = snapshot.domain(name)
+		codes = [
+			list(cv)
+			for cv in arguments['coded_values']
+		]
+
+		if domain is None:
+
+			description = f'Create domain {name}'
+
+
+		elif domain['codes'] != codes:
+
+			description = f'Update domain {name}'
+
+
+		else:
+
+			continue
+
+
+
+		changes.append(
+			Change(
+				description
+				,mg.create_domain_cv
+				,{**arguments, 'gdb': gdb, 'snapshot': snapshot}
+			)
+		)
+
+
+
+	#
+	# Feature classes and tables, and their fields
+	#
+
+	for object_type, arguments in desired:
+
+		if object_type == 'feature class':
+
+			name = arguments['fc_name']
+			function = mg.create_fc
+
+
+		elif object_type == 'table':
+
+			name = arguments['table_name']
+			function = mg.create_table
+
+
+		else:
+
+			continue
+
+
+
+		table = snapshot.dataset(name)
+
+		if table is None:
+
+			changes.append(
+				Change(
+					f'Create {object_type} {name}'
+					,function
+					,{**arguments, 'gdb': gdb}
+				)
+			)
+
+			continue
+
+
+
+		changes_fields, warnings_fields = _get_plan_fields(
+			table_path = os.path.join(gdb, name)
+			,table_name = name
+			,fields_spec = arguments['attributes'] or ()
+			,fields_live = table['fields']
+			,drop_fields = drop_fields
+		)
+
+		changes.extend(changes_fields)
+		warnings.extend(warnings_fields)
+
+
+
+	#
+	# Relationship classes
+	#
+
+	for object_type, arguments in desired:
+
+		if (
+			object_type == 'relationship class'
+			and not snapshot.exists(arguments['rc_name'])
+		):
+
+			changes.append(
+				Change(
+					f'Create relationship class {arguments["rc_name"]}'
+					,mg.create_rc
+					,{**arguments, 'gdb': gdb}
+				)
+			)
+
+
+
+	#
+	# Objects not in model
+	#
+
+	desired_names = [
+		(
+			arguments.get('fc_name')
+			or arguments.get('table_name')
+			or arguments.get('rc_name')
+			or ''
+		).lower()
+		for object_type, arguments in desired
+	]
+
+	for dataset in snapshot.datasets().values():
+
+		name = dataset['name']
+
+		if (
+			name.lower() in desired_names
+			or name.lower() == LEDGER_TABLE_NAME.lower()
+			or name.lower().endswith(SYSTEM_OBJECT_SUFFIXES)
+		):
+
+			continue
+
+
+
+		warnings.append(f'{name} is not in the model; delete manually if obsolete')
+
+
+
+	return changes, warnings
+
+
+
+def apply_plan(
+	changes
+	,snapshot # mg.SchemaSnapshot, updated with changes
+	,indent_level = 0
+):
+
+	for change in changes:
+
+		logging.info(
+			change.description
+			,extra = {'indent_level': indent_level}
+		)
+
+		arguments = dict(change.arguments)
+
+		if 'indent_level' in arguments:
+
+			arguments['indent_level'] = indent_level + 1
+
+		change.function(**arguments)
+
+
+
+		# mg functions invalidate snapshots themselves; arcpy tools do not
+
+		if 'in_table' in arguments:
+
+			snapshot.invalidate(
+				name = os.path.basename(arguments['in_table'])
+			)
+
+
+
+####################
+# Ledger
+####################
+
+def get_ledger_latest(
+	gdb
+):
+	'''
+	Return (version, checksum, warning count) of latest ledger entry, or
+	None if the ledger does not exist or is empty
+	'''
+
+	ledger = os.path.join(
+		gdb
+		,LEDGER_TABLE_NAME
+	)
+
+	if not arcpy.Exists(ledger):
+
+		return None
+
+
+
+	with arcpy.da.SearchCursor(
+		in_table = ledger
+		,field_names = (
+			'Version'
+			,'Checksum'
+			,'Warnings'
+		)
+		,sql_clause = (
+			None
+			,'ORDER BY Version DESC'
+		)
+	) as cursor:
+
+		for row in cursor:
+
+			return row
+
+
+
+	return None
+
+
+
+def write_ledger(
+	gdb
+	,version
+	,checksum
+	,change_count
+	,warning_count
+	,indent_level = 0
+):
+	'''
+	Append entry to ledger, creating ledger table if it does not exist
+	'''
+
+	ledger = os.path.join(
+		gdb
+		,LEDGER_TABLE_NAME
+	)
+
+	if not arcpy.Exists(ledger):
+
+		mg.create_table(
+			gdb = gdb
+			,table_name = LEDGER_TABLE_NAME
+			,alias = 'Schema Ledger'
+			,attributes = LEDGER_ATTRIBUTES
+			,global_id = False
+			,editor_tracking = False
+			,archiving = False
+			,attachments = False
+			,attachments_upgrade = False
+			,indent_level = indent_level
+		)
+
+
+
+	logging.info(
+		f'Recording ledger version {version}'
+		,extra = {'indent_level': indent_level}
+	)
+
+	with arcpy.da.InsertCursor(
+		in_table = ledger
+		,field_names = (
+			'Version'
+			,'Checksum'
+			,'AppliedDate'
+			,'Changes'
+			,'Warnings'
+		)
+	) as cursor:
+
+		cursor.insertRow(
+			(
+				version
+				,checksum
+				,datetime.datetime.now()
+				,change_count
+				,warning_count
+			)
+		)
+
+
+
+####################
+# Migration
+####################
+
+def migrate_model(
+	gdb
+	,dry_run = False
+	,drop_fields = False
+	,force = False
+	,indent_level = 0
+):
+	'''
+	Migrate geodatabase to the model; see METHOD note in module header
+
+	Returns number of changes applied (or planned, with `dry_run`)
+	'''
+
+	logging.info(
+		'Recording model definition'
+		,extra = {'indent_level': indent_level}
+	)
+
+	desired = get_desired_schema(
+		gdb = gdb
+		,indent_level = indent_level + 1
+	)
+
+	checksum = get_checksum(desired)
+
+
+
+	logging.info(
+		'Reading schema ledger'
+		,extra = {'indent_level': indent_level}
+	)
+
+	latest = get_ledger_latest(gdb)
+
+	if latest is None:
+
+		version = LEDGER_VERSION_FIRST
+
+
+	else:
+
+		version = latest[0] + 1
+
+		if latest[1] == checksum and not force:
+
+			if not latest[2]: # Null for no warnings
+
+				logging.info(
+					f'Schema is up to date (ledger version {latest[0]})'
+					,extra = {'indent_level': indent_level + 1}
+				)
+
+				return 0
+
+
+
+			logging.info( # Checksum alone does not show the warnings were resolved
+				f'Ledger version {latest[0]} has {latest[2]} outstanding warnings; planning again'
+				,extra = {'indent_level': indent_level + 1}
+			)
+
+
+
+	logging.info(
+		'Planning changes'
+		,extra = {'indent_level': indent_level}
+	)
+
+	snapshot = mg.SchemaSnapshot( # See METHOD note in module header
+		gdb = gdb
+		,file_name = mg.schema_snapshot_file(gdb)
+		,ttl = mg.SCHEMA_SNAPSHOT_TTL if dry_run and not force else 0
+	)
+
+	changes, warnings = get_plan(
+		gdb = gdb
+		,desired = desired
+		,snapshot = snapshot
+		,drop_fields = drop_fields
+	)
+
+	logging.info(
+		f'{len(changes)} changes, {len(warnings)} warnings'
+		,extra = {'indent_level': indent_level + 1}
+	)
+
+	for warning in warnings:
+
+		logging.warning(
+			warning
+			,extra = {'indent_level': indent_level + 1}
+		)
+
+
+
+	if dry_run:
+
+		for change in changes:
+
+			logging.info(
+				f'Would: {change.description}'
+				,extra = {'indent_level': indent_level + 1}
+			)
+
+		snapshot.save()
+
+		return len(changes)
+
+
+
+	logging.info(
+		'Applying changes'
+		,extra = {'indent_level': indent_level}
+	)
+
+	apply_plan(
+		changes = changes
+		,snapshot = snapshot
+		,indent_level = indent_level + 1
+	)
+
+	if (
+		changes
+		or latest is None
+		or latest[1] != checksum
+		or latest[2] != len(warnings)
+	):
+
+		write_ledger(
+			gdb = gdb
+			,version = version
+			,checksum = checksum
+			,change_count = len(changes)
+			,warning_count = len(warnings)
+			,indent_level = indent_level
+		)
+
+	snapshot.save()
+
+
+
+	return len(changes)
+
+
+
+
+
+
+################################################################################
+# Utility functions
+################################################################################
+
+
+# Private
+
+def _configure_arguments():
+	'''
+	Configure arguments when running in script mode
+	
+	Returns configured argparse.ArgumentParser
+	'''
+
+	ap = argparse.ArgumentParser(
+		conflict_handler = 'resolve' # Allow overwriting built-in -h/--help to add to custom argument group
+		,description = 'Migrate a geodatabase to the hydrologic monitoring data model'
+	)
+
+
+
+	g = ap.add_argument_group( # Avoid all named arguments being listed as 'optional' in help
+		'Arguments'
+	)
+
+
+
+	g.add_argument(
+		'-s'
+		,'--server'
+		,dest = 'server'
+		,help = 'SQL Server hostname'
+		,metavar = '<server>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-d'
+		,'--database'
+		,dest = 'database'
+		,help = 'SQL Server database name'
+		,metavar = '<database>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-L'
+		,'--log-level'
+		,choices = mg.LOG_LEVEL_NAMES
+		,default = 'INFO'
+		,dest = 'log_level'
+		,help = 'Logging level (default: INFO)'
+		,required = False
+		,type = str.upper
+	)
+	
+	g.add_argument(
+		'-l'
+		,'--log-file'
+		,dest = 'log_file_name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
+		,metavar = '<log_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-n'
+		,'--dry-run'
+		,dest = 'dry_run'
+		,help = 'Log planned changes without applying them'
+		,action = 'store_true'
+	)
+
+	g.add_argument(
+		'-D'
+		,'--drop-fields'
+		,dest = 'drop_fields'
+		,help = 'Delete fields that are not in the model'
+		,action = 'store_true'
+	)
+
+	g.add_argument(
+		'-F'
+		,'--force'
+		,dest = 'force'
+		,help = 'Compare with live schema even if the ledger is up to date'
+		,action = 'store_true'
+	)
+	
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
+
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
+
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
+	
+	
+	
+	return ap
+
+
+
+def _get_plan_fields(
+	table_path
+	,table_name
+	,fields_spec # add_fields() format
+	,fields_live # mg.SchemaSnapshot.dataset() fields
+	,drop_fields = False
+):
+	'''
+	Compare desired and live fields of an existing table; see get_plan()
+
+	Returns tuple of (changes, warnings)
+	'''
+
+	changes = []
+	warnings = []
+	missing = []
+
+
+
+	for field_spec in fields_spec:
+
+		(
+			name
+			,data_type
+			,precision
+			,scale
+			,length
+			,alias
+			,is_nullable
+			,is_required
+			,domain
+			,default
+		) = field_spec
+
+		field = fields_live.get(name.lower())
+
+
+
+		# Missing; add below, in one add_fields() call
+
+		if field is None:
+
+			missing.append(field_spec)
+
+			continue
+
+
+
+		# Differences that require copying data
+
+		if FIELD_TYPES.get(data_type.upper()) != field['type']:
+
+			warnings.append(
+				f'{table_name}.{name} type is {field["type"]}, model has {data_type}; migrate manually'
+			)
+
+
+		elif data_type.upper() == 'TEXT' and length != field['length']:
+
+			warnings.append(
+				f'{table_name}.{name} length is {field["length"]}, model has {length}; migrate manually'
+			)
+
+
+
+		if bool(is_nullable) != field['nullable']:
+
+			warnings.append(
+				f'{table_name}.{name} nullable is {field["nullable"]}, model has {bool(is_nullable)}; migrate manually'
+			)
+
+
+
+		# Alias
+
+		if alias and alias != field['alias']:
+
+			changes.append(
+				Change(
+					f'Set {table_name}.{name} alias to {alias}'
+					,arcpy.management.AlterField
+					,{
+						'in_table': table_path
+						,'field': name
+						,'new_field_alias': alias
+					}
+				)
+			)
+
+
+
+		# Domain; subtype-specific domains (tuple) are not compared
+
+		if type(domain) is not tuple and mg.none2blank(domain) != mg.none2blank(field['domain']):
+
+			if domain:
+
+				changes.append(
+					Change(
+						f'Assign domain {domain} to {table_name}.{name}'
+						,arcpy.management.AssignDomainToField
+						,{
+							'in_table': table_path
+							,'field_name': name
+							,'domain_name': domain
+						}
+					)
+				)
+
+
+			else:
+
+				changes.append(
+					Change(
+						f'Remove domain from {table_name}.{name}'
+						,arcpy.management.RemoveDomainFromField
+						,{
+							'in_table': table_path
+							,'field_name': name
+						}
+					)
+				)
+
+
+
+		# Default; compare as text, since live defaults of numeric fields
+		# are numbers
+
+		if str(mg.none2blank(default)) != str(mg.none2blank(field['default'])):
+
+			if default is None:
+
+				changes.append(
+					Change(
+						f'Clear {table_name}.{name} default'
+						,arcpy.management.AssignDefaultToField
+						,{
+							'in_table': table_path
+							,'field_name': name
+							,'default_value': None
+							,'clear_value': True
+						}
+					)
+				)
+
+
+			else:
+
+				changes.append(
+					Change(
+						f'Set {table_name}.{name} default to {default}'
+						,arcpy.management.AssignDefaultToField
+						,{
+							'in_table': table_path
+							,'field_name': name
+							,'default_value': default
+						}
+					)
+				)
+
+
+
+	if missing:
+
+		changes.append(
+			Change(
+				f'Add fields to {table_name}: {", ".join(f[0] for f in missing)}'
+				,mg.add_fields
+				,{
+					'table': table_path
+					,'fields_spec': tuple(missing)
+					,'indent_level': 0 # Set in apply_plan()
+				}
+			)
+		)
+
+
+
+	# Fields not in model
+
+	names_spec = [
+		field_spec[0].lower()
+		for field_spec in fields_spec
+	]
+
+	for name_lower, field in fields_live.items():
+
+		if (
+			name_lower in names_spec
+			or name_lower in SYSTEM_FIELD_NAMES
+			or field['type'] in SYSTEM_FIELD_TYPES
+		):
+
+			continue
+
+
+
+		if drop_fields:
+
+			changes.append(
+				Change(
+					f'Delete field {table_name}.{field["name"]}'
+					,arcpy.management.DeleteField
+					,{
+						'in_table': table_path
+						,'drop_field': field['name']
+					}
+				)
+			)
+
+
+		else:
+
+			warnings.append(
+				f'{table_name}.{field["name"]} is not in the model; use --drop-fields to delete'
+			)
+
+
+
+	return changes, warnings
+
+
+
+def _print_banner(
+	args
+):
+	'''
+	Print banner containing argument information to log
+	'''
+
+	banner = (
+		f'{mg.BANNER_DELIMITER_1}\n'
+		f'Hydrologic Data Model Migration\n'
+		f'{mg.BANNER_DELIMITER_2}\n'
+		f'Target database server:  {args.server}\n'
+		f'Target database name:    {args.database}\n'
+		f'Log level:               {args.log_level}\n'
+		f'Dry run:                 {args.dry_run}\n'
+		f'Drop fields:             {args.drop_fields}\n'
+		f'Force:                   {args.force}\n'
+		f'Profile file:            {args.profile_file}\n'
+		f'Profile mode:            {args.profile_mode}\n'
+		f'Trace arcpy:             {args.trace_arcpy}\n'
+		f'{mg.BANNER_DELIMITER_1}'
+	)
+
+
+
+	# Print banner
+
+	logging.info(banner)
+
+
+
+def _process_arguments(
+	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
+):
+	'''
+	Process arguments for main block
+	
+	Act on arguments that can be handled immediately. Return arguments, as
+	well as any objects created here that are needed elsewhere.
+	
+	Note: Refrain from sending log messges until the log level argument is
+	processed, as not to report extraneous information to a user who
+	requested a coarser level of detail.
+	'''
+
+
+	# Define arguments
+
+	parser = _configure_arguments()
+
+
+
+	# Fetch argument values
+
+	args = parser.parse_args(argv)
+
+
+
+	#
+	# Evaluate arguments
+	#
+
+
+	# Set log level
+
+	logging.getLogger().setLevel(args.log_level)
+	
+	
+	
+	# Configure log file
+	#
+	# Do this as early as possible, so we can capture the most messages to
+	# the log file; logging messages sent before log file coniguration will
+	# go to console only
+
+	if args.log_file_name is not None:
+	
+		logging.debug(f'Configuring log file {args.log_file_name}')
+		mg.configure_log_file(
+			args.log_file_name
+			,log_formatter
+		)
+	
+	
+	
+	#
+	# Return
+	#
+	
+	return args
+
+
+
+
+
+
+################################################################################
+# Main
+################################################################################
+
+if __name__ == '__main__':
+
+
+	#
+	# Setup
+	#
+
+
+	# Initialize logging infrastructure; do this early so we can communicate
+	# with user
+	#
+	# Keep a reference to the formatter so we can use it with other handlers
+	# (e.g. FileHandler)
+
+	log_formatter = mg.initialize_logging()
+
+
+
+	# Process arguments
+
+	try:
+	
+		args = _process_arguments(log_formatter)
+		
+	
+	except Exception as e:
+	
+		logging.error(e)
+		raise
+
+
+
+	# Print banner
+
+	_print_banner(args)
+
+
+
+	# Connect to geodatabase
+	
+	logging.info('Connecting to geodatabase')
+
+	try:
+	
+		gdb = mg.connect_gdb(
+			server = args.server
+			,database = args.database
+		)
+		
+		
+	except RuntimeError as e:
+	
+		logging.error(e)
+		
+		sys.exit(mg.EXIT_FAILURE)
+
+	
+	
+	#
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
+	#
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
+
+		#
+		# Migrate model
+		#
+	
+		migrate_model(
+			gdb = gdb
+			,dry_run = args.dry_run
+			,drop_fields = args.drop_fields
+			,force = args.force
+		)
+	
+
+	
+	#
+	# Cleanup
+	#
+
+	logging.info('Done.')
+
+
+
+
+################################################################################
+# END
+################################################################################
@@ -0,0 +1,724 @@
+################################################################################
+# Name:
+#	photo_processing.py
+#
+# Purpose:
+#	Photo file processing functions for hydro photo loading, designed to
+#	run in worker processes
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#		Pillow (bundled with ArcGIS Pro; required for photo reduction and
+#		  thumbnails only)
+#
+# Notes:
+#	Functions in this module are submitted to a concurrent.futures executor
+#	by the photo loader, so they must be defined at module level (to be
+#	picklable) and must not depend on arcpy or on any state in the calling
+#	process. Each function accepts simple arguments and returns a dict of
+#	simple values.
+#
+#	Pillow is imported on first use, so that callers that do not reduce
+#	photos or generate thumbnails do not pay its import cost (or require it
+#	to be installed).
+#
+#	EXIF metadata is extracted with a minimal parser here rather than with
+#	Pillow, so it is available whether or not photos are reduced. The
+#	parser walks the JPEG marker segments from the start of the file and
+#	stops at the EXIF segment or the start of image data, so it reads only
+#	the file header, not the compressed image.
+#
+# History:
+#	2026-10-18 MCM Created
+#	               Add SHA-256 content hash to read_photo()
+#	               Add EXIF extraction (read_exif)
+#	               Add thumbnail generation (make_thumbnail)
+#	               Add read / processing times to read_photo()
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+import datetime
+import hashlib
+import io
+import struct
+import time
+
+
+
+################################################################################
+# Constants
+################################################################################
+
+
+#
+# Photo reading
+#
+
+READ_CHUNK_SIZE = 1048576 # Bytes per read when streaming photo files
+
+
+
+#
+# EXIF
+#
+
+JPEG_MARKER_APP1 = 0xE1 # Application segment containing EXIF
+JPEG_MARKER_SOI = 0xD8 # Start of image
+JPEG_MARKER_SOS = 0xDA # Start of scan; image data follows
+
+JPEG_MARKERS_STANDALONE = ( # Markers without a length / payload: TEM, RST0-RST7
+	(0x01,)
+	+ tuple(range(0xD0, 0xD8))
+)
+
+EXIF_HEADER = b'Exif\x00\x00'
+
+EXIF_TAG_DATETIME = 0x0132
+EXIF_TAG_DATETIME_ORIGINAL = 0x9003
+EXIF_TAG_EXIF_IFD = 0x8769
+EXIF_TAG_GPS_IFD = 0x8825
+EXIF_TAG_GPS_LATITUDE_REF = 0x0001
+EXIF_TAG_GPS_LATITUDE = 0x0002
+EXIF_TAG_GPS_LONGITUDE_REF = 0x0003
+EXIF_TAG_GPS_LONGITUDE = 0x0004
+
+EXIF_TYPE_SIZES = { # Bytes per value, by TIFF field type
+	1: 1 # BYTE
+	,2: 1 # ASCII
+	,3: 2 # SHORT
+	,4: 4 # LONG
+	,5: 8 # RATIONAL
+	,7: 1 # UNDEFINED
+	,9: 4 # SLONG
+	,10: 8 # SRATIONAL
+}
+
+EXIF_TYPE_FORMATS = { # struct format of numeric values, by TIFF field type
+	3: 'H' # SHORT
+	,4: 'L' # LONG
+	,5: 'L' # RATIONAL (numerator, denominator)
+	,9: 'l' # SLONG
+	,10: 'l' # SRATIONAL (numerator, denominator)
+}
+
+EXIF_FORMAT_DATETIME = '%Y:%m:%d %H:%M:%S'
+
+
+
+#
+# Photo reduction
+#
+
+JPEG_QUALITY_DEFAULT = 85
+
+REDUCE_FORMATS = ( # Pillow format names that we re-encode; others pass through unchanged
+	'JPEG'
+	,'PNG'
+)
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+
+#
+# Public
+#
+
+def read_exif(stream):
+	'''
+	Read EXIF metadata from the header of a JPEG file
+	
+	`stream` is a binary file object positioned at the start of the file.
+	Only the marker segments preceding the EXIF segment are read; reading
+	stops at the start of image data.
+	
+	Returns dict:
+	
+		exif		Raw EXIF segment payload, starting with the
+				'Exif' header (bytes), or None if not found
+		capture_time	Date/time the photo was taken (ISO 8601 str), or
+				None
+		latitude	GPS latitude (decimal degrees), or None
+		longitude	GPS longitude (decimal degrees), or None
+	
+	Malformed or absent EXIF data yields None values rather than an
+	exception, as EXIF is informational only.
+	'''
+	
+	result = {
+		'exif': None
+		,'capture_time': None
+		,'latitude': None
+		,'longitude': None
+	}
+	
+	
+	
+	# Find EXIF segment
+	
+	if stream.read(2) != bytes((0xFF, JPEG_MARKER_SOI)):
+	
+		return result
+		
+		
+	while True:
+	
+		marker = stream.read(2)
+		
+		if (
+			len(marker) < 2
+			or marker[0] != 0xFF
+		):
+		
+			return result
+			
+			
+		if marker[1] == 0xFF: # Fill byte; marker follows
+		
+			stream.seek(-1, io.SEEK_CUR)
+			continue
+			
+			
+		if marker[1] in JPEG_MARKERS_STANDALONE:
+		
+			continue
+			
+			
+		if marker[1] == JPEG_MARKER_SOS:
+		
+			return result
+			
+			
+		length = stream.read(2)
+		
+		if len(length) < 2:
+		
+			return result
+			
+			
+		size = struct.unpack('>H', length)[0] - 2 # Length includes itself
+		
+		
+		if marker[1] == JPEG_MARKER_APP1:
+		
+			payload = stream.read(size)
+			
+			if payload.startswith(EXIF_HEADER):
+			
+				result['exif'] = payload
+				break
+				
+		else:
+		
+			stream.seek(size, io.SEEK_CUR)
+			
+			
+			
+	# Parse selected tags
+	
+	try:
+	
+		result.update(_parse_exif(result['exif'][len(EXIF_HEADER):]))
+		
+	except (
+		IndexError
+		,KeyError
+		,ValueError
+		,ZeroDivisionError
+		,struct.error
+	):
+	
+		pass # Keep raw EXIF; parsed values remain None
+		
+		
+	return result
+
+
+
+def make_thumbnail(
+	data
+	,max_dimension
+	,jpeg_quality = JPEG_QUALITY_DEFAULT
+):
+	'''
+	Generate thumbnail of image content, in the same format, fitting
+	within a `max_dimension` square; see reduce_image()
+	
+	Images already within `max_dimension` are their own thumbnail.
+
+	Returns thumbnail content (bytes), or None if the image is not in a
+	format we re-encode
+	'''
+
+	from PIL import Image
+
+
+	with Image.open(io.BytesIO(data)) as image: # Reads header only
+
+		if image.format not in REDUCE_FORMATS:
+
+			return None
+
+
+		if max(image.size) <= max_dimension:
+
+			return data
+
+
+
+	return reduce_image(
+		data = data
+		,max_dimension = max_dimension
+		,jpeg_quality = jpeg_quality
+	)
+
+
+
+def read_photo(
+	photo_file
+	,max_dimension = None
+	,jpeg_quality = JPEG_QUALITY_DEFAULT
+	,thumbnail_dimension = None
+):
+	'''
+	Read photo file and, optionally, reduce its size
+
+	If `max_dimension` is set, images whose width or height exceeds it are
+	downsampled to fit within a `max_dimension` square, preserving aspect
+	ratio, and re-encoded in their original format. JPEG images are
+	re-encoded at `jpeg_quality`. If the reduced image is not smaller than
+	the original file, the original bytes are kept.
+
+	The SHA-256 hash is computed over the source file content as it is
+	streamed from disk, so it identifies the photo independently of its
+	file name and of any reduction applied here.
+	
+	EXIF metadata is read from the header of `data`, after any reduction,
+	so it describes the content that is loaded; see read_exif().
+	
+	If `thumbnail_dimension` is set, a thumbnail is also generated from
+	`data`; see make_thumbnail().
+
+	Returns dict:
+
+		data		File content, possibly reduced (bytes)
+		sha256		SHA-256 hash of source file (hexadecimal str)
+		size_original	Size of source file (bytes)
+		size		Size of `data` (bytes)
+		reduced		True if `data` was reduced from source file
+		exif		\
+		capture_time	 \ See read_exif()
+		latitude	 /
+		longitude	/
+		thumbnail	Thumbnail content, or None (bytes)
+		seconds_read	Time spent reading source file (float)
+		seconds_process	Time spent reducing, extracting EXIF, and
+				generating thumbnail (float)
+	'''
+
+	time_start = time.perf_counter()
+
+	chunks = []
+	sha256 = hashlib.sha256()
+
+
+	with open(
+		photo_file
+		,'rb'
+	) as f:
+
+		while chunk := f.read(READ_CHUNK_SIZE):
+
+			sha256.update(chunk)
+			chunks.append(chunk)
+
+
+	data = b''.join(chunks)
+
+
+	result = {
+		'data': data
+		,'sha256': sha256.hexdigest()
+		,'size_original': len(data)
+		,'size': len(data)
+		,'reduced': False
+		,'thumbnail': None
+	}
+
+	time_read = time.perf_counter()
+
+
+
+	if max_dimension is not None:
+
+		data_reduced = reduce_image(
+			data = data
+			,max_dimension = max_dimension
+			,jpeg_quality = jpeg_quality
+		)
+
+
+		if (
+			data_reduced is not None
+			and len(data_reduced) < len(data)
+		):
+
+			result['data'] = data_reduced
+			result['size'] = len(data_reduced)
+			result['reduced'] = True
+
+
+
+	if thumbnail_dimension is not None:
+
+		result['thumbnail'] = make_thumbnail(
+			data = result['data']
+			,max_dimension = thumbnail_dimension
+			,jpeg_quality = jpeg_quality
+		)
+
+
+
+	result.update(
+		read_exif(
+			io.BytesIO(result['data'])
+		)
+	)
+
+
+
+	result['seconds_read'] = time_read - time_start
+	result['seconds_process'] = time.perf_counter() - time_read
+
+
+
+	return result
+
+
+
+def reduce_image(
+	data
+	,max_dimension
+	,jpeg_quality = JPEG_QUALITY_DEFAULT
+):
+	'''
+	Downsample and re-encode image content
+
+	EXIF orientation is applied to the pixels before resizing, so the
+	output displays upright in clients that ignore the orientation tag, and
+	the tag is reset in the output EXIF so clients that honor it do not
+	rotate the image a second time. Other EXIF metadata is retained.
+
+	Returns reduced image content (bytes), or None if the image is already
+	within `max_dimension` or is not in a format we re-encode
+	'''
+
+	from PIL import Image, ImageOps
+
+
+	with Image.open(io.BytesIO(data)) as image:
+
+		image_format = image.format
+
+
+		if image_format not in REDUCE_FORMATS:
+
+			return None
+
+
+		if max(image.size) <= max_dimension:
+
+			return None
+
+
+
+		# Apply orientation; returns a copy with orientation tag removed
+
+		image_upright = ImageOps.exif_transpose(image)
+
+		image_upright.thumbnail(
+			(
+				max_dimension
+				,max_dimension
+			)
+			,Image.LANCZOS
+		)
+
+
+
+		# Encode
+
+		options = {
+			'exif': image_upright.getexif()
+		}
+
+		if image_format == 'JPEG':
+
+			options['quality'] = jpeg_quality
+			options['optimize'] = True
+
+			if image_upright.mode not in ( # JPEG does not support alpha / palette
+				'L'
+				,'RGB'
+				,'CMYK'
+			):
+
+				image_upright = image_upright.convert('RGB')
+
+
+		buffer = io.BytesIO()
+
+		image_upright.save(
+			buffer
+			,format = image_format
+			,**options
+		)
+
+
+
+	return buffer.getvalue()
+
+
+
+#
+# Private
+#
+
+def _parse_exif(tiff):
+	'''
+	Parse capture time and GPS position from EXIF TIFF structure
+	
+	Returns dict with capture_time, latitude, and longitude keys, for
+	values found
+	'''
+	
+	result = {}
+	
+	
+	
+	# TIFF header
+	
+	if tiff[:2] == b'II':
+	
+		byte_order = '<'
+		
+	elif tiff[:2] == b'MM':
+	
+		byte_order = '>'
+		
+	else:
+	
+		raise ValueError('Invalid TIFF byte order')
+		
+		
+	offset_ifd0 = struct.unpack(f'{byte_order}L', tiff[4:8])[0]
+	
+	
+	
+	# IFDs
+	
+	ifd0 = _read_ifd(
+		tiff = tiff
+		,offset = offset_ifd0
+		,byte_order = byte_order
+	)
+	
+	
+	if EXIF_TAG_EXIF_IFD in ifd0:
+	
+		ifd_exif = _read_ifd(
+			tiff = tiff
+			,offset = ifd0[EXIF_TAG_EXIF_IFD][0]
+			,byte_order = byte_order
+		)
+		
+	else:
+	
+		ifd_exif = {}
+		
+		
+	if EXIF_TAG_GPS_IFD in ifd0:
+	
+		ifd_gps = _read_ifd(
+			tiff = tiff
+			,offset = ifd0[EXIF_TAG_GPS_IFD][0]
+			,byte_order = byte_order
+		)
+		
+	else:
+	
+		ifd_gps = {}
+		
+		
+		
+	# Capture time; prefer original over last-modified date/time
+	
+	value = ifd_exif.get(
+		EXIF_TAG_DATETIME_ORIGINAL
+		,ifd0.get(EXIF_TAG_DATETIME)
+	)
+	
+	if value is not None:
+	
+		result['capture_time'] = datetime.datetime.strptime(
+			value
+			,EXIF_FORMAT_DATETIME
+		).isoformat()
+		
+		
+		
+	# GPS position
+	
+	for (
+		key
+		,tag_ref
+		,tag_value
+		,negative_ref
+	) in (
+		(
+			'latitude'
+			,EXIF_TAG_GPS_LATITUDE_REF
+			,EXIF_TAG_GPS_LATITUDE
+			,'S'
+		)
+		,(
+			'longitude'
+			,EXIF_TAG_GPS_LONGITUDE_REF
+			,EXIF_TAG_GPS_LONGITUDE
+			,'W'
+		)
+	):
+	
+		if tag_value in ifd_gps:
+		
+			(
+				degrees
+				,minutes
+				,seconds
+			) = ifd_gps[tag_value]
+			
+			value = degrees + minutes / 60 + seconds / 3600
+			
+			if ifd_gps.get(tag_ref) == negative_ref:
+			
+				value = -value
+				
+				
+			result[key] = value
+			
+			
+			
+	return result
+
+
+
+def _read_ifd(
+	tiff
+	,offset
+	,byte_order # struct byte order character
+):
+	'''
+	Read TIFF image file directory (IFD) entries
+	
+	Returns dict of tag: value, where value is a str for ASCII fields, or
+	a tuple of numbers for numeric fields. Unsupported field types are
+	omitted.
+	'''
+	
+	entries = {}
+	
+	
+	count = struct.unpack(f'{byte_order}H', tiff[offset:offset + 2])[0]
+	
+	
+	for i in range(count):
+	
+		entry = offset + 2 + i * 12
+		
+		(
+			tag
+			,field_type
+			,value_count
+		) = struct.unpack(f'{byte_order}HHL', tiff[entry:entry + 8])
+		
+		
+		if field_type not in EXIF_TYPE_SIZES:
+		
+			continue
+			
+			
+			
+		# Values fit in the entry if four bytes or fewer; otherwise,
+		# the entry holds their offset
+		
+		size = EXIF_TYPE_SIZES[field_type] * value_count
+		
+		if size <= 4:
+		
+			start = entry + 8
+			
+		else:
+		
+			start = struct.unpack(f'{byte_order}L', tiff[entry + 8:entry + 12])[0]
+			
+			
+		raw = tiff[start:start + size]
+		
+		if len(raw) < size:
+		
+			raise ValueError('IFD value out of range')
+			
+			
+			
+		if field_type == 2: # ASCII
+		
+			entries[tag] = raw.split(b'\x00')[0].decode('ascii', 'replace').strip()
+			
+		elif field_type in (1, 7): # BYTE, UNDEFINED
+		
+			entries[tag] = tuple(raw)
+			
+		elif field_type in (5, 10): # RATIONAL, SRATIONAL
+		
+			numbers = struct.unpack(
+				f'{byte_order}{value_count * 2}{EXIF_TYPE_FORMATS[field_type]}'
+				,raw
+			)
+			
+			entries[tag] = tuple(
+				numbers[j] / numbers[j + 1]
+				for j in range(0, len(numbers), 2)
+			)
+			
+		else: # SHORT, LONG, SLONG
+		
+			entries[tag] = struct.unpack(
+				f'{byte_order}{value_count}{EXIF_TYPE_FORMATS[field_type]}'
+				,raw
+			)
+			
+			
+			
+	return entries
+
+
+
+
+
+################################################################################
+# END
+################################################################################
@@ -0,0 +1,1492 @@
+################################################################################
+# Name:
+#	reconcile_hydro_photos.py
+#
+# Purpose:
+#	Reconcile hydro geodatabase Location and Measuring Point photo
+#	attachments with the Aquarius photo index
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#
+# Notes:
+#	load_hydro_photos.py adds photos to the geodatabase, but photos that
+#	are later removed or retagged in Aquarius remain attached. This script
+#	compares the photo index with the attachments in the geodatabase and
+#	applies the differences.
+#
+#
+#
+#	METHOD
+#
+#	The script builds three set indexes, each in one pass:
+#
+#		o Photo index: the attachments that should exist, keyed by
+#		  attachment table, related global ID, and file name, with
+#		  their keywords. Location NWFIDs and Measuring Point Aquarius
+#		  IDs are resolved to global IDs through the parent index.
+#
+#		o Parent tables: Location global IDs by NWFID, and Measuring
+#		  Point global IDs by Aquarius ID. Rows are selected with the
+#		  photo loader's target keys (load_hydro_photos.Attachment
+#		  TARGET_KEY), so photos resolve to the rows the loader
+#		  attaches them to, active or not.
+#
+#		o Attachment tables: the attachments that do exist, with
+#		  metadata only (no attachment content).
+#
+#	Changes are then computed as set differences:
+#
+#		Add		Expected, but not attached
+#		Delete		Attached, but not expected (including duplicates
+#				of an expected attachment)
+#		Keywords	Attached and expected, with wrong keywords
+#
+#	A report of the change volume, by table, is logged before any change
+#	is made. With --dry-run, the script stops after the report.
+#	Otherwise, changes are applied in batches, each in its own edit
+#	session, so a failure rolls back only the current batch.
+#
+#
+#
+#	SCOPE OF DELETES
+#
+#	Field users may add photos to the same attachment tables in
+#	Survey123, so not every attachment comes from Aquarius. By default,
+#	only attachments whose file name appears in the photo index, or that
+#	are recorded in the photo loader state database (--state-db), are
+#	candidates for deletion. Photos removed from Aquarius entirely are
+#	therefore only deleted with a state database, or with --all, which
+#	treats every attachment in the tables as managed by the photo index.
+#
+#	Attachments for index records that fail validation (e.g. missing
+#	photo file) are never deleted.
+#
+#	Photo thumbnail attachments are ignored; the photo loader maintains
+#	them with their photos (see load_hydro_photos.py --thumbnail-dimension).
+#
+#
+#
+#	ADDS
+#
+#	Missing attachments are loaded through the photo loader
+#	(load_hydro_photos.Attachment.load), so they are identical to
+#	attachments it loads: photos are reduced (--max-dimension), thumbnails
+#	loaded (--thumbnail-dimension), and attachments recorded in the photo
+#	state database. Use the same options as the photo loader.
+#
+#
+#
+#	MESSAGES
+#
+#	All messaging is processed through the `logging` module, including user
+#	feedback, diagnostic messages, and errors. Output to all destinations
+#	is UTF-8 encoded.
+#
+#	In script mode, this module uses the root logger.
+#
+# History:
+#	2026-10-18 MCM Created
+#	               Ignore photo thumbnail attachments
+#	               Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Accept argument list from hydro.py
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Delete state records by attachment, and record added
+#	                 attachments without journaling them
+#	               Select parent rows with photo loader target keys,
+#	                 including inactive Measuring Points
+#	               Load added attachments through photo loader, with
+#	                 --max-dimension, --jpeg-quality, and
+#	                 --thumbnail-dimension options
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Use mg.LOG_LEVEL_NAMES for log level choices
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+
+# Standard
+
+import argparse
+import collections
+import importlib.util
+import logging
+import os
+import sys
+import uuid
+
+
+# Custom
+
+import load_hydro_photos
+import mg
+import photo_processing
+
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
+
+
+#
+# Constants
+#
+
+BATCH_SIZE = 500 # Changes per edit session
+
+
+# Attachment tables and keywords, by photo type
+
+TABLE_LOCATION = 'hydro.location__attach'
+TABLE_MP = 'hydro.measuringpoint__attach'
+
+KEYWORDS = {
+	TABLE_LOCATION: 'Location_image'
+	,TABLE_MP: 'MeasuringPoint_image'
+}
+
+ATTACHMENT_CLASSES = { # Photo loader classes, for adds
+	TABLE_LOCATION: load_hydro_photos.LocationAttachment
+	,TABLE_MP: load_hydro_photos.MPAttachment
+}
+
+
+
+################################################################################
+# Classes
+################################################################################
+
+class Changes:
+	'''
+	Attachment changes computed by reconciliation
+	'''
+
+
+	########################################################################
+	# Instance methods
+	########################################################################
+
+
+	#
+	# Public
+	#
+
+	def __init__(self):
+
+		logging.debug(f'Initializing {__class__.__name__}')
+
+
+
+		# Lists of changes
+
+		self.adds = [] # (table, rel_globalid, Photo)
+		self.deletes = [] # (table, attachmentid, rel_globalid, att_name)
+		self.keywords = [] # (table, attachmentid, keywords)
+
+
+
+	def __str__(self):
+
+		template = '\n\t{table:<40s}{add:>12s}{delete:>12s}{keywords:>12s}'
+
+
+		counts = {
+			table: collections.Counter()
+			for table in KEYWORDS
+		}
+
+		for change in self.adds:
+
+			counts[change[0]]['add'] += 1
+
+		for change in self.deletes:
+
+			counts[change[0]]['delete'] += 1
+
+		for change in self.keywords:
+
+			counts[change[0]]['keywords'] += 1
+
+
+
+		message = 'Reconciliation changes'
+
+		message += template.format(
+			table = ''
+			,add = 'Add'
+			,delete = 'Delete'
+			,keywords = 'Keywords'
+		)
+
+		for (
+			table
+			,count
+		) in counts.items():
+
+			message += template.format(
+				table = table
+				,add = f'{count["add"]:n}'
+				,delete = f'{count["delete"]:n}'
+				,keywords = f'{count["keywords"]:n}'
+			)
+
+
+		return message
+
+
+
+	@property
+	def count(self):
+
+		return (
+			len(self.adds)
+			+ len(self.deletes)
+			+ len(self.keywords)
+		)
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+
+#
+# Public
+#
+
+def apply_changes(
+	gdb
+	,changes # Changes
+	,state = None # load_hydro_photos.PhotoState
+	,batch_size = BATCH_SIZE
+	,max_dimension = None
+	,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+	,thumbnail_dimension = None
+):
+	'''
+	Apply reconciliation changes in batches, one edit session per batch
+	
+	Deletes and keyword fixes are applied with one cursor per table and
+	batch. Adds read each photo file as it is loaded; see ADDS note in
+	module header.
+	'''
+
+	editor = arcpy.da.Editor(gdb)
+	logging.debug('Created geodatabase editor')
+
+
+
+	#
+	# Deletes
+	#
+
+	if len(changes.deletes) > 0:
+
+		logging.info(f'Deleting {len(changes.deletes):n} attachments')
+
+
+	for batch in _batches(
+		changes.deletes
+		,batch_size
+	):
+
+		_edit(
+			editor = editor
+			,function = _delete_attachments
+			,gdb = gdb
+			,batch = batch
+		)
+
+
+		if state is not None:
+
+			_delete_state(
+				state = state
+				,batch = batch
+			)
+
+
+
+	#
+	# Keywords
+	#
+
+	if len(changes.keywords) > 0:
+
+		logging.info(f'Fixing keywords for {len(changes.keywords):n} attachments')
+
+
+	for batch in _batches(
+		changes.keywords
+		,batch_size
+	):
+
+		_edit(
+			editor = editor
+			,function = _update_keywords
+			,gdb = gdb
+			,batch = batch
+		)
+
+
+
+	#
+	# Adds
+	#
+
+	if len(changes.adds) > 0:
+
+		logging.info(f'Adding {len(changes.adds):n} attachments')
+
+
+	for batch in _batches(
+		changes.adds
+		,batch_size
+	):
+
+		_edit(
+			editor = editor
+			,function = _insert_attachments
+			,gdb = gdb
+			,batch = batch
+			,state = state
+			,max_dimension = max_dimension
+			,jpeg_quality = jpeg_quality
+			,thumbnail_dimension = thumbnail_dimension
+		)
+
+
+
+def compute_changes(
+	index_file
+	,photo_dir
+	,gdb
+	,state = None # load_hydro_photos.PhotoState
+	,all_attachments = False # Treat all attachments as managed by photo index
+):
+	'''
+	Build set indexes of photo index, parent tables, and attachment tables,
+	and return Changes needed to reconcile attachments with photo index
+	'''
+
+
+	#
+	# Photo index
+	#
+
+	(
+		index_records
+		,tag_columns
+		,photo_uuids
+	) = load_hydro_photos.validate_index(
+		index_file = index_file
+		,photo_dir = photo_dir
+	)
+
+
+	index_file_names = _read_index_file_names(index_file)
+
+
+
+	#
+	# Photos
+	#
+
+	photos = []
+	file_names_valid = set()
+
+
+	for index_record in index_records:
+
+		try:
+
+			photo = load_hydro_photos.Photo(
+				index_record = index_record
+				,photo_dir = photo_dir
+				,tag_columns = tag_columns
+			)
+
+		except ValueError as e:
+
+			logging.warning(f'Skipping photo: {e}')
+			continue
+
+
+		file_names_valid.add(photo.file_name)
+
+		photos.append(photo)
+
+
+
+	#
+	# Parent tables
+	#
+	# Selected with the photo loader's target keys; see METHOD note in
+	# module header. A key that matches multiple rows maps to None, since
+	# the loader attaches to none of them.
+	#
+
+	logging.info('Reading Location and Measuring Point records')
+
+	locations = {}
+
+	with arcpy.da.SearchCursor(
+		in_table = os.path.join(
+			gdb
+			,'hydro.location'
+		)
+		,field_names = (
+			'nwfid'
+			,'globalid'
+		)
+		,where_clause = mg.where_in(
+			field = load_hydro_photos.LocationAttachment.TARGET_KEY
+			,values = {photo.location for photo in photos if photo.is_location}
+		)
+	) as cursor:
+
+		for row in cursor:
+
+			if row[0] in locations:
+
+				locations[row[0]] = None
+
+			else:
+
+				locations[row[0]] = _standardize_globalid(row[1])
+
+
+	mps = {}
+
+	with arcpy.da.SearchCursor(
+		in_table = os.path.join(
+			gdb
+			,'hydro.measuringpoint'
+		)
+		,field_names = (
+			'aquariusid'
+			,'globalid'
+		)
+		,where_clause = mg.where_in(
+			field = load_hydro_photos.MPAttachment.TARGET_KEY
+			,values = {mp_uuid for photo in photos for mp_uuid in photo.mp_uuids}
+		)
+	) as cursor:
+
+		for row in cursor:
+
+			mp_uuid = row[0].upper() # As TARGET_KEY
+
+			if mp_uuid in mps:
+
+				mps[mp_uuid] = None
+
+			else:
+
+				mps[mp_uuid] = _standardize_globalid(row[1])
+
+
+
+	#
+	# Expected attachments
+	#
+
+	expected = {} # (table, rel_globalid, att_name): Photo
+
+
+	for photo in photos:
+
+		targets = []
+
+		if photo.is_location:
+
+			targets.append(
+				(
+					TABLE_LOCATION
+					,locations.get(photo.location)
+				)
+			)
+
+		if photo.is_mp:
+
+			for mp_uuid in photo.mp_uuids:
+
+				targets.append(
+					(
+						TABLE_MP
+						,mps.get(mp_uuid)
+					)
+				)
+
+
+		for (
+			table
+			,rel_globalid
+		) in targets:
+
+			if rel_globalid is None:
+
+				logging.debug(f'No unique target record for photo; not expected: Table {table} File {photo.file_name}')
+				continue
+
+
+			expected[
+				(
+					table
+					,rel_globalid
+					,photo.file_name
+				)
+			] = photo
+
+
+	logging.debug(f'{len(expected):n} attachments expected from photo index')
+
+
+
+	#
+	# Managed attachments
+	#
+	# Attachments that may be deleted; see script header notes
+	#
+
+	file_names_protected = index_file_names - file_names_valid
+
+	managed_state = set()
+
+	if state is not None:
+
+		for record in state.find_all():
+
+			managed_state.add(
+				(
+					record['table_name']
+					,record['rel_globalid']
+					,record['att_name']
+				)
+			)
+
+
+
+	#
+	# Existing attachments, and changes
+	#
+
+	changes = Changes()
+
+	found = set()
+
+
+	for table in KEYWORDS:
+
+		logging.info(f'Reading attachment metadata from {table}')
+
+
+		with arcpy.da.SearchCursor(
+			in_table = os.path.join(
+				gdb
+				,table
+			)
+			,field_names = (
+				'attachmentid'
+				,'rel_globalid'
+				,'att_name'
+				,'keywords'
+			)
+			,sql_clause = (
+				None
+				,'ORDER BY attachmentid'
+			)
+		) as cursor:
+
+			for (
+				attachmentid
+				,rel_globalid
+				,att_name
+				,keywords
+			) in cursor:
+
+				if (
+					keywords is not None
+					and keywords.endswith(load_hydro_photos.THUMBNAIL_SUFFIX)
+				):
+
+					continue # Maintained by photo loader
+
+
+				rel_globalid = _standardize_globalid(rel_globalid)
+
+				key = (
+					table
+					,rel_globalid
+					,att_name
+				)
+
+
+				if (
+					key in expected
+					and key not in found
+				):
+
+					found.add(key)
+
+					if keywords != KEYWORDS[table]:
+
+						changes.keywords.append(
+							(
+								table
+								,attachmentid
+								,KEYWORDS[table]
+							)
+						)
+
+
+				elif (
+					att_name not in file_names_protected
+					and (
+						all_attachments
+						or att_name in index_file_names
+						or key in managed_state
+					)
+				):
+
+					changes.deletes.append(
+						(
+							table
+							,attachmentid
+							,rel_globalid
+							,att_name
+						)
+					)
+
+
+
+	for (
+		key
+		,photo
+	) in expected.items():
+
+		if key not in found:
+
+			changes.adds.append(
+				(
+					key[0]
+					,key[1]
+					,photo
+				)
+			)
+
+
+
+	return changes
+
+
+
+def reconcile_photos(
+	index_file
+	,photo_dir
+	,gdb
+	,dry_run = False
+	,state_file = None
+	,all_attachments = False
+	,batch_size = BATCH_SIZE
+	,max_dimension = None
+	,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+	,thumbnail_dimension = None
+):
+	'''
+	Compute and report reconciliation changes and, unless `dry_run`, apply
+	them
+	'''
+
+	if state_file is None:
+
+		state = None
+
+	else:
+
+		state = load_hydro_photos.PhotoState(state_file)
+
+
+
+	try:
+
+		changes = compute_changes(
+			index_file = index_file
+			,photo_dir = photo_dir
+			,gdb = gdb
+			,state = state
+			,all_attachments = all_attachments
+		)
+
+		logging.info(changes)
+
+
+		for change in changes.deletes:
+
+			logging.debug(f'Delete: Table {change[0]} attachmentid {change[1]} rel_globalid {change[2]} File {change[3]}')
+
+		for change in changes.keywords:
+
+			logging.debug(f'Keywords: Table {change[0]} attachmentid {change[1]} Keywords {change[2]}')
+
+		for change in changes.adds:
+
+			logging.debug(f'Add: Table {change[0]} rel_globalid {change[1]} File {change[2].file_name}')
+
+
+
+		if dry_run:
+
+			logging.info('Dry run; no changes applied')
+
+		elif changes.count == 0:
+
+			logging.info('Attachments are reconciled; no changes needed')
+
+		else:
+
+			apply_changes(
+				gdb = gdb
+				,changes = changes
+				,state = state
+				,batch_size = batch_size
+				,max_dimension = max_dimension
+				,jpeg_quality = jpeg_quality
+				,thumbnail_dimension = thumbnail_dimension
+			)
+
+			logging.info(f'Applied {changes.count:n} changes')
+
+
+	finally:
+
+		if state is not None:
+
+			state.close()
+
+
+
+#
+# Private
+#
+
+def _batches(
+	changes
+	,batch_size
+):
+
+	for i in range(
+		0
+		,len(changes)
+		,batch_size
+	):
+
+		yield changes[i:i + batch_size]
+
+
+
+def _configure_arguments():
+	'''
+	Configure arguments when running in script mode
+
+	Returns configured argparse.ArgumentParser
+	'''
+
+	ap = argparse.ArgumentParser(
+		conflict_handler = 'resolve' # Allow overwriting built-in -h/--help to add to custom argument group
+		,description = 'Reconcile hydro geodatabase photo attachments with Aquarius photo index'
+	)
+
+
+
+	g = ap.add_argument_group( # Avoid all named arguments being listed as 'optional' in help
+		'Arguments'
+	)
+
+
+
+	g.add_argument(
+		'-i'
+		,'--index-file'
+		,dest = 'index_file'
+		,help = 'Photo index file'
+		,metavar = '<index_file>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-d'
+		,'--database'
+		,dest = 'database'
+		,help = 'Geodatabase database name'
+		,metavar = '<database>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-D'
+		,'--photo-dir'
+		,dest = 'photo_dir'
+		,help = 'Photo directory'
+		,metavar = '<photo_dir>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-g'
+		,'--gdb-server'
+		,dest = 'gdb_server'
+		,help = 'Geodatabase server'
+		,metavar = '<geodatabase_server>'
+		,required = True
+	)
+
+	g.add_argument(
+		'-L'
+		,'--log-level'
+		,choices = mg.LOG_LEVEL_NAMES
+		,default = 'INFO'
+		,dest = 'log_level'
+		,help = 'Logging level (default: INFO)'
+		,required = False
+		,type = str.upper
+	)
+
+	g.add_argument(
+		'-l'
+		,'--log-file'
+		,dest = 'log_file_name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
+		,metavar = '<log_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-n'
+		,'--dry-run'
+		,action = 'store_true'
+		,dest = 'dry_run'
+		,help = 'Report changes without applying them'
+		,required = False
+	)
+
+	g.add_argument(
+		'-s'
+		,'--state-db'
+		,dest = 'state_file'
+		,help = 'Photo loader state database (SQLite); attachments recorded in it may be deleted'
+		,metavar = '<state_db>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-a'
+		,'--all'
+		,action = 'store_true'
+		,dest = 'all_attachments'
+		,help = 'Treat all attachments as managed by photo index, including those added in Survey123'
+		,required = False
+	)
+
+	g.add_argument(
+		'-b'
+		,'--batch-size'
+		,default = BATCH_SIZE
+		,dest = 'batch_size'
+		,help = f'Number of changes per edit session (default: {BATCH_SIZE})'
+		,metavar = '<batch_size>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-x'
+		,'--max-dimension'
+		,dest = 'max_dimension'
+		,help = 'Reduce added photos larger than this width or height (pixels); use the photo loader setting'
+		,metavar = '<max_dimension>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-q'
+		,'--jpeg-quality'
+		,default = photo_processing.JPEG_QUALITY_DEFAULT
+		,dest = 'jpeg_quality'
+		,help = f'JPEG quality (1-95) for reduced photos (default: {photo_processing.JPEG_QUALITY_DEFAULT})'
+		,metavar = '<jpeg_quality>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-t'
+		,'--thumbnail-dimension'
+		,dest = 'thumbnail_dimension'
+		,help = 'Load a thumbnail attachment of each added photo, no larger than this width or height (pixels); use the photo loader setting'
+		,metavar = '<thumbnail_dimension>'
+		,required = False
+		,type = int
+	)
+
+	g.add_argument(
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
+	)
+
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
+	)
+
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
+
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
+
+
+
+	return ap
+
+
+
+def _delete_attachments(
+	gdb
+	,batch # List of (table, attachmentid, rel_globalid, att_name)
+):
+
+	for (
+		table
+		,attachmentids
+	) in _group_by_table(batch).items():
+
+		with arcpy.da.UpdateCursor(
+			in_table = os.path.join(
+				gdb
+				,table
+			)
+			,field_names = 'attachmentid'
+			,where_clause = f'attachmentid IN ({", ".join(str(a[1]) for a in attachmentids)})'
+		) as cursor:
+
+			for row in cursor:
+
+				cursor.deleteRow()
+
+
+
+def _delete_state(
+	state # load_hydro_photos.PhotoState
+	,batch # List of (table, attachmentid, rel_globalid, att_name)
+):
+	'''
+	Delete state records of deleted attachments
+	'''
+
+	for change in batch:
+
+		state.delete_attachment(
+			table_name = change[0]
+			,attachmentid = change[1]
+		)
+
+
+
+def _edit(
+	editor # arcpy.da.Editor
+	,function
+	,**kwargs
+):
+	'''
+	Call function in its own edit session, committing on success and
+	rolling back on failure
+	
+	Returns function result
+	'''
+
+	editor.startEditing(
+		with_undo = False
+		,multiuser_mode = False
+	)
+
+
+	try:
+
+		result = function(**kwargs)
+
+
+	except Exception as e:
+
+		logging.error('Failed to apply batch; rolling back')
+
+		editor.stopEditing(False)
+
+		raise RuntimeError(f'Failed to apply batch: {e}') from e
+
+
+	editor.stopEditing(True)
+
+	logging.debug(f'Committed batch of {len(kwargs["batch"]):n} changes')
+
+
+	return result
+
+
+
+def _group_by_table(batch):
+
+	groups = collections.defaultdict(list)
+
+	for change in batch:
+
+		groups[change[0]].append(change)
+
+
+	return groups
+
+
+
+def _insert_attachments(
+	gdb
+	,batch # List of (table, rel_globalid, Photo)
+	,state = None # load_hydro_photos.PhotoState
+	,max_dimension = None
+	,jpeg_quality = photo_processing.JPEG_QUALITY_DEFAULT
+	,thumbnail_dimension = None
+):
+	'''
+	Read photo files and load attachments through the photo loader; see
+	ADDS note in module header
+	
+	Attachments are recorded in `state` as they are loaded, so a batch that
+	is rolled back leaves state records of attachments that do not exist;
+	the photo loader checks that recorded attachments exist before using
+	them (Attachment._exists_target).
+	'''
+
+	for (
+		table
+		,rel_globalid
+		,photo
+	) in batch:
+
+		try:
+
+			photo.get_data(
+				max_dimension = max_dimension
+				,jpeg_quality = jpeg_quality
+				,thumbnail_dimension = thumbnail_dimension
+			)
+
+		except OSError as e:
+
+			logging.warning(f'Skipping add: Failed to read photo file: File {photo.file_name}: {e}')
+			continue
+
+
+		try:
+
+			attachment = ATTACHMENT_CLASSES[table](
+				gdb = gdb
+				,photo = photo
+				,rel_globalids = [rel_globalid]
+			)
+
+		except ValueError as e:
+
+			logging.warning(f'Skipping add: Failed to generate attachment metadata: File {photo.file_name}: {e}')
+			continue
+
+
+		errors = attachment.load(
+			state = state
+			,journal = False # Journal is for resuming loader runs
+		)
+
+		for error in errors:
+
+			logging.warning(f'Failed to add attachment: Table {table} rel_globalid {rel_globalid} File {photo.file_name}: {error}')
+
+
+		photo.data = None # Release content
+		photo.thumbnail = None
+
+
+
+def _print_banner(
+	args
+):
+	'''
+	Print banner containing argument information to log
+	'''
+
+	banner = (
+		f'{mg.BANNER_DELIMITER_1}\n'
+		f'Hydrologic Geodatabase Photo Reconciliation\n'
+		f'{mg.BANNER_DELIMITER_2}\n'
+		f'Photo index file:                  {args.index_file}\n'
+		f'Photo directory:                   {args.photo_dir}\n'
+		f'Geodatabase server:                {args.gdb_server}\n'
+		f'Geodatabase database name:         {args.database}\n'
+		f'Log level:                         {args.log_level}\n'
+		f'Log file:                          {args.log_file_name}\n'
+		f'Dry run:                           {args.dry_run}\n'
+		f'Photo state database:              {args.state_file}\n'
+		f'All attachments:                   {args.all_attachments}\n'
+		f'Batch size:                        {args.batch_size}\n'
+		f'Maximum photo dimension:           {args.max_dimension}\n'
+		f'JPEG quality:                      {args.jpeg_quality}\n'
+		f'Maximum thumbnail dimension:       {args.thumbnail_dimension}\n'
+		f'Profile file:                      {args.profile_file}\n'
+		f'Profile mode:                      {args.profile_mode}\n'
+		f'Trace arcpy:                       {args.trace_arcpy}\n'
+		f'{mg.BANNER_DELIMITER_1}'
+	)
+
+
+
+	# Print banner
+
+	logging.info(banner)
+
+
+
+def _process_arguments(
+	log_formatter = None # Formatter to use with log file
+	,argv = None # Argument list (default: sys.argv); see hydro.py
+):
+	'''
+	Process arguments for main block
+
+	Act on arguments that can be handled immediately. Return arguments, as
+	well as any objects created here that are needed elsewhere.
+
+	Note: Refrain from sending log messges until the log level argument is
+	processed, as not to report extraneous information to a user who
+	requested a coarser level of detail.
+	'''
+
+
+	# Define arguments
+
+	parser = _configure_arguments()
+
+
+
+	# Fetch argument values
+
+	args = parser.parse_args(argv)
+
+
+
+	#
+	# Evaluate arguments
+	#
+
+
+	# Set log level
+
+	logging.getLogger().setLevel(args.log_level)
+
+
+
+	# Configure log file
+	#
+	# Do this as early as possible, so we can capture the most messages to
+	# the log file; logging messages sent before log file coniguration will
+	# go to console only
+
+	if args.log_file_name is not None:
+
+		logging.debug(f'Configuring log file {args.log_file_name}')
+		mg.configure_log_file(
+			args.log_file_name
+			,log_formatter
+		)
+
+
+
+	#
+	# Verify batch size
+	#
+
+	if not args.batch_size > 0:
+
+		raise ValueError('Batch size must be greater than zero')
+
+
+
+	#
+	# Verify photo reduction and thumbnails; see load_hydro_photos.py
+	#
+
+	if (
+		args.max_dimension is not None
+		and not args.max_dimension > 0
+	):
+
+		raise ValueError('Maximum photo dimension must be greater than zero')
+
+
+	if (
+		args.thumbnail_dimension is not None
+		and not args.thumbnail_dimension > 0
+	):
+
+		raise ValueError('Maximum thumbnail dimension must be greater than zero')
+
+
+	if (
+		args.max_dimension is not None
+		or args.thumbnail_dimension is not None
+	):
+
+		if importlib.util.find_spec('PIL') is None: # Imported where used
+
+			raise RuntimeError('Photo reduction and thumbnails require the Pillow package')
+
+
+	if not 1 <= args.jpeg_quality <= 95:
+
+		raise ValueError('JPEG quality must be between 1 and 95')
+
+
+
+	# Standardize paths
+	#
+	# Relative paths break some arcpy functionality (e.g. accessing Excel
+	# tables) so force all paths to absolute
+
+	index_file = os.path.abspath(args.index_file)
+	photo_dir = os.path.abspath(args.photo_dir)
+
+	if args.state_file is not None:
+
+		args.state_file = os.path.abspath(args.state_file)
+
+
+
+	#
+	# Return
+	#
+
+	return (
+		args
+		,index_file
+		,photo_dir
+	)
+
+
+
+def _read_index_file_names(index_file):
+	'''
+	Return set of all file names in photo index, valid or not
+	'''
+
+	with arcpy.da.SearchCursor(
+		in_table = index_file
+		,field_names = 'FileName'
+	) as cursor:
+
+		return {
+			row[0]
+			for row in cursor
+		}
+
+
+
+def _standardize_globalid(globalid):
+	'''
+	Return global ID as upper-case string without braces
+	'''
+
+	return str(uuid.UUID(globalid)).upper()
+
+
+
+def _update_keywords(
+	gdb
+	,batch # List of (table, attachmentid, keywords)
+):
+
+	for (
+		table
+		,changes
+	) in _group_by_table(batch).items():
+
+		keywords = {
+			change[1]: change[2]
+			for change in changes
+		}
+
+
+		with arcpy.da.UpdateCursor(
+			in_table = os.path.join(
+				gdb
+				,table
+			)
+			,field_names = (
+				'attachmentid'
+				,'keywords'
+			)
+			,where_clause = f'attachmentid IN ({", ".join(str(a) for a in keywords)})'
+		) as cursor:
+
+			for row in cursor:
+
+				cursor.updateRow(
+					(
+						row[0]
+						,keywords[row[0]]
+					)
+				)
+
+
+
+################################################################################
+# Main
+################################################################################
+
+if __name__ == '__main__':
+
+
+	#
+	# Setup
+	#
+
+
+	# Initialize logging infrastructure; do this early so we can communicate
+	# with user
+	#
+	# Keep a reference to the formatter so we can use it with other handlers
+	# (e.g. FileHandler)
+
+	log_formatter = mg.initialize_logging()
+
+
+
+	# Process arguments
+
+	try:
+
+		(
+			args
+			,index_file
+			,photo_dir
+		) = _process_arguments(log_formatter)
+
+
+	except Exception as e:
+
+		logging.error(e)
+		raise
+
+
+
+	# Print banner
+
+	_print_banner(args)
+
+
+
+	# Connect to geodatabase
+
+	logging.info('Connecting to geodatabase')
+
+	try:
+
+		gdb = mg.connect_gdb(
+			server = args.gdb_server
+			,database = args.database
+		)
+
+
+	except RuntimeError as e:
+
+		logging.error(e)
+
+		sys.exit(mg.EXIT_FAILURE)
+
+
+
+	#
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
+	#
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
+
+		#
+		# Reconcile
+		#
+
+		reconcile_photos(
+			index_file = index_file
+			,photo_dir = photo_dir
+			,gdb = gdb
+			,dry_run = args.dry_run
+			,state_file = args.state_file
+			,all_attachments = args.all_attachments
+			,batch_size = args.batch_size
+			,max_dimension = args.max_dimension
+			,jpeg_quality = args.jpeg_quality
+			,thumbnail_dimension = args.thumbnail_dimension
+		)
+
+
+
+	#
+	# Cleanup
+	#
+
+	logging.info('Done.')
+
+
+
+
+################################################################################
+# END
+################################################################################
@@ -0,0 +1,346 @@
+################################################################################
+# Name:
+#	test_hydro.py
+#
+# Purpose:
+#	Test running loader steps through hydro.py
+#
+# Environment:
+#	ArcGIS Pro 3.4.2
+#	Python 3.11.10, with:
+#		arcpy 3.4 (build py311_arcgispro_55347)
+#
+# Notes:
+#	Run with `python -m unittest test_hydro` (or pytest) from this
+#	directory.
+#
+#	When hydro.py runs a step, the script module is imported, so the
+#	globals its main block sets (e.g. `gdb`) do not exist; steps must use
+#	the geodatabase passed to them. These tests run the loader steps with
+#	arcpy replaced by a fake that records the tables each cursor opens,
+#	and check that every table is in the geodatabase passed to run_step().
+#	They need no database, but the script modules need arcpy to import, so
+#	they are skipped outside ArcGIS Pro Python.
+#
+# History:
+#	2026-10-18 MCM Created
+#
+# To do:
+#	none
+#
+# Copyright 2003-2025. Mannion Geosystems, LLC. http://www.manniongeo.com
+################################################################################
+
+
+#
+# Modules
+#
+
+
+# Standard
+
+import csv
+import importlib.util
+import logging
+import os
+import tempfile
+import unittest
+import unittest.mock
+import uuid
+
+
+# Custom
+
+if importlib.util.find_spec('arcpy') is None:
+
+	raise unittest.SkipTest('arcpy is not available; run with ArcGIS Pro Python')
+
+
+import hydro
+import load_hydro_data
+import load_hydro_photos
+import mg
+
+
+
+#
+# Constants
+#
+
+GDB = os.path.join( # Connection file passed to run_step(); never opened
+	tempfile.gettempdir()
+	,'test_hydro.sde'
+)
+
+LOCATION_ID = 8352
+
+
+
+################################################################################
+# Functions
+################################################################################
+
+def setUpModule():
+
+	mg.initialize_logging() # Custom DATA levels, used by the loaders
+
+
+
+################################################################################
+# Classes
+################################################################################
+
+class FakeCursor(list):
+	'''
+	Rows of an arcpy.da cursor, with field names
+	'''
+
+	def __init__(
+		self
+		,fields
+		,rows = ()
+	):
+
+		super().__init__(rows)
+
+		self.fields = tuple(fields)
+
+
+
+	def __enter__(self):
+
+		return self
+
+
+
+	def __exit__(self, *args):
+
+		return False
+
+
+
+	def next(self):
+
+		return self.pop(0)
+
+
+
+class TestRunStep(unittest.TestCase):
+	'''
+	Run loader steps through hydro.run_step(), with a fake arcpy
+	'''
+
+	def setUp(self):
+
+		self.tables = [] # in_table of every cursor opened
+
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(self.temp_dir.cleanup)
+
+
+
+	def fake_arcpy(self, search_cursor):
+		'''
+		Return fake arcpy module whose SearchCursor calls `search_cursor`
+		'''
+
+		arcpy = unittest.mock.MagicMock()
+
+
+
+		def search(in_table, field_names, where_clause = None, **kwargs):
+
+			self.tables.append(in_table)
+
+			return search_cursor(in_table, field_names, where_clause)
+
+
+
+		def insert(in_table, field_names, **kwargs):
+
+			self.tables.append(in_table)
+
+			cursor = unittest.mock.MagicMock()
+			cursor.__enter__.return_value = cursor
+			cursor.fields = tuple(field_names)
+			cursor.insertRow.return_value = 1
+
+			return cursor
+
+
+
+		arcpy.da.SearchCursor.side_effect = search
+		arcpy.da.InsertCursor.side_effect = insert
+
+		return arcpy
+
+
+
+	def assert_tables_in_gdb(self, source_dir):
+
+		targets = [
+			t
+			for t in self.tables
+			if not t.startswith(source_dir)
+		]
+
+		self.assertTrue(targets)
+
+		for table in targets:
+
+			self.assertEqual(
+				os.path.dirname(table)
+				,GDB
+			)
+
+
+
+	def test_load_data(self):
+
+		source_gdb = os.path.join(
+			self.temp_dir.name
+			,'AquariusExport.gdb'
+		)
+
+		step_arguments = load_hydro_data._process_arguments(
+			argv = ['-s', 'server', '-d', 'hydro', '-L', 'WARNING', source_gdb]
+		)
+
+
+
+		def search_cursor(in_table, field_names, where_clause):
+
+			if in_table.startswith(source_gdb):
+
+				return FakeCursor(
+					('LocationIdentifier',)
+					,[(LOCATION_ID,)]
+				)
+
+
+
+			return FakeCursor( # GlobalID of new row
+				('GlobalID',)
+				,[('{00000000-0000-0000-0000-000000000000}',)]
+			)
+
+
+
+		location = unittest.mock.MagicMock(
+			sensors = [unittest.mock.MagicMock()]
+			,measuring_points = [unittest.mock.MagicMock()]
+			,rejected_measuring_point_count = 0
+		)
+
+		with (
+			unittest.mock.patch.object(load_hydro_data, 'arcpy', self.fake_arcpy(search_cursor))
+			,unittest.mock.patch.object(load_hydro_data, 'get_location', return_value = location)
+			,self.assertNoLogs(level = logging.WARNING)
+		):
+
+			hydro.run_step(
+				gdb = GDB
+				,step_name = 'load-data'
+				,step_arguments = step_arguments
+			)
+
+
+
+		self.assert_tables_in_gdb(source_gdb)
+
+
+
+	def test_load_photos(self):
+
+		photo_dir = os.path.join(
+			self.temp_dir.name
+			,'photos'
+		)
+		os.mkdir(photo_dir)
+
+		file_name = f'{LOCATION_ID:06}_20241204_SITE.jpg'
+
+		with open(os.path.join(photo_dir, file_name), 'wb') as f:
+
+			f.write(b'\xff\xd8\xff\xd9') # Empty JPEG
+
+
+
+		index_file = os.path.join(
+			self.temp_dir.name
+			,'LocationPhotos.csv'
+		)
+
+		index_fields = (
+			'Identifier'
+			,'FileName'
+			,'UniqueId'
+			,'Comment'
+			,'Tags_0_Key'
+		)
+
+		with open(index_file, 'w', newline = '') as f:
+
+			csv.writer(f).writerow(index_fields) # Read through arcpy below
+
+
+
+		step_arguments = load_hydro_photos._process_arguments(
+			argv = ['-i', index_file, '-D', photo_dir, '-g', 'server', '-d', 'hydro', '-L', 'WARNING', '-w', '1']
+		)
+
+
+
+		def search_cursor(in_table, field_names, where_clause):
+
+			if in_table == index_file:
+
+				return FakeCursor(
+					index_fields
+					,[(LOCATION_ID, file_name, uuid.uuid4().hex, None, load_hydro_photos.TAG_LOCATION)]
+				)
+
+
+			if field_names == 'globalid': # Related Location
+
+				return FakeCursor(
+					('globalid',)
+					,[('{00000000-0000-0000-0000-000000000000}',)]
+				)
+
+
+
+			return FakeCursor(field_names) # No existing attachments
+
+
+
+		with (
+			unittest.mock.patch.object(load_hydro_photos, 'arcpy', self.fake_arcpy(search_cursor))
+			,self.assertNoLogs(level = logging.WARNING)
+		):
+
+			hydro.run_step(
+				gdb = GDB
+				,step_name = 'load-photos'
+				,step_arguments = step_arguments
+			)
+
+
+
+		self.assert_tables_in_gdb(index_file)
+
+
+
+################################################################################
+# Main
+################################################################################
+
+if __name__ == '__main__':
+
+	unittest.main()
+
+
+
+################################################################################
+# END
+################################################################################
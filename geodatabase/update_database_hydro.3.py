@@ -19,6 +19,16 @@
 #
 # History:
 #	2025-04-25 MCM Created
+#	2026-10-18 MCM Use shared connection file cache (mg.connect_gdb)
+#	               Import arcpy lazily (mg.lazy_import)
+#	               Add --profile option (mg.profile)
+#	               Add --trace-arcpy option (mg.trace_arcpy)
+#	               Write JSON lines log files (mg.FormatterJSON)
+#	               Write log records on a background thread
+#	                 (mg.initialize_logging)
+#	               Use shared script setup in mg (initialize_logging,
+#	                 configure_log_file, connect_gdb)
+#	               Accept DATA and DATADEBUG log levels (mg.LOG_LEVEL_NAMES)
 #
 # To do:
 #	none
@@ -34,20 +44,19 @@
 
 # Standard
 
-import arcpy
 import argparse
 import logging
 import os
 import sys
-import tempfile
 
 
 # Custom
 
-import constants as C
 import create_hydro_data_model
 import mg
 
+arcpy = mg.lazy_import('arcpy') # Imported on first use; see mg.py
+
 
 
 ################################################################################
@@ -102,29 +111,6 @@ def update_view_locationlastvisit(
 ################################################################################
 
 
-def _check_credentials():
-	'''
-	The target SQL Server instance uses Windows authentication, so we need
-	to ensure that this Python process is running as the correct user
-	'''
-
-	domain = os.environ.get('USERDOMAIN')
-	user = os.environ.get('USERNAME')
-	
-	username = f'{domain}\\{user}' # Leave default string case, for display
-	
-	
-	
-	logging.debug('Checking OS username')
-	if user.upper() != 'HYDRO': # Only check user, not domain, so developers can run in arbitrary environment
-	
-		raise RuntimeError( # Error message is hardwired to HQ domain; developers can ignore domain name
-			'Invalid Windows credentials'
-			f'\nThis script must run in a Python session as the HQ\hydro user, but is running as {username}'
-		)
-
-
-
 def _configure_arguments():
 	'''
 	Configure arguments when running in script mode
@@ -157,13 +143,7 @@ def _configure_arguments():
 	g.add_argument(
 		'-L'
 		,'--log-level'
-		,choices = (
-			'CRITICAL'
-			,'ERROR'
-			,'WARNING'
-			,'INFO'
-			,'DEBUG'
-		)
+		,choices = mg.LOG_LEVEL_NAMES
 		,default = 'INFO'
 		,dest = 'log_level'
 		,help = 'Logging level (default: INFO)'
@@ -175,160 +155,49 @@ def _configure_arguments():
 		'-l'
 		,'--log-file'
 		,dest = 'log_file_name'
-		,help = 'Diagnostic log file name'
+		,help = f'Diagnostic log file name; use suffix {mg.LOG_FILE_SUFFIX_JSON} for JSON lines'
 		,metavar = '<log_file>'
 		,required = False
 	)
 
 	g.add_argument(
-		'-h'
-		,'--help'
-		,action = 'help'
+		'-P'
+		,'--profile'
+		,dest = 'profile_file'
+		,help = 'Profile main work and write statistics to file (.pstats; folded stacks in sample mode)'
+		,metavar = '<profile_file>'
+		,required = False
 	)
 
-
-
-	return ap
-
-
-
-def _configure_log_file(
-	file_name
-	,formatter = None
-):
-	'''
-	Add log file handler to existing root logger
-	Fail if file already exists
-	'''
-
-	try:
-
-		logging.debug('Adding log FileHandler')
-		handler = logging.FileHandler(
-			file_name
-			,mode = 'x'
-			,encoding = 'utf-8'
-		)
-
-
-	except FileExistsError:
-
-		logging.error(f'Log file \'{file_name}\' already exists')
-
-		raise
-
-
-
-	if formatter is not None:
-
-		logging.debug('Setting log FileHandler Formatter')
-		handler.setFormatter(formatter)
-
-
-
-	logging.debug('Adding FileHandler to Logger')
-	logging.getLogger().addHandler(handler)
-
-
-
-def _connect_gdb(
-	server
-):
-	'''
-	Create temporary geodatabase connection using OS authentication
-	
-	Returns tempfile.TemporaryDirectory object, along with geodatabase
-	connection file. You must retain a reference to the returned
-	TemporaryDirectory, else it will go out-of-scope and automatically
-	delete itself - including the connection file it contains. Retaining
-	a reference to the file, itself, is not sufficient to prevent automatic
-	cleanup.
-	'''
-	
-	
-	# Check Windows credentials
-	
-	try:
-	
-		_check_credentials()
-		
-	
-	except RuntimeError as e:
-	
-		raise
-		
-
-	
-	# Create connection
-	
-	temp_dir = tempfile.TemporaryDirectory()
-	logging.debug(f'Created temporary directory {temp_dir.name}')
-	
-	
-	
-	arcpy.management.CreateDatabaseConnection(
-		out_folder_path = temp_dir.name
-		,out_name = C.CONNECTION_FILE_NAME
-		,database_platform = 'SQL_SERVER'
-		,instance = server
-		,account_authentication = 'OPERATING_SYSTEM_AUTH'
-		,database = 'hydro'
-	)
-	
-	
-	gdb = os.path.join(
-		temp_dir.name
-		,C.CONNECTION_FILE_NAME
+	g.add_argument(
+		'-M'
+		,'--profile-mode'
+		,choices = mg.PROFILE_MODES
+		,default = mg.PROFILE_MODE_DETERMINISTIC
+		,dest = 'profile_mode'
+		,help = f'Profiling mode (default: {mg.PROFILE_MODE_DETERMINISTIC}); use sample for low overhead on long runs'
+		,required = False
 	)
-	logging.debug(f'Created database connection file: {gdb}')
-	
-	
-	
-	# Validate geodatabase connection
-	#
-	# Creating connection file does not appear to test connection, just
-	# write properties to file
-
-	logging.debug('Validating geodatabase connection')
-	try:
-
-		# Describe raises:
-		#	IOError if target is not a recognized object type
-		#	OSError if target does not exist
-
-		d = arcpy.Describe(gdb)
-		logging.debug(f'Describe type: {d.dataType}')
-
-
-
-		# Referencing workspaceType raises AttributeError if target is not a workspace
-
-		if not d.workspaceType == 'RemoteDatabase':
 
-			# Explicitly raise exception if target is not an enterprise geodatabase
-
-			raise TypeError(f'Expected RemoteDatabase type; got {d.workspaceType} type')
+	g.add_argument(
+		'-T'
+		,'--trace-arcpy'
+		,action = 'store_true'
+		,dest = 'trace_arcpy'
+		,help = 'Log counts and latencies of arcpy calls, by call site, at end of run'
+		,required = False
+	)
 
+	g.add_argument(
+		'-h'
+		,'--help'
+		,action = 'help'
+	)
 
-	except (
-		IOError
-		,OSError
-		,AttributeError
-		,TypeError
-	) as e:
 
-		raise RuntimeError('Invalid enterprise geodatabase') from e
 
+	return ap
 
-	
-	# Return connection file AND TemporaryDirectory; see function header
-	# comments for details
-	
-	return(
-		gdb
-		,temp_dir
-	)
-	
 
 
 def _get_domain():
@@ -352,63 +221,6 @@ def _get_domain():
 		
 	
 	
-def _initialize_logging(
-	level = logging.NOTSET
-):
-	'''
-	Configure basic console logging
-
-	When running in script mode, this function is called early to establish
-	a basic communication channel with the user. The intent is to perform
-	minimial configuration here - both to reduce the possiblity of errors
-	before the channel is ready, and to avoid expensive processing if the
-	script exits early (e.g. invalid argument) - while also building some
-	of the foundation for more robust logging that may be specified in
-	the script's runtime arguments.
-
-	Use the `logging` module's root logger, and send all messages to stdout.
-	Log at the most verbose level (NOTSET) to avoid suppressing useful
-	messages in case of early problems, with the expectation that the
-	script will choose a more reasonable level after processing arguments.
-	Define custom formatting now, to avoid early messages looking
-	differently than later ones.
-
-	Returns formatter, for use with other handlers.
-	'''
-
-
-	# Formatter
-
-	f = mg.FormatterIndent(
-		fmt = mg.LOG_FORMAT
-		,datefmt = mg.LOG_FORMAT_DATE
-	)
-
-
-
-	# Handler
-
-	h = logging.StreamHandler(sys.stdout)
-
-	h.setFormatter(f)
-
-
-
-	# Logger
-
-	l = logging.getLogger()
-
-	l.setLevel(level)
-	l.addHandler(h)
-
-
-
-	# Return
-
-	return f
-
-
-
 def _print_banner(
 	args
 ):
@@ -423,6 +235,9 @@ def _print_banner(
 		f'Target database server:  {args.server}\n'
 		f'Log level:               {args.log_level}\n'
 		f'Log file:                {args.log_file_name}\n'
+		f'Profile file:            {args.profile_file}\n'
+		f'Profile mode:            {args.profile_mode}\n'
+		f'Trace arcpy:             {args.trace_arcpy}\n'
 		f'{mg.BANNER_DELIMITER_1}'
 	)
 
@@ -481,7 +296,7 @@ def _process_arguments(
 	if args.log_file_name is not None:
 
 		logging.debug(f'Configuring log file {args.log_file_name}')
-		_configure_log_file(
+		mg.configure_log_file(
 			args.log_file_name
 			,log_formatter
 		)
@@ -514,7 +329,7 @@ if __name__ == '__main__':
 	# Keep a reference to the formatter so we can use it with other handlers
 	# (e.g. FileHandler)
 
-	log_formatter = _initialize_logging()
+	log_formatter = mg.initialize_logging()
 
 
 
@@ -544,10 +359,10 @@ if __name__ == '__main__':
 
 	try:
 	
-		(
-			gdb
-			,temp_dir
-		) = _connect_gdb(args.server)
+		gdb = mg.connect_gdb(
+			server = args.server
+			,database = 'hydro'
+		)
 		
 		
 	except RuntimeError as e:
@@ -559,16 +374,31 @@ if __name__ == '__main__':
 
 
 	#
-	# Update Views
+	# Run, with optional profiling (--profile) and arcpy call tracing
+	# (--trace-arcpy)
 	#
+
+	with (
+		mg.profile(
+			file_name = args.profile_file
+			,mode = args.profile_mode
+		)
+		,mg.trace_arcpy(
+			enabled = args.trace_arcpy
+		)
+	):
+
+		#
+		# Update Views
+		#
 	
 	
-	# LocationLastVisit
+		# LocationLastVisit
 	
-	update_view_locationlastvisit(
-		gdb = gdb
-		,indent_level = 1
-	)
+		update_view_locationlastvisit(
+			gdb = gdb
+			,indent_level = 1
+		)
 
 
 